@@ -0,0 +1,3 @@
+"""Servidor HTTP/JSON local sobre los servicios de inventario y su cliente"""
+from api.cache import ResponseCache
+from api.client import ApiClient
@@ -0,0 +1,65 @@
+import hashlib
+import threading
+import time
+
+
+class ResponseCache:
+    """Caché en memoria de respuestas serializadas con vida corta.
+
+    Cada entrada guarda el cuerpo y su ETag. Las lecturas concurrentes de una
+    misma clave vencida esperan a un único cálculo en lugar de repetir la
+    consulta contra la base de datos.
+    """
+
+    def __init__(self, ttl=10):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+        # Un candado por clave para calcular cada respuesta una sola vez
+        self._key_locks = {}
+
+    @staticmethod
+    def make_etag(body):
+        """ETag fuerte a partir del contenido"""
+        return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+    def _fresh(self, key):
+        entry = self._entries.get(key)
+        if entry and entry[2] > time.monotonic():
+            return entry
+        return None
+
+    def get_or_compute(self, key, compute):
+        """Devolver (cuerpo, etag) de la clave, calculándolo con `compute()` si venció"""
+        with self._lock:
+            entry = self._fresh(key)
+            if entry:
+                return entry[0], entry[1]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                entry = self._fresh(key)
+                if entry:
+                    return entry[0], entry[1]
+
+            body = compute()
+            etag = self.make_etag(body)
+            with self._lock:
+                self._entries[key] = (body, etag, time.monotonic() + self.ttl)
+                self._purge()
+            return body, etag
+
+    def _purge(self):
+        """Eliminar entradas vencidas (con el candado general tomado)"""
+        now = time.monotonic()
+        for key in [k for k, e in self._entries.items() if e[2] <= now]:
+            del self._entries[key]
+            lock = self._key_locks.get(key)
+            if lock and not lock.locked():
+                del self._key_locks[key]
+
+    def clear(self):
+        """Vaciar la caché"""
+        with self._lock:
+            self._entries.clear()
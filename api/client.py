@@ -0,0 +1,59 @@
+import json
+import threading
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+from services.errors import ServiceError, ValidationError, NotFoundError
+
+
+class ApiClient:
+    """Cliente del servidor API con revalidación por ETag.
+
+    Guarda la última respuesta de cada URL; si el servidor contesta 304 Not
+    Modified se reutiliza sin volver a transferir ni decodificar el cuerpo.
+    """
+
+    def __init__(self, base_url, timeout=5):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self._responses = {}
+        self._lock = threading.Lock()
+
+    def get(self, path, **params):
+        """GET de un recurso JSON; los parámetros None se omiten"""
+        params = {k: v for k, v in params.items() if v is not None}
+        url = self.base_url + path + ("?" + urlencode(sorted(params.items())) if params else "")
+
+        with self._lock:
+            cached = self._responses.get(url)
+        request = Request(url, headers={'Accept': 'application/json'})
+        if cached:
+            request.add_header('If-None-Match', cached[0])
+
+        try:
+            with urlopen(request, timeout=self.timeout) as response:
+                data = json.loads(response.read().decode("utf-8"))
+                etag = response.headers.get('ETag')
+        except HTTPError as e:
+            if e.code == 304 and cached:
+                return cached[1]
+            raise self._error(e) from e
+
+        if etag:
+            with self._lock:
+                self._responses[url] = (etag, data)
+        return data
+
+    @staticmethod
+    def _error(http_error):
+        """Traducir una respuesta de error a las excepciones de servicios"""
+        try:
+            message = json.loads(http_error.read().decode("utf-8")).get('error')
+        except Exception:
+            message = None
+        message = message or f"Error HTTP {http_error.code}"
+        if http_error.code == 400:
+            return ValidationError(message)
+        if http_error.code == 404:
+            return NotFoundError(message)
+        return ServiceError(message)
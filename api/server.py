@@ -0,0 +1,145 @@
+import json
+import re
+import sys
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs, urlencode
+from database import create_pool, pooled_connection
+from services import CatalogService, ServiceError, ValidationError, NotFoundError
+from api.cache import ResponseCache
+
+
+def _json_default(value):
+    """Serializar fechas y decimales de PostgreSQL"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Tipo no serializable: {type(value).__name__}")
+
+
+def _flag(value):
+    return str(value).lower() in ("1", "true", "si", "sí")
+
+
+def _dashboard(service, query):
+    return {
+        'tarjetas': service.dashboard_counts(),
+        'movimientos': service.movements(limit=10),
+        'stock_bajo': service.stock(solo_bajo=True, limit=10),
+    }
+
+
+# (patrón de ruta, función(servicio, parámetros de la ruta, query string))
+ROUTES = [
+    (re.compile(r"^/api/productos$"),
+     lambda s, m, q: s.list_products(q.get('categoria'), q.get('q'))),
+    (re.compile(r"^/api/productos/(\d+)$"),
+     lambda s, m, q: s.get_product(int(m.group(1)))),
+    (re.compile(r"^/api/stock$"),
+     lambda s, m, q: s.stock(_flag(q.get('bajo', '')), q.get('limite'))),
+    (re.compile(r"^/api/movimientos$"),
+     lambda s, m, q: s.movements(q.get('tipo'), q.get('desde'), q.get('hasta'), q.get('limite'))),
+    (re.compile(r"^/api/solicitudes$"),
+     lambda s, m, q: s.requests(q.get('departamento'), q.get('limite'))),
+    (re.compile(r"^/api/proveedores$"),
+     lambda s, m, q: s.suppliers()),
+    (re.compile(r"^/api/dashboard$"),
+     lambda s, m, q: _dashboard(s, q)),
+]
+
+
+class InventoryApiHandler(BaseHTTPRequestHandler):
+    server_version = "InventarioAPI/1.0"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+        for pattern, handler in ROUTES:
+            match = pattern.match(url.path)
+            if match:
+                break
+        else:
+            self._send_error(404, f"Ruta no encontrada: {url.path}")
+            return
+
+        # Clave canónica: mismos parámetros en cualquier orden comparten respuesta
+        key = url.path + "?" + urlencode(sorted(query.items()))
+        try:
+            body, etag = self.server.cache.get_or_compute(
+                key, lambda: self._render(handler, match, query))
+        except ValidationError as e:
+            self._send_error(400, str(e))
+            return
+        except NotFoundError as e:
+            self._send_error(404, str(e))
+            return
+        except ServiceError as e:
+            self._send_error(422, str(e))
+            return
+        except Exception as e:
+            print(f"Error en {url.path}: {e}", file=sys.stderr)
+            self._send_error(500, "Error interno del servidor")
+            return
+
+        headers = {'ETag': etag, 'Cache-Control': f"max-age={self.server.cache.ttl}"}
+        if etag in [t.strip() for t in self.headers.get('If-None-Match', '').split(",")]:
+            self._send(304, None, headers)
+        else:
+            self._send(200, body, headers)
+
+    def _render(self, handler, match, query):
+        """Ejecutar la consulta con una conexión del pool y serializarla"""
+        # El pool lanza error si se agota: se limita la concurrencia a su tamaño
+        with self.server.db_slots, pooled_connection(self.server.pool) as conn:
+            data = handler(CatalogService(conn), match, query)
+        return json.dumps(data, default=_json_default, ensure_ascii=False).encode("utf-8")
+
+    def _send(self, status, body, headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if body is not None:
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body is not None:
+            self.wfile.write(body)
+
+    def _send_error(self, status, message):
+        body = json.dumps({'error': message}, ensure_ascii=False).encode("utf-8")
+        self._send(status, body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class InventoryApiServer(ThreadingHTTPServer):
+    """Servidor HTTP con un pool de conexiones y una caché de respuestas compartidos"""
+
+    daemon_threads = True
+
+    def __init__(self, address, pool, pool_max, cache_ttl=10, verbose=False):
+        super().__init__(address, InventoryApiHandler)
+        self.pool = pool
+        self.db_slots = threading.BoundedSemaphore(pool_max)
+        self.cache = ResponseCache(cache_ttl)
+        self.verbose = verbose
+
+
+def run_server(host, port, cache_ttl=10, pool_max=10, verbose=False):
+    """Iniciar el servidor API hasta Ctrl+C"""
+    pool = create_pool(1, pool_max)
+    server = InventoryApiServer((host, port), pool, pool_max, cache_ttl, verbose)
+    print(f"Servidor API en http://{host}:{port}/api/ (Ctrl+C para detener)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        pool.closeall()
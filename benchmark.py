@@ -0,0 +1,126 @@
+"""Datos sintéticos y benchmarks de los modelos sobre una base local.
+
+Genera un inventario reproducible con COPY en una base de pruebas y mide los
+métodos de los modelos, el dashboard y las exportaciones. Los resultados se
+guardan en JSON y se comparan con un baseline para detectar regresiones. La
+prueba de carga simula empleados concurrentes sobre los servicios.
+
+Uso:
+    python benchmark.py generar --escala media --base inventario_bench --limpiar
+    python benchmark.py ejecutar --base inventario_bench --salida resultados.json
+    python benchmark.py ejecutar --base inventario_bench --baseline baseline.json
+    python benchmark.py carga --base inventario_bench --usuarios 20 --duracion 120
+"""
+import argparse
+import sys
+import database
+
+
+def _usar_base(nombre, permitir_principal):
+    """Apuntar las conexiones de la aplicación a la base de pruebas"""
+    if nombre == database.CONNECTION_PARAMS['database'] and not permitir_principal:
+        raise SystemExit(
+            f"'{nombre}' es la base de la aplicación; use otra base o --permitir-base-principal")
+    database.CONNECTION_PARAMS['database'] = nombre
+
+
+def generar(args):
+    from benchmarks.generador import generar_datos
+    _usar_base(args.base, args.permitir_base_principal)
+    conn = database.create_connection(show_errors=False)
+    try:
+        conteos = generar_datos(conn, args.escala, args.semilla, args.limpiar)
+    finally:
+        conn.close()
+    for tabla, total in conteos.items():
+        print(f"{tabla:<22} {total:>12,}")
+    return 0
+
+
+def ejecutar(args):
+    from benchmarks.suite import ejecutar_suite, comparar, guardar, cargar
+    _usar_base(args.base, True)
+    resultados = ejecutar_suite(args.repeticiones, args.calentamiento, args.filtro)
+    resultados["base"] = args.base
+    if args.salida:
+        guardar(resultados, args.salida)
+        print(f"\nResultados guardados en {args.salida}")
+
+    if args.baseline:
+        try:
+            baseline = cargar(args.baseline)
+        except FileNotFoundError:
+            guardar(resultados, args.baseline)
+            print(f"No existía baseline; se guardó en {args.baseline}")
+            return 0
+        regresiones = comparar(resultados, baseline, args.tolerancia)
+        if regresiones:
+            print(f"\nRegresiones (> {args.tolerancia:.0%} sobre {args.baseline}):")
+            for nombre, antes, ahora, variacion in regresiones:
+                print(f"  {nombre:<50} {antes:9.1f} -> {ahora:9.1f} ms  (+{variacion:.0%})")
+            return 1
+        print(f"\nSin regresiones respecto a {args.baseline}")
+    return 0
+
+
+def carga(args):
+    from benchmarks.carga import ejecutar_carga, imprimir_reporte
+    from benchmarks.suite import guardar
+    _usar_base(args.base, args.permitir_base_principal)
+    reporte = ejecutar_carga(args.usuarios, args.duracion, args.productos, args.semilla)
+    imprimir_reporte(reporte)
+    if args.salida:
+        guardar(reporte, args.salida)
+        print(f"\nReporte guardado en {args.salida}")
+    return 1 if reporte["violaciones_stock"] else 0
+
+
+def main(argv=None):
+    from benchmarks.generador import ESCALAS
+    parser = argparse.ArgumentParser(description="Datos sintéticos y benchmarks de inventario")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    gen = sub.add_parser("generar", help="Cargar un conjunto de datos sintético")
+    gen.add_argument("--escala", choices=sorted(ESCALAS), default="pequena")
+    gen.add_argument("--base", default="inventario_bench",
+                     help="Base de datos de pruebas (con el esquema ya creado)")
+    gen.add_argument("--semilla", type=int, default=42)
+    gen.add_argument("--limpiar", action="store_true",
+                     help="Vaciar las tablas del inventario antes de cargar")
+    gen.add_argument("--permitir-base-principal", action="store_true",
+                     help="Permitir escribir en la base configurada de la aplicación")
+    gen.set_defaults(func=generar)
+
+    run = sub.add_parser("ejecutar", help="Ejecutar la suite de benchmarks")
+    run.add_argument("--base", default="inventario_bench")
+    run.add_argument("--repeticiones", type=int, default=5)
+    run.add_argument("--calentamiento", type=int, default=1)
+    run.add_argument("--filtro", help="Ejecutar solo los casos que contengan este texto")
+    run.add_argument("--salida", help="Archivo JSON de resultados")
+    run.add_argument("--baseline", help="Baseline JSON a comparar (se crea si no existe)")
+    run.add_argument("--tolerancia", type=float, default=0.20,
+                     help="Empeoramiento relativo tolerado de la mediana (0.20 = 20%%)")
+    run.set_defaults(func=ejecutar)
+
+    load = sub.add_parser("carga", help="Prueba de carga con empleados concurrentes")
+    load.add_argument("--base", default="inventario_bench")
+    load.add_argument("--usuarios", type=int, default=10)
+    load.add_argument("--duracion", type=int, default=60, help="Segundos de prueba")
+    load.add_argument("--productos", type=int, default=50,
+                      help="Productos compartidos por las entregas (menos = más contención)")
+    load.add_argument("--semilla", type=int, default=1)
+    load.add_argument("--salida", help="Archivo JSON del reporte")
+    load.add_argument("--permitir-base-principal", action="store_true",
+                      help="Permitir escribir en la base configurada de la aplicación")
+    load.set_defaults(func=carga)
+
+    args = parser.parse_args(argv)
+    try:
+        return args.func(args)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
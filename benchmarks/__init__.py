@@ -0,0 +1 @@
+"""Generación de datos sintéticos y suite de benchmarks de los modelos"""
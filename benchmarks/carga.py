@@ -0,0 +1,270 @@
+import random
+import threading
+import time
+from collections import defaultdict
+from diagnostics.queries import percentile
+
+# Mezcla de operaciones de un empleado: (operación, peso)
+MEZCLA = [
+    ("busqueda", 40),
+    ("entrega", 25),
+    ("entrada", 15),
+    ("compra", 10),
+    ("dashboard", 10),
+]
+
+# Códigos de PostgreSQL que indican contención
+DEADLOCK = "40P01"
+LOCK_NOT_AVAILABLE = "55P03"
+
+
+class _Contexto:
+    """Datos compartidos por los empleados y contadores del resultado"""
+
+    def __init__(self, productos, departamentos, solicitantes, usuarios):
+        self.productos = productos
+        self.departamentos = departamentos
+        self.solicitantes = solicitantes
+        self.usuarios = usuarios
+        self.lock = threading.Lock()
+        self.latencias = defaultdict(list)
+        self.exitos = defaultdict(int)
+        self.rechazos = defaultdict(int)
+        self.errores = defaultdict(int)
+        self.deadlocks = 0
+        self.lock_timeouts = 0
+        self.indeterminadas = 0
+        # Variación de stock confirmada por producto
+        self.delta_stock = defaultdict(int)
+        self.productos_dudosos = set()
+
+
+def _cargar_contexto(conn, cantidad_productos, rng):
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            SELECT i.id_producto FROM inventario i
+            JOIN productos p ON p.id_producto = i.id_producto
+            WHERE p.activo = TRUE
+            ORDER BY i.stock DESC LIMIT %s
+        """, (cantidad_productos * 4,))
+        candidatos = [row[0] for row in cursor.fetchall()]
+        cursor.execute("SELECT id_solicitante, id_departamento FROM solicitantes WHERE activo = TRUE")
+        solicitantes = cursor.fetchall()
+        cursor.execute("SELECT id FROM usuarios")
+        usuarios = [row[0] for row in cursor.fetchall()]
+    if not candidatos or not solicitantes or not usuarios:
+        raise RuntimeError("La base no tiene productos, solicitantes o usuarios; "
+                           "genere datos con 'benchmark.py generar'")
+    productos = rng.sample(candidatos, min(cantidad_productos, len(candidatos)))
+    departamentos = sorted({d for _, d in solicitantes})
+    return _Contexto(productos, departamentos, solicitantes, usuarios)
+
+
+def _stock(conn, productos):
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT id_producto, stock FROM inventario WHERE id_producto = ANY(%s)",
+                       (list(productos),))
+        return dict(cursor.fetchall())
+
+
+def _empleado(numero, contexto, fin, semilla):
+    """Bucle de un empleado simulado con su propia conexión"""
+    from psycopg2 import Error as DatabaseError
+    from database import create_connection, ConnectionLostError
+    from services import (CatalogService, EntregaService, StockService, PurchaseService,
+                          InsufficientStockError, ServiceError)
+
+    rng = random.Random(semilla + numero)
+    conn = create_connection(show_errors=False)
+    catalogo = CatalogService(conn)
+    entregas = EntregaService(conn)
+    stock = StockService(conn)
+    compras = PurchaseService(conn)
+    operaciones = [op for op, _ in MEZCLA]
+    pesos = [peso for _, peso in MEZCLA]
+    responsable = rng.choice(contexto.usuarios)
+    memo = 0
+
+    while not fin.is_set():
+        operacion = rng.choices(operaciones, weights=pesos)[0]
+        afectados = []
+        cambios = []
+        inicio = time.perf_counter()
+        try:
+            if operacion == "busqueda":
+                catalogo.list_products(texto=rng.choice("ABCDEFGHJKLMNPQRSTUVWXYZ"))
+            elif operacion == "dashboard":
+                catalogo.dashboard_counts()
+                catalogo.stock(solo_bajo=True, limit=10)
+                catalogo.movements(limit=10)
+            elif operacion == "entrega":
+                id_solicitante, id_departamento = rng.choice(contexto.solicitantes)
+                lineas = [(p, rng.randint(1, 3))
+                          for p in rng.sample(contexto.productos, rng.randint(1, 4))]
+                afectados = [p for p, _ in lineas]
+                memo += 1
+                entregas.registrar_entrega(id_departamento, id_solicitante, responsable,
+                                           f"CARGA-{numero}-{memo}", lineas)
+                cambios = [(p, -c) for p, c in lineas]
+            elif operacion == "entrada":
+                producto = rng.choice(contexto.productos)
+                cantidad = rng.randint(1, 10)
+                afectados = [producto]
+                stock.add_stock(producto, cantidad, responsable, "Prueba de carga")
+                cambios = [(producto, cantidad)]
+            else:
+                compras.create_request(f"Producto {rng.choice(contexto.productos)}",
+                                       rng.randint(1, 50), "Prueba de carga",
+                                       rng.choice(PurchaseService.PRIORIDADES))
+            ms = (time.perf_counter() - inicio) * 1000
+            with contexto.lock:
+                contexto.latencias[operacion].append(ms)
+                contexto.exitos[operacion] += 1
+                for producto, delta in cambios:
+                    contexto.delta_stock[producto] += delta
+        except InsufficientStockError:
+            with contexto.lock:
+                contexto.rechazos[operacion] += 1
+        except ConnectionLostError:
+            # No se sabe si la escritura se aplicó: se excluye de la verificación
+            with contexto.lock:
+                contexto.indeterminadas += 1
+                contexto.productos_dudosos.update(afectados)
+        except (ServiceError, DatabaseError) as e:
+            codigo = getattr(e, "pgcode", None)
+            with contexto.lock:
+                contexto.errores[operacion] += 1
+                if codigo == DEADLOCK:
+                    contexto.deadlocks += 1
+                elif codigo == LOCK_NOT_AVAILABLE:
+                    contexto.lock_timeouts += 1
+        except Exception as e:
+            with contexto.lock:
+                contexto.errores[operacion] += 1
+            print(f"Empleado {numero}: error inesperado en {operacion}: {e}")
+    conn.close()
+
+
+def _monitor_bloqueos(fin, muestras, intervalo=0.2):
+    """Muestrear las sesiones que esperan un lock en la base de la prueba"""
+    from database import create_connection
+    conn = create_connection(show_errors=False, cache=False)
+    try:
+        with conn.cursor() as cursor:
+            while not fin.wait(intervalo):
+                cursor.execute("""
+                    SELECT COUNT(*) FROM pg_stat_activity
+                    WHERE datname = current_database() AND wait_event_type = 'Lock'
+                """)
+                muestras.append(cursor.fetchone()[0])
+    finally:
+        conn.close()
+
+
+def _deadlocks_servidor(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT deadlocks FROM pg_stat_database WHERE datname = current_database()")
+        row = cursor.fetchone()
+        return row[0] if row else 0
+
+
+def ejecutar_carga(usuarios=10, duracion=60, productos=50, semilla=1, progreso=print):
+    """Simular `usuarios` empleados concurrentes durante `duracion` segundos.
+
+    Los empleados comparten un grupo de `productos` para provocar contención
+    en las entregas. Al terminar se verifica que el stock de cada producto
+    sea el inicial más las variaciones confirmadas y que ninguno quede negativo.
+    """
+    from database import create_connection
+    rng = random.Random(semilla)
+    # La verificación de stock lee siempre del servidor
+    conn = create_connection(show_errors=False, cache=False)
+    try:
+        contexto = _cargar_contexto(conn, productos, rng)
+        stock_inicial = _stock(conn, contexto.productos)
+        deadlocks_inicio = _deadlocks_servidor(conn)
+
+        fin = threading.Event()
+        muestras_bloqueo = []
+        hilos = [threading.Thread(target=_empleado, args=(n, contexto, fin, semilla), daemon=True)
+                 for n in range(usuarios)]
+        monitor = threading.Thread(target=_monitor_bloqueos, args=(fin, muestras_bloqueo),
+                                   daemon=True)
+        progreso(f"{usuarios} empleados durante {duracion} s sobre {len(contexto.productos)} productos...")
+        inicio = time.perf_counter()
+        monitor.start()
+        for hilo in hilos:
+            hilo.start()
+        fin.wait(duracion)
+        fin.set()
+        for hilo in hilos:
+            hilo.join()
+        monitor.join()
+        transcurrido = time.perf_counter() - inicio
+
+        stock_final = _stock(conn, contexto.productos)
+        deadlocks_servidor = _deadlocks_servidor(conn) - deadlocks_inicio
+    finally:
+        conn.close()
+
+    violaciones = []
+    for producto in contexto.productos:
+        esperado = stock_inicial.get(producto, 0) + contexto.delta_stock.get(producto, 0)
+        final = stock_final.get(producto, 0)
+        if final < 0 or (producto not in contexto.productos_dudosos and final != esperado):
+            violaciones.append({"producto": producto, "inicial": stock_inicial.get(producto),
+                                "esperado": esperado, "final": final})
+
+    operaciones = {}
+    for operacion, _ in MEZCLA:
+        ordenados = sorted(contexto.latencias[operacion])
+        operaciones[operacion] = {
+            "exitos": contexto.exitos[operacion],
+            "rechazos": contexto.rechazos[operacion],
+            "errores": contexto.errores[operacion],
+            "por_segundo": contexto.exitos[operacion] / transcurrido,
+            "p50_ms": percentile(ordenados, 50),
+            "p95_ms": percentile(ordenados, 95),
+            "p99_ms": percentile(ordenados, 99),
+            "max_ms": ordenados[-1] if ordenados else 0.0,
+        }
+
+    return {
+        "usuarios": usuarios,
+        "duracion_s": transcurrido,
+        "productos": len(contexto.productos),
+        "operaciones_por_segundo": sum(contexto.exitos.values()) / transcurrido,
+        "operaciones": operaciones,
+        "esperas_lock": {
+            "muestras": len(muestras_bloqueo),
+            "con_espera": sum(1 for m in muestras_bloqueo if m),
+            "maximo_sesiones": max(muestras_bloqueo, default=0),
+        },
+        "deadlocks": contexto.deadlocks,
+        "deadlocks_servidor": deadlocks_servidor,
+        "lock_timeouts": contexto.lock_timeouts,
+        "indeterminadas": contexto.indeterminadas,
+        "violaciones_stock": violaciones,
+    }
+
+
+def imprimir_reporte(reporte, salida=print):
+    salida(f"\n{reporte['usuarios']} empleados, {reporte['duracion_s']:.1f} s, "
+           f"{reporte['operaciones_por_segundo']:.1f} operaciones/s")
+    salida(f"{'Operación':<12}{'éxitos':>8}{'rech.':>7}{'err.':>6}{'op/s':>8}"
+           f"{'p50':>9}{'p95':>9}{'p99':>9}{'máx':>9}  (ms)")
+    for nombre, op in reporte["operaciones"].items():
+        salida(f"{nombre:<12}{op['exitos']:>8}{op['rechazos']:>7}{op['errores']:>6}"
+               f"{op['por_segundo']:>8.1f}{op['p50_ms']:>9.1f}{op['p95_ms']:>9.1f}"
+               f"{op['p99_ms']:>9.1f}{op['max_ms']:>9.1f}")
+    esperas = reporte["esperas_lock"]
+    salida(f"Esperas de lock: {esperas['con_espera']} de {esperas['muestras']} muestras, "
+           f"hasta {esperas['maximo_sesiones']} sesiones esperando")
+    salida(f"Deadlocks: {reporte['deadlocks']} (servidor: {reporte['deadlocks_servidor']}), "
+           f"lock timeouts: {reporte['lock_timeouts']}, "
+           f"escrituras indeterminadas: {reporte['indeterminadas']}")
+    violaciones = reporte["violaciones_stock"]
+    salida(f"Violaciones de consistencia de stock: {len(violaciones)}")
+    for v in violaciones[:20]:
+        salida(f"  producto {v['producto']}: inicial {v['inicial']}, "
+               f"esperado {v['esperado']}, final {v['final']}")
@@ -0,0 +1,223 @@
+import csv
+import hashlib
+import io
+import random
+from datetime import datetime, timedelta
+from services.base import estado_stock_sql
+from services.compras_service import PurchaseService
+
+# Volúmenes por escala. Las distribuciones de categorías, marcas y productos
+# movidos siguen una ley de potencia, como en el inventario real: pocas
+# categorías y productos concentran la mayoría del volumen.
+ESCALAS = {
+    "pequena": {"productos": 1_000, "movimientos": 100_000, "solicitudes": 5_000,
+                "categorias": 20, "marcas": 80, "ubicaciones": 10, "departamentos": 15,
+                "solicitantes": 200, "proveedores": 50, "compras": 500, "anios": 2},
+    "media": {"productos": 50_000, "movimientos": 2_000_000, "solicitudes": 100_000,
+              "categorias": 60, "marcas": 600, "ubicaciones": 40, "departamentos": 40,
+              "solicitantes": 2_000, "proveedores": 400, "compras": 10_000, "anios": 4},
+    "grande": {"productos": 500_000, "movimientos": 10_000_000, "solicitudes": 1_000_000,
+               "categorias": 150, "marcas": 3_000, "ubicaciones": 120, "departamentos": 80,
+               "solicitantes": 10_000, "proveedores": 2_000, "compras": 50_000, "anios": 6},
+}
+
+# Tablas que se vacían antes de generar, en orden de dependencias inverso
+TABLAS = [
+    "detalle_solicitud", "solicitudes", "movimientos", "proveedor_producto",
+    "proveedor_categoria", "inventario", "productos", "solicitudes_compra",
+    "proveedores", "solicitantes", "usuarios", "departamentos", "ubicaciones",
+    "marcas", "categorias",
+]
+
+# Filas por bloque de COPY
+LOTE_COPY = 200_000
+
+
+def _pesos_potencia(n, exponente=1.1):
+    """Pesos acumulados de una distribución tipo Zipf para random.choices"""
+    acumulado = 0.0
+    pesos = []
+    for i in range(n):
+        acumulado += 1 / (i + 1) ** exponente
+        pesos.append(acumulado)
+    return pesos
+
+
+def _copy(cursor, tabla, columnas, filas):
+    """Cargar filas con COPY en bloques de LOTE_COPY"""
+    sentencia = f"COPY {tabla} ({', '.join(columnas)}) FROM STDIN WITH (FORMAT csv)"
+    total = 0
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for fila in filas:
+        writer.writerow(fila)
+        total += 1
+        if total % LOTE_COPY == 0:
+            buffer.seek(0)
+            cursor.copy_expert(sentencia, buffer)
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+    if buffer.tell():
+        buffer.seek(0)
+        cursor.copy_expert(sentencia, buffer)
+    return total
+
+
+def _ids(cursor, tabla, columna):
+    cursor.execute(f"SELECT {columna} FROM {tabla} ORDER BY {columna}")
+    return [row[0] for row in cursor.fetchall()]
+
+
+def _fecha(rng, inicio, segundos):
+    """Fecha aleatoria en horario laboral dentro del rango"""
+    fecha = inicio + timedelta(seconds=rng.randrange(segundos))
+    return fecha.replace(hour=rng.randint(8, 17))
+
+
+def generar_datos(conn, escala="pequena", semilla=42, limpiar=False, progreso=print):
+    """Generar un conjunto de datos sintético reproducible en la base conectada.
+
+    Con `limpiar` vacía antes las tablas del inventario (TRUNCATE ... RESTART
+    IDENTITY). Devuelve el número de filas cargadas por tabla.
+    """
+    volumen = ESCALAS[escala]
+    rng = random.Random(semilla)
+    conteos = {}
+    hoy = datetime.now().replace(microsecond=0)
+    inicio = hoy - timedelta(days=365 * volumen["anios"])
+    segundos = int((hoy - inicio).total_seconds())
+
+    autocommit_previo = conn.autocommit
+    conn.autocommit = False
+    try:
+        with conn.cursor() as cursor:
+            if limpiar:
+                progreso("Vaciando tablas...")
+                cursor.execute(f"TRUNCATE {', '.join(TABLAS)} RESTART IDENTITY CASCADE")
+
+            for tabla, prefijo in (("categorias", "Categoría"), ("marcas", "Marca"),
+                                   ("ubicaciones", "Ubicación"), ("departamentos", "Departamento")):
+                conteos[tabla] = _copy(cursor, tabla, ["nombre", "activo"], (
+                    (f"{prefijo} {i:05d}", True) for i in range(1, volumen[tabla] + 1)))
+            categorias = _ids(cursor, "categorias", "id_categoria")
+            marcas = _ids(cursor, "marcas", "id_marca")
+            ubicaciones = _ids(cursor, "ubicaciones", "id_ubicacion")
+            departamentos = _ids(cursor, "departamentos", "id_departamento")
+
+            password = hashlib.sha256(b"benchmark").hexdigest()
+            conteos["usuarios"] = _copy(
+                cursor, "usuarios", ["nombre_completo", "email", "usuario", "password", "rol"],
+                ((f"Usuario {i}", f"usuario{i}@bench.local", f"bench{i}", password,
+                  "admin" if i == 1 else "usuario") for i in range(1, 21)))
+            usuarios = _ids(cursor, "usuarios", "id")
+
+            pesos_departamento = _pesos_potencia(len(departamentos))
+            conteos["solicitantes"] = _copy(
+                cursor, "solicitantes", ["cedula", "nombre", "id_departamento", "activo"],
+                ((str(10_000_000 + i), f"Solicitante {i:06d}",
+                  rng.choices(departamentos, cum_weights=pesos_departamento)[0], True)
+                 for i in range(1, volumen["solicitantes"] + 1)))
+            cursor.execute("SELECT id_solicitante, id_departamento FROM solicitantes")
+            solicitantes = cursor.fetchall()
+
+            conteos["proveedores"] = _copy(
+                cursor, "proveedores",
+                ["nombre", "contacto", "telefono", "email", "valoracion", "manejo_precios"],
+                ((f"Proveedor {i:05d}", f"Contacto {i}", f"0412{i:07d}",
+                  f"proveedor{i}@bench.local", rng.choice([None, 1, 2, 3, 4, 5]),
+                  rng.choice(["Bajo", "Medio", "Alto"]))
+                 for i in range(1, volumen["proveedores"] + 1)))
+            proveedores = _ids(cursor, "proveedores", "id_proveedor")
+
+            progreso(f"Generando {volumen['productos']} productos...")
+            pesos_categoria = _pesos_potencia(len(categorias))
+            pesos_marca = _pesos_potencia(len(marcas))
+            conteos["productos"] = _copy(
+                cursor, "productos", ["codigo", "nombre", "id_marca", "id_categoria", "stock_minimo"],
+                ((f"P{i:07d}", f"Producto {rng.choice('ABCDEFGHJKLMNPQRSTUVWXYZ')}{i:07d}",
+                  rng.choices(marcas, cum_weights=pesos_marca)[0],
+                  rng.choices(categorias, cum_weights=pesos_categoria)[0],
+                  rng.choice([0, 5, 10, 20, 50]))
+                 for i in range(1, volumen["productos"] + 1)))
+            productos = _ids(cursor, "productos", "id_producto")
+
+            conteos["inventario"] = _copy(
+                cursor, "inventario", ["id_producto", "id_ubicacion", "stock", "estado_stock"],
+                ((id_producto, rng.choice(ubicaciones), int(rng.expovariate(1 / 40)), "disponible")
+                 for id_producto in productos))
+            cursor.execute(f"""
+                UPDATE inventario i
+                SET estado_stock = {estado_stock_sql("i.stock", "p.stock_minimo")}
+                FROM productos p WHERE p.id_producto = i.id_producto
+            """)
+
+            conteos["proveedor_categoria"] = _copy(
+                cursor, "proveedor_categoria", ["id_proveedor", "id_categoria"],
+                ((id_proveedor, id_categoria) for id_proveedor in proveedores
+                 for id_categoria in set(rng.choices(categorias, cum_weights=pesos_categoria, k=3))))
+            conteos["proveedor_producto"] = _copy(
+                cursor, "proveedor_producto", ["id_proveedor", "id_producto"],
+                ((id_proveedor, id_producto) for id_proveedor in proveedores
+                 for id_producto in set(rng.sample(productos, min(20, len(productos))))))
+
+            # Pocos productos concentran la mayoría de los movimientos
+            pesos_producto = _pesos_potencia(len(productos), exponente=0.9)
+
+            def _movimientos():
+                for _ in range(volumen["movimientos"]):
+                    tipo = rng.choice(("Entrada", "Salida", "Salida"))
+                    referencia = ("Compra" if tipo == "Entrada"
+                                  else f"Solicitud #MEMO-{rng.randint(1, volumen['solicitudes']):07d}")
+                    yield (rng.choices(productos, cum_weights=pesos_producto)[0], tipo,
+                           rng.randint(1, 20), rng.choice(usuarios), referencia,
+                           _fecha(rng, inicio, segundos))
+
+            progreso(f"Generando {volumen['movimientos']} movimientos...")
+            conteos["movimientos"] = _copy(
+                cursor, "movimientos",
+                ["id_producto", "tipo", "cantidad", "id_responsable", "referencia", "fecha"],
+                _movimientos())
+
+            def _solicitudes():
+                for i in range(1, volumen["solicitudes"] + 1):
+                    id_solicitante, id_departamento = rng.choice(solicitantes)
+                    yield (id_departamento, id_solicitante, rng.choice(usuarios),
+                           f"MEMO-{i:07d}", _fecha(rng, inicio, segundos))
+
+            def _detalles():
+                for id_solicitud in solicitudes:
+                    for id_producto in set(rng.choices(productos, cum_weights=pesos_producto,
+                                                       k=rng.randint(1, 5))):
+                        yield id_solicitud, id_producto, rng.randint(1, 10)
+
+            progreso(f"Generando {volumen['solicitudes']} solicitudes...")
+            conteos["solicitudes"] = _copy(
+                cursor, "solicitudes",
+                ["id_departamento", "id_solicitante", "id_responsable_entrega",
+                 "comentario", "fecha_solicitud"],
+                _solicitudes())
+            solicitudes = _ids(cursor, "solicitudes", "id_solicitud")
+            conteos["detalle_solicitud"] = _copy(
+                cursor, "detalle_solicitud", ["id_solicitud", "id_producto", "cantidad"],
+                _detalles())
+
+            conteos["solicitudes_compra"] = _copy(
+                cursor, "solicitudes_compra",
+                ["producto", "cantidad", "motivo", "prioridad", "proveedor", "fecha", "estado"],
+                ((f"Producto {rng.randint(1, volumen['productos']):07d}", rng.randint(1, 100),
+                  "Reposición", rng.choice(PurchaseService.PRIORIDADES),
+                  f"Proveedor {rng.randint(1, volumen['proveedores']):05d}",
+                  _fecha(rng, inicio, segundos), rng.choice(PurchaseService.ESTADOS))
+                 for _ in range(volumen["compras"])))
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.autocommit = autocommit_previo
+
+    progreso("Actualizando estadísticas (ANALYZE)...")
+    with conn.cursor() as cursor:
+        cursor.execute("ANALYZE")
+    return conteos
@@ -0,0 +1,184 @@
+import json
+import os
+import platform
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+
+def _casos():
+    """Casos de la suite: (nombre, preparar) donde preparar() devuelve la función a medir"""
+    from models.product_model import ProductModel
+    from models.movimientos_models import MovementModel
+    from models.proveedores_models import SupplierModel
+    from models.solicitudes_model import SolicitudesModel
+
+    def productos():
+        model = ProductModel()
+        return lambda: model.get_products()
+
+    def productos_busqueda():
+        model = ProductModel()
+        extra = " AND (p.nombre ILIKE %s OR p.codigo ILIKE %s) AND i.estado_stock = %s"
+        return lambda: model.get_products(extra, ("%B12%", "%B12%", "disponible"))
+
+    def estado_stock():
+        model = ProductModel()
+        return model.update_product_stock_status
+
+    def movimientos():
+        model = MovementModel()
+        return lambda: model.get_all_movements()
+
+    def movimientos_filtrados():
+        model = MovementModel()
+        hasta = datetime.now()
+        desde = hasta - timedelta(days=30)
+        return lambda: model.get_all_movements("Salida", desde.strftime("%Y-%m-%d"),
+                                               hasta.strftime("%Y-%m-%d"))
+
+    def proveedores():
+        model = SupplierModel()
+        return lambda: model.get_all_suppliers()
+
+    def solicitudes():
+        model = SolicitudesModel()
+        return lambda: model.obtener_solicitudes()
+
+    def solicitudes_filtradas():
+        model = SolicitudesModel()
+        return lambda: model.obtener_solicitudes({'search_text': "MEMO-00012"})
+
+    def dashboard():
+        from menu.dashboard import get_dashboard_data
+        return get_dashboard_data
+
+    def _exportacion(exportar, datos):
+        def medir():
+            filename, error = exportar(datos)
+            if error:
+                raise RuntimeError(f"La exportación falló: {error}")
+            return datos
+        return medir
+
+    def exportar_inventario():
+        import pandas  # noqa: F401  (dependencia de ExportManager)
+        from models.export_manager import ExportManager
+        # Mismas columnas que la tabla de inventario
+        datos = [(i, p[2], p[3], p[4], p[1], p[5], p[8], p[6], p[7], p[9])
+                 for i, p in enumerate(ProductModel().get_products(), start=1)]
+        return _exportacion(ExportManager.export_inventory, datos)
+
+    def exportar_movimientos():
+        import pandas  # noqa: F401
+        from models.export_manager import ExportManager
+        datos = MovementModel().get_all_movements()
+        return _exportacion(ExportManager.export_movements, datos)
+
+    return [
+        ("ProductModel.get_products", productos),
+        ("ProductModel.get_products[busqueda]", productos_busqueda),
+        ("ProductModel.update_product_stock_status", estado_stock),
+        ("MovementModel.get_all_movements", movimientos),
+        ("MovementModel.get_all_movements[salidas_30_dias]", movimientos_filtrados),
+        ("SupplierModel.get_all_suppliers", proveedores),
+        ("SolicitudesModel.obtener_solicitudes", solicitudes),
+        ("SolicitudesModel.obtener_solicitudes[busqueda]", solicitudes_filtradas),
+        ("dashboard.get_dashboard_data", dashboard),
+        ("ExportManager.export_inventory", exportar_inventario),
+        ("ExportManager.export_movements", exportar_movimientos),
+    ]
+
+
+def _filas(resultado):
+    """Cantidad de filas de un resultado, si aplica"""
+    if isinstance(resultado, (list, tuple)):
+        return len(resultado)
+    if isinstance(resultado, dict):
+        return sum(len(v) for v in resultado.values() if isinstance(v, list))
+    return None
+
+
+def ejecutar_suite(repeticiones=5, calentamiento=1, filtro=None, progreso=print):
+    """Medir cada caso y devolver los resultados como diccionario serializable.
+
+    Las exportaciones se escriben en un directorio temporal y la caché de
+    resultados se desactiva durante la medición. Un caso que no se puede
+    preparar (p. ej. falta pandas para exportar) queda como omitido.
+    """
+    from query_cache import result_cache
+    resultados = {}
+    directorio_original = os.getcwd()
+    # Medir siempre contra el servidor, no contra la caché de resultados
+    cache_activa, result_cache.enabled = result_cache.enabled, False
+    with tempfile.TemporaryDirectory() as temporal:
+        os.chdir(temporal)
+        try:
+            for nombre, preparar in _casos():
+                if filtro and filtro not in nombre:
+                    continue
+                try:
+                    funcion = preparar()
+                except ImportError as e:
+                    resultados[nombre] = {"omitido": str(e)}
+                    progreso(f"{nombre:<50} omitido: {e}")
+                    continue
+
+                for _ in range(calentamiento):
+                    funcion()
+                tiempos = []
+                filas = None
+                for _ in range(repeticiones):
+                    inicio = time.perf_counter()
+                    resultado = funcion()
+                    tiempos.append((time.perf_counter() - inicio) * 1000)
+                    filas = _filas(resultado)
+                tiempos.sort()
+                resultados[nombre] = {
+                    "mediana_ms": statistics.median(tiempos),
+                    "min_ms": tiempos[0],
+                    "max_ms": tiempos[-1],
+                    "repeticiones": repeticiones,
+                    "filas": filas,
+                }
+                progreso(f"{nombre:<50} mediana {resultados[nombre]['mediana_ms']:9.1f} ms"
+                         f"  filas {filas if filas is not None else '-'}")
+        finally:
+            os.chdir(directorio_original)
+            result_cache.enabled = cache_activa
+
+    return {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "resultados": resultados,
+    }
+
+
+def comparar(actual, baseline, tolerancia=0.20):
+    """Comparar con un baseline; devuelve [(caso, baseline_ms, actual_ms, variación)].
+
+    Solo incluye los casos cuya mediana empeoró más que `tolerancia`.
+    """
+    regresiones = []
+    for nombre, medida in actual["resultados"].items():
+        base = baseline.get("resultados", {}).get(nombre)
+        if not base or "mediana_ms" not in base or "mediana_ms" not in medida:
+            continue
+        if base["mediana_ms"] <= 0:
+            continue
+        variacion = medida["mediana_ms"] / base["mediana_ms"] - 1
+        if variacion > tolerancia:
+            regresiones.append((nombre, base["mediana_ms"], medida["mediana_ms"], variacion))
+    return regresiones
+
+
+def guardar(resultados, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(resultados, f, ensure_ascii=False, indent=2)
+
+
+def cargar(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,96 @@
+"""Carga de tablas maestras desde documentos .docx.
+
+Uso:
+    python cargar_maestros.py "Tablas maestras. InvUsm.docx" CATEGORIAS.docx --dry-run
+    python cargar_maestros.py maestros.docx --desactivar-faltantes
+"""
+import argparse
+import sys
+from models.master_data_model import MasterDataModel
+
+
+def _describe(table, record):
+    """Texto corto de un registro para el reporte"""
+    if table == 'solicitantes':
+        departamento = record.get('departamento')
+        return f"{record['cedula']} - {record.get('nombre', '')}" + (
+            f" ({departamento})" if departamento else "")
+    return record['nombre']
+
+
+def print_report(diff, warnings, limit):
+    """Imprimir el resumen de cambios por tabla"""
+    for warning in warnings:
+        print(f"AVISO: {warning}")
+
+    total = 0
+    for table in MasterDataModel.ORDER:
+        changes = diff[table]
+        count = sum(len(v) for v in changes.values())
+        total += count
+        print(f"\n[{table}] altas: {len(changes['insert'])}, "
+              f"actualizaciones: {len(changes['update'])}, "
+              f"desactivaciones: {len(changes['deactivate'])}")
+
+        for record in changes['insert'][:limit]:
+            print(f"  + {_describe(table, record)}")
+        for update in changes['update'][:limit]:
+            detalle = ", ".join(f"{k}={v}" for k, v in update['cambios'].items())
+            print(f"  ~ {_describe(table, update['actual'])}: {detalle}")
+        for record in changes['deactivate'][:limit]:
+            print(f"  - {_describe(table, record)}")
+        if count > 3 * limit:
+            print("  ...")
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Carga categorías, marcas, ubicaciones, departamentos y "
+                    "solicitantes desde tablas de documentos .docx")
+    parser.add_argument("documentos", nargs="+", help="Archivos .docx a procesar")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Solo mostrar el reporte de cambios, sin aplicarlos")
+    parser.add_argument("--desactivar-faltantes", action="store_true",
+                        help="Desactivar registros que no aparezcan en los documentos")
+    parser.add_argument("--limite", type=int, default=20,
+                        help="Máximo de registros a listar por tipo de cambio")
+    args = parser.parse_args(argv)
+
+    try:
+        model = MasterDataModel()
+    except Exception as e:
+        print(f"No se pudo conectar a PostgreSQL: {e}", file=sys.stderr)
+        return 2
+
+    try:
+        data = {table: [] for table in MasterDataModel.TABLES}
+        warnings = []
+        for filename in args.documentos:
+            parsed, file_warnings = model.parse_docx(filename)
+            for table, records in parsed.items():
+                data[table].extend(records)
+            warnings.extend(f"{filename}: {w}" for w in file_warnings)
+            if not any(parsed.values()):
+                warnings.append(f"{filename}: no contiene tablas de datos maestros")
+
+        diff = model.compute_diff(data, args.desactivar_faltantes)
+        total = print_report(diff, warnings, args.limite)
+
+        if total == 0:
+            print("\nSin cambios.")
+        elif args.dry_run:
+            print(f"\nSimulación: {total} cambios no aplicados.")
+        else:
+            model.apply_diff(diff)
+            print(f"\n{total} cambios aplicados.")
+        return 0
+    except Exception as e:
+        print(f"Error al cargar tablas maestras: {e}", file=sys.stderr)
+        return 1
+    finally:
+        model.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
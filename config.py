@@ -5,3 +5,67 @@ DB_CONFIG = {
     'password': 'tu_contraseña',
     'port': '5432'
 }
+
+# Intervalo de refresco del agregado de consumo departamental (ms)
+CONSUMO_REFRESH_MS = 900000
+
+# Servidor API local (servidor_api.py)
+API_HOST = '127.0.0.1'
+API_PORT = 8765
+# Vida de las respuestas en la caché del servidor (segundos)
+API_CACHE_TTL = 10
+API_POOL_MAX = 10
+# URL del servidor API para el modo cliente, p. ej. 'http://127.0.0.1:8765'.
+# Solo el panel principal (Dashboard) lee desde el servidor; las demás
+# pantallas (inventario, solicitudes, proveedores, compras, notificaciones)
+# siguen usando sus propias conexiones a PostgreSQL. Con None todo se
+# consulta directamente.
+API_URL = None
+
+# Vigencia de las reservas de stock de entregas en preparación (minutos)
+RESERVA_MINUTOS = 30
+# Intervalo del barrido de reservas vencidas (ms)
+RESERVAS_BARRIDO_MS = 300000
+
+# Reconexión automática a PostgreSQL
+DB_CONNECT_TIMEOUT = 5
+DB_RECONNECT_ATTEMPTS = 4
+# Espera antes del segundo intento (segundos); se duplica en cada intento
+DB_RECONNECT_DELAY = 0.5
+# Tras este tiempo inactiva, la conexión se verifica antes de usarla (segundos)
+DB_PING_IDLE_SECONDS = 60
+
+# Métricas de consultas (panel de diagnóstico en Ajustes)
+# Umbral del log de consultas lentas (ms)
+SLOW_QUERY_MS = 250
+SLOW_QUERY_LOG = 'consultas_lentas.log'
+# Duraciones recientes conservadas por operación para los percentiles
+QUERY_STATS_SAMPLES = 500
+
+# Monitor de respuesta de la interfaz: intervalo del latido y umbral de bloqueo (ms)
+UI_HEARTBEAT_MS = 100
+UI_STALL_MS = 300
+
+# Captura de planes (EXPLAIN ANALYZE) de lecturas lentas; desactivada por defecto
+EXPLAIN_CAPTURE = False
+EXPLAIN_MS = 500
+EXPLAIN_LOG = 'planes_consultas.jsonl'
+# Intervalo mínimo entre capturas de una misma consulta (segundos)
+EXPLAIN_INTERVAL_S = 600
+EXPLAIN_TIMEOUT_MS = 30000
+
+# Caché de resultados de lecturas (se invalida con las escrituras de la aplicación)
+RESULT_CACHE_ENABLED = True
+# Vida de cada resultado (segundos); acota el retraso ante cambios de otros equipos
+RESULT_CACHE_TTL = 10
+RESULT_CACHE_MAX_ENTRIES = 256
+# Resultados con más filas no se guardan
+RESULT_CACHE_MAX_ROWS = 5000
+
+# Centro de notificaciones: filas que se agregan por vez en cada categoría
+NOTIFICACIONES_POR_PAGINA = 25
+
+# Sentencias preparadas de las consultas frecuentes (PREPARE una vez por conexión)
+PREPARED_STATEMENTS_ENABLED = True
+# Textos distintos que se preparan como máximo; el resto se ejecuta sin preparar
+PREPARED_STATEMENTS_MAX = 128
@@ -1,17 +1,22 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from datetime import datetime
 from models.compras_models import PurchaseModel
 from views.compras_views import PurchaseView
 from models.export_manager import ExportManager
+from services import PurchaseService, ValidationError
+from events import ProductChanged, SupplierChanged, ReferenceDataChanged
+from lifecycle import lifecycle
 
 
 class PurchaseController:
     def __init__(self, frame, app):
         self.model = PurchaseModel()
+        self.purchase_service = PurchaseService(self.model.conn)
         self.view = PurchaseView(frame, app)
         self.view.set_controller(self)
         self.app = app
+        # Categorías, productos y proveedores del formulario de solicitud
+        self._form_data = None
         self.setup_ui()
 
     def setup_ui(self):
@@ -19,6 +24,24 @@ class PurchaseController:
         self.view.setup_requests_tab()
         self.refresh_requests_table()
 
+        # Volver a leer los datos del formulario solo si cambiaron
+        lifecycle.subscribe(ProductChanged, self._invalidate_form_data)
+        lifecycle.subscribe(SupplierChanged, self._invalidate_form_data)
+        lifecycle.subscribe(ReferenceDataChanged, self._invalidate_form_data)
+
+    def _invalidate_form_data(self, event):
+        self._form_data = None
+
+    def _get_form_data(self):
+        """Categorías, productos activos y proveedores para el formulario"""
+        if self._form_data is None:
+            self._form_data = (
+                self.model.get_categories(),
+                [p[1] for p in self.model.get_active_products()],
+                self.model.get_suppliers(),
+            )
+        return self._form_data
+
     def refresh_requests_table(self, status_filter="Todos", priority_filter="Todos"):
         """Actualiza la tabla de solicitudes"""
         try:
@@ -34,10 +57,8 @@ class PurchaseController:
     def show_purchase_form(self):
         """Muestra el formulario para nueva solicitud de compra"""
         try:
-            # Obtener datos del modelo
-            categories = self.model.get_categories()
-            products = [p[1] for p in self.model.get_active_products()]
-            suppliers = self.model.get_suppliers()
+            # Obtener datos del modelo (se reutilizan entre aperturas)
+            categories, products, suppliers = self._get_form_data()
             
             # Delegar a la view la creación del formulario
             self.view.show_purchase_form(
@@ -52,33 +73,23 @@ class PurchaseController:
     def save_purchase_request(self, entries, window):
         """Guarda una nueva solicitud de compra"""
         try:
-            # Validación de cantidad
-            try:
-                cantidad = int(entries["Cantidad:"].get())
-            except ValueError:
-                self.view.show_message("Error", "La cantidad debe ser un número válido", "error")
-                return
-
-            # Preparar datos para el modelo
-            data = (
+            self.purchase_service.create_request(
                 entries["Producto:"].get(),
-                cantidad,
+                entries["Cantidad:"].get(),
                 entries["Motivo:"].get(),
                 entries["Prioridad:"].get(),
-                entries["Proveedor:"].get() if entries["Proveedor:"].get() else None,
-                datetime.now(),
-                "Pendiente"
+                entries["Proveedor:"].get()
             )
-
-            # Guardar en el modelo
-            self.model.create_request(data)
-            
-            self.view.show_message("Éxito", "Solicitud registrada correctamente", "info")
-            window.destroy()
-            self.refresh_requests_table()
-
+        except ValidationError as e:
+            self.view.show_message("Error", str(e), "error")
+            return
         except Exception as e:
             self.view.show_message("Error", f"No se pudo guardar la solicitud: {e}", "error")
+            return
+
+        self.view.show_message("Éxito", "Solicitud registrada correctamente", "info")
+        window.destroy()
+        self.refresh_requests_table()
 
     def delete_request(self):
         """Elimina una solicitud seleccionada"""
@@ -95,7 +106,7 @@ class PurchaseController:
             return
 
         try:
-            self.model.delete_request(request_id)
+            self.purchase_service.delete_request(request_id)
             self.view.show_message("Éxito", "Solicitud eliminada correctamente", "info")
             self.refresh_requests_table()
         except Exception as e:
@@ -121,7 +132,7 @@ class PurchaseController:
     def update_request_status(self, request_id, new_status, window):
         """Actualiza el estado de una solicitud"""
         try:
-            self.model.update_request_status(request_id, new_status)
+            self.purchase_service.update_status(request_id, new_status)
             self.view.show_message("Éxito", "Estado actualizado correctamente", "info")
             self.refresh_requests_table()
             window.destroy()
@@ -0,0 +1,65 @@
+from tkinter import messagebox
+from models.consumo_model import ConsumoModel
+from views.consumo_view import ConsumoView
+from models.export_manager import ExportManager
+
+
+class ConsumoController:
+    def __init__(self, app):
+        self.app = app
+        self.model = ConsumoModel()
+        self.view = ConsumoView(None, app)
+        self.view.set_controller(self)
+        self.ultimo_resultado = None
+
+    def mostrar_analisis(self):
+        """Mostrar la ventana de análisis de consumo departamental"""
+        self.view.mostrar_ventana_analisis(
+            list(ConsumoModel.DIMENSIONES.keys()),
+            list(ConsumoModel.PERIODOS.keys()),
+            self.model.obtener_departamentos(),
+            self.model.obtener_categorias()
+        )
+        self.aplicar_filtros()
+
+    def aplicar_filtros(self):
+        """Recalcular la tabla dinámica con los filtros actuales"""
+        opciones = self.view.obtener_opciones()
+        if opciones['filas'] == opciones['columnas']:
+            messagebox.showwarning(
+                "Advertencia", "Filas y columnas deben ser dimensiones distintas")
+            return
+
+        try:
+            encabezados, registros = self.model.obtener_pivot(
+                opciones['filas'], opciones['columnas'],
+                opciones['periodo'], opciones)
+            self.ultimo_resultado = (encabezados, registros)
+            self.view.mostrar_pivot(encabezados, registros)
+        except Exception as e:
+            messagebox.showerror(
+                "Error", f"No se pudo calcular el análisis: {e}")
+
+    def actualizar_datos(self):
+        """Refrescar el agregado de consumo y recalcular"""
+        if self.model.refrescar():
+            self.aplicar_filtros()
+        else:
+            messagebox.showerror(
+                "Error", "No se pudo actualizar el agregado de consumo")
+
+    def exportar(self):
+        """Exportar la tabla dinámica actual a Excel"""
+        if not self.ultimo_resultado or not self.ultimo_resultado[1]:
+            messagebox.showwarning("Advertencia", "No hay datos para exportar")
+            return
+
+        encabezados, registros = self.ultimo_resultado
+        filename, error = ExportManager.export_consumption(
+            registros, encabezados)
+
+        if error:
+            messagebox.showerror("Error", f"Error al exportar: {error}")
+        else:
+            messagebox.showinfo(
+                "Éxito", f"Análisis de consumo exportado en {filename}")
@@ -0,0 +1,267 @@
+from tkinter import messagebox, filedialog
+from models.conteo_model import ConteoModel
+from views.conteo_view import ConteoView
+from models.export_manager import ExportManager
+from helpers import parse_scan_code
+
+
+class ConteoController:
+    def __init__(self, app, on_applied=None):
+        self.app = app
+        self.model = ConteoModel()
+        self.view = ConteoView(None, app)
+        self.view.set_controller(self)
+        # Callback para refrescar la pantalla de origen tras aplicar ajustes
+        self.on_applied = on_applied
+        self.sesiones = []
+        self.id_conteo = None
+        self.indice_codigos = {}
+        # Lecturas escaneadas aún no guardadas: id_producto -> cantidad
+        self.lecturas = {}
+        self.diferencias = []
+
+    def mostrar(self):
+        """Mostrar la ventana de conteo físico"""
+        self.view.mostrar_ventana_conteo()
+        self.cargar_sesiones()
+
+    def cargar_sesiones(self, seleccion=None):
+        """Cargar sesiones abiertas y seleccionar una"""
+        self.sesiones = self.model.obtener_conteos_abiertos()
+        self.view.cargar_sesiones(self.sesiones, seleccion)
+        self.seleccionar_conteo()
+
+    def seleccionar_conteo(self):
+        """Cambiar la sesión activa, guardando antes las lecturas pendientes"""
+        if self.lecturas and not self.guardar_lecturas():
+            return
+
+        indice = self.view.obtener_indice_sesion()
+        if indice < 0 or indice >= len(self.sesiones):
+            self.id_conteo = None
+            self.indice_codigos = {}
+            self.view.mostrar_diferencias([])
+            return
+
+        self.id_conteo = self.sesiones[indice][0]
+        self.indice_codigos = self.model.obtener_indice_codigos(self.id_conteo)
+        self.calcular_diferencias()
+
+    def nueva_sesion(self):
+        """Crear una nueva sesión de conteo"""
+        datos = self.view.pedir_nueva_sesion(self.model.obtener_ubicaciones())
+        if not datos:
+            return
+        try:
+            current_user = getattr(self.app, 'current_user', None)
+            id_conteo = self.model.crear_conteo(
+                datos['id_ubicacion'], datos['descripcion'],
+                getattr(current_user, 'id', None))
+            self.cargar_sesiones(seleccion=id_conteo)
+        except Exception as e:
+            messagebox.showerror(
+                "Error", f"No se pudo crear la sesión de conteo: {e}")
+
+    def anular_sesion(self):
+        """Anular la sesión seleccionada"""
+        if not self._verificar_sesion():
+            return
+        if not messagebox.askyesno(
+                "Confirmar", f"¿Anular la sesión de conteo #{self.id_conteo}?"):
+            return
+        try:
+            self.lecturas = {}
+            self.model.anular_conteo(self.id_conteo)
+            self.cargar_sesiones()
+        except Exception as e:
+            messagebox.showerror(
+                "Error", f"No se pudo anular la sesión: {e}")
+
+    def _verificar_sesion(self):
+        """Verificar que haya una sesión seleccionada"""
+        if self.id_conteo is None:
+            messagebox.showwarning(
+                "Advertencia", "Cree o seleccione una sesión de conteo")
+            return False
+        return True
+
+    def registrar_lectura(self):
+        """Acumular localmente una lectura de código"""
+        raw = self.view.leer_codigo()
+        if not raw.strip() or not self._verificar_sesion():
+            return
+
+        codigo, cantidad = parse_scan_code(raw)
+        if cantidad is None:
+            self.view.mostrar_estado(f"Cantidad inválida: {raw}", error=True)
+            return
+
+        producto = self.indice_codigos.get(codigo.lower())
+        if not producto:
+            self.view.mostrar_estado(
+                f"Código fuera del alcance de la sesión: {codigo}", error=True)
+            return
+
+        id_producto, nombre = producto
+        self.lecturas[id_producto] = self.lecturas.get(id_producto, 0) + cantidad
+        self.view.actualizar_pendientes(
+            len(self.lecturas), sum(self.lecturas.values()))
+        self.view.mostrar_estado(f"+{cantidad} {nombre}")
+
+    def guardar_lecturas(self):
+        """Guardar en lote las lecturas acumuladas en la tabla de conteo"""
+        if not self.lecturas:
+            return True
+        try:
+            self.model.registrar_cantidades(
+                self.id_conteo, self.lecturas.items(), acumular=True)
+            self.lecturas = {}
+            self.view.actualizar_pendientes(0, 0)
+            return True
+        except Exception as e:
+            messagebox.showerror(
+                "Error", f"No se pudieron guardar las lecturas: {e}")
+            return False
+
+    def importar_planilla(self):
+        """Importar cantidades contadas desde CSV/Excel (código, cantidad)"""
+        if not self._verificar_sesion():
+            return
+
+        filename = filedialog.askopenfilename(
+            parent=self.view.window,
+            title="Importar conteo",
+            filetypes=[("Planillas", "*.csv *.xlsx *.xls"),
+                       ("CSV", "*.csv"), ("Excel", "*.xlsx *.xls")]
+        )
+        if not filename:
+            return
+
+        try:
+            filas = self._leer_planilla(filename)
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudo leer la planilla: {e}")
+            return
+
+        lineas, no_encontrados = [], []
+        for codigo, cantidad in filas:
+            producto = self.indice_codigos.get(codigo.lower())
+            if producto:
+                lineas.append((producto[0], cantidad))
+            else:
+                no_encontrados.append(codigo)
+
+        try:
+            registrados = self.model.registrar_cantidades(
+                self.id_conteo, lineas, acumular=False)
+        except Exception as e:
+            messagebox.showerror(
+                "Error", f"No se pudo importar el conteo: {e}")
+            return
+
+        mensaje = f"Productos importados: {registrados}"
+        if no_encontrados:
+            mensaje += (f"\nCódigos no encontrados ({len(no_encontrados)}): "
+                        + ", ".join(no_encontrados[:15]))
+            if len(no_encontrados) > 15:
+                mensaje += ", ..."
+        messagebox.showinfo("Importación", mensaje)
+        self.cargar_sesiones(seleccion=self.id_conteo)
+
+    def _leer_planilla(self, filename):
+        """Leer pares (código, cantidad) desde una planilla"""
+        import pandas as pd
+
+        if filename.lower().endswith(".csv"):
+            df = pd.read_csv(filename, dtype=str, sep=None, engine="python")
+        else:
+            df = pd.read_excel(filename, dtype=str)
+
+        columnas = {str(c).strip().lower(): c for c in df.columns}
+        col_codigo = next((columnas[c] for c in ("codigo", "código") if c in columnas),
+                          df.columns[0])
+        col_cantidad = next((columnas[c] for c in ("cantidad", "contado", "conteo")
+                             if c in columnas), df.columns[1])
+
+        filas = []
+        for codigo, cantidad in zip(df[col_codigo], df[col_cantidad]):
+            if pd.isna(codigo) or pd.isna(cantidad):
+                continue
+            cantidad = str(cantidad).strip()
+            if cantidad.endswith(".0"):
+                cantidad = cantidad[:-2]
+            if cantidad.isdigit():
+                filas.append((str(codigo).strip(), int(cantidad)))
+        return filas
+
+    def calcular_diferencias(self):
+        """Calcular y mostrar las diferencias de la sesión"""
+        if self.id_conteo is None or not self.guardar_lecturas():
+            return
+        try:
+            self.diferencias = self.model.obtener_diferencias(
+                self.id_conteo, self.view.incluir_no_contados())
+            self.view.mostrar_diferencias(self.diferencias)
+        except Exception as e:
+            messagebox.showerror(
+                "Error", f"No se pudieron calcular las diferencias: {e}")
+
+    def aplicar_ajustes(self):
+        """Aplicar todos los ajustes de la sesión en una transacción"""
+        if not self._verificar_sesion():
+            return
+        self.calcular_diferencias()
+
+        con_diferencia = [d for d in self.diferencias if d[6]]
+        if not con_diferencia:
+            messagebox.showinfo("Información", "No hay diferencias para ajustar")
+            return
+
+        if not messagebox.askyesno(
+                "Confirmar",
+                f"Se ajustará el stock de {len(con_diferencia)} productos y se "
+                "cerrará la sesión. ¿Desea continuar?"):
+            return
+
+        try:
+            current_user = getattr(self.app, 'current_user', None)
+            ajustados, entradas, salidas = self.model.aplicar_conteo(
+                self.id_conteo, getattr(current_user, 'id', None),
+                self.view.incluir_no_contados())
+        except Exception as e:
+            messagebox.showerror(
+                "Error", f"No se pudieron aplicar los ajustes: {e}")
+            return
+
+        messagebox.showinfo(
+            "Éxito",
+            f"Productos ajustados: {ajustados}\n"
+            f"Unidades de entrada: {entradas}\nUnidades de salida: {salidas}")
+        self.cargar_sesiones()
+        if self.on_applied:
+            self.on_applied()
+
+    def exportar_diferencias(self):
+        """Exportar las diferencias calculadas a Excel"""
+        if not self.diferencias:
+            messagebox.showwarning("Advertencia", "No hay datos para exportar")
+            return
+
+        headers = ["Código", "Producto", "Ubicación", "Sistema", "Contado", "Diferencia"]
+        data = [d[1:] for d in self.diferencias]
+        filename, error = ExportManager.export_to_excel(
+            data, headers, f"conteo_{self.id_conteo}", "Conteo")
+
+        if error:
+            messagebox.showerror("Error", f"Error al exportar: {error}")
+        else:
+            messagebox.showinfo("Éxito", f"Diferencias exportadas en {filename}")
+
+    def cerrar(self):
+        """Cerrar la ventana guardando las lecturas pendientes"""
+        if self.lecturas and self.id_conteo is not None:
+            if not self.guardar_lecturas() and not messagebox.askyesno(
+                    "Confirmar", "¿Cerrar y descartar las lecturas sin guardar?"):
+                return
+        self.view.window.destroy()
+        self.model.close()
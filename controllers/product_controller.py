@@ -1,9 +1,13 @@
 import tkinter as tk
-from tkinter import messagebox
+from tkinter import ttk, messagebox
 from models.product_model import ProductModel
 from views.product_view import ProductView
-from controllers.movimientos_controllers import MovementController
 from models.export_manager import ExportManager
+from helpers import parse_scan_code
+from services import StockService, ValidationError, InactiveReferenceError, ConflictError
+from diagnostics import timed
+from events import StockChanged, ProductChanged, ReferenceDataChanged
+from lifecycle import lifecycle
 
 
 class ProductController:
@@ -15,8 +19,14 @@ class ProductController:
     def __init__(self, app):
         self.app = app
         self.model = ProductModel()
+        self.stock_service = StockService(self.model.conn)
         self.view = ProductView(frame=None, app=app)
         self.view.set_controller(self)  # Conectar vista con controlador
+        # Filtro SQL del listado visible, para recargar solo filas afectadas
+        self._listing = ("", ())
+        # Marcas, categorías y ubicaciones del formulario de producto; se
+        # descartan al recibir ReferenceDataChanged
+        self._form_data = None
 
     def show_inventory(self):
         """Mostrar gestión de inventario"""
@@ -43,6 +53,11 @@ class ProductController:
         self.view.setup_styles()
         self.view.setup_inventory_tab(frame)
 
+        # Mantener la tabla al día mientras la pantalla esté abierta
+        lifecycle.subscribe(StockChanged, self._on_products_changed)
+        lifecycle.subscribe(ProductChanged, self._on_products_changed)
+        lifecycle.subscribe(ReferenceDataChanged, self._on_reference_changed)
+
         # Cargar datos iniciales
         self.refresh_table()
 
@@ -55,20 +70,49 @@ class ProductController:
         # ✅ CONFIGURAR AUTocompletado PARA EL COMBOBOX DE ESTADO
         self.view.estado_combo.set_completion_list(
             ["Todos", "Disponible", "Stock bajo", "Agotado"])
+        self.view.clase_combo.set_completion_list(["Todas", "A", "B", "C"])
 
+    @timed
     def refresh_table(self):
         """Refrescar tabla de productos"""
         try:
             inventario_data = self.model.update_product_stock_status()
             formatted_data = self._format_table_data(inventario_data)
             self.view.refresh_table(formatted_data)
-
-            if hasattr(self.app, 'notification_manager'):
-                self.app.notification_manager.check_low_stock()
+            self._listing = ("", ())
 
         except Exception as e:
             messagebox.showerror("Error", f"Error al cargar datos: {e}")
 
+    def _on_products_changed(self, event):
+        """Actualizar solo las filas de los productos afectados"""
+        extra, params = self._listing
+        try:
+            if event.product_ids is None:
+                data = self.model.fetch_products(extra, params)
+                self.view.refresh_table(self._format_table_data(data))
+                return
+            data = self.model.fetch_products(
+                extra + " AND p.id_producto = ANY(%s)",
+                tuple(params) + (sorted(event.product_ids),))
+            self.view.update_rows(event.product_ids, self._format_table_data(data))
+        except Exception as e:
+            print(f"Error al actualizar productos modificados: {e}")
+
+    def _on_reference_changed(self, event):
+        """Refrescar los filtros cuando cambian categorías o marcas"""
+        if event.table in ('marcas', 'categorias', 'ubicaciones'):
+            self._form_data = None
+        if event.table in ('categorias', 'marcas'):
+            self.refresh_comboboxes()
+
+    def _get_form_data(self):
+        """Datos de los combobox del formulario de producto (marcas, categorías, ubicaciones)"""
+        if self._form_data is None:
+            self._form_data = tuple(self.model.get_combobox_data(tabla)
+                                    for tabla in ("marcas", "categorias", "ubicaciones"))
+        return self._form_data
+
     def _format_table_data(self, inventario_data):
         """Formatear datos para la tabla"""
         formatted_data = []
@@ -82,7 +126,8 @@ class ProductController:
                 item[5] if item[5] else 0,      # Stock
                 item[8] if item[8] is not None else 0,  # Stock (m)
                 item[6] if item[6] else "N/A",  # Ubicación
-                item[7] if item[7] else "disponible"  # Estado
+                item[7] if item[7] else "disponible",  # Estado
+                f"{item[9] or '-'}{item[10] or ''}"  # Clase ABC/XYZ
             ))
         return formatted_data
 
@@ -104,9 +149,14 @@ class ProductController:
                 params.append(filters['estado'].lower(
                 ) if filters['estado'] != "Stock bajo" else "stock bajo")
 
+            if filters['clase'] != "Todas":
+                extra += " AND p.clase_abc = %s"
+                params.append(filters['clase'])
+
             inventario_data = self.model.get_products(extra, tuple(params))
             formatted_data = self._format_table_data(inventario_data)
             self.view.refresh_table(formatted_data)
+            self._listing = (extra, tuple(params))
 
         except Exception as e:
             messagebox.showerror("Error", f"Error al buscar productos: {e}")
@@ -128,13 +178,36 @@ class ProductController:
                 params.append(filters['estado'].lower(
                 ) if filters['estado'] != "Stock bajo" else "stock bajo")
 
+            if filters['clase'] != "Todas":
+                extra += " AND p.clase_abc = %s"
+                params.append(filters['clase'])
+
             inventario_data = self.model.get_products(extra, tuple(params))
             formatted_data = self._format_table_data(inventario_data)
             self.view.refresh_table(formatted_data)
+            self._listing = (extra, tuple(params))
 
         except Exception as e:
             messagebox.showerror("Error", f"Error al aplicar filtros: {e}")
 
+    def classify_products(self):
+        """Recalcular la clasificación ABC/XYZ de todo el catálogo"""
+        try:
+            resumen = self.model.classify_abc_xyz()
+            if resumen is None:
+                messagebox.showerror(
+                    "Error", "No se pudo obtener el historial de movimientos")
+                return
+
+            messagebox.showinfo(
+                "Clasificación ABC/XYZ",
+                f"A: {resumen['A']}  B: {resumen['B']}  C: {resumen['C']}\n"
+                f"X: {resumen['X']}  Y: {resumen['Y']}  Z: {resumen['Z']}")
+
+        except Exception as e:
+            messagebox.showerror(
+                "Error", f"No se pudo clasificar los productos: {e}")
+
     def new_product(self):
         """Crear nuevo producto"""
         self.show_product_form()
@@ -142,9 +215,7 @@ class ProductController:
     def show_product_form(self, product_id=None, select_nuevo=None):
         """Mostrar formulario de producto"""
         try:
-            marcas = self.model.get_combobox_data("marcas")
-            categorias = self.model.get_combobox_data("categorias")
-            ubicaciones = self.model.get_combobox_data("ubicaciones")
+            marcas, categorias, ubicaciones = self._get_form_data()
 
             form_window, entries, buttons, save_btn = self.view.show_product_form(
                 product_id)
@@ -171,8 +242,11 @@ class ProductController:
                 btn.configure(command=lambda t=tabla,
                               pw=form_window: self.add_new_value(t, pw))
 
+            # Versiones leídas al cargar el producto (bloqueo optimista)
+            form_state = {'versions': None}
             save_btn.configure(command=lambda: self.save_product(
-                entries, product_id, marcas, categorias, ubicaciones, form_window))
+                entries, product_id, marcas, categorias, ubicaciones, form_window,
+                versions=form_state['versions']))
 
             def on_close():
                 if hasattr(self, '_formulario_activo'):
@@ -181,7 +255,7 @@ class ProductController:
             form_window.protocol("WM_DELETE_WINDOW", on_close)
 
             if product_id:
-                self.load_product_data(
+                form_state['versions'] = self.load_product_data(
                     product_id, entries, marcas, categorias, ubicaciones)
 
             # Seleccionar automáticamente el nuevo valor si corresponde
@@ -197,7 +271,11 @@ class ProductController:
             messagebox.showerror("Error", f"Error al cargar formulario: {e}")
 
     def load_product_data(self, product_id, entries, marcas, categorias, ubicaciones):
-        """Cargar datos de producto en formulario"""
+        """Cargar datos de producto en formulario.
+
+        Devuelve (versión de producto, versión de inventario) para detectar
+        cambios concurrentes al guardar.
+        """
         try:
             producto_data = self.model.get_product_data(product_id)
             if not producto_data:
@@ -233,168 +311,55 @@ class ProductController:
                     (u[1] for u in ubicaciones if u[0] == producto_data[6]), "")
                 entries["Ubicación:"].set(ubicacion_nombre)
 
+            return producto_data[9], producto_data[10]
+
         except Exception as e:
             messagebox.showerror("Error", f"Error al cargar datos: {str(e)}")
+            return None
 
-    def save_product(self, entries, product_id, marcas, categorias, ubicaciones, window):
-        """Guardar producto"""
-        try:
-            # Obtener valores del formulario
-            codigo = entries["Código:"].get().strip()
-            producto = entries["Producto:"].get().strip()
-            marca_nombre = entries["Marca:"].get()
-            categoria_nombre = entries["Categoría:"].get()
-            ubicacion_nombre = entries["Ubicación:"].get()
-            estado = entries["Estado:"].get()
-            
-            # NUEVO: Obtener stock mínimo
-            stock_minimo_txt = entries["Stock mínimo:"].get().strip()
-            stock_minimo = 0  # Valor por defecto
-            if stock_minimo_txt:
-                if not stock_minimo_txt.isdigit() or int(stock_minimo_txt) < 0:
-                    messagebox.showerror("Error", "El stock mínimo debe ser un número entero positivo o cero.")
-                    return
-                stock_minimo = int(stock_minimo_txt)
-
-            # 🔒 OBTENER STOCK DEPENDIENDO SI ES EDICIÓN O NUEVO
-            if product_id:
-                # En edición, obtener el stock actual de la base de datos
-                producto_data = self.model.get_product_data(product_id)
-                stock = producto_data[5] if producto_data and producto_data[5] is not None else 0
-            else:
-                # En nuevo producto, obtener del formulario
-                stock_txt = entries["Stock inicial:"].get().strip()
-                if not stock_txt:
-                    messagebox.showwarning(
-                        "Campos requeridos", "El stock inicial es obligatorio para nuevos productos.")
-                    return
-                if not stock_txt.isdigit() or int(stock_txt) < 0:
-                    messagebox.showerror(
-                        "Stock inválido", "El stock debe ser un número entero positivo.")
-                    return
-                stock = int(stock_txt)
-
-            # Validaciones básicas
-            if not codigo or not producto:
-                messagebox.showwarning(
-                    "Campos requeridos", "Código y Producto son campos obligatorios.")
-                return
-
-            if not self._validate_product_data(codigo, producto, str(stock) if not product_id else "0"):
-                return
-
-            # Obtener IDs de relaciones
-            marca_id = self.model.get_id_by_name("marcas", marca_nombre)
-            categoria_id = self.model.get_id_by_name("categorias", categoria_nombre)
-            ubicacion_id = self.model.get_id_by_name("ubicaciones", ubicacion_nombre)
-
-            # Identificar cuál está inactivo
-            errores = []
-            if marca_id is None:
-                errores.append("Marca")
-            if categoria_id is None:
-                errores.append("Categoría")
-            if ubicacion_id is None and ubicacion_nombre:  # Solo si es obligatorio
-                errores.append("Ubicación")
-
-            if errores:
-                mensaje = (
-                    f"Error: {', '.join(errores)} seleccionada se encuentra inactiva.\n"
-                    "Para permitir la edición, por favor actívela en Ajustes."
-                )
-                messagebox.showerror("Error de relación inactiva", mensaje)
-                return
-
-            # Preparar datos para guardar - AGREGADO STOCK_MÍNIMO
-            product_data = {
-                'codigo': codigo,
-                'nombre': producto,
-                'marca_id': marca_id,
-                'categoria_id': categoria_id,
-                'stock': stock,  # 🔒 Usar stock actual en edición, nuevo stock en creación
-                'ubicacion_id': ubicacion_id,
-                'estado': estado,
-                'stock_minimo': stock_minimo  # NUEVO CAMPO
-            }
-
-            # Guardar producto
-            saved_id = self.model.save_product(product_data, product_id)
+    def _current_user_id(self):
+        """ID del usuario en sesión, o None"""
+        return getattr(getattr(self.app, 'current_user', None), 'id', None)
 
-            # Registrar movimiento SOLO para nuevos productos
-            if not product_id:
-                self._register_product_movement(
-                    None, saved_id, stock, ubicacion_id)
-
-            messagebox.showinfo("Éxito", "Producto guardado correctamente")
-            window.destroy()
-            self.refresh_table()
+    def save_product(self, entries, product_id, marcas, categorias, ubicaciones, window,
+                     versions=None):
+        """Guardar producto"""
+        data = {
+            'codigo': entries["Código:"].get(),
+            'nombre': entries["Producto:"].get(),
+            'marca': entries["Marca:"].get(),
+            'categoria': entries["Categoría:"].get(),
+            'ubicacion': entries["Ubicación:"].get(),
+            'estado': entries["Estado:"].get(),
+            'stock_minimo': entries["Stock mínimo:"].get(),
+        }
+        if not product_id:
+            data['stock'] = entries["Stock inicial:"].get()
 
+        try:
+            self.stock_service.save_product(
+                data, product_id, id_responsable=self._current_user_id(),
+                versions=versions)
+        except ConflictError as e:
+            if messagebox.askyesno(
+                    "Cambios concurrentes", f"{e}\n\n¿Desea recargar el formulario?",
+                    parent=window):
+                window.destroy()
+                self.show_product_form(product_id)
+            return
+        except InactiveReferenceError as e:
+            messagebox.showerror("Error de relación inactiva", f"Error: {e}")
+            return
+        except ValidationError as e:
+            messagebox.showwarning("Datos inválidos", str(e))
+            return
         except Exception as e:
             messagebox.showerror(
                 "Error", f"No se pudo guardar el producto: {e}")
+            return
 
-    def _validate_product_data(self, codigo, producto, stock_txt):
-        """Validar datos del producto - Modificado para edición"""
-        if not codigo or not producto:
-            messagebox.showwarning(
-                "Campos requeridos", "Código y Producto son campos obligatorios.")
-            return False
-
-        # 🔒 Solo validar stock para nuevos productos
-        if stock_txt != "0":  # En edición pasamos "0" para evitar validación
-            if not stock_txt.isdigit() or int(stock_txt) < 0:
-                messagebox.showerror(
-                    "Stock inválido", "El stock debe ser un número entero positivo.")
-                return False
-
-        if not codigo.replace("-", "").isalnum():
-            messagebox.showerror(
-                "Código inválido", "El código solo debe contener letras, números y guiones.")
-            return False
-
-        if not all(c.isalnum() or c.isspace() for c in producto):
-            messagebox.showerror(
-                "Nombre inválido", "El nombre del producto solo debe contener letras, números y espacios.")
-            return False
-
-        return True
-
-    def _register_product_movement(self, product_id, saved_id, stock, ubicacion_id):
-        """Registrar movimiento de producto"""
-        movement_controller = MovementController(
-            None, self.app, create_ui=False)
-        current_user = getattr(self.app, 'current_user', None)
-        current_user_id = getattr(current_user, 'id', None)
-
-        if product_id:  # Edición
-            old_stock = self.model.get_old_stock(product_id)
-            # Si old_stock es None, tratarlo como 0
-            old_stock = old_stock if old_stock is not None else 0
-            stock_diff = stock - old_stock
-
-            if stock_diff != 0:
-                movement_type = "Entrada" if stock_diff > 0 else "Salida"
-                movement_controller.register_movement(
-                    id_producto=product_id,
-                    tipo=movement_type,
-                    cantidad=abs(stock_diff),
-                    id_ubicacion=ubicacion_id,
-                    id_responsable=current_user_id,
-                    referencia="Edición de stock inicial"  # Corregido - sin tilde
-                )
-        else:  # Nuevo producto
-            try:
-                movement_controller.register_movement(
-                    id_producto=saved_id,
-                    tipo="Entrada",
-                    cantidad=stock,
-                    id_ubicacion=ubicacion_id,
-                    id_responsable=current_user_id,
-                    referencia="Producto nuevo"
-                )
-            except Exception as e:
-                messagebox.showwarning(
-                    "Advertencia", f"Producto creado pero no se pudo registrar el movimiento: {e}")
+        messagebox.showinfo("Éxito", "Producto guardado correctamente")
+        window.destroy()
 
     def edit_selected_product(self):
         """Editar producto seleccionado"""
@@ -419,9 +384,8 @@ class ProductController:
 
         if messagebox.askyesno("Confirmar", "¿Está seguro de marcar este producto como inactivo?"):
             try:
-                self.model.delete_product(product_id)
+                self.stock_service.deactivate_product(product_id)
                 messagebox.showinfo("Éxito", "Producto marcado como inactivo")
-                self.refresh_table()
             except Exception as e:
                 messagebox.showerror("Error", f"No se pudo eliminar: {e}")
 
@@ -446,35 +410,209 @@ class ProductController:
     def add_stock(self, product_id, quantity, window):
         """Agregar stock a producto"""
         try:
-            if not quantity.isdigit() or int(quantity) <= 0:
-                messagebox.showerror(
-                    "Error", "Ingrese una cantidad válida (número positivo)")
-                return
+            self.stock_service.add_stock(
+                product_id, quantity, id_responsable=self._current_user_id())
+        except ValidationError:
+            messagebox.showerror(
+                "Error", "Ingrese una cantidad válida (número positivo)")
+            return
+        except Exception as e:
+            messagebox.showerror(
+                "Error", f"No se pudo actualizar el stock: {e}")
+            return
+
+        messagebox.showinfo("Éxito", "Stock actualizado correctamente")
+        window.destroy()
+
+    def show_scan_intake(self):
+        """Mostrar modo de entrada rápida por escaneo de códigos"""
+        code_index = self.model.get_code_index()
+        if not code_index:
+            messagebox.showwarning(
+                "Advertencia", "No hay productos activos con código para escanear")
+            return
+
+        widgets = self.view.show_scan_intake_form()
+        # Índice código -> id_producto y datos por id; los escaneos se
+        # acumulan localmente en 'pending' (id_producto -> cantidad)
+        state = {
+            'index': {code: p[0] for code, p in code_index.items()},
+            'products': {p[0]: list(p[1:]) for p in code_index.values()},
+            'pending': {},
+            'history': [],
+            'widgets': widgets
+        }
+
+        widgets['code_entry'].bind(
+            "<Return>", lambda e: self._register_scan(state))
+        widgets['window'].bind("<F2>", lambda e: self.flush_scan_intake(state))
+
+        ttk.Button(widgets['btn_frame'], text="💾 Guardar (F2)", style="Accent.TButton",
+                   command=lambda: self.flush_scan_intake(state)).pack(side="left", padx=5)
+        ttk.Button(widgets['btn_frame'], text="↩ Deshacer último",
+                   command=lambda: self._undo_last_scan(state)).pack(side="left", padx=5)
+        ttk.Button(widgets['btn_frame'], text="Cerrar",
+                   command=lambda: self._close_scan_intake(state)).pack(side="right", padx=5)
+        widgets['window'].protocol(
+            "WM_DELETE_WINDOW", lambda: self._close_scan_intake(state))
+
+    def _register_scan(self, state):
+        """Acumular un escaneo sin tocar la base de datos"""
+        widgets = state['widgets']
+        raw = widgets['code_var'].get()
+        widgets['code_var'].set("")
+        if not raw.strip():
+            return
+
+        code, qty = parse_scan_code(raw)
+        if qty is None:
+            self.view.show_scan_status(
+                widgets['status_label'], f"Cantidad inválida: {raw}", error=True)
+            return
 
-            self.model.add_stock(product_id, quantity)
-
-            # Registrar movimiento
-            ubicacion_id = self.model.get_ubicacion_id(product_id)
-            movement_controller = MovementController(
-                None, self.app, create_ui=False)
-            current_user = getattr(self.app, 'current_user', None)
-            current_user_id = getattr(current_user, 'id', None)
-            movement_controller.register_movement(
-                id_producto=product_id,
-                tipo="Entrada",
-                cantidad=int(quantity),
-                id_ubicacion=ubicacion_id,
-                id_responsable=current_user_id,
-                referencia="Entrada de stock"
-            )
-
-            messagebox.showinfo("Éxito", "Stock actualizado correctamente")
-            window.destroy()
-            self.refresh_table()
+        product_id = state['index'].get(code.lower())
+        if product_id is None:
+            self.view.show_scan_status(
+                widgets['status_label'], f"Código no encontrado: {code}", error=True)
+            return
+
+        state['pending'][product_id] = state['pending'].get(product_id, 0) + qty
+        state['history'].append((product_id, qty))
+        self._render_scan_row(state, product_id)
+        self.view.show_scan_status(
+            widgets['status_label'], f"+{qty} {state['products'][product_id][1]}")
+
+    def _render_scan_row(self, state, product_id):
+        """Actualizar fila y totales acumulados de un producto"""
+        widgets = state['widgets']
+        codigo, nombre, stock = state['products'][product_id]
+        qty = state['pending'].get(product_id, 0)
+        if qty:
+            self.view.update_scan_row(widgets['tree'], product_id, (
+                codigo, nombre, stock, qty, stock + qty))
+        elif widgets['tree'].exists(str(product_id)):
+            widgets['tree'].delete(str(product_id))
+
+        self._render_scan_totals(state)
+
+    def _undo_last_scan(self, state):
+        """Deshacer el último escaneo acumulado"""
+        if not state['history']:
+            return
+        product_id, qty = state['history'].pop()
+        state['pending'][product_id] -= qty
+        if state['pending'][product_id] <= 0:
+            del state['pending'][product_id]
+        self._render_scan_row(state, product_id)
+        self.view.show_scan_status(
+            state['widgets']['status_label'], f"Deshecho: -{qty}")
+
+    def flush_scan_intake(self, state):
+        """Confirmar todos los escaneos acumulados en una sola transacción"""
+        widgets = state['widgets']
+        if not state['pending']:
+            self.view.show_scan_status(
+                widgets['status_label'], "No hay escaneos pendientes")
+            return
 
+        try:
+            updated_ids = self.stock_service.bulk_add_stock(
+                state['pending'].items(), id_responsable=self._current_user_id())
         except Exception as e:
             messagebox.showerror(
-                "Error", f"No se pudo actualizar el stock: {e}")
+                "Error", f"No se pudo registrar la entrada: {e}")
+            return
+
+        skipped = set(state['pending']) - set(updated_ids)
+        units = sum(q for pid, q in state['pending'].items() if pid in updated_ids)
+
+        # Actualizar stock local y limpiar lo confirmado
+        for pid in updated_ids:
+            state['products'][pid][2] += state['pending'].pop(pid)
+            widgets['tree'].delete(str(pid))
+        state['history'] = [h for h in state['history'] if h[0] in state['pending']]
+        self._render_scan_totals(state)
+
+        message = f"Entrada registrada: {len(updated_ids)} productos, {units} unidades"
+        if skipped:
+            message += f" ({len(skipped)} sin inventario, pendientes)"
+        self.view.show_scan_status(widgets['status_label'], message, error=bool(skipped))
+
+    def _render_scan_totals(self, state):
+        """Actualizar solo la línea de totales"""
+        state['widgets']['totals_label'].configure(
+            text=f"Productos: {len(state['pending'])}  |  "
+                 f"Unidades: {sum(state['pending'].values())}")
+
+    def _close_scan_intake(self, state):
+        """Cerrar el modo escaneo avisando si hay escaneos sin guardar"""
+        if state['pending'] and not messagebox.askyesno(
+                "Confirmar", "Hay escaneos sin guardar. ¿Desea descartarlos?"):
+            return
+        state['widgets']['window'].destroy()
+
+    def show_cycle_count(self):
+        """Mostrar el modo de conteo físico y conciliación de inventario"""
+        from controllers.conteo_controller import ConteoController
+        try:
+            ConteoController(self.app).mostrar()
+        except Exception as e:
+            messagebox.showerror(
+                "Error", f"No se pudo abrir el conteo físico: {e}")
+
+    def import_products(self):
+        """Importar productos en lote desde una planilla CSV/Excel"""
+        from tkinter import filedialog
+        from models.product_import_model import ProductImportModel
+
+        filename = filedialog.askopenfilename(
+            parent=self.app,
+            title="Importar productos",
+            filetypes=[("Planillas", "*.csv *.xlsx *.xls"),
+                       ("CSV", "*.csv"), ("Excel", "*.xlsx *.xls")]
+        )
+        if not filename:
+            return
+
+        import_model = None
+        self.app.config(cursor="watch")
+        self.app.update_idletasks()
+        try:
+            import_model = ProductImportModel()
+            rows = import_model.read_file(filename)
+            if not rows:
+                messagebox.showwarning("Advertencia", "La planilla no contiene filas")
+                return
+
+            result = import_model.import_rows(
+                rows, id_responsable=self._current_user_id())
+        except Exception as e:
+            messagebox.showerror(
+                "Error", f"No se pudo importar la planilla: {e}")
+            return
+        finally:
+            self.app.config(cursor="")
+            if import_model:
+                import_model.close()
+
+        errores = result['errores']
+        message = (f"Filas leídas: {result['filas']}\n"
+                   f"Productos creados: {result['creados']}\n"
+                   f"Productos actualizados: {result['actualizados']}\n"
+                   f"Movimientos registrados: {result['movimientos']}\n"
+                   f"Filas con error: {len(errores)}")
+
+        if errores:
+            message += "\n\n¿Desea exportar el detalle de errores?"
+            if messagebox.askyesno("Importación finalizada", message):
+                filename, error = ExportManager.export_to_excel(
+                    errores, ["Fila", "Código", "Error"], "errores_importacion", "Errores")
+                if error:
+                    messagebox.showerror("Error", f"Error al exportar: {error}")
+                else:
+                    messagebox.showinfo("Éxito", f"Errores exportados en {filename}")
+        else:
+            messagebox.showinfo("Importación finalizada", message)
 
     def add_new_value(self, table, parent_window=None):
         """Agregar nuevo valor a tabla relacionada"""
@@ -545,15 +683,6 @@ class ProductController:
                         [u[1] for u in datos_actualizados])
                     entries['Ubicación:'].set(nuevo_valor[1])
 
-            # También actualizar los comboboxes de filtros en la vista principal
-            if table == 'categorias':
-                categorias_actualizadas = self.model.get_combobox_data(
-                    "categorias")
-                self.view.update_categories_combo(categorias_actualizadas)
-            elif table == 'marcas':
-                marcas_actualizadas = self.model.get_combobox_data("marcas")
-                self.view.update_marcas_combo(marcas_actualizadas)
-
         except Exception as e:
             print(f"Error al actualizar comboboxes: {e}")
 
@@ -3,14 +3,20 @@ from tkinter import ttk, messagebox
 from models.proveedores_models import SupplierModel
 from views.proveedores_views import SupplierView
 from models.export_manager import ExportManager
+from services import SupplierService, ValidationError
+from events import SupplierChanged, ReferenceDataChanged
+from lifecycle import lifecycle
 
 
 class SupplierController:
     def __init__(self, frame, app):
         self.model = SupplierModel()
+        self.supplier_service = SupplierService(self.model.conn)
         self.view = SupplierView(frame, app)
         self.view.set_controller(self)
         self.app = app
+        # Categorías del formulario de proveedor, hasta que cambie la tabla
+        self._categories = None
         self.setup_ui()
 
     def setup_ui(self):
@@ -18,8 +24,18 @@ class SupplierController:
         self.view.setup_suppliers_tab()
         self.refresh_suppliers_table()
 
+        # Recargar con los filtros vigentes cuando cambia cualquier proveedor
+        lifecycle.subscribe(
+            SupplierChanged, lambda e: self.refresh_suppliers_table(*self._filters))
+        lifecycle.subscribe(ReferenceDataChanged, self._on_reference_changed)
+
+    def _on_reference_changed(self, event):
+        if event.table == 'categorias':
+            self._categories = None
+
     def refresh_suppliers_table(self, category_filter="Todas", rating_filter="Todas", price_filter="Todos"):
         """Actualiza la tabla de proveedores"""
+        self._filters = (category_filter, rating_filter, price_filter)
         try:
             data = self.model.get_all_suppliers(
                 category_filter, rating_filter, price_filter)
@@ -46,7 +62,9 @@ class SupplierController:
                 entries["Precios:"]['values'] = ["Bajo", "Medio", "Alto"]
             if "Categorías:" in entries:
                 try:
-                    categories = self.model.get_categories()
+                    if self._categories is None:
+                        self._categories = self.model.get_categories()
+                    categories = self._categories
                     # Actualizar el combobox usando su método de autocompletado si existe
                     cat_combo = entries["Categorías:"]
                     if hasattr(cat_combo, 'set_completion_list'):
@@ -140,176 +158,240 @@ class SupplierController:
 
     def save_supplier(self, entries, window, supplier_id=None):
         """Guarda un nuevo proveedor o actualiza uno existente"""
-        try:
-            # Validación
-            if not entries["Nombre:"].get():
-                messagebox.showwarning("Error", "El nombre es obligatorio")
-                return
-
-            # Preparar datos
-            data = (
-                entries["Nombre:"].get(),
-                entries["Contacto:"].get(),
-                entries["Teléfono:"].get(),
-                entries["Email:"].get(),
-                entries["Dirección:"].get(),
-                entries["Redes Sociales:"].get(),
-                int(entries["Valoración:"].get().split()[0]
-                    ) if entries["Valoración:"].get() else None,
-                entries["Manejo de Precios:"].get(),
-                entries["Comentarios:"].get("1.0", tk.END).strip(),
-            )
-
-            # Guardar en la base de datos
-            if supplier_id is None:
-                new_id = self.model.create_supplier(data)
-                supplier_id = new_id
-            else:
-                self.model.update_supplier(supplier_id, data)
-
-            # Guardar la categoría seleccionada en la tabla de relaciones
-            try:
-                if "Categorías:" in entries:
-                    selected_cat = ''
-                    try:
-                        selected_cat = entries["Categorías:"].get()
-                    except Exception:
-                        # Algunos widgets usan .get(), otros usan .get('') etc.
-                        try:
-                            selected_cat = entries["Categorías:"].get(0)
-                        except Exception:
-                            selected_cat = ''
-
-                    if selected_cat:
-                        # Delegar al modelo la asociación
-                        try:
-                            self.model.set_supplier_category(
-                                supplier_id, selected_cat)
-                        except Exception:
-                            # No crítico: si falla la asociación, no cancelamos el flujo principal
-                            pass
-            except Exception:
-                pass
-
-            messagebox.showinfo("Éxito", "Proveedor guardado correctamente")
-            window.destroy()
-            self.refresh_suppliers_table()
+        data = {
+            'nombre': entries["Nombre:"].get(),
+            'contacto': entries["Contacto:"].get(),
+            'telefono': entries["Teléfono:"].get(),
+            'email': entries["Email:"].get(),
+            'direccion': entries["Dirección:"].get(),
+            'redes_sociales': entries["Redes Sociales:"].get(),
+            'valoracion': entries["Valoración:"].get(),
+            'manejo_precios': entries["Manejo de Precios:"].get(),
+            'comentarios': entries["Comentarios:"].get("1.0", tk.END),
+        }
+        categoria = entries["Categorías:"].get() if "Categorías:" in entries else None
 
+        try:
+            self.supplier_service.save_supplier(data, supplier_id, categoria)
+        except ValidationError as e:
+            messagebox.showwarning("Error", str(e))
+            return
         except Exception as e:
             messagebox.showerror(
                 "Error", f"No se pudo guardar el proveedor: {e}")
+            return
+
+        messagebox.showinfo("Éxito", "Proveedor guardado correctamente")
+        window.destroy()
 
     def manage_supplier_products(self, supplier_id):
-        """Gestiona los productos asociados a un proveedor"""
+        """Gestiona los productos asociados a un proveedor en modo masivo"""
         if not supplier_id:
             messagebox.showwarning(
                 "Advertencia", "Primero debe guardar el proveedor para gestionar productos")
             return
 
         try:
-            import tkinter as tk
-            from tkinter import ttk
-            # Obtener datos del modelo
-            supplier_data = self.model.get_supplier_by_id(supplier_id)
-            supplier_name = supplier_data[0]
-            available_products = self.model.get_available_products(supplier_id)
-            current_products = self.model.get_supplier_products(supplier_id)
-
-            # Formatear datos para la view
-            available_products_formatted = [
-                f"{p[1]} ({p[2]})" for p in available_products]
-            current_products_formatted = [(p[0], p[1])
-                                          for p in current_products]
-
-            # Delegar la creación de UI a la View
-            products_window, product_combo, tree, btn_frame = self.view.show_supplier_products_management(
-                supplier_id, supplier_name, available_products_formatted, current_products_formatted
-            )
-
-            # Si los botones no existen, crearlos aquí
-            for widget in btn_frame.winfo_children():
-                widget.destroy()
-
-            ttk.Button(btn_frame, text="➕ Agregar",
-                       command=lambda: self.add_product_to_supplier(supplier_id, product_combo.get(), product_combo, tree)).pack(side="left", padx=5)
-
-            ttk.Button(btn_frame, text="➖ Eliminar Seleccionado",
-                       command=lambda: self.remove_product_from_supplier(supplier_id, tree, product_combo)).pack(side="left", padx=5)
-
-            ttk.Button(btn_frame, text="Cerrar",
-                       command=products_window.destroy).pack(side="right", padx=5)
+            supplier_name = self.model.get_supplier_by_id(supplier_id)[0]
+            products = self.model.get_assignable_products(supplier_id)
+
+            # Estado local: catálogo, asignación original y asignación deseada.
+            # Los cambios se acumulan aquí y se aplican en un solo lote.
+            state = {
+                'supplier_id': supplier_id,
+                'products': {p[0]: (p[1], p[2], p[3]) for p in products},
+                'original': {p[0] for p in products if p[4]},
+            }
+            state['desired'] = set(state['original'])
+
+            categories = sorted({p[3] for p in products})
+            widgets = self.view.show_supplier_products_management(
+                supplier_name, categories)
+            state['widgets'] = widgets
+
+            def render(*_):
+                self._render_supplier_assignment(state)
+
+            widgets['category_combo'].bind("<<ComboboxSelected>>", render)
+            widgets['search_var'].trace_add("write", render)
+            widgets['only_assigned_var'].trace_add("write", render)
+
+            actions = [
+                ("✔ Asignar seleccionados",
+                 lambda: self._mark_selected_products(state, True)),
+                ("✖ Quitar seleccionados",
+                 lambda: self._mark_selected_products(state, False)),
+                ("✔ Asignar categoría",
+                 lambda: self._mark_category_products(state, True)),
+                ("✖ Quitar categoría",
+                 lambda: self._mark_category_products(state, False)),
+                ("📥 Importar catálogo",
+                 lambda: self.import_supplier_catalog(state)),
+            ]
+            for text, command in actions:
+                ttk.Button(widgets['action_frame'], text=text,
+                           command=command).pack(side="left", padx=5)
+
+            ttk.Button(widgets['btn_frame'], text="Aplicar cambios", style="Accent.TButton",
+                       command=lambda: self.apply_supplier_products_changes(state)).pack(side="left", padx=5)
+            ttk.Button(widgets['btn_frame'], text="Cerrar",
+                       command=lambda: self._close_supplier_products(state)).pack(side="right", padx=5)
+            widgets['window'].protocol(
+                "WM_DELETE_WINDOW", lambda: self._close_supplier_products(state))
+
+            render()
 
         except Exception as e:
             messagebox.showerror(
                 "Error", f"No se pudo abrir la gestión de productos: {e}")
 
-    def add_product_to_supplier(self, supplier_id, product_with_category, product_combo, tree):
-        """Agrega un producto al proveedor"""
-        if not product_with_category:
+    def _visible_supplier_products(self, state):
+        """Filtra el catálogo local según categoría, búsqueda y asignación"""
+        widgets = state['widgets']
+        category = widgets['category_combo'].get()
+        search = widgets['search_var'].get().strip().lower()
+        only_assigned = widgets['only_assigned_var'].get()
+
+        rows = []
+        for product_id, (code, name, cat) in state['products'].items():
+            assigned = product_id in state['desired']
+            if category and category != "Todas" and cat != category:
+                continue
+            if only_assigned and not assigned:
+                continue
+            if search and search not in name.lower() and search not in (code or "").lower():
+                continue
+            rows.append((product_id, code, name, cat, assigned))
+        return rows
+
+    def _render_supplier_assignment(self, state):
+        """Redibuja el catálogo y el resumen de cambios sin consultar la base de datos"""
+        widgets = state['widgets']
+        self.view.refresh_assignment_tree(
+            widgets['tree'], self._visible_supplier_products(state))
+        to_add, to_remove = self._supplier_products_diff(state)
+        self.view.update_assignment_status(
+            widgets['status_label'], len(to_add), len(to_remove), len(state['desired']))
+
+    def _supplier_products_diff(self, state):
+        """Calcula las altas y bajas pendientes respecto a la asignación original"""
+        return (state['desired'] - state['original'],
+                state['original'] - state['desired'])
+
+    def _mark_products(self, state, product_ids, assigned):
+        """Marca o desmarca productos en la asignación deseada"""
+        if assigned:
+            state['desired'].update(product_ids)
+        else:
+            state['desired'].difference_update(product_ids)
+        self._render_supplier_assignment(state)
+
+    def _mark_selected_products(self, state, assigned):
+        """Marca o desmarca los productos seleccionados"""
+        product_ids = self.view.get_selected_product_ids(state['widgets']['tree'])
+        if not product_ids:
             messagebox.showwarning(
-                "Advertencia", "Seleccione un producto para agregar")
+                "Advertencia", "Seleccione uno o más productos")
             return
+        self._mark_products(state, product_ids, assigned)
 
-        try:
-            # Extraer nombre del producto
-            product_name = product_with_category.split(" (")[0]
-            product_id = self.model.get_product_id_by_name(product_name)
-
-            if not product_id:
-                messagebox.showerror("Error", "No se encontró el producto")
-                return
-
-            # Insertar relación en el modelo
-            self.model.add_product_to_supplier(supplier_id, product_id)
-            messagebox.showinfo("Éxito", "Producto agregado correctamente")
-
-            # Actualizar UI a través de la View
-            self._refresh_products_ui(supplier_id, product_combo, tree)
-
-        except Exception as e:
-            messagebox.showerror(
-                "Error", f"No se pudo agregar el producto: {e}")
-
-    def remove_product_from_supplier(self, supplier_id, tree, product_combo):
-        """Elimina un producto del proveedor"""
-        selected_item = self.view.get_selected_product_from_tree(tree)
-        if not selected_item:
+    def _mark_category_products(self, state, assigned):
+        """Marca o desmarca todos los productos visibles de la categoría filtrada"""
+        if state['widgets']['category_combo'].get() in ("", "Todas"):
             messagebox.showwarning(
-                "Advertencia", "Seleccione un producto para eliminar")
+                "Advertencia", "Seleccione una categoría en el filtro")
+            return
+        product_ids = [row[0] for row in self._visible_supplier_products(state)]
+        self._mark_products(state, product_ids, assigned)
+
+    def import_supplier_catalog(self, state):
+        """Importa un catálogo CSV/Excel y marca como asignados los productos encontrados"""
+        from tkinter import filedialog
+
+        filename = filedialog.askopenfilename(
+            parent=state['widgets']['window'],
+            title="Importar catálogo del proveedor",
+            filetypes=[("Catálogos", "*.csv *.xlsx *.xls"),
+                       ("CSV", "*.csv"), ("Excel", "*.xlsx *.xls")]
+        )
+        if not filename:
             return
 
         try:
-            product_name = tree.item(selected_item, "values")[0]
-            product_id = self.model.get_product_id_by_name(product_name)
-
-            # Eliminar relación del modelo
-            self.model.remove_product_from_supplier(supplier_id, product_id)
-            messagebox.showinfo("Éxito", "Producto eliminado correctamente")
-
-            # Actualizar UI a través de la View
-            self._refresh_products_ui(supplier_id, product_combo, tree)
-
+            keys = self._read_catalog_keys(filename)
+            resolved = self.model.resolve_products_by_keys(keys)
         except Exception as e:
             messagebox.showerror(
-                "Error", f"No se pudo eliminar el producto: {e}")
-
-    def _refresh_products_ui(self, supplier_id, product_combo, tree):
-        """Actualiza la UI de productos después de cambios"""
-        try:
-            available_products = self.model.get_available_products(supplier_id)
-            current_products = self.model.get_supplier_products(supplier_id)
-
-            # Actualizar combobox
-            product_combo['values'] = [
-                f"{p[1]} ({p[2]})" for p in available_products]
+                "Error", f"No se pudo importar el catálogo: {e}")
+            return
 
-            # Actualizar treeview
-            self.view.refresh_products_tree(
-                tree, [(p[0], p[1]) for p in current_products])
+        unknown = set(resolved.values()) - set(state['products'])
+        if unknown:
+            # Productos inactivos que no están en el catálogo local
+            resolved = {k: v for k, v in resolved.items() if v not in unknown}
+
+        self._mark_products(state, resolved.values(), True)
+
+        missing = [k for k in keys if k not in resolved]
+        message = f"Productos reconocidos: {len(resolved)} de {len(keys)}."
+        if missing:
+            message += "\n\nNo encontrados:\n" + "\n".join(missing[:20])
+            if len(missing) > 20:
+                message += f"\n... y {len(missing) - 20} más"
+        message += "\n\nRevise los cambios y pulse 'Aplicar cambios'."
+        messagebox.showinfo("Importación", message)
+
+    def _read_catalog_keys(self, filename):
+        """Lee códigos o nombres de producto desde un archivo CSV/Excel"""
+        import pandas as pd
+
+        if filename.lower().endswith(".csv"):
+            df = pd.read_csv(filename, dtype=str, sep=None, engine="python")
+        else:
+            df = pd.read_excel(filename, dtype=str)
+
+        columns = {str(c).strip().lower(): c for c in df.columns}
+        for candidate in ("codigo", "código", "producto", "nombre"):
+            if candidate in columns:
+                series = df[columns[candidate]]
+                break
+        else:
+            series = df.iloc[:, 0]
+
+        keys = []
+        seen = set()
+        for value in series.dropna():
+            key = str(value).strip()
+            if key and key not in seen:
+                seen.add(key)
+                keys.append(key)
+        return keys
+
+    def apply_supplier_products_changes(self, state):
+        """Aplica en un único lote las altas y bajas pendientes"""
+        to_add, to_remove = self._supplier_products_diff(state)
+        if not to_add and not to_remove:
+            messagebox.showinfo("Información", "No hay cambios pendientes")
+            return
 
+        try:
+            added, removed = self.supplier_service.apply_products_diff(
+                state['supplier_id'], to_add, to_remove)
+            state['original'] = set(state['desired'])
+            self._render_supplier_assignment(state)
+            messagebox.showinfo(
+                "Éxito", f"Productos agregados: {added}\nProductos eliminados: {removed}")
         except Exception as e:
             messagebox.showerror(
-                "Error", f"No se pudieron actualizar los datos: {e}")
+                "Error", f"No se pudieron aplicar los cambios: {e}")
+
+    def _close_supplier_products(self, state):
+        """Cierra la ventana avisando si hay cambios sin aplicar"""
+        to_add, to_remove = self._supplier_products_diff(state)
+        if (to_add or to_remove) and not messagebox.askyesno(
+                "Confirmar", "Hay cambios sin aplicar. ¿Desea descartarlos?"):
+            return
+        state['widgets']['window'].destroy()
 
     def show_supplier_details(self):
         """Muestra los detalles del proveedor seleccionado"""
@@ -373,9 +455,13 @@ class SupplierController:
             return
 
         try:
-            self.model.delete_supplier(supplier_name)
+            supplier_data = self.model.get_supplier_by_name(supplier_name)
+            if not supplier_data:
+                messagebox.showerror(
+                    "Error", "No se encontró el proveedor en la base de datos")
+                return
+            self.supplier_service.delete_supplier(supplier_data[0])
             messagebox.showinfo("Éxito", "Proveedor eliminado correctamente")
-            self.refresh_suppliers_table()
         except Exception as e:
             messagebox.showerror(
                 "Error", f"No se pudo eliminar el proveedor: {e}")
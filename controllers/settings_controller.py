@@ -3,12 +3,17 @@ import tkinter as tk
 from tkinter import ttk
 from models.settings_models import SettingsModel
 from views.settings_views import SettingsView
+from services import SettingsService
+from diagnostics import query_stats, view_timings, plan_capture, export_report
+from query_cache import result_cache
+from lifecycle import lifecycle
 
 
 class SettingsController:
     def __init__(self, app):
         self.app = app
         self.model = SettingsModel()
+        self.settings_service = SettingsService(self.model.conn)
         self.view = SettingsView(app)
         self.trees = {}  # <--- Agrega esto
 
@@ -124,6 +129,13 @@ class SettingsController:
         for tab_key, config in self.tabs_config.items():
             self._create_tab(notebook, tab_key, config)
 
+        self.ops_tree, self.slow_tree, self.plans_tree, self.diagnostics_info = \
+            self.view.create_diagnostics_tab(
+                notebook, self.refresh_diagnostics, self.reset_diagnostics,
+                self.export_diagnostics, self.toggle_plan_capture,
+                plan_capture.enabled)
+        self.refresh_diagnostics()
+
     def _create_tab(self, notebook, tab_key, config):
         """Crea una pestaña específica"""
         tree, button_frame = self.view.create_settings_tab(notebook, config)
@@ -154,6 +166,74 @@ class SettingsController:
             self.view.show_message(
                 "Error", f"Error al cargar datos: {str(e)}", "error")
 
+    def refresh_diagnostics(self):
+        """Carga las métricas de consultas en la pestaña de diagnóstico"""
+        resumen = query_stats.summary()
+        self.view.refresh_table_data(self.ops_tree, [
+            (r["pantalla"], r["operacion"], r["llamadas"], r["errores"],
+             f"{r['p50_ms']:.1f}", f"{r['p95_ms']:.1f}", f"{r['p99_ms']:.1f}",
+             f"{r['max_ms']:.1f}", f"{r['total_ms']:.0f}",
+             f"{r['filas_promedio']:.1f}", r["sql"])
+            for r in resumen
+        ])
+        lentas = query_stats.slow_queries()
+        self.view.refresh_table_data(self.slow_tree, [
+            (c["fecha"], f"{c['ms']:.1f}", c["pantalla"], c["operacion"],
+             c["filas"], c["params"], c["sql"])
+            for c in lentas
+        ])
+        self.view.refresh_table_data(self.plans_tree, [
+            (p["fecha"], p["huella"], p["operacion"], f"{p['ms']:.1f}",
+             ", ".join(s["tabla"] for s in p["resumen"]["seq_scans"]) or "-",
+             " | ".join(p["resumen"]["sugerencias"]) or "-")
+            for p in plan_capture.plans()
+        ])
+        info = (f"{sum(r['llamadas'] for r in resumen)} consultas · "
+                f"{len(lentas)} lentas (≥ {query_stats.umbral_ms} ms, "
+                f"registradas en {query_stats.log_path})")
+        cache = result_cache.stats()
+        info += (f" · Caché: {cache['tasa_aciertos']:.0%} aciertos, "
+                 f"{cache['entradas']} entradas")
+        retenidos = sum(sum(r["retenidos"].values()) for r in lifecycle.report().values())
+        info += (f" · Recursos: {lifecycle.open_connections()} conexiones abiertas, "
+                 f"{retenidos} objetos retenidos")
+        monitor = getattr(self.app, 'responsiveness', None)
+        if monitor:
+            ui = monitor.summary()
+            info += (f" · Interfaz: lag p95 {ui['p95_ms']:.0f} ms, "
+                     f"{ui['bloqueos']} bloqueos")
+        self.diagnostics_info.config(text=info)
+
+    def reset_diagnostics(self):
+        """Descarta las métricas acumuladas"""
+        if self.view.ask_confirmation("Confirmar", "¿Reiniciar las métricas de consultas?"):
+            query_stats.reset()
+            view_timings.reset()
+            plan_capture.reset()
+            result_cache.clear()
+            self.refresh_diagnostics()
+
+    def toggle_plan_capture(self, enabled):
+        """Activa o desactiva la captura de planes de las lecturas lentas"""
+        plan_capture.enabled = enabled
+
+    def export_diagnostics(self):
+        """Guarda el reporte de rendimiento (interfaz, pantallas y consultas)"""
+        from tkinter import filedialog
+        filename = filedialog.asksaveasfilename(
+            title="Exportar reporte de rendimiento",
+            defaultextension=".txt",
+            initialfile="reporte_rendimiento.txt",
+            filetypes=[("Texto", "*.txt")]
+        )
+        if not filename:
+            return
+        try:
+            export_report(filename, getattr(self.app, 'responsiveness', None))
+            self.view.show_message("Éxito", f"Reporte guardado en {filename}")
+        except OSError as e:
+            self.view.show_message("Error", f"No se pudo guardar el reporte: {e}", "error")
+
     def add_item_dialog(self, tab_key):
         """Muestra diálogo para agregar un nuevo ítem"""
         config = self.tabs_config[tab_key]
@@ -175,15 +255,9 @@ class SettingsController:
                 # Obtener valores del formulario desde la View
                 values = self.view.get_form_values(fields_config, entry_vars)
                 
-                # Validar campos requeridos
-                self._validate_required_fields(values, config["fields_config"])
-                
-                # Preparar datos para inserción
-                columns = [field[0] for field in config["fields_config"]]
-                values_list = [values[field[0]] for field in config["fields_config"]]
-                
-                # Insertar en la base de datos
-                self.model.insert_item(config["table_name"], columns, values_list)
+                # Insertar en la base de datos (valida campos requeridos)
+                self.settings_service.save_item(
+                    config["table_name"], self._item_values(values, config))
                 
                 self.view.show_message("Éxito", "Ítem agregado correctamente", "info")
                 dialog.destroy()
@@ -233,18 +307,9 @@ class SettingsController:
                     # Obtener valores del formulario desde la View
                     values = self.view.get_form_values(fields_config, entry_vars)
                     
-                    # Validar campos requeridos
-                    self._validate_required_fields(values, config["fields_config"])
-                    
-                    # Preparar datos para actualización
-                    columns = [field[0] for field in config["fields_config"]]
-                    values_list = [values[field[0]] for field in config["fields_config"]]
-                    
-                    # Actualizar en la base de datos
-                    self.model.update_item(
-                        config["table_name"], config["id_column"], selected_id, 
-                        columns, values_list
-                    )
+                    # Actualizar en la base de datos (valida campos requeridos)
+                    self.settings_service.save_item(
+                        config["table_name"], self._item_values(values, config), selected_id)
                     
                     self.view.show_message("Éxito", "Ítem actualizado correctamente", "info")
                     dialog.destroy()
@@ -280,25 +345,13 @@ class SettingsController:
         ):
             try:
                 # Intentar eliminación lógica primero
-                self.model.soft_delete_item(config["table_name"], config["id_column"], selected_id)
+                self.settings_service.set_active(config["table_name"], selected_id, False)
                 self.view.show_message("Éxito", "Ítem desactivado correctamente. Ya no aparecerá en los combobox.", "info")
                 self.refresh_tab(tab_key)
                 
-                # Notificar al controlador de productos para refrescar combobox
-                self._notify_product_controller()
-                
             except Exception as e:
                 self.view.show_message("Error", str(e), "error")
                 
-    def _notify_product_controller(self):
-        """Notificar al controlador de productos para refrescar combobox"""
-        try:
-            # Buscar el controlador de productos en la app
-            if hasattr(self.app, 'product_controller'):
-                self.app.product_controller.refresh_comboboxes()
-        except Exception as e:
-            print(f"Error al notificar controlador de productos: {e}")
-                    
     def activate_item(self, tab_key):
         """Reactiva un ítem previamente desactivado"""
         selected_data = self.view.get_selected_item_data()
@@ -317,16 +370,9 @@ class SettingsController:
             f"✅ El ítem volverá a aparecer en los combobox"
         ):
             try:
-                success = self.model.activate_item(config["table_name"], config["id_column"], selected_id)
-                if success:
-                    self.view.show_message("Éxito", "Ítem activado correctamente. Ahora aparecerá en los combobox.", "info")
-                    self.refresh_tab(tab_key)
-                    
-                    # Notificar al controlador de productos para refrescar combobox
-                    self._notify_product_controller()
-                    
-                else:
-                    self.view.show_message("Error", "No se pudo activar el ítem", "error")
+                self.settings_service.set_active(config["table_name"], selected_id, True)
+                self.view.show_message("Éxito", "Ítem activado correctamente. Ahora aparecerá en los combobox.", "info")
+                self.refresh_tab(tab_key)
             except Exception as e:
                 self.view.show_message("Error", str(e), "error")
 
@@ -367,13 +413,16 @@ class SettingsController:
                     self.view.show_message(
                         "Error", f"Error al cargar {related_table}: {str(e)}", "error")
 
-    def _validate_required_fields(self, values, fields_config):
-        """Valida los campos requeridos"""
-        optional_fields = ["contacto", "telefono", "email", "direccion", "activo"]
-        
-        for field_name, field_type, _ in fields_config:
-            if field_name not in optional_fields and not values.get(field_name):
-                raise Exception(f"El campo {field_name} es requerido")
+    def _item_values(self, values, config):
+        """Valores del formulario como {columna: valor} en el orden configurado"""
+        item = {}
+        for field_name, _, _ in config["fields_config"]:
+            value = values.get(field_name)
+            # Los combobox de relación muestran "ID - Nombre"
+            if field_name.startswith("id_") and isinstance(value, str):
+                value = value.split(" - ")[0].strip()
+            item[field_name] = value
+        return item
 
     def close_connections(self):
         """Cierra las conexiones"""
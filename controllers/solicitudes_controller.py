@@ -2,13 +2,18 @@ import tkinter as tk
 from tkinter import messagebox
 from models.solicitudes_model import SolicitudesModel
 from views.solicitudes_view import SolicitudesView
-from controllers.movimientos_controllers import MovementController
 from models.export_manager import ExportManager
+from services import EntregaService, ReservaService, ValidationError, InsufficientStockError
+from config import RESERVA_MINUTOS
+from events import event_bus, StockChanged, RequestRegistered
+from lifecycle import lifecycle
 
 
 class SolicitudesController:
     def __init__(self, content_frame, *args):
         self.model = SolicitudesModel()
+        self.entrega_service = EntregaService(self.model.conn)
+        self.reserva_service = ReservaService(self.model.conn, RESERVA_MINUTOS)
 
         # Manejar diferentes firmas del constructor
         if len(args) == 1:
@@ -23,8 +28,12 @@ class SolicitudesController:
         self.view = SolicitudesView(content_frame, app)
         self.view.set_controller(self)
         self.current_user = getattr(app, 'current_user', None)
+        # Stock disponible en el formulario (descontando reservas vigentes), por id
         self.stock_actual = {}
-        self.producto_info = {}
+        # Sesión de reservas de la entrega en preparación
+        self.sesion_entrega = None
+        self.indice_entrega = None
+        self.productos_categoria = {}
         self.current_form_data = None
 
     def mostrar_interfaz_principal(self):
@@ -32,6 +41,9 @@ class SolicitudesController:
         tree = self.view.mostrar_interfaz_principal()
         self.cargar_departamentos_combo()
         self.cargar_solicitudes()
+
+        # Incorporar las entregas registradas desde cualquier formulario
+        lifecycle.subscribe(RequestRegistered, lambda e: self.cargar_solicitudes())
         return tree
 
     def cargar_departamentos_combo(self):
@@ -63,39 +75,64 @@ class SolicitudesController:
             departamentos, solicitantes, self.current_user
         )
 
-        # ✅ Usar solo categorías en inventario
-        categorias = self.model.obtener_categorias_en_inventario()
+        # Cada formulario reserva stock bajo su propia sesión; al cerrarse la
+        # ventana (registrada o cancelada) se liberan las reservas pendientes
+        sesion = self.sesion_entrega = self.reserva_service.nueva_sesion()
+        window = self.current_form_data['window']
+        window.on_hide(lambda: self._liberar_reservas(sesion))
+
+        # El stock disponible cambia con entregas, entradas y ajustes de otros
+        window.on_hide(event_bus.subscribe(
+            StockChanged, lambda e: self.refrescar_indice_entrega()))
+
+        # Índice de productos en inventario cargado una sola vez por formulario
+        self.stock_actual = {}
+        self.productos_categoria = {}
+        self.refrescar_indice_entrega()
+
+    def refrescar_indice_entrega(self):
+        """Recargar el índice de productos del formulario de entrega.
+
+        El stock del índice ya descuenta las reservas vigentes, incluidas las
+        de las líneas agregadas a esta entrega.
+        """
+        if not self.current_form_data or not self.current_form_data['window'].is_open:
+            return
+
+        self.indice_entrega = self.model.obtener_indice_entrega()
         self.view.cargar_categorias_combo(
-            categorias, self.current_form_data['category_combo'])
+            self.indice_entrega['categorias'], self.current_form_data['category_combo'])
 
-        # Configurar eventos
-        self.current_form_data['category_combo'].bind(
-            "<<ComboboxSelected>>",
-            lambda e: self.on_categoria_seleccionada()
-        )
+        self.stock_actual = {}
 
-        self.current_form_data['product_combo'].bind(
-            "<<ComboboxSelected>>",
-            lambda e: self.on_producto_seleccionado()
-        )
+        if self.current_form_data['selected_category'].get():
+            self.on_categoria_seleccionada()
+        if self.current_form_data['selected_product'].get():
+            self.on_producto_seleccionado()
+
+    def _producto_por_nombre(self, producto_nombre):
+        """Obtener id e información de un producto de la categoría actual"""
+        producto_id = self.productos_categoria.get(producto_nombre)
+        if producto_id is None or not self.indice_entrega:
+            return None, None
+        return producto_id, self.indice_entrega['productos'].get(producto_id)
 
     def on_categoria_seleccionada(self):
         """Manejar la selección de una categoría"""
-        if not self.current_form_data:
+        if not self.current_form_data or not self.indice_entrega:
             return
 
         categoria_nombre = self.current_form_data['selected_category'].get()
         if not categoria_nombre:
             return
 
-        categorias = self.model.obtener_categorias_en_inventario()
         categoria_id = next(
-            (c[0] for c in categorias if c[1] == categoria_nombre), None)
+            (c[0] for c in self.indice_entrega['categorias'] if c[1] == categoria_nombre), None)
 
         if categoria_id:
-            # ✅ Usar solo productos de inventario
-            productos = self.model.obtener_productos_por_categoria_en_inventario(
-                categoria_id)
+            productos = self.indice_entrega['productos_por_categoria'].get(
+                categoria_id, [])
+            self.productos_categoria = {nombre: pid for pid, nombre in productos}
             self.view.cargar_productos_combo(
                 productos, self.current_form_data['product_combo'])
 
@@ -108,26 +145,15 @@ class SolicitudesController:
         if not producto_nombre:
             return
 
-        detalles = self.model.obtener_detalles_producto(producto_nombre)
-        if detalles:
-            producto_id, stock, ubicacion, estado = detalles
-
-            self.producto_info[producto_nombre] = {
-                'id': producto_id,
-                'ubicacion': ubicacion if ubicacion else "N/A",
-                'estado': estado if estado else "disponible"
-            }
-
-            if producto_nombre in self.stock_actual:
-                stock_disponible = self.stock_actual[producto_nombre]
-            else:
-                stock_disponible = stock
-                self.stock_actual[producto_nombre] = stock_disponible
+        producto_id, info = self._producto_por_nombre(producto_nombre)
+        if info:
+            stock_disponible = self.stock_actual.setdefault(
+                producto_id, info['stock'])
 
             self.view.actualizar_detalles_producto(
-                estado=self.producto_info[producto_nombre]['estado'],
+                estado=info['estado'],
                 stock=stock_disponible,
-                ubicacion=self.producto_info[producto_nombre]['ubicacion'],
+                ubicacion=info['ubicacion'],
                 estado_label=self.current_form_data['estado_label'],
                 stock_label=self.current_form_data['stock_label'],
                 ubicacion_label=self.current_form_data['ubicacion_label']
@@ -139,6 +165,12 @@ class SolicitudesController:
             messagebox.showwarning("Advertencia", "Seleccione un producto")
             return
 
+        producto_id, info = self._producto_por_nombre(producto_nombre)
+        if not info:
+            messagebox.showwarning(
+                "Advertencia", "Seleccione un producto de la lista")
+            return
+
         try:
             cantidad = int(cantidad)
             if cantidad <= 0:
@@ -146,43 +178,35 @@ class SolicitudesController:
                     "Error", "La cantidad debe ser mayor a cero")
                 return
 
-            stock_disponible = self.stock_actual.get(producto_nombre, 0)
+            # Las filas de la entrega usan el id del producto como identificador
+            item = str(producto_id)
+            current_qty = int(output_tree.item(item)["values"][1]) if output_tree.exists(item) else 0
 
-            if cantidad > stock_disponible:
+            # Reservar atómicamente el total de la línea antes de agregarla
+            try:
+                disponible = self.reserva_service.reservar(
+                    self.sesion_entrega, producto_id, current_qty + cantidad,
+                    getattr(self.current_user, 'id', None))
+            except InsufficientStockError as e:
+                self.stock_actual[producto_id] = max(e.shortages[0][2] - current_qty, 0)
+                stock_label.config(text=str(self.stock_actual[producto_id]))
                 messagebox.showwarning(
-                    "Error", "No hay suficiente stock disponible")
+                    "Error", "No hay suficiente stock disponible "
+                    f"(disponible: {self.stock_actual[producto_id]})")
                 return
+            except Exception as e:
+                messagebox.showerror("Error", f"No se pudo reservar el stock: {e}")
+                return
+
+            if current_qty:
+                output_tree.item(item, values=(
+                    info['nombre'], current_qty + cantidad, info['ubicacion']))
+            else:
+                output_tree.insert("", "end", iid=item, values=(
+                    info['nombre'], cantidad, info['ubicacion']))
 
-            # Verificar si el producto ya está en la lista
-            for item in output_tree.get_children():
-                if output_tree.item(item)["values"][0] == producto_nombre:
-                    current_qty = output_tree.item(item)["values"][1]
-                    if (current_qty + cantidad) > stock_disponible:
-                        messagebox.showwarning(
-                            "Error", "No hay suficiente stock disponible")
-                        return
-
-                    output_tree.item(item, values=(
-                        producto_nombre,
-                        current_qty + cantidad,
-                        self.producto_info[producto_nombre]['ubicacion']
-                    ))
-
-                    self.stock_actual[producto_nombre] = stock_disponible - cantidad
-                    stock_label.config(
-                        text=str(self.stock_actual[producto_nombre]))
-                    qty_entry.delete(0, 'end')
-                    return
-
-            # Agregar nuevo producto
-            output_tree.insert("", "end", values=(
-                producto_nombre,
-                cantidad,
-                self.producto_info[producto_nombre]['ubicacion']
-            ))
-
-            self.stock_actual[producto_nombre] = stock_disponible - cantidad
-            stock_label.config(text=str(self.stock_actual[producto_nombre]))
+            self.stock_actual[producto_id] = disponible
+            stock_label.config(text=str(disponible))
             qty_entry.delete(0, 'end')
 
         except ValueError:
@@ -195,13 +219,17 @@ class SolicitudesController:
             messagebox.showwarning("Advertencia", "Seleccione un producto")
             return
 
-        producto_nombre = output_tree.item(selected[0])["values"][0]
-        cantidad = output_tree.item(selected[0])["values"][1]
-
-        if producto_nombre in self.stock_actual:
-            self.stock_actual[producto_nombre] += cantidad
+        producto_id = int(selected[0])
+        try:
+            self.stock_actual[producto_id] = self.reserva_service.liberar(
+                self.sesion_entrega, producto_id)
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudo liberar la reserva: {e}")
+            return
 
         output_tree.delete(selected[0])
+        if self._producto_por_nombre(self.current_form_data['selected_product'].get())[0] == producto_id:
+            stock_label.config(text=str(self.stock_actual[producto_id]))
 
     def registrar_entrega_form(self, dept_combo, sol_combo, resp_entrega_label, memo_entry, output_tree, departamentos, solicitantes, window):
         """Registrar una nueva entrega desde el formulario"""
@@ -209,36 +237,45 @@ class SolicitudesController:
         if not self._validar_campos_basicos(dept_combo, sol_combo, memo_entry, output_tree):
             return
 
-        try:
-            id_responsable_entrega = self._obtener_id_usuario_actual()
-            if not id_responsable_entrega:
-                return
+        id_responsable_entrega = self._obtener_id_usuario_actual()
+        if not id_responsable_entrega:
+            return
 
-            # Registrar la solicitud
-            datos_solicitud = (
+        lineas = [(int(item), output_tree.item(item)["values"][1])
+                  for item in output_tree.get_children()]
+        try:
+            self.entrega_service.registrar_entrega(
                 departamentos[dept_combo.current()][0],
                 solicitantes[sol_combo.current()][0],
                 id_responsable_entrega,
-                memo_entry.get().strip()
+                memo_entry.get(),
+                lineas,
+                sesion=self.sesion_entrega
             )
-
-            solicitud_id = self.model.registrar_solicitud(datos_solicitud)
-            if not solicitud_id:
-                raise Exception("No se pudo registrar la solicitud")
-
-            # Registrar productos y movimientos
-            self._registrar_productos_entrega(
-                solicitud_id, output_tree, id_responsable_entrega, memo_entry.get().strip())
-
-            self.model.commit()
-            messagebox.showinfo("Éxito", "Entrega registrada correctamente")
-            window.destroy()
-            self.cargar_solicitudes()
-
+        except InsufficientStockError as e:
+            messagebox.showwarning("Stock insuficiente", str(e))
+            # Refrescar el stock mostrado con el valor vigente
+            self.refrescar_indice_entrega()
+            return
+        except ValidationError as e:
+            messagebox.showwarning("Advertencia", str(e))
+            return
         except Exception as e:
             messagebox.showerror(
                 "Error", f"No se pudo registrar la entrega: {e}")
-            self.model.rollback()
+            return
+
+        messagebox.showinfo("Éxito", "Entrega registrada correctamente")
+        window.destroy()
+        self.current_form_data = None
+        self.indice_entrega = None
+
+    def _liberar_reservas(self, sesion):
+        """Liberar las reservas de una entrega que se cerró"""
+        try:
+            self.reserva_service.liberar(sesion)
+        except Exception as e:
+            print(f"Error al liberar reservas de la entrega: {e}")
 
     def _validar_campos_basicos(self, dept_combo, sol_combo, memo_entry, output_tree):
         """Validar campos básicos del formulario"""
@@ -267,32 +304,6 @@ class SolicitudesController:
             return None
         return self.app.current_user.id
 
-    def _registrar_productos_entrega(self, solicitud_id, output_tree, id_responsable_entrega, memo_text):
-        """Registrar productos de la entrega"""
-        movement_controller = MovementController(
-            None, self.app, create_ui=False)
-
-        for item in output_tree.get_children():
-            producto_nombre, cantidad, _ = output_tree.item(item)["values"]
-            cantidad = int(cantidad)
-            producto_id = self.producto_info[producto_nombre]['id']
-
-            # Registrar detalle
-            detalle_data = (solicitud_id, producto_id, cantidad)
-            self.model.registrar_detalle_solicitud(detalle_data)
-
-            # Actualizar inventario
-            self.model.actualizar_inventario(producto_id, cantidad)
-
-            # Registrar movimiento
-            movement_controller.register_movement(
-                id_producto=producto_id,
-                tipo="Salida",
-                cantidad=cantidad,
-                id_responsable=id_responsable_entrega,
-                referencia=f"Solicitud #{memo_text}"
-            )
-
     def mostrar_detalles_solicitud(self):
         """Mostrar detalles de la solicitud seleccionada"""
         solicitud_data = self.view.obtener_solicitud_seleccionada()
@@ -471,6 +482,15 @@ class SolicitudesController:
             messagebox.showerror(
                 "Error", f"Error al exportar solicitudes: {str(e)}")
 
+    def mostrar_analisis_consumo(self):
+        """Mostrar el análisis de consumo por departamento y categoría"""
+        from controllers.consumo_controller import ConsumoController
+        try:
+            ConsumoController(self.app).mostrar_analisis()
+        except Exception as e:
+            messagebox.showerror(
+                "Error", f"No se pudo abrir el análisis de consumo: {e}")
+
     def cerrar_conexion(self):
         """Cerrar la conexión a la base de datos"""
         self.model.close()
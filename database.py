@@ -1,25 +1,442 @@
 import psycopg2
-from psycopg2 import OperationalError
-from tkinter import messagebox
+from psycopg2 import OperationalError, InterfaceError
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, cursor as _PgCursor
+from psycopg2.pool import ThreadedConnectionPool
+import re
 import threading
+import time
+from contextlib import contextmanager
+from diagnostics.queries import query_stats
+from query_cache import result_cache
+from prepared_statements import statements, PreparedQuery
+from lifecycle import lifecycle
+from config import (DB_CONNECT_TIMEOUT, DB_RECONNECT_ATTEMPTS,
+                    DB_RECONNECT_DELAY, DB_PING_IDLE_SECONDS)
 
 
-def create_connection():
-    """Crea y retorna una conexión a PostgreSQL"""
+# Parámetros de conexión compartidos por la aplicación y el servidor API
+CONNECTION_PARAMS = {
+    'host': "localhost",
+    'database': "inventario_usm",  # Nombre de tu BD
+    'user': "postgres",            # Tu usuario
+    'password': "123456789",   # Tu contraseña
+    'port': "5432",
+}
+
+
+class DatabaseUnavailableError(OperationalError):
+    """No se pudo restablecer la conexión con PostgreSQL"""
+
+
+class ConnectionLostError(OperationalError):
+    """La conexión se perdió durante una escritura o una transacción.
+
+    Estas operaciones no se reintentan: el llamador decide si repetirlas.
+    """
+
+
+class ConnectionDisposedError(InterfaceError):
+    """Uso de una conexión ya cerrada con close() (p. ej. por el ámbito de su pantalla).
+
+    No se reconecta: quien la sigue usando la retuvo más allá de su ámbito.
+    """
+
+
+class PreparedCursor(_PgCursor):
+    """Cursor de psycopg2 que ejecuta por nombre las sentencias preparadas del registro"""
+
+    def execute(self, query, vars=None):
+        if isinstance(query, PreparedQuery) and statements.enabled:
+            return statements.execute(self, query, vars, super().execute)
+        return super().execute(query, vars)
+
+
+# Sentencias que se pueden repetir sin efectos: lecturas simples sin
+# bloqueos de fila ni escrituras en CTE o SELECT INTO
+_LECTURA = re.compile(r"^\s*(SELECT|WITH|SHOW|VALUES)\b", re.IGNORECASE)
+_EFECTOS = re.compile(
+    r"\b(INSERT|UPDATE|DELETE|MERGE|INTO|NEXTVAL|SETVAL|SHARE)\b",
+    re.IGNORECASE)
+
+
+def es_lectura(query):
+    """Indica si la sentencia es una lectura idempotente que puede reintentarse"""
+    if isinstance(query, bytes):
+        query = query.decode("utf-8", "replace")
+    if not isinstance(query, str):
+        return False
+    return bool(_LECTURA.match(query)) and not _EFECTOS.search(query)
+
+
+class ResilientConnection:
+    """Conexión a PostgreSQL que se recupera de caídas del servidor o de la red.
+
+    Mantiene la interfaz de la conexión de psycopg2 (cursor, autocommit,
+    commit, rollback, close). Antes de usarse comprueba que siga viva; si se
+    perdió, reconecta con espera exponencial. Las lecturas idempotentes que
+    fallan por la caída se repiten una vez sobre la nueva conexión; las
+    escrituras y las transacciones en curso fallan con ConnectionLostError.
+
+    Con `cache` las lecturas fuera de transacción pasan por la caché de
+    resultados y las escrituras invalidan las tablas que modifican.
+    """
+
+    def __init__(self, attempts=DB_RECONNECT_ATTEMPTS, delay=DB_RECONNECT_DELAY,
+                 ping_idle=DB_PING_IDLE_SECONDS, cache=True):
+        self.attempts = attempts
+        self.delay = delay
+        self.ping_idle = ping_idle
+        self.cache = cache
+        # Tablas modificadas en la transacción en curso (None: todas)
+        self._written = set()
+        self._lock = threading.RLock()
+        self._autocommit = False
+        # Cerrada a propósito con close(): no vuelve a abrirse
+        self._disposed = False
+        self._conn = self._connect()
+        self._last_used = time.monotonic()
+        # Se incrementa en cada reconexión para renovar los cursores
+        self.generation = 0
+
+    @staticmethod
+    def _connect():
+        return psycopg2.connect(connect_timeout=DB_CONNECT_TIMEOUT,
+                                cursor_factory=PreparedCursor, **CONNECTION_PARAMS)
+
+    @property
+    def raw(self):
+        """Conexión de psycopg2 actual"""
+        return self._conn
+
+    @property
+    def closed(self):
+        return self._conn.closed
+
+    @property
+    def autocommit(self):
+        return self._autocommit
+
+    @autocommit.setter
+    def autocommit(self, value):
+        self._autocommit = value
+        # En una conexión caída se aplica al reconectar
+        if not self._conn.closed:
+            self._conn.autocommit = value
+
+    def idle(self):
+        """Sin transacción abierta: se puede reconectar sin perder trabajo"""
+        return self._conn.closed or self._conn.get_transaction_status() == TRANSACTION_STATUS_IDLE
+
+    def check_open(self):
+        """Fallar si la conexión se cerró con close(), en lugar de reabrirla"""
+        if self._disposed:
+            raise ConnectionDisposedError(
+                "La conexión ya fue cerrada (su pantalla se cerró) y no se reabre")
+
+    def ensure_alive(self):
+        """Reconectar si la conexión está cerrada o no responde tras estar inactiva"""
+        with self._lock:
+            self.check_open()
+            if self._conn.closed:
+                self.reconnect()
+                return
+            if not self.idle() or time.monotonic() - self._last_used < self.ping_idle:
+                return
+            try:
+                with self._conn.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                if not self._conn.autocommit:
+                    self._conn.rollback()
+                self.touch()
+            except (OperationalError, InterfaceError):
+                self.reconnect()
+
+    def reconnect(self):
+        """Abrir una conexión nueva con espera exponencial entre intentos"""
+        with self._lock:
+            self.check_open()
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+            error = None
+            for intento in range(self.attempts):
+                if intento:
+                    time.sleep(self.delay * 2 ** (intento - 1))
+                try:
+                    conn = self._connect()
+                except OperationalError as e:
+                    error = e
+                    continue
+                conn.autocommit = self._autocommit
+                self._conn = conn
+                self.generation += 1
+                self.touch()
+                query_stats.record_reconnect(intento + 1)
+                return
+            raise DatabaseUnavailableError(
+                f"No se pudo restablecer la conexión con PostgreSQL tras "
+                f"{self.attempts} intentos: {error}")
+
+    def touch(self):
+        self._last_used = time.monotonic()
+
+    def cursor(self, *args, **kwargs):
+        self.check_open()
+        if self.idle():
+            self.ensure_alive()
+        return ResilientCursor(self, args, kwargs)
+
+    def written(self, query):
+        """Invalidar la caché con las tablas que modifica una sentencia"""
+        tables = result_cache.written_tables(query)
+        result_cache.invalidate(tables)
+        # Dentro de una transacción se invalida otra vez al confirmar, para
+        # descartar lo que otras conexiones leyeron antes del commit
+        if not self._autocommit and self._written is not None:
+            self._written = None if tables is None else self._written | tables
+
+    def commit(self):
+        self.check_open()
+        try:
+            self._conn.commit()
+        except (OperationalError, InterfaceError) as e:
+            if not self._conn.closed:
+                raise
+            raise ConnectionLostError(
+                "Se perdió la conexión con la base de datos al confirmar; "
+                "la operación no se pudo confirmar.") from e
+        finally:
+            written, self._written = self._written, set()
+            result_cache.invalidate(written)
+
+    def rollback(self):
+        self._written = set()
+        # Con la conexión caída el servidor ya descartó la transacción
+        if not self._conn.closed:
+            self._conn.rollback()
+
+    def close(self):
+        self._disposed = True
+        self._conn.close()
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+class ResilientCursor:
+    """Cursor de una ResilientConnection que sobrevive a las reconexiones.
+
+    Los resultados servidos desde la caché se entregan con los mismos
+    métodos fetch*, rowcount y description que un cursor normal.
+    """
+
+    def __init__(self, owner, args, kwargs):
+        self._owner = owner
+        self._args = args
+        self._kwargs = kwargs
+        self._cursor = owner.raw.cursor(*args, **kwargs)
+        self._generation = owner.generation
+        # Filas de la última lectura si se sirvió desde la caché o se guardó en ella
+        self._rows = None
+        self._pos = 0
+        self._description = None
+
+    def _current(self):
+        if self._generation != self._owner.generation:
+            self._cursor = self._owner.raw.cursor(*self._args, **self._kwargs)
+            self._generation = self._owner.generation
+        return self._cursor
+
+    def execute(self, query, vars=None):
+        return self._run("execute", query, vars)
+
+    def executemany(self, query, vars_list):
+        return self._run("executemany", query, vars_list)
+
+    def _run(self, method, query, params):
+        owner = self._owner
+        owner.check_open()
+        self._rows = None
+        # Sin transacción abierta nada se pierde si hay que reconectar
+        was_idle = owner.idle()
+        lectura = method == "execute" and es_lectura(query)
+        cacheable = (lectura and owner.cache and owner.autocommit and was_idle
+                     and result_cache.cacheable(query))
+        if cacheable:
+            cached = result_cache.get(query, params)
+            if cached is not None:
+                self._serve(*cached)
+                return None
+        if was_idle:
+            owner.ensure_alive()
+        inicio = time.perf_counter()
+        error = None
+        try:
+            result = getattr(self._current(), method)(query, params)
+        except (OperationalError, InterfaceError) as e:
+            if not owner.closed:
+                error = e
+                raise
+            if not (was_idle and lectura):
+                error = e
+                raise ConnectionLostError(
+                    "Se perdió la conexión con la base de datos durante una "
+                    "escritura; no se pudo confirmar si se aplicó. Verifique "
+                    "los datos antes de reintentar.") from e
+            error = e
+            owner.reconnect()
+            inicio = time.perf_counter()
+            result = self._current().execute(query, params)
+            error = None
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            query_stats.record(query, params, time.perf_counter() - inicio,
+                               self._cursor.rowcount, error)
+            # Una escritura fallida pudo aplicarse igual: se invalida siempre
+            if not lectura:
+                owner.written(query)
+        owner.touch()
+
+        if cacheable and self._cursor.description is not None:
+            rows = self._cursor.fetchall()
+            result_cache.put(query, params, rows, self._cursor.description)
+            self._serve(rows, self._cursor.description)
+        return result
+
+    def _serve(self, rows, description):
+        self._rows = rows
+        self._pos = 0
+        self._description = description
+
+    @property
+    def description(self):
+        return self._description if self._rows is not None else self._current().description
+
+    @property
+    def rowcount(self):
+        return len(self._rows) if self._rows is not None else self._current().rowcount
+
+    def fetchone(self):
+        if self._rows is None:
+            return self._current().fetchone()
+        if self._pos >= len(self._rows):
+            return None
+        self._pos += 1
+        return self._rows[self._pos - 1]
+
+    def fetchmany(self, size=None):
+        if self._rows is None:
+            return self._current().fetchmany(size) if size is not None else self._current().fetchmany()
+        size = size or self._cursor.arraysize
+        filas = self._rows[self._pos:self._pos + size]
+        self._pos += len(filas)
+        return filas
+
+    def fetchall(self):
+        if self._rows is None:
+            return self._current().fetchall()
+        filas = self._rows[self._pos:]
+        self._pos = len(self._rows)
+        return filas
+
+    def close(self):
+        self._rows = None
+        self._cursor.close()
+
+    def __iter__(self):
+        if self._rows is None:
+            return iter(self._current())
+        return iter(self.fetchall())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def __getattr__(self, name):
+        return getattr(self._current(), name)
+
+
+def create_connection(show_errors=True, cache=True):
+    """Crea y retorna una conexión a PostgreSQL con reconexión automática.
+
+    Con `show_errors=False` (scripts de consola) la excepción se propaga en
+    lugar de mostrarse en un messagebox. Con `cache=False` las lecturas van
+    siempre al servidor.
+    """
     try:
-        conn = psycopg2.connect(
-            host="localhost",
-            database="inventario_usm",  # Nombre de tu BD
-            user="postgres",            # Tu usuario
-            password="123456789",   # Tu contraseña
-            port="5432"
-        )
+        conn = ResilientConnection(cache=cache)
         # Evitar que una excepción deje la conexión en un estado abortado
         # y simplificar la gestión de commits en una aplicación de escritorio.
         # Al activar autocommit, cada operación se confirma inmediatamente.
         conn.autocommit = True
-        return conn
+        # Se cierra junto con la pantalla (o la aplicación) que la abrió
+        return lifecycle.track_connection(conn)
     except OperationalError as e:
+        if not show_errors:
+            raise
+        from tkinter import messagebox
         messagebox.showerror("Error de conexión",
                              f"No se pudo conectar a PostgreSQL: {e}")
         return None
+
+
+# Claves de esquema ya verificadas en este proceso
+_esquemas_aplicados = set()
+
+
+def ensure_schema(cursor, clave, sentencias):
+    """Ejecuta sentencias DDL idempotentes (IF NOT EXISTS) una sola vez por proceso"""
+    if clave in _esquemas_aplicados:
+        return
+    for sentencia in sentencias:
+        cursor.execute(sentencia)
+    _esquemas_aplicados.add(clave)
+    # Las sentencias preparadas antes de la migración pueden haber quedado obsoletas
+    statements.invalidate()
+
+
+@contextmanager
+def transaction(conn):
+    """Agrupa varias sentencias en una única transacción.
+
+    Desactiva temporalmente el autocommit de la conexión, confirma al salir
+    del bloque o revierte si ocurre una excepción.
+    """
+    autocommit_previo = conn.autocommit
+    conn.autocommit = False
+    try:
+        with conn.cursor() as cursor:
+            yield cursor
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.autocommit = autocommit_previo
+
+
+def create_pool(minconn=1, maxconn=10):
+    """Crea un pool de conexiones compartido entre hilos (servidor API).
+
+    Cada conexión del pool prepara por su cuenta las sentencias frecuentes.
+    """
+    return ThreadedConnectionPool(minconn, maxconn, cursor_factory=PreparedCursor,
+                                  **CONNECTION_PARAMS)
+
+
+@contextmanager
+def pooled_connection(pool):
+    """Toma una conexión del pool en modo autocommit y la devuelve al salir"""
+    conn = pool.getconn()
+    try:
+        conn.autocommit = True
+        yield conn
+    finally:
+        # Las conexiones cerradas por un error de red se descartan del pool
+        pool.putconn(conn, close=bool(conn.closed))
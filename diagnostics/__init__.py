@@ -0,0 +1,5 @@
+"""Medición de rendimiento: consultas a la base de datos y respuesta de la interfaz"""
+from diagnostics.plans import PlanCapture, plan_capture, summarize_plan
+from diagnostics.queries import QueryStats, query_stats, normalize_sql
+from diagnostics.responsiveness import ResponsivenessMonitor, ViewTimings, view_timings, timed
+from diagnostics.report import performance_report, export_report
@@ -0,0 +1,171 @@
+import hashlib
+import json
+import queue
+import threading
+import time
+from collections import OrderedDict
+from config import (EXPLAIN_CAPTURE, EXPLAIN_MS, EXPLAIN_LOG,
+                    EXPLAIN_INTERVAL_S, EXPLAIN_TIMEOUT_MS)
+
+# Filas descartadas por el filtro de un Seq Scan a partir de las cuales
+# se sugiere un índice
+_FILAS_DESCARTADAS_INDICE = 1000
+
+
+def query_fingerprint(sql_normalizado):
+    """Identificador estable de una consulta normalizada"""
+    return hashlib.sha1(sql_normalizado.encode("utf-8")).hexdigest()[:12]
+
+
+def _nodos(plan):
+    yield plan
+    for hijo in plan.get("Plans", []):
+        yield from _nodos(hijo)
+
+
+def summarize_plan(explain):
+    """Resumen de un plan JSON: Seq Scans, sugerencias de índices y totales"""
+    raiz = explain[0] if isinstance(explain, list) else explain
+    plan = raiz["Plan"]
+    seq_scans = []
+    sugerencias = []
+    for nodo in _nodos(plan):
+        tipo = nodo.get("Node Type")
+        loops = nodo.get("Actual Loops", 1) or 1
+        if tipo == "Seq Scan":
+            descartadas = nodo.get("Rows Removed by Filter", 0) * loops
+            devueltas = nodo.get("Actual Rows", 0) * loops
+            tabla = nodo.get("Relation Name", "?")
+            filtro = nodo.get("Filter")
+            seq_scans.append({"tabla": tabla, "filas": devueltas,
+                              "descartadas": descartadas, "filtro": filtro})
+            if filtro and descartadas >= _FILAS_DESCARTADAS_INDICE and descartadas > 10 * devueltas:
+                sugerencias.append(
+                    f"Seq Scan en {tabla} descarta {descartadas} filas: "
+                    f"considere un índice para {filtro}")
+        elif tipo == "Sort" and nodo.get("Sort Space Type") == "Disk":
+            sugerencias.append(
+                f"Ordenamiento en disco ({nodo.get('Sort Space Used')} kB) por "
+                f"{', '.join(nodo.get('Sort Key', []))}: aumente work_mem o use un índice")
+    return {
+        "tiempo_ms": raiz.get("Execution Time"),
+        "planificacion_ms": raiz.get("Planning Time"),
+        "buffers_hit": plan.get("Shared Hit Blocks", 0),
+        "buffers_read": plan.get("Shared Read Blocks", 0),
+        "seq_scans": seq_scans,
+        "sugerencias": sugerencias,
+    }
+
+
+class PlanCapture:
+    """Captura opcional de planes de ejecución de las lecturas lentas.
+
+    Las consultas que superan `umbral_ms` se repiten en un hilo aparte, con
+    su propia conexión, bajo EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) dentro
+    de una transacción que siempre se revierte. Solo se capturan lecturas
+    (ANALYZE ejecuta la sentencia) y cada consulta a lo sumo una vez cada
+    `intervalo_s` segundos.
+    """
+
+    def __init__(self, enabled=EXPLAIN_CAPTURE, umbral_ms=EXPLAIN_MS, log_path=EXPLAIN_LOG,
+                 intervalo_s=EXPLAIN_INTERVAL_S, timeout_ms=EXPLAIN_TIMEOUT_MS, maximo=100):
+        self.enabled = enabled
+        self.umbral_ms = umbral_ms
+        self.log_path = log_path
+        self.intervalo_s = intervalo_s
+        self.timeout_ms = timeout_ms
+        self.maximo = maximo
+        self._planes = OrderedDict()
+        self._ultima_captura = {}
+        self._lock = threading.Lock()
+        self._pendientes = queue.Queue(maxsize=20)
+        self._thread = None
+        self._conn = None
+
+    def maybe_capture(self, query, params, ms, sql, operacion, pantalla):
+        """Encolar la captura del plan si la consulta lo amerita"""
+        if not self.enabled or ms < self.umbral_ms:
+            return
+        from database import es_lectura
+        if not es_lectura(query):
+            return
+        huella = query_fingerprint(sql)
+        ahora = time.monotonic()
+        with self._lock:
+            if ahora - self._ultima_captura.get(huella, -self.intervalo_s) < self.intervalo_s:
+                return
+            self._ultima_captura[huella] = ahora
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._worker, daemon=True)
+                self._thread.start()
+        try:
+            self._pendientes.put_nowait((huella, query, params, ms, sql, operacion, pantalla))
+        except queue.Full:
+            pass
+
+    def _worker(self):
+        while True:
+            huella, query, params, ms, sql, operacion, pantalla = self._pendientes.get()
+            try:
+                explain = self._explain(query, params)
+                registro = {
+                    "huella": huella,
+                    "fecha": time.strftime("%Y-%m-%d %H:%M:%S"),
+                    "ms": ms,
+                    "operacion": operacion,
+                    "pantalla": pantalla,
+                    "sql": sql,
+                    "resumen": summarize_plan(explain),
+                    "plan": explain,
+                }
+                with self._lock:
+                    self._planes[huella] = registro
+                    self._planes.move_to_end(huella)
+                    while len(self._planes) > self.maximo:
+                        self._planes.popitem(last=False)
+                self._append_log(registro)
+            except Exception as e:
+                print(f"No se pudo capturar el plan de {operacion}: {e}")
+
+    def _connection(self):
+        if self._conn is None or self._conn.closed:
+            import psycopg2
+            from database import CONNECTION_PARAMS
+            self._conn = psycopg2.connect(**CONNECTION_PARAMS)
+        return self._conn
+
+    def _explain(self, query, params):
+        if isinstance(query, bytes):
+            query = query.decode("utf-8")
+        conn = self._connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SET LOCAL statement_timeout = %s", (self.timeout_ms,))
+                cursor.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + query, params)
+                explain = cursor.fetchone()[0]
+        finally:
+            conn.rollback()
+        if isinstance(explain, str):
+            explain = json.loads(explain)
+        return explain
+
+    def _append_log(self, registro):
+        try:
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(registro, ensure_ascii=False, default=str) + "\n")
+        except OSError as e:
+            print(f"No se pudo guardar el plan capturado: {e}")
+
+    def plans(self):
+        """Planes capturados, del más reciente al más antiguo"""
+        with self._lock:
+            return list(reversed(self._planes.values()))
+
+    def reset(self):
+        with self._lock:
+            self._planes.clear()
+            self._ultima_captura.clear()
+
+
+# Instancia compartida; se activa con EXPLAIN_CAPTURE o desde Ajustes
+plan_capture = PlanCapture()
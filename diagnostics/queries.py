@@ -0,0 +1,231 @@
+import hashlib
+import logging
+import math
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+from logging.handlers import RotatingFileHandler
+from config import SLOW_QUERY_MS, SLOW_QUERY_LOG, QUERY_STATS_SAMPLES
+from diagnostics.plans import plan_capture
+
+_COMENTARIOS = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+_CADENAS = re.compile(r"'(?:[^']|'')*'")
+_NUMEROS = re.compile(r"(?<![\w$])\d+(?:\.\d+)?\b")
+_ESPACIOS = re.compile(r"\s+")
+_LISTAS = re.compile(r"\(\s*(?:\?|%s)(?:\s*,\s*(?:\?|%s))+\s*\)")
+
+# Archivos cuyas funciones no cuentan como origen de una consulta
+_INFRAESTRUCTURA = (
+    os.sep + "database.py",
+    os.sep + "diagnostics" + os.sep,
+    os.sep + "psycopg2" + os.sep,
+    os.sep + "contextlib.py",
+)
+
+
+@lru_cache(maxsize=1024)
+def normalize_sql(query):
+    """SQL sin comentarios, literales ni espacios repetidos, para agrupar consultas"""
+    if isinstance(query, bytes):
+        query = query.decode("utf-8", "replace")
+    elif not isinstance(query, str):
+        query = str(query)
+    sql = _COMENTARIOS.sub(" ", query)
+    sql = _CADENAS.sub("?", sql)
+    sql = _NUMEROS.sub("?", sql)
+    sql = _ESPACIOS.sub(" ", sql).strip()
+    sql = _LISTAS.sub("(...)", sql)
+    return sql[:400]
+
+
+def fingerprint_params(params):
+    """Huella corta de los parámetros; identifica repeticiones sin guardar valores"""
+    if not params:
+        return "-"
+    return hashlib.sha1(repr(params).encode("utf-8", "replace")).hexdigest()[:10]
+
+
+def calling_operation(max_frames=12):
+    """Método que originó la consulta, p. ej. 'ProductModel.get_products'.
+
+    Se salta la capa de conexión y prefiere el primer método público, de modo
+    que los auxiliares privados (_fetch, _check_conflict) se atribuyan a la
+    operación que los usa.
+    """
+    frame = sys._getframe(1)
+    primero = None
+    revisados = 0
+    while frame and revisados < max_frames:
+        code = frame.f_code
+        if not any(parte in code.co_filename for parte in _INFRAESTRUCTURA):
+            revisados += 1
+            owner = frame.f_locals.get("self")
+            nombre = (f"{type(owner).__name__}.{code.co_name}" if owner is not None
+                      else f"{frame.f_globals.get('__name__', '?')}.{code.co_name}")
+            if primero is None:
+                primero = nombre
+            if not code.co_name.startswith("_") or code.co_name == "__init__":
+                return nombre
+        frame = frame.f_back
+    return primero or "?"
+
+
+def percentile(ordenados, p):
+    """Percentil por rango más cercano de una lista ya ordenada"""
+    if not ordenados:
+        return 0.0
+    rango = math.ceil(p / 100 * len(ordenados))
+    return ordenados[min(max(rango, 1), len(ordenados)) - 1]
+
+
+class _Operation:
+    __slots__ = ("llamadas", "errores", "total", "maximo", "filas", "muestras")
+
+    def __init__(self, muestras):
+        self.llamadas = 0
+        self.errores = 0
+        self.total = 0.0
+        self.maximo = 0.0
+        self.filas = 0
+        self.muestras = deque(maxlen=muestras)
+
+
+class QueryStats:
+    """Métricas de las consultas ejecutadas por la aplicación.
+
+    Agrupa por pantalla, método de origen y SQL normalizado; conserva las
+    últimas duraciones de cada grupo para calcular p50/p95/p99 y registra en
+    el log de consultas lentas las que superan el umbral.
+    """
+
+    def __init__(self, muestras=QUERY_STATS_SAMPLES, umbral_ms=SLOW_QUERY_MS,
+                 log_path=SLOW_QUERY_LOG):
+        self.muestras = muestras
+        self.umbral_ms = umbral_ms
+        self.log_path = log_path
+        self.enabled = True
+        self.pantalla = "Inicio"
+        self._operaciones = {}
+        self._lentas = deque(maxlen=200)
+        self._lock = threading.Lock()
+        self._logger = None
+        # Reconexiones exitosas y los intentos que necesitaron
+        self.reconexiones = 0
+        self.intentos_reconexion = 0
+
+    def set_screen(self, nombre):
+        """Pantalla a la que se atribuyen las consultas del hilo principal"""
+        self.pantalla = nombre
+
+    def _current_screen(self):
+        if threading.current_thread() is threading.main_thread():
+            return self.pantalla
+        return "Segundo plano"
+
+    def record(self, query, params, segundos, filas, error=None):
+        """Registrar una sentencia ejecutada"""
+        if not self.enabled:
+            return
+        sql = normalize_sql(query)
+        operacion = calling_operation()
+        pantalla = self._current_screen()
+        ms = segundos * 1000
+        with self._lock:
+            op = self._operaciones.get((pantalla, operacion, sql))
+            if op is None:
+                op = self._operaciones[(pantalla, operacion, sql)] = _Operation(self.muestras)
+            op.llamadas += 1
+            op.total += ms
+            op.maximo = max(op.maximo, ms)
+            op.muestras.append(ms)
+            if error is not None:
+                op.errores += 1
+            elif filas and filas > 0:
+                op.filas += filas
+
+        if error is None:
+            plan_capture.maybe_capture(query, params, ms, sql, operacion, pantalla)
+
+        if ms >= self.umbral_ms:
+            entrada = {
+                "fecha": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "ms": ms,
+                "pantalla": pantalla,
+                "operacion": operacion,
+                "filas": filas,
+                "params": fingerprint_params(params),
+                "sql": sql,
+            }
+            with self._lock:
+                self._lentas.append(entrada)
+            self._log_slow(entrada)
+
+    def record_reconnect(self, intentos):
+        """Registrar una conexión restablecida tras `intentos` intentos"""
+        with self._lock:
+            self.reconexiones += 1
+            self.intentos_reconexion += intentos
+
+    def _log_slow(self, entrada):
+        try:
+            if self._logger is None:
+                logger = logging.getLogger("inventario.consultas_lentas")
+                logger.setLevel(logging.INFO)
+                logger.propagate = False
+                if not logger.handlers:
+                    handler = RotatingFileHandler(
+                        self.log_path, maxBytes=1_000_000, backupCount=3, encoding="utf-8")
+                    handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+                    logger.addHandler(handler)
+                self._logger = logger
+            self._logger.info(
+                "%.1f ms | %s | %s | filas=%s | params=%s | %s",
+                entrada["ms"], entrada["pantalla"], entrada["operacion"],
+                entrada["filas"], entrada["params"], entrada["sql"])
+        except OSError as e:
+            print(f"No se pudo escribir el log de consultas lentas: {e}")
+
+    def summary(self):
+        """Métricas por operación, ordenadas por tiempo total descendente"""
+        with self._lock:
+            items = [(clave, op.llamadas, op.errores, op.total, op.maximo, op.filas,
+                      sorted(op.muestras))
+                     for clave, op in self._operaciones.items()]
+        resumen = []
+        for (pantalla, operacion, sql), llamadas, errores, total, maximo, filas, ordenados in items:
+            resumen.append({
+                "pantalla": pantalla,
+                "operacion": operacion,
+                "sql": sql,
+                "llamadas": llamadas,
+                "errores": errores,
+                "total_ms": total,
+                "p50_ms": percentile(ordenados, 50),
+                "p95_ms": percentile(ordenados, 95),
+                "p99_ms": percentile(ordenados, 99),
+                "max_ms": maximo,
+                "filas_promedio": filas / llamadas if llamadas else 0,
+            })
+        resumen.sort(key=lambda r: r["total_ms"], reverse=True)
+        return resumen
+
+    def slow_queries(self):
+        """Consultas lentas recientes, de la más nueva a la más antigua"""
+        with self._lock:
+            return list(reversed(self._lentas))
+
+    def reset(self):
+        """Descartar las métricas acumuladas"""
+        with self._lock:
+            self._operaciones.clear()
+            self._lentas.clear()
+            self.reconexiones = 0
+            self.intentos_reconexion = 0
+
+
+# Instancia compartida por todas las conexiones del proceso
+query_stats = QueryStats()
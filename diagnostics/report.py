@@ -0,0 +1,93 @@
+import time
+from diagnostics.plans import plan_capture
+from diagnostics.queries import query_stats
+from diagnostics.responsiveness import view_timings
+from query_cache import result_cache
+from prepared_statements import statements
+from lifecycle import lifecycle
+from views.dialog_pool import dialog_pool
+
+
+def performance_report(monitor=None):
+    """Reporte de texto con la respuesta de la interfaz, pantallas y consultas"""
+    lineas = [f"Reporte de rendimiento - {time.strftime('%Y-%m-%d %H:%M:%S')}", ""]
+
+    if monitor is not None:
+        r = monitor.summary()
+        lineas += [
+            "== Bucle de eventos ==",
+            f"Latidos: {r['latidos']}  lag p50 {r['p50_ms']:.1f} ms  p95 {r['p95_ms']:.1f} ms  "
+            f"p99 {r['p99_ms']:.1f} ms  máx {r['max_ms']:.1f} ms",
+            f"Bloqueos (≥ {monitor.umbral_ms} ms): {r['bloqueos']}",
+            "",
+        ]
+        for stall in reversed(monitor.stalls):
+            lineas.append(f"-- {stall['fecha']}  {stall['ms']:.0f} ms  en {stall['pantalla']}")
+            lineas.append(stall["pila"].rstrip() or "   (pila no capturada)")
+            lineas.append("")
+
+    lineas.append("== Pantallas y tablas ==")
+    for t in view_timings.summary():
+        lineas.append(f"{t['nombre']:<45} x{t['veces']:<5} p50 {t['p50_ms']:8.1f}  "
+                      f"p95 {t['p95_ms']:8.1f}  máx {t['max_ms']:8.1f} ms")
+    lineas.append("")
+
+    cache = result_cache.stats()
+    lineas += [
+        "== Caché de resultados ==",
+        f"Entradas {cache['entradas']}  aciertos {cache['aciertos']}  fallos {cache['fallos']}  "
+        f"({cache['tasa_aciertos']:.0%})  invalidaciones {cache['invalidaciones']}  "
+        f"desalojos {cache['desalojos']}",
+        "",
+    ]
+
+    preparadas = statements.stats()
+    lineas.append("== Sentencias preparadas ==")
+    lineas.append(f"Sentencias {preparadas['sentencias']}  preparaciones {preparadas['preparaciones']}  "
+                  f"ejecuciones {preparadas['ejecuciones']}  invalidaciones {preparadas['invalidaciones']}  "
+                  f"planificación ahorrada (estimada) {preparadas['ahorro_ms']:.1f} ms")
+    for s in statements.report()[:10]:
+        lineas.append(f"{s['nombre']} x{s['ejecuciones']:<5} prep {s['preparaciones']:<3} "
+                      f"plan {s['planificacion_ms'] or 0:.2f} ms  ahorro {s['ahorro_ms']:.1f} ms | {s['sql'][:80]}")
+    lineas.append("")
+
+    lineas.append("== Recursos por pantalla ==")
+    lineas.append(f"Conexiones abiertas: {lifecycle.open_connections()}")
+    pool = dialog_pool.stats()
+    lineas.append(f"Formularios en pool: {pool['formularios']}  construidos {pool['construidos']}  "
+                  f"reutilizados {pool['reutilizados']}")
+    for nombre, r in sorted(lifecycle.report().items()):
+        vivos = ", ".join(f"{t} x{n}" for t, n in sorted(r["vivos"].items())) or "-"
+        retenidos = ", ".join(f"{t} x{n}" for t, n in sorted(r["retenidos"].items())) or "-"
+        lineas.append(f"{nombre:<20} abiertas {r['abiertas']:<4} cerradas {r['cerradas']:<4} "
+                      f"conexiones {r['conexiones']:<3} vivos: {vivos}  retenidos: {retenidos}")
+    lineas.append("")
+
+    lineas.append("== Consultas ==")
+    lineas.append(f"Reconexiones {query_stats.reconexiones}  "
+                  f"intentos {query_stats.intentos_reconexion}")
+    for q in query_stats.summary():
+        lineas.append(f"{q['pantalla']} | {q['operacion']} | x{q['llamadas']} err {q['errores']} | "
+                      f"p50 {q['p50_ms']:.1f} p95 {q['p95_ms']:.1f} p99 {q['p99_ms']:.1f} "
+                      f"máx {q['max_ms']:.1f} ms | {q['sql']}")
+
+    planes = plan_capture.plans()
+    if planes:
+        lineas += ["", "== Planes capturados =="]
+        for p in planes:
+            resumen = p["resumen"]
+            lineas.append(f"-- {p['fecha']}  [{p['huella']}] {p['operacion']}  {p['ms']:.1f} ms "
+                          f"(EXPLAIN: {resumen['tiempo_ms']} ms, buffers hit "
+                          f"{resumen['buffers_hit']} / read {resumen['buffers_read']})")
+            for scan in resumen["seq_scans"]:
+                lineas.append(f"   Seq Scan {scan['tabla']}: {scan['filas']} filas, "
+                              f"{scan['descartadas']} descartadas  {scan['filtro'] or ''}")
+            for sugerencia in resumen["sugerencias"]:
+                lineas.append(f"   * {sugerencia}")
+    return "\n".join(lineas) + "\n"
+
+
+def export_report(path, monitor=None):
+    """Guardar el reporte de rendimiento en `path`"""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(performance_report(monitor))
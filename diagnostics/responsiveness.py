@@ -0,0 +1,153 @@
+import functools
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from contextlib import contextmanager
+from config import UI_HEARTBEAT_MS, UI_STALL_MS
+from diagnostics.queries import percentile, query_stats
+
+
+class ViewTimings:
+    """Tiempos de construcción y refresco de pantallas y tablas"""
+
+    def __init__(self, muestras=200):
+        self.muestras = muestras
+        self._tiempos = {}
+        self._lock = threading.Lock()
+
+    def record(self, nombre, ms):
+        with self._lock:
+            tiempos = self._tiempos.get(nombre)
+            if tiempos is None:
+                tiempos = self._tiempos[nombre] = deque(maxlen=self.muestras)
+            tiempos.append(ms)
+
+    @contextmanager
+    def measure(self, nombre):
+        """Medir el bloque con nombre `nombre`"""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(nombre, (time.perf_counter() - inicio) * 1000)
+
+    def summary(self):
+        """Tiempos por nombre, del más lento (p95) al más rápido"""
+        with self._lock:
+            items = [(nombre, sorted(t)) for nombre, t in self._tiempos.items()]
+        resumen = [{
+            "nombre": nombre,
+            "veces": len(ordenados),
+            "p50_ms": percentile(ordenados, 50),
+            "p95_ms": percentile(ordenados, 95),
+            "max_ms": ordenados[-1],
+        } for nombre, ordenados in items if ordenados]
+        resumen.sort(key=lambda r: r["p95_ms"], reverse=True)
+        return resumen
+
+    def reset(self):
+        with self._lock:
+            self._tiempos.clear()
+
+
+# Instancia compartida por las vistas y controladores
+view_timings = ViewTimings()
+
+
+def timed(func):
+    """Decorador que registra la duración de cada llamada como 'Clase.metodo'"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with view_timings.measure(func.__qualname__):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+class ResponsivenessMonitor:
+    """Mide la latencia del bucle de eventos de Tk y detecta bloqueos.
+
+    Un temporizador `after` late cada `intervalo_ms`; el retraso de cada
+    latido respecto a lo programado es el lag del bucle principal. Un hilo
+    vigilante revisa el último latido y, si el bucle lleva más de `umbral_ms`
+    sin responder, captura la pila del hilo principal para identificar el
+    callback que lo bloquea.
+    """
+
+    def __init__(self, app, intervalo_ms=UI_HEARTBEAT_MS, umbral_ms=UI_STALL_MS):
+        self.app = app
+        self.intervalo_ms = intervalo_ms
+        self.umbral_ms = umbral_ms
+        self.lags = deque(maxlen=3000)
+        self.stalls = deque(maxlen=50)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._after_id = None
+        self._esperado = None
+        self._bloqueo = None
+        self._main_ident = threading.main_thread().ident
+
+    def start(self):
+        """Iniciar el latido y el hilo vigilante"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._esperado = time.perf_counter() + self.intervalo_ms / 1000
+        self._after_id = self.app.after(self.intervalo_ms, self._beat)
+        self._thread = threading.Thread(target=self._watch, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._after_id:
+            try:
+                self.app.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def _beat(self):
+        ahora = time.perf_counter()
+        lag = max(0.0, (ahora - self._esperado) * 1000)
+        self.lags.append(lag)
+        with self._lock:
+            bloqueo, self._bloqueo = self._bloqueo, None
+            self._esperado = ahora + self.intervalo_ms / 1000
+        if bloqueo or lag >= self.umbral_ms:
+            self.stalls.append({
+                "fecha": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "ms": lag,
+                "pantalla": bloqueo["pantalla"] if bloqueo else query_stats.pantalla,
+                # Sin pila si el bloqueo terminó antes de que el vigilante lo viera
+                "pila": bloqueo["pila"] if bloqueo else "",
+            })
+        if not self._stop.is_set():
+            self._after_id = self.app.after(self.intervalo_ms, self._beat)
+
+    def _watch(self):
+        while not self._stop.wait(self.intervalo_ms / 2000):
+            with self._lock:
+                if self._bloqueo is not None or self._esperado is None:
+                    continue
+                retraso = (time.perf_counter() - self._esperado) * 1000
+                if retraso < self.umbral_ms:
+                    continue
+                frame = sys._current_frames().get(self._main_ident)
+                self._bloqueo = {
+                    "pantalla": query_stats.pantalla,
+                    "pila": "".join(traceback.format_stack(frame)) if frame else "",
+                }
+
+    def summary(self):
+        """Lag del bucle principal (ms) y número de bloqueos registrados"""
+        ordenados = sorted(self.lags)
+        return {
+            "latidos": len(ordenados),
+            "p50_ms": percentile(ordenados, 50),
+            "p95_ms": percentile(ordenados, 95),
+            "p99_ms": percentile(ordenados, 99),
+            "max_ms": ordenados[-1] if ordenados else 0.0,
+            "bloqueos": len(self.stalls),
+        }
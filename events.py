@@ -0,0 +1,188 @@
+"""Bus de eventos de dominio en proceso.
+
+Los caminos de escritura (servicios y modelos) publican qué cambió después
+de confirmar la transacción; las vistas abiertas y las cachés se suscriben
+y actualizan solo lo afectado en lugar de volver a cargar todo.
+"""
+import queue
+import threading
+
+
+class DomainEvent:
+    """Base de los eventos de dominio"""
+
+    __slots__ = ()
+
+    def __repr__(self):
+        campos = ", ".join(f"{k}={getattr(self, k)!r}" for k in self.__slots__)
+        return f"{type(self).__name__}({campos})"
+
+
+def _ids(product_ids):
+    """Normalizar IDs de productos; None significa 'cualquiera/desconocidos'"""
+    if product_ids is None:
+        return None
+    return frozenset(int(pid) for pid in product_ids)
+
+
+class StockChanged(DomainEvent):
+    """Cambió el stock (o el estado de stock) de productos.
+
+    `product_ids` es None cuando la escritura afectó a un conjunto no
+    determinado (por ejemplo, una importación masiva).
+    """
+
+    __slots__ = ("product_ids",)
+
+    def __init__(self, product_ids):
+        self.product_ids = _ids(product_ids)
+
+
+class ProductChanged(DomainEvent):
+    """Se crearon, editaron o desactivaron productos"""
+
+    __slots__ = ("product_ids",)
+
+    def __init__(self, product_ids):
+        self.product_ids = _ids(product_ids)
+
+
+class MovementRecorded(DomainEvent):
+    """Se registraron movimientos de inventario"""
+
+    __slots__ = ("product_ids", "tipo")
+
+    def __init__(self, product_ids, tipo=None):
+        self.product_ids = _ids(product_ids)
+        self.tipo = tipo
+
+
+class ReferenceDataChanged(DomainEvent):
+    """Cambió una tabla maestra (categorías, marcas, ubicaciones, ...)"""
+
+    __slots__ = ("table",)
+
+    def __init__(self, table):
+        self.table = table
+
+
+class RequestRegistered(DomainEvent):
+    """Se registró una entrega (solicitud) con sus productos"""
+
+    __slots__ = ("id_solicitud", "product_ids")
+
+    def __init__(self, id_solicitud, product_ids):
+        self.id_solicitud = id_solicitud
+        self.product_ids = _ids(product_ids)
+
+
+class SupplierChanged(DomainEvent):
+    """Se creó, editó o eliminó un proveedor, o cambiaron sus productos"""
+
+    __slots__ = ("supplier_id",)
+
+    def __init__(self, supplier_id):
+        self.supplier_id = supplier_id
+
+
+class EventBus:
+    """Publicación y suscripción sincrónica por tipo de evento.
+
+    Un suscriptor de una clase recibe también sus subclases. Los errores de
+    un manejador se informan y no interrumpen a los demás ni a quien
+    publicó: la escritura ya está confirmada.
+
+    Tkinter no admite llamadas desde otros hilos: con el bombeo iniciado
+    (start_pump), lo publicado desde un hilo secundario se encola y el hilo
+    principal lo entrega en su próxima vuelta.
+    """
+
+    def __init__(self):
+        self._handlers = {}
+        self._lock = threading.Lock()
+        self._pending = queue.Queue()
+        self._schedule = None
+        self._interval = 50
+        self.published = 0
+
+    def start_pump(self, schedule, interval_ms=50):
+        """Entregar los eventos encolados desde el hilo de la interfaz.
+
+        `schedule(ms, callback)` programa `callback` en el hilo principal
+        (la aplicación usa el `after` de su ámbito). Se llama desde ese hilo.
+        """
+        self._schedule = schedule
+        self._interval = interval_ms
+        self._pump()
+
+    def stop_pump(self):
+        """Dejar de bombear y descartar lo pendiente (la ventana se cerró)"""
+        self._schedule = None
+        self.drain(deliver=False)
+
+    def _pump(self):
+        self.drain()
+        if self._schedule is not None:
+            self._schedule(self._interval, self._pump)
+
+    def drain(self, deliver=True):
+        """Entregar en el hilo actual los eventos encolados por otros hilos"""
+        while True:
+            try:
+                event, handlers = self._pending.get_nowait()
+            except queue.Empty:
+                return
+            if deliver:
+                self._deliver(event, handlers)
+
+    def subscribe(self, event_type, handler):
+        """Suscribir `handler` a `event_type`. Devuelve la función para desuscribirlo."""
+        with self._lock:
+            self._handlers.setdefault(event_type, []).append(handler)
+
+        def unsubscribe():
+            with self._lock:
+                handlers = self._handlers.get(event_type, [])
+                if handler in handlers:
+                    handlers.remove(handler)
+        return unsubscribe
+
+    def subscribe_many(self, handlers):
+        """Suscribir varios {tipo: manejador}. Devuelve una sola función para desuscribirlos."""
+        cancels = [self.subscribe(event_type, handler)
+                   for event_type, handler in handlers.items()]
+
+        def unsubscribe():
+            for cancel in cancels:
+                cancel()
+        return unsubscribe
+
+    def publish(self, event):
+        """Entregar el evento a los suscriptores de su clase y de sus bases"""
+        self.published += 1
+        with self._lock:
+            handlers = [h for cls in type(event).__mro__
+                        for h in self._handlers.get(cls, ())]
+        if not handlers:
+            return
+
+        if self._schedule is not None and threading.current_thread() is not threading.main_thread():
+            self._pending.put((event, handlers))
+            return
+        self._deliver(event, handlers)
+
+    @staticmethod
+    def _deliver(event, handlers):
+        for handler in handlers:
+            try:
+                handler(event)
+            except Exception as e:
+                print(f"Error al procesar el evento {event!r}: {e}")
+
+    def clear(self):
+        """Quitar todas las suscripciones"""
+        with self._lock:
+            self._handlers.clear()
+
+
+event_bus = EventBus()
@@ -35,6 +35,20 @@ def center_window(window):
     window.geometry(f'{width}x{height}+{x}+{y}')
 
 
+def parse_scan_code(raw):
+    """Interpreta una lectura de escáner 'cantidad*código' o solo 'código'.
+
+    Devuelve (código, cantidad); la cantidad es None si el multiplicador no es válido.
+    """
+    raw = raw.strip()
+    if "*" in raw:
+        qty, code = raw.split("*", 1)
+        if qty.strip().isdigit() and int(qty) > 0:
+            return code.strip(), int(qty)
+        return code.strip(), None
+    return raw, 1
+
+
 def send_email(to_email, subject, body):
     # Configura tus credenciales aquí
     smtp_server = "smtp.gmail.com"
@@ -0,0 +1,233 @@
+"""Ciclo de vida de pantallas y de los recursos que abren.
+
+Cada pantalla del menú trabaja dentro de un ámbito (Scope) desechable: las
+conexiones creadas mientras está activa, los controladores que registra,
+los `after` que programa y las suscripciones al bus de eventos se liberan
+juntos al pasar a otra pantalla. Un ámbito de aplicación agrupa lo que vive
+mientras la ventana principal está abierta (tareas periódicas, conexiones
+de hilos secundarios).
+
+Fuera de la aplicación de escritorio (scripts, servidor API, benchmarks)
+no hay ámbito activo y nada se registra.
+"""
+import gc
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from events import event_bus
+
+# Métodos de cierre que usan los controladores y modelos del proyecto
+_CIERRES = ("close", "close_connections", "cerrar_conexion", "close_connection")
+
+
+class Scope:
+    """Recursos de una pantalla que se liberan juntos con close()"""
+
+    def __init__(self, name, widget=None):
+        self.name = name
+        self.widget = widget
+        self.opened_at = time.monotonic()
+        self._closers = []
+        self._jobs = {}
+        self._closed = False
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def own(self, obj, closer=None):
+        """Registrar un objeto para cerrarlo con el ámbito. Devuelve el objeto.
+
+        Sin `closer` se usa su primer método de cierre conocido, si tiene.
+        """
+        if closer is None:
+            closer = next((getattr(obj, m) for m in _CIERRES
+                           if callable(getattr(obj, m, None))), None)
+        if closer is not None:
+            self._closers.append(closer)
+        lifecycle.track(self, obj)
+        return obj
+
+    def on_close(self, callback):
+        """Ejecutar `callback` al cerrar el ámbito"""
+        self._closers.append(callback)
+        return callback
+
+    def subscribe(self, event_type, handler):
+        """Suscribirse al bus de eventos mientras el ámbito esté abierto"""
+        return self.on_close(event_bus.subscribe(event_type, handler))
+
+    def after(self, ms, callback, key=None):
+        """Programar `callback` con after; se cancela al cerrar el ámbito.
+
+        Con `key`, programar de nuevo reemplaza al anterior pendiente, de
+        modo que una tarea periódica nunca tiene más de una ejecución en cola.
+        """
+        if self._closed or self.widget is None:
+            return None
+        key = key if key is not None else object()
+        self.cancel(key)
+
+        def run():
+            self._jobs.pop(key, None)
+            callback()
+        self._jobs[key] = self.widget.after(ms, run)
+        return key
+
+    def cancel(self, key):
+        """Cancelar un after pendiente programado con `key`"""
+        job = self._jobs.pop(key, None)
+        if job is not None and self.widget is not None:
+            try:
+                self.widget.after_cancel(job)
+            except Exception:
+                pass
+
+    def pending_jobs(self):
+        return len(self._jobs)
+
+    def close(self):
+        """Cancelar los after pendientes y cerrar lo registrado (en orden inverso)"""
+        if self._closed:
+            return
+        self._closed = True
+        for key in list(self._jobs):
+            self.cancel(key)
+        while self._closers:
+            closer = self._closers.pop()
+            try:
+                closer()
+            except Exception as e:
+                print(f"Error al liberar recursos de {self.name}: {e}")
+
+
+class LifecycleManager:
+    """Ámbitos de la aplicación y de la pantalla actual, y reporte de fugas"""
+
+    def __init__(self):
+        self.app = None
+        self.screen = None
+        self._override = threading.local()
+        self._lock = threading.Lock()
+        # Por tipo de pantalla: ámbitos abiertos/cerrados y objetos registrados
+        self._screens = {}
+        self._objects = {}
+        # Conexión -> nombre del ámbito que la creó
+        self._connections = weakref.WeakKeyDictionary()
+
+    def start(self, widget, name="Aplicación"):
+        """Crear el ámbito de la aplicación sobre la ventana principal"""
+        if self.app is not None:
+            self.app.close()
+        self.app = Scope(name, widget)
+        return self.app
+
+    def open_screen(self, name):
+        """Cerrar la pantalla anterior y abrir el ámbito de la nueva"""
+        self.close_screen()
+        self.screen = Scope(name, self.app.widget if self.app else None)
+        with self._lock:
+            stats = self._screens.setdefault(name, {'abiertas': 0, 'cerradas': 0})
+            stats['abiertas'] += 1
+        return self.screen
+
+    def close_screen(self):
+        """Liberar los recursos de la pantalla actual"""
+        screen, self.screen = self.screen, None
+        if screen is not None:
+            screen.close()
+            with self._lock:
+                self._screens[screen.name]['cerradas'] += 1
+
+    def shutdown(self):
+        """Cerrar la pantalla actual y el ámbito de la aplicación"""
+        self.close_screen()
+        if self.app is not None:
+            self.app.close()
+            self.app = None
+
+    def current(self):
+        """Ámbito en el que se registran los recursos nuevos (o None)"""
+        override = getattr(self._override, 'scope', False)
+        if override is not False:
+            return override
+        # Los hilos secundarios no pertenecen a ninguna pantalla
+        if threading.current_thread() is not threading.main_thread():
+            return self.app
+        return self.screen or self.app
+
+    @contextmanager
+    def using(self, scope):
+        """Registrar en `scope` lo que se cree dentro del bloque (None: nada)"""
+        previous = getattr(self._override, 'scope', False)
+        self._override.scope = scope
+        try:
+            yield scope
+        finally:
+            self._override.scope = previous
+
+    def own(self, obj, closer=None):
+        """Registrar un objeto en el ámbito actual, si lo hay. Devuelve el objeto."""
+        scope = self.current()
+        return scope.own(obj, closer) if scope is not None else obj
+
+    def subscribe(self, event_type, handler):
+        """Suscribirse al bus de eventos hasta que se cierre el ámbito actual"""
+        scope = self.current()
+        if scope is None:
+            return event_bus.subscribe(event_type, handler)
+        return scope.subscribe(event_type, handler)
+
+    def track(self, scope, obj):
+        """Recordar un objeto registrado en un ámbito para el reporte de fugas"""
+        try:
+            ref = weakref.ref(obj)
+        except TypeError:
+            return
+        with self._lock:
+            self._objects.setdefault(scope.name, []).append((ref, type(obj).__name__, scope))
+
+    def track_connection(self, conn):
+        """Registrar una conexión nueva en el ámbito actual para cerrarla con él"""
+        scope = self.current()
+        if scope is None or conn is None:
+            return conn
+        with self._lock:
+            self._connections[conn] = scope.name
+        scope.own(conn, conn.close)
+        return conn
+
+    def report(self):
+        """Objetos y conexiones vivos por tipo de pantalla.
+
+        'retenidos' son objetos de ámbitos ya cerrados que siguen en memoria:
+        algo (un callback, un after o una variable global) mantiene una
+        referencia y es una fuga probable.
+        """
+        gc.collect()
+        with self._lock:
+            connections = [(name, conn.closed) for conn, name in list(self._connections.items())]
+            report = {}
+            for name, stats in self._screens.items():
+                report[name] = {'abiertas': stats['abiertas'], 'cerradas': stats['cerradas'],
+                                'vivos': {}, 'retenidos': {}, 'conexiones': 0}
+            for name, entries in self._objects.items():
+                entries[:] = [e for e in entries if e[0]() is not None]
+                fila = report.setdefault(name, {'abiertas': 0, 'cerradas': 0,
+                                                'vivos': {}, 'retenidos': {}, 'conexiones': 0})
+                for _, tipo, scope in entries:
+                    clave = 'retenidos' if scope.closed else 'vivos'
+                    fila[clave][tipo] = fila[clave].get(tipo, 0) + 1
+        for name, closed in connections:
+            if not closed and name in report:
+                report[name]['conexiones'] += 1
+        return report
+
+    def open_connections(self):
+        """Cantidad de conexiones registradas que siguen abiertas"""
+        with self._lock:
+            return sum(1 for conn in list(self._connections) if not conn.closed)
+
+
+lifecycle = LifecycleManager()
@@ -1,7 +1,13 @@
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
+from config import CONSUMO_REFRESH_MS, RESERVAS_BARRIDO_MS
 from styles import setup_styles
 from helpers import clear_frame
+from diagnostics import query_stats, view_timings, ResponsivenessMonitor
+from events import event_bus
+from lifecycle import lifecycle
+from views.dialog_pool import dialog_pool
 from menu.dashboard import show_dashboard
 from menu.productos import show_inventory
 from menu.pedidos import show_requests
@@ -46,15 +52,32 @@ class ModernInventoryApp(tk.Tk):
         self.login_controller = LoginController(self)
         self.login_view = LoginView(self, self.login_controller)
 
+        # Ámbito de lo que vive mientras la ventana principal está abierta
+        self.app_scope = lifecycle.start(self)
+
+        # Los eventos publicados desde hilos secundarios se encolan y el
+        # hilo de la interfaz los entrega (Tkinter no es seguro entre hilos)
+        event_bus.start_pump(
+            lambda ms, callback: self.app_scope.after(ms, callback, key="eventos"))
+        self.app_scope.on_close(event_bus.stop_pump)
+        self.bind("<Destroy>", lambda e: e.widget is self and lifecycle.shutdown(), add="+")
+        # Los formularios reutilizables viven mientras la aplicación
+        self.app_scope.on_close(dialog_pool.clear)
+
         # Configurar el administrador de notificaciones
         self.notification_manager = NotificationManager(self)
 
+        # Monitor de respuesta del bucle de eventos
+        self.responsiveness = ResponsivenessMonitor(self)
+        self.responsiveness.start()
+
         # Mostrar login primero
         self.show_login()
 
     def show_login(self):
         """Muestra la pantalla de login usando la nueva estructura MVC"""
         # Limpiar ventana si ya hay widgets
+        lifecycle.close_screen()
         for widget in self.winfo_children():
             widget.destroy()
 
@@ -74,14 +97,19 @@ class ModernInventoryApp(tk.Tk):
         self.create_main_menu()
         self.create_status_bar()
 
-        # Verificar notificaciones
+        # Verificar notificaciones (se reprograma sola cada 5 minutos)
         self.notification_manager.check_low_stock()
 
-        # Iniciar el sistema de verificación periódica
-        self.after(300000, self.notification_manager.check_low_stock)
+        # Refresco programado del agregado de consumo departamental
+        self.app_scope.after(CONSUMO_REFRESH_MS, self.refresh_consumption_summary,
+                             key="consumo")
+
+        # Barrido programado de reservas de stock vencidas
+        self.app_scope.after(RESERVAS_BARRIDO_MS, self.sweep_expired_reservations,
+                             key="reservas")
 
         # Mostrar dashboard por defecto
-        show_dashboard(self)
+        self.open_screen("📊 Dashboard", show_dashboard)
 
     def create_header(self):
         """Crea la barra superior con logo, búsqueda y menú de usuario"""
@@ -149,7 +177,8 @@ class ModernInventoryApp(tk.Tk):
                                 activebackground=self.colors["hover"],
                                 activeforeground=self.colors["primary"])
         user_dropdown.add_command(
-            label="👤 Mi perfil", command=self.show_profile)
+            label="👤 Mi perfil",
+            command=lambda: self.open_screen("👤 Perfil", lambda app: app.show_profile()))
         user_dropdown.add_separator()
         user_dropdown.add_command(label="🚪 Cerrar sesión",
                                   command=self.logout)
@@ -185,7 +214,7 @@ class ModernInventoryApp(tk.Tk):
                             bg="white", fg=self.colors["text"], bd=0,
                             activebackground=self.colors["hover"],
                             activeforeground=self.colors["primary"],
-                            command=lambda cmd=command: cmd(self),
+                            command=lambda cmd=command, name=text: self.open_screen(name, cmd),
                             padx=20, anchor="w")
             btn.pack(fill="x", ipady=10)
 
@@ -199,6 +228,19 @@ class ModernInventoryApp(tk.Tk):
         self.content_frame.grid(
             row=0, column=1, sticky="nsew", padx=10, pady=10)
 
+    def open_screen(self, name, command):
+        """Muestra una pantalla del menú lateral"""
+        # Las consultas se atribuyen a la pantalla en las métricas
+        pantalla = name.split(" ", 1)[-1]
+        query_stats.set_screen(pantalla)
+        # Liberar conexiones, after y suscripciones de la pantalla anterior
+        lifecycle.open_screen(pantalla)
+        with view_timings.measure(f"Pantalla {pantalla}"):
+            result = command(self)
+            # Incluir el cálculo de geometría de los widgets creados
+            self.update_idletasks()
+        return result
+
     def create_status_bar(self):
         """Crea la barra de estado inferior"""
         status_frame = tk.Frame(self, bg="white", height=30)
@@ -210,6 +252,48 @@ class ModernInventoryApp(tk.Tk):
         tk.Label(status_frame, text="© 2025 Universidad - Todos los derechos reservados",
                  bg="white", fg=self.colors["text_light"], padx=10).pack(side="right")
 
+    def refresh_consumption_summary(self):
+        """Refresca en segundo plano el agregado de consumo y reprograma"""
+        if not getattr(self, '_consumo_refrescando', False):
+            self._consumo_refrescando = True
+
+            def _refrescar():
+                try:
+                    from models.consumo_model import ConsumoModel
+                    if not hasattr(self, '_consumo_model'):
+                        self._consumo_model = ConsumoModel(show_errors=False)
+                    self._consumo_model.refrescar()
+                except Exception as e:
+                    print(f"Error en refresco programado de consumo: {e}")
+                finally:
+                    self._consumo_refrescando = False
+
+            threading.Thread(target=_refrescar, daemon=True).start()
+
+        self.app_scope.after(CONSUMO_REFRESH_MS, self.refresh_consumption_summary,
+                             key="consumo")
+
+    def sweep_expired_reservations(self):
+        """Elimina en segundo plano las reservas de stock vencidas y reprograma"""
+        if not getattr(self, '_reservas_barriendo', False):
+            self._reservas_barriendo = True
+
+            def _barrer():
+                try:
+                    from services.reservas_service import ReservaService
+                    if not hasattr(self, '_reserva_service'):
+                        self._reserva_service = ReservaService()
+                    self._reserva_service.barrer_vencidas()
+                except Exception as e:
+                    print(f"Error en barrido de reservas vencidas: {e}")
+                finally:
+                    self._reservas_barriendo = False
+
+            threading.Thread(target=_barrer, daemon=True).start()
+
+        self.app_scope.after(RESERVAS_BARRIDO_MS, self.sweep_expired_reservations,
+                             key="reservas")
+
     def show_profile(self):
         """Muestra el perfil del usuario"""
         clear_frame(self.content_frame)
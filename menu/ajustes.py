@@ -1,11 +1,12 @@
 # ajustes.py (archivo principal simplificado)
 from controllers.settings_controller import SettingsController
+from lifecycle import lifecycle
 
 
 def show_settings(app):
     """Función para mostrar la configuración desde el menú principal"""
     try:
-        settings = SettingsController(app)
+        settings = lifecycle.own(SettingsController(app))
         settings.show_settings()
         return settings  # Para mantener la referencia si es necesario
     except Exception as e:
@@ -3,6 +3,7 @@ from tkinter import ttk
 import tkinter as tk
 from controllers.compras_controllers import PurchaseController
 from controllers.proveedores_controllers import SupplierController
+from lifecycle import lifecycle
 
 
 def show_purchases(app):
@@ -23,9 +24,9 @@ def show_purchases(app):
     # Pestaña de solicitudes
     requests_frame = tk.Frame(notebook, bg="white")
     notebook.add(requests_frame, text="📋 Compras")
-    purchase_controller = PurchaseController(requests_frame, app)
+    purchase_controller = lifecycle.own(PurchaseController(requests_frame, app))
 
     # Pestaña de proveedores
     suppliers_frame = tk.Frame(notebook, bg="white")
     notebook.add(suppliers_frame, text="👥 Proveedores")
-    supplier_controller = SupplierController(suppliers_frame, app)
+    supplier_controller = lifecycle.own(SupplierController(suppliers_frame, app))
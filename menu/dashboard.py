@@ -4,10 +4,12 @@ from helpers import clear_frame
 from database import create_connection
 from datetime import datetime
 from views.base_view import BaseView
+from config import API_URL
+from lifecycle import lifecycle
 
-# Conexión a PostgreSQL
-conn = create_connection()
-cursor = conn.cursor()
+# Conexión a PostgreSQL o cliente API, creados al primer uso
+_catalog = None
+_api = None
 
 
 class DashboardView(BaseView):
@@ -39,8 +41,9 @@ class DashboardView(BaseView):
         cards_frame = self.create_main_container(self.frame)
         cards_frame.pack(fill="x", pady=10)
 
-        # Obtener datos para las tarjetas
-        card_data = get_dashboard_card_data()
+        # Obtener en una sola lectura los datos de tarjetas y listas
+        self.data = get_dashboard_data()
+        card_data = self.data["tarjetas"]
 
         cards = [
             ("Productos", card_data["total_productos"], self.primary_color),
@@ -83,7 +86,7 @@ class DashboardView(BaseView):
                  font=self.app.subtitle_font, bg="white", fg=self.fg_color).pack(anchor="w", padx=20, pady=15)
 
         # Obtener últimos movimientos
-        movimientos = get_recent_movements()
+        movimientos = self.data["movimientos"]
 
         # Crear un frame para mostrar los movimientos como lista
         movimientos_frame = tk.Frame(chart_frame, bg="white")
@@ -109,7 +112,7 @@ class DashboardView(BaseView):
         table_container.pack(fill="both", expand=True, padx=20, pady=(0, 20))
 
         # Obtener productos con stock bajo
-        low_stock_products = get_low_stock_products()
+        low_stock_products = self.data["stock_bajo"]
 
         for product in low_stock_products:
             diferencia = product['stock_minimo'] - product['stock_actual'] if product['stock_actual'] < product['stock_minimo'] else 0
@@ -127,123 +130,74 @@ class DashboardView(BaseView):
 
 
 # Funciones de datos (mantenidas para compatibilidad)
-def get_dashboard_card_data():
-    """Obtiene los datos para las tarjetas del dashboard"""
-    data = {
-        "total_productos": 0,
-        "stock_bajo": 0,
-        "solicitudes_hoy": 0,
-        "compras_hoy": 0
+def _dashboard_source():
+    """Datos del panel desde el servidor API (modo API) o desde PostgreSQL"""
+    global _catalog, _api
+    if API_URL:
+        if _api is None:
+            from api.client import ApiClient
+            _api = ApiClient(API_URL)
+        return _api.get("/api/dashboard")
+
+    if _catalog is None:
+        from services.catalogo_service import CatalogService
+        # Conexión compartida por todas las visitas al panel
+        with lifecycle.using(lifecycle.app):
+            _catalog = CatalogService(create_connection())
+    return {
+        "tarjetas": _catalog.dashboard_counts(),
+        "movimientos": _catalog.movements(limit=10),
+        "stock_bajo": _catalog.stock(solo_bajo=True, limit=10),
     }
 
-    today = datetime.now().date()
 
-    try:
-        # Total de productos activos en inventario
-        cursor.execute("""
-            SELECT COUNT(DISTINCT p.id_producto) 
-            FROM productos p
-            JOIN inventario i ON p.id_producto = i.id_producto
-            WHERE p.activo = TRUE
-        """)
-        data["total_productos"] = cursor.fetchone()[0]
-
-        # Total de productos con stock bajo (sin repetir)
-        cursor.execute("""
-            SELECT COUNT(DISTINCT p.id_producto)
-            FROM productos p
-            JOIN inventario i ON p.id_producto = i.id_producto
-            WHERE p.activo = TRUE
-            AND i.stock <= COALESCE(p.stock_minimo, 0)
-            AND i.stock > 0
-        """)
-        data["stock_bajo"] = cursor.fetchone()[0]
-
-        # Solicitudes realizadas hoy
-        cursor.execute("""
-            SELECT COUNT(*) 
-            FROM solicitudes 
-            WHERE DATE(fecha_solicitud) = %s
-        """, (today,))
-        data["solicitudes_hoy"] = cursor.fetchone()[0]
-
-        # Compras pendientes
-        cursor.execute("""
-            SELECT COUNT(*) 
-            FROM solicitudes_compra 
-            WHERE estado = 'Pendiente'
-        """)
-        data["compras_hoy"] = cursor.fetchone()[0]
+def _format_fecha(value):
+    """Fecha de movimiento como DD/MM/YYYY HH:MM (llega como ISO en modo API)"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.strftime("%d/%m/%Y %H:%M") if value else ""
+
 
+def get_dashboard_data():
+    """Obtiene tarjetas, movimientos recientes y productos con stock bajo"""
+    data = {
+        "tarjetas": {"total_productos": 0, "stock_bajo": 0,
+                     "solicitudes_hoy": 0, "compras_hoy": 0},
+        "movimientos": [],
+        "stock_bajo": [],
+    }
+    try:
+        source = _dashboard_source()
+        data["tarjetas"].update(source["tarjetas"])
+        data["movimientos"] = [{
+            "tipo": m["tipo"],
+            "producto": m["producto"],
+            "cantidad": m["cantidad"],
+            "fecha": _format_fecha(m["fecha"])
+        } for m in source["movimientos"]]
+        data["stock_bajo"] = [{
+            "nombre": p["nombre"],
+            "stock_actual": p["stock"],
+            "stock_minimo": p["stock_minimo"]
+        } for p in source["stock_bajo"]]
     except Exception as e:
         print(f"Error al obtener datos del dashboard: {e}")
-        conn.rollback()
-
     return data
 
 
+def get_dashboard_card_data():
+    """Obtiene los datos para las tarjetas del dashboard"""
+    return get_dashboard_data()["tarjetas"]
+
+
 def get_recent_movements():
     """Obtiene los últimos movimientos de inventario"""
-    try:
-        cursor.execute("""
-            SELECT 
-                m.tipo,
-                p.nombre as producto,
-                m.cantidad,
-                TO_CHAR(m.fecha, 'DD/MM/YYYY HH24:MI') as fecha
-            FROM movimientos m
-            JOIN productos p ON m.id_producto = p.id_producto
-            ORDER BY m.fecha DESC
-            LIMIT 10
-        """)
-
-        movimientos = []
-        for row in cursor.fetchall():
-            movimientos.append({
-                "tipo": row[0],
-                "producto": row[1],
-                "cantidad": row[2],
-                "fecha": row[3]
-            })
-
-        return movimientos
-
-    except Exception as e:
-        print(f"Error al obtener movimientos recientes: {e}")
-        conn.rollback()
-        return []
+    return get_dashboard_data()["movimientos"]
 
 
 def get_low_stock_products():
     """Obtiene productos con stock bajo según el stock mínimo configurado por producto"""
-    try:
-        cursor.execute("""
-            SELECT 
-                p.nombre,
-                i.stock as stock_actual,
-                COALESCE(p.stock_minimo, 0) as stock_minimo
-            FROM productos p
-            JOIN inventario i ON p.id_producto = i.id_producto
-            WHERE p.activo = TRUE
-              AND i.stock <= COALESCE(p.stock_minimo, 0)
-            ORDER BY i.stock ASC
-            LIMIT 10
-        """)
-
-        productos = []
-        for row in cursor.fetchall():
-            productos.append({
-                "nombre": row[0],
-                "stock_actual": row[1],
-                "stock_minimo": row[2]
-            })
-
-        return productos
-
-    except Exception as e:
-        print(f"Error al obtener productos con stock bajo: {e}")
-        conn.rollback()
-        return []
+    return get_dashboard_data()["stock_bajo"]
 
 
 # Función de compatibilidad para la app existente
@@ -2,6 +2,7 @@ from helpers import clear_frame
 from tkinter import ttk
 import tkinter as tk
 from controllers.movimientos_controllers import MovementController
+from lifecycle import lifecycle
 
 
 def show_movements(app):
@@ -20,4 +21,4 @@ def show_movements(app):
     movements_frame.pack(fill="both", expand=True, padx=0, pady=0)  # Eliminar padding
 
     # Crear el controlador que manejará toda la lógica
-    movement_controller = MovementController(movements_frame, app)
\ No newline at end of file
+    movement_controller = lifecycle.own(MovementController(movements_frame, app))
\ No newline at end of file
@@ -3,6 +3,7 @@ from tkinter import ttk
 import tkinter as tk
 from helpers import clear_frame
 from controllers.solicitudes_controller import SolicitudesController
+from lifecycle import lifecycle
 
 
 def show_requests(app, current_user=None):
@@ -14,18 +15,16 @@ def show_requests(app, current_user=None):
         current_user = app.current_user
 
     # Crear controlador
-    controller = SolicitudesController(
+    controller = lifecycle.own(SolicitudesController(
         app.content_frame,
         app.colors,
         app.title_font,
         app
-    )
+    ))
 
     # Configurar usuario actual
     controller.current_user = current_user
 
     # Mostrar interfaz principal
     controller.mostrar_interfaz_principal()
-
-    # Guardar referencia al controlador en la app
-    app.solicitudes_controller = controller
+    return controller
@@ -1,7 +1,9 @@
 from controllers.product_controller import ProductController
+from lifecycle import lifecycle
 
 
 def show_inventory(app):
     """Mostrar la gestión de inventario"""
-    controller = ProductController(app)
+    controller = lifecycle.own(ProductController(app))
     controller.show_inventory()
+    return controller
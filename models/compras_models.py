@@ -46,30 +46,6 @@ class PurchaseModel:
         self.cursor.execute(query, params)
         return self.cursor.fetchall()
 
-    def create_request(self, data):
-        """Crea una nueva solicitud de compra"""
-        self.cursor.execute("""
-            INSERT INTO solicitudes_compra (
-                producto, cantidad, motivo, prioridad, proveedor, fecha, estado
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s)
-        """, data)
-        self.conn.commit()
-
-    def update_request_status(self, request_id, new_status):
-        """Actualiza el estado de una solicitud"""
-        self.cursor.execute("""
-            UPDATE solicitudes_compra 
-            SET estado = %s 
-            WHERE id = %s
-        """, (new_status, request_id))
-        self.conn.commit()
-
-    def delete_request(self, request_id):
-        """Elimina una solicitud"""
-        self.cursor.execute(
-            "DELETE FROM solicitudes_compra WHERE id = %s", (request_id,))
-        self.conn.commit()
-
     def get_categories(self):
         """Obtiene todas las categorías"""
         self.cursor.execute("SELECT nombre FROM categorias ORDER BY nombre")
@@ -0,0 +1,161 @@
+from database import create_connection, ensure_schema
+
+# Agregado materializado de detalle_solicitud por mes, departamento,
+# solicitante y categoría. El índice único permite REFRESH CONCURRENTLY.
+CONSUMO_SCHEMA = [
+    """
+    CREATE MATERIALIZED VIEW IF NOT EXISTS mv_consumo_departamental AS
+    SELECT
+        DATE_TRUNC('month', s.fecha_solicitud)::date AS mes,
+        s.id_departamento,
+        d.nombre AS departamento,
+        s.id_solicitante,
+        sol.nombre AS solicitante,
+        COALESCE(p.id_categoria, 0) AS id_categoria,
+        COALESCE(c.nombre, 'Sin categoría') AS categoria,
+        SUM(ds.cantidad) AS cantidad,
+        COUNT(*) AS lineas,
+        COUNT(DISTINCT s.id_solicitud) AS solicitudes
+    FROM detalle_solicitud ds
+    JOIN solicitudes s ON s.id_solicitud = ds.id_solicitud
+    JOIN departamentos d ON d.id_departamento = s.id_departamento
+    JOIN solicitantes sol ON sol.id_solicitante = s.id_solicitante
+    JOIN productos p ON p.id_producto = ds.id_producto
+    LEFT JOIN categorias c ON c.id_categoria = p.id_categoria
+    GROUP BY 1, 2, 3, 4, 5, 6, 7
+    """,
+    """
+    CREATE UNIQUE INDEX IF NOT EXISTS mv_consumo_departamental_uk
+    ON mv_consumo_departamental (mes, id_departamento, id_solicitante, id_categoria)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS mv_consumo_departamental_dept_idx
+    ON mv_consumo_departamental (id_departamento, mes)
+    """,
+]
+
+
+class ConsumoModel:
+    # Dimensiones permitidas para filas/columnas del pivot
+    DIMENSIONES = {
+        'Departamento': "departamento",
+        'Solicitante': "solicitante",
+        'Categoría': "categoria",
+        'Período': "periodo",
+    }
+    PERIODOS = {'Mes': "month", 'Trimestre': "quarter", 'Año': "year"}
+    FORMATOS_PERIODO = {'Mes': "YYYY-MM", 'Trimestre': "YYYY-\"T\"Q", 'Año': "YYYY"}
+
+    def __init__(self, show_errors=True):
+        # Desde un hilo secundario no se puede abrir un messagebox: con
+        # show_errors=False el error de conexión se propaga al llamador
+        self.conn = create_connection(show_errors=show_errors)
+        self.cursor = self.conn.cursor()
+        ensure_schema(self.cursor, "consumo_departamental", CONSUMO_SCHEMA)
+
+    def refrescar(self, concurrente=True):
+        """Refrescar el agregado materializado sin bloquear las lecturas"""
+        try:
+            if concurrente:
+                self.cursor.execute(
+                    "REFRESH MATERIALIZED VIEW CONCURRENTLY mv_consumo_departamental")
+            else:
+                self.cursor.execute(
+                    "REFRESH MATERIALIZED VIEW mv_consumo_departamental")
+            return True
+        except Exception as e:
+            print(f"Error al refrescar consumo departamental: {e}")
+            self.conn.rollback()
+            # Solo una vista que nunca se cargó rechaza CONCURRENTLY; ante
+            # otros errores no se cae en un refresco que bloquea las lecturas
+            if concurrente and getattr(e, 'pgcode', None) in ('0A000', '55000'):
+                return self.refrescar(concurrente=False)
+            return False
+
+    def obtener_consumo(self, filas, columnas, periodo="Mes", filtros=None):
+        """Obtener el consumo agregado por dos dimensiones"""
+        dim_filas = self.DIMENSIONES[filas]
+        dim_columnas = self.DIMENSIONES[columnas]
+        trunc = self.PERIODOS[periodo]
+        formato = self.FORMATOS_PERIODO[periodo]
+
+        query = f"""
+            SELECT {dim_filas} AS fila, {dim_columnas} AS columna, SUM(cantidad) AS cantidad
+            FROM (
+                SELECT TO_CHAR(DATE_TRUNC('{trunc}', mes), '{formato}') AS periodo,
+                       departamento, solicitante, categoria, cantidad
+                FROM mv_consumo_departamental
+                WHERE 1=1
+        """
+
+        params = []
+        if filtros:
+            if filtros.get('date_from'):
+                query += " AND mes >= DATE_TRUNC('month', %s::date)"
+                params.append(filtros['date_from'])
+            if filtros.get('date_to'):
+                query += " AND mes <= %s::date"
+                params.append(filtros['date_to'])
+            if filtros.get('departamento'):
+                query += " AND departamento = %s"
+                params.append(filtros['departamento'])
+            if filtros.get('categoria'):
+                query += " AND categoria = %s"
+                params.append(filtros['categoria'])
+
+        query += ") consumo GROUP BY fila, columna ORDER BY fila, columna"
+
+        try:
+            self.cursor.execute(query, params)
+            return self.cursor.fetchall()
+        except Exception as e:
+            print(f"Error al obtener consumo departamental: {e}")
+            self.conn.rollback()
+            return []
+
+    def obtener_pivot(self, filas, columnas, periodo="Mes", filtros=None):
+        """Obtener una tabla dinámica (encabezados, filas) del consumo"""
+        import pandas as pd
+
+        datos = self.obtener_consumo(filas, columnas, periodo, filtros)
+        if not datos:
+            return [filas, "Total"], []
+
+        df = pd.DataFrame(datos, columns=["fila", "columna", "cantidad"])
+        df["cantidad"] = df["cantidad"].astype(float)
+        pivot = df.pivot_table(index="fila", columns="columna", values="cantidad",
+                               aggfunc="sum", fill_value=0)
+        pivot["Total"] = pivot.sum(axis=1)
+        pivot = pivot.sort_values("Total", ascending=False)
+
+        encabezados = [filas] + [str(c) for c in pivot.columns]
+        registros = [
+            (str(indice),) + tuple(int(v) for v in valores)
+            for indice, valores in zip(pivot.index, pivot.values)
+        ]
+        return encabezados, registros
+
+    def obtener_departamentos(self):
+        """Obtener departamentos presentes en el agregado"""
+        try:
+            self.cursor.execute(
+                "SELECT DISTINCT departamento FROM mv_consumo_departamental ORDER BY departamento")
+            return [row[0] for row in self.cursor.fetchall()]
+        except Exception as e:
+            print(f"Error al obtener departamentos de consumo: {e}")
+            return []
+
+    def obtener_categorias(self):
+        """Obtener categorías presentes en el agregado"""
+        try:
+            self.cursor.execute(
+                "SELECT DISTINCT categoria FROM mv_consumo_departamental ORDER BY categoria")
+            return [row[0] for row in self.cursor.fetchall()]
+        except Exception as e:
+            print(f"Error al obtener categorías de consumo: {e}")
+            return []
+
+    def close(self):
+        """Cerrar conexión"""
+        self.cursor.close()
+        self.conn.close()
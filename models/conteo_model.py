@@ -0,0 +1,243 @@
+from psycopg2.extras import execute_values
+from database import create_connection, ensure_schema, transaction
+from events import event_bus, StockChanged, MovementRecorded
+
+# Sesiones de conteo físico y tabla de preparación con las cantidades contadas
+CONTEO_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS conteos_inventario (
+        id_conteo SERIAL PRIMARY KEY,
+        id_ubicacion INTEGER REFERENCES ubicaciones(id_ubicacion),
+        descripcion VARCHAR(200),
+        estado VARCHAR(20) NOT NULL DEFAULT 'abierto',
+        id_responsable INTEGER,
+        fecha_inicio TIMESTAMP NOT NULL DEFAULT NOW(),
+        fecha_aplicacion TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS conteo_detalle (
+        id_conteo INTEGER NOT NULL
+            REFERENCES conteos_inventario(id_conteo) ON DELETE CASCADE,
+        id_producto INTEGER NOT NULL REFERENCES productos(id_producto),
+        cantidad_contada INTEGER NOT NULL CHECK (cantidad_contada >= 0),
+        fecha TIMESTAMP NOT NULL DEFAULT NOW(),
+        PRIMARY KEY (id_conteo, id_producto)
+    )
+    """,
+]
+
+# Productos del alcance de la sesión (todo el almacén o una ubicación) con su
+# cantidad contada; %(incluir)s decide si los no contados cuentan como cero
+_ALCANCE_CONTEO = """
+    FROM conteos_inventario c
+    JOIN inventario i
+      ON c.id_ubicacion IS NULL OR i.id_ubicacion = c.id_ubicacion
+    JOIN productos p ON p.id_producto = i.id_producto
+    LEFT JOIN ubicaciones u ON u.id_ubicacion = i.id_ubicacion
+    LEFT JOIN conteo_detalle d
+      ON d.id_conteo = c.id_conteo AND d.id_producto = i.id_producto
+    WHERE c.id_conteo = %(id_conteo)s
+      AND (d.id_producto IS NOT NULL OR (%(incluir)s AND p.activo = TRUE))
+"""
+
+
+class ConteoModel:
+    def __init__(self):
+        self.conn = create_connection()
+        self.cursor = self.conn.cursor()
+        ensure_schema(self.cursor, "conteos_inventario", CONTEO_SCHEMA)
+
+    def obtener_ubicaciones(self):
+        """Obtener ubicaciones activas"""
+        try:
+            self.cursor.execute(
+                "SELECT id_ubicacion, nombre FROM ubicaciones WHERE activo = TRUE ORDER BY nombre")
+            return self.cursor.fetchall()
+        except Exception as e:
+            print(f"Error al obtener ubicaciones: {e}")
+            return []
+
+    def obtener_conteos_abiertos(self):
+        """Obtener sesiones de conteo abiertas con su cantidad de líneas"""
+        try:
+            self.cursor.execute("""
+                SELECT c.id_conteo,
+                       COALESCE(c.descripcion, ''),
+                       COALESCE(u.nombre, 'Todas'),
+                       TO_CHAR(c.fecha_inicio, 'DD/MM/YYYY HH24:MI'),
+                       (SELECT COUNT(*) FROM conteo_detalle d WHERE d.id_conteo = c.id_conteo)
+                FROM conteos_inventario c
+                LEFT JOIN ubicaciones u ON c.id_ubicacion = u.id_ubicacion
+                WHERE c.estado = 'abierto'
+                ORDER BY c.fecha_inicio DESC
+            """)
+            return self.cursor.fetchall()
+        except Exception as e:
+            print(f"Error al obtener conteos: {e}")
+            return []
+
+    def crear_conteo(self, id_ubicacion, descripcion, id_responsable=None):
+        """Crear una nueva sesión de conteo"""
+        try:
+            self.cursor.execute("""
+                INSERT INTO conteos_inventario (id_ubicacion, descripcion, id_responsable)
+                VALUES (%s, %s, %s)
+                RETURNING id_conteo
+            """, (id_ubicacion, descripcion or None, id_responsable))
+            return self.cursor.fetchone()[0]
+        except Exception as e:
+            self.conn.rollback()
+            raise e
+
+    def anular_conteo(self, id_conteo):
+        """Anular una sesión de conteo abierta"""
+        try:
+            self.cursor.execute("""
+                UPDATE conteos_inventario SET estado = 'anulado'
+                WHERE id_conteo = %s AND estado = 'abierto'
+            """, (id_conteo,))
+        except Exception as e:
+            self.conn.rollback()
+            raise e
+
+    def obtener_indice_codigos(self, id_conteo):
+        """Obtener índice código -> (id_producto, nombre) del alcance de la sesión"""
+        try:
+            self.cursor.execute("""
+                SELECT LOWER(p.codigo), p.id_producto, p.nombre
+                FROM conteos_inventario c
+                JOIN inventario i
+                  ON c.id_ubicacion IS NULL OR i.id_ubicacion = c.id_ubicacion
+                JOIN productos p ON p.id_producto = i.id_producto
+                WHERE c.id_conteo = %s AND p.codigo IS NOT NULL
+            """, (id_conteo,))
+            return {codigo.strip(): (pid, nombre)
+                    for codigo, pid, nombre in self.cursor.fetchall()}
+        except Exception as e:
+            print(f"Error al obtener índice de códigos: {e}")
+            return {}
+
+    def registrar_cantidades(self, id_conteo, lineas, acumular=True):
+        """Guardar en lote cantidades contadas (id_producto, cantidad).
+
+        Con `acumular` las cantidades se suman a lo ya contado (escaneo);
+        si no, reemplazan el valor anterior (importación de planilla).
+        """
+        totales = {}
+        for id_producto, cantidad in lineas:
+            totales[int(id_producto)] = totales.get(int(id_producto), 0) + int(cantidad)
+        if not totales:
+            return 0
+
+        actualizacion = ("conteo_detalle.cantidad_contada + EXCLUDED.cantidad_contada"
+                         if acumular else "EXCLUDED.cantidad_contada")
+        with transaction(self.conn) as cursor:
+            execute_values(cursor, f"""
+                INSERT INTO conteo_detalle (id_conteo, id_producto, cantidad_contada)
+                VALUES %s
+                ON CONFLICT (id_conteo, id_producto) DO UPDATE
+                SET cantidad_contada = {actualizacion}, fecha = NOW()
+            """, [(id_conteo, pid, qty) for pid, qty in totales.items()], page_size=1000)
+        return len(totales)
+
+    def obtener_diferencias(self, id_conteo, incluir_no_contados=False):
+        """Calcular en una sola consulta las diferencias contra inventario"""
+        self.cursor.execute(f"""
+            SELECT p.id_producto,
+                   COALESCE(p.codigo, ''),
+                   p.nombre,
+                   COALESCE(u.nombre, 'N/A'),
+                   i.stock,
+                   d.cantidad_contada,
+                   COALESCE(d.cantidad_contada, 0) - i.stock AS diferencia
+            {_ALCANCE_CONTEO}
+            ORDER BY ABS(COALESCE(d.cantidad_contada, 0) - i.stock) DESC, p.nombre
+        """, {'id_conteo': id_conteo, 'incluir': incluir_no_contados})
+        return self.cursor.fetchall()
+
+    def aplicar_conteo(self, id_conteo, id_responsable=None, incluir_no_contados=False):
+        """Aplicar todos los ajustes del conteo y sus movimientos en una transacción.
+
+        Devuelve (productos ajustados, unidades de entrada, unidades de salida).
+        """
+        with transaction(self.conn) as cursor:
+            cursor.execute("""
+                SELECT estado FROM conteos_inventario
+                WHERE id_conteo = %s FOR UPDATE
+            """, (id_conteo,))
+            row = cursor.fetchone()
+            if not row or row[0] != 'abierto':
+                raise ValueError("La sesión de conteo no está abierta")
+
+            if id_responsable is not None:
+                cursor.execute(
+                    "SELECT 1 FROM usuarios WHERE id = %s", (id_responsable,))
+                if not cursor.fetchone():
+                    id_responsable = None
+
+            cursor.execute(f"""
+                WITH ajustes AS (
+                    SELECT i.id_producto,
+                           i.stock AS stock_sistema,
+                           COALESCE(d.cantidad_contada, 0) AS contado,
+                           COALESCE(p.stock_minimo, 0) AS stock_minimo
+                    {_ALCANCE_CONTEO}
+                      AND COALESCE(d.cantidad_contada, 0) <> i.stock
+                    FOR UPDATE OF i
+                ),
+                actualizados AS (
+                    UPDATE inventario i
+                    SET stock = a.contado,
+                        estado_stock = CASE
+                            WHEN a.contado = 0 THEN 'agotado'
+                            WHEN a.contado <= a.stock_minimo THEN 'stock bajo'
+                            ELSE 'disponible'
+                        END
+                    FROM ajustes a
+                    WHERE i.id_producto = a.id_producto
+                    RETURNING i.id_producto, a.stock_sistema, a.contado
+                )
+                INSERT INTO movimientos (
+                    id_producto, tipo, cantidad, id_responsable, referencia, fecha
+                )
+                SELECT id_producto,
+                       CASE WHEN contado > stock_sistema THEN 'Entrada' ELSE 'Salida' END,
+                       ABS(contado - stock_sistema),
+                       %(responsable)s,
+                       %(referencia)s,
+                       NOW()
+                FROM actualizados
+                RETURNING id_producto, tipo, cantidad
+            """, {
+                'id_conteo': id_conteo,
+                'incluir': incluir_no_contados,
+                'responsable': id_responsable,
+                'referencia': f"Conteo físico #{id_conteo}"
+            })
+            movimientos = cursor.fetchall()
+
+            cursor.execute("""
+                UPDATE conteos_inventario
+                SET estado = 'aplicado', fecha_aplicacion = NOW()
+                WHERE id_conteo = %s
+            """, (id_conteo,))
+
+        if movimientos:
+            ajustados = [pid for pid, _, _ in movimientos]
+            event_bus.publish(StockChanged(ajustados))
+            event_bus.publish(MovementRecorded(ajustados))
+
+        entradas = sum(qty for _, tipo, qty in movimientos if tipo == 'Entrada')
+        salidas = sum(qty for _, tipo, qty in movimientos if tipo == 'Salida')
+        return len(movimientos), entradas, salidas
+
+    def close(self):
+        """Cerrar conexión"""
+        try:
+            if self.cursor:
+                self.cursor.close()
+            if self.conn:
+                self.conn.close()
+        except Exception as e:
+            print(f"Error al cerrar conexión: {e}")
@@ -106,8 +106,8 @@ class ExportManager:
         """
         Exportación específica para inventario
         """
-        headers = ["Nro", "Producto", "Marca", "Categoría",
-                   "Código", "Stock", "Ubicación", "Estado"]
+        headers = ["Nro", "Producto", "Marca", "Categoría", "Código",
+                   "Stock", "Stock (m)", "Ubicación", "Estado", "Clase"]
         return ExportManager.export_to_excel(data, headers, "inventario", "Inventario")
 
     @staticmethod
@@ -116,7 +116,7 @@ class ExportManager:
         Exportación específica para movimientos
         """
         headers = ["Nro", "Fecha", "Tipo", "Producto",
-                   "Cantidad", "Ubicación", "Responsable", "Referencia"]
+                   "Cantidad", "Responsable", "Referencia"]
         return ExportManager.export_to_excel(data, headers, "movimientos", "Movimientos")
 
     @staticmethod
@@ -146,6 +146,13 @@ class ExportManager:
                    "Solicitante", "Referencia", "Responsable Entrega"]
         return ExportManager.export_to_excel(data, headers, "solicitudes", "Solicitudes")
 
+    @staticmethod
+    def export_consumption(data, headers):
+        """
+        Exportación específica para el análisis de consumo departamental
+        """
+        return ExportManager.export_to_excel(data, headers, "consumo_departamental", "Consumo")
+
     @staticmethod
     def export_with_custom_format(data, headers, filename_prefix, sheet_name="Datos"):
         """
@@ -0,0 +1,327 @@
+import re
+import unicodedata
+import zipfile
+import xml.etree.ElementTree as ET
+from database import create_connection, transaction
+from events import event_bus, ReferenceDataChanged
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+def _normalize(text):
+    """Minúsculas, sin acentos ni signos: 'Categorías' -> 'categorias'"""
+    text = unicodedata.normalize("NFKD", str(text or ""))
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return re.sub(r"[^a-z0-9]+", " ", text.lower()).strip()
+
+
+def _clean(text):
+    """Recortar y colapsar espacios internos"""
+    return re.sub(r"\s+", " ", str(text or "")).strip()
+
+
+class MasterDataModel:
+    # Tablas maestras soportadas: clave natural, columnas y alias de encabezado
+    TABLES = {
+        'departamentos': {
+            'id': 'id_departamento', 'key': 'nombre', 'columns': ('nombre',),
+            'aliases': ('departamentos', 'departamento'),
+        },
+        'categorias': {
+            'id': 'id_categoria', 'key': 'nombre', 'columns': ('nombre',),
+            'aliases': ('categorias', 'categoria'),
+        },
+        'marcas': {
+            'id': 'id_marca', 'key': 'nombre', 'columns': ('nombre',),
+            'aliases': ('marcas', 'marca'),
+        },
+        'ubicaciones': {
+            'id': 'id_ubicacion', 'key': 'nombre', 'columns': ('nombre',),
+            'aliases': ('ubicaciones', 'ubicacion'),
+        },
+        'solicitantes': {
+            'id': 'id_solicitante', 'key': 'cedula',
+            'columns': ('cedula', 'nombre', 'departamento'),
+            'aliases': ('solicitantes', 'solicitante', 'responsables'),
+        },
+    }
+    # Orden de aplicación: los solicitantes dependen de los departamentos
+    ORDER = ('departamentos', 'categorias', 'marcas', 'ubicaciones', 'solicitantes')
+
+    COLUMN_ALIASES = {
+        'nombre': ('nombre', 'descripcion', 'nombre completo'),
+        'cedula': ('cedula', 'ci', 'documento'),
+        'departamento': ('departamento', 'dependencia'),
+    }
+
+    def __init__(self, conn=None):
+        self.conn = conn or create_connection(show_errors=False)
+        self.cursor = self.conn.cursor()
+        self._activo = {}
+
+    def _has_activo(self, table):
+        """Verificar si la tabla tiene columna 'activo' (no todas la tienen)"""
+        if table not in self._activo:
+            self.cursor.execute("""
+                SELECT column_name
+                FROM information_schema.columns
+                WHERE table_name = %s AND column_name = 'activo'
+            """, (table,))
+            self._activo[table] = self.cursor.fetchone() is not None
+        return self._activo[table]
+
+    # ===== LECTURA DE DOCUMENTOS =====
+
+    @classmethod
+    def _table_for(cls, text):
+        """Identificar una tabla maestra a partir de un título o encabezado"""
+        words = set(_normalize(text).split())
+        for table, spec in cls.TABLES.items():
+            if words & set(spec['aliases']):
+                return table
+        return None
+
+    @classmethod
+    def _column_for(cls, header):
+        """Identificar la columna de una tabla maestra a partir de su encabezado"""
+        header = _normalize(header)
+        for column, aliases in cls.COLUMN_ALIASES.items():
+            if header in aliases:
+                return column
+        return None
+
+    @staticmethod
+    def _read_docx_blocks(filename):
+        """Recorrer el cuerpo del .docx devolviendo ('p', texto) y ('tbl', filas)"""
+        with zipfile.ZipFile(filename) as docx:
+            root = ET.fromstring(docx.read("word/document.xml"))
+
+        blocks = []
+        for element in root.find(f"{_W}body"):
+            if element.tag == f"{_W}p":
+                blocks.append(("p", "".join(t.text or "" for t in element.iter(f"{_W}t"))))
+            elif element.tag == f"{_W}tbl":
+                rows = []
+                for tr in element.findall(f"{_W}tr"):
+                    rows.append([
+                        " ".join("".join(t.text or "" for t in p.iter(f"{_W}t"))
+                                 for p in tc.findall(f"{_W}p"))
+                        for tc in tr.findall(f"{_W}tc")
+                    ])
+                blocks.append(("tbl", rows))
+        return blocks
+
+    def parse_docx(self, filename):
+        """Extraer registros de las tablas maestras contenidas en un .docx.
+
+        Reconoce dos formatos de tabla de Word:
+        - una columna por tabla maestra (encabezados 'Categorías', 'Marcas', ...)
+        - una tabla por entidad precedida por un título con su nombre, con
+          encabezados de columna ('Cédula', 'Nombre', 'Departamento', ...)
+        Devuelve {tabla: [registro, ...]} y la lista de avisos de lectura.
+        """
+        data = {table: [] for table in self.TABLES}
+        warnings = []
+        last_title = ""
+
+        for kind, content in self._read_docx_blocks(filename):
+            if kind == "p":
+                if content.strip():
+                    last_title = content
+                continue
+
+            rows = [[_clean(c) for c in row] for row in content if any(_clean(c) for c in row)]
+            if len(rows) < 2:
+                continue
+            headers = rows[0]
+
+            # Formato 1: cada columna es una tabla maestra de nombres
+            column_tables = [self._table_for(h) for h in headers]
+            if all(t and self.TABLES[t]['columns'] == ('nombre',) for t in column_tables):
+                for index, table in enumerate(column_tables):
+                    data[table].extend(
+                        {'nombre': row[index]} for row in rows[1:]
+                        if index < len(row) and row[index])
+                continue
+
+            # Formato 2: tabla de una entidad identificada por el título previo
+            table = self._table_for(last_title) or self._table_for(headers[0])
+            if not table:
+                warnings.append(
+                    f"Tabla sin identificar (encabezados: {', '.join(headers)})")
+                continue
+
+            columns = [self._column_for(h) for h in headers]
+            if table != 'solicitantes' and 'nombre' not in columns:
+                # Tabla de una sola columna titulada con el nombre de la entidad
+                columns = ['nombre'] + columns[1:]
+
+            for row in rows[1:]:
+                record = {c: row[i] for i, c in enumerate(columns)
+                          if c in self.TABLES[table]['columns'] and i < len(row) and row[i]}
+                if record.get(self.TABLES[table]['key']):
+                    data[table].append(record)
+
+        return data, warnings
+
+    # ===== COMPARACIÓN =====
+
+    def _current_rows(self, table):
+        """Leer la tabla maestra actual indexada por clave natural normalizada"""
+        spec = self.TABLES[table]
+        # Sin columna 'activo' todos los registros cuentan como activos
+        has_activo = self._has_activo(table)
+        if table == 'solicitantes':
+            self.cursor.execute(f"""
+                SELECT s.id_solicitante, s.cedula, s.nombre,
+                       COALESCE(d.nombre, ''), {'COALESCE(s.activo, TRUE)' if has_activo else 'TRUE'}
+                FROM solicitantes s
+                LEFT JOIN departamentos d ON d.id_departamento = s.id_departamento
+            """)
+            return {_normalize(r[1]): {'id': r[0], 'cedula': r[1], 'nombre': r[2],
+                                       'departamento': r[3], 'activo': r[4]}
+                    for r in self.cursor.fetchall()}
+
+        self.cursor.execute(
+            f"SELECT {spec['id']}, nombre, "
+            f"{'COALESCE(activo, TRUE)' if has_activo else 'TRUE'} FROM {table}")
+        return {_normalize(r[1]): {'id': r[0], 'nombre': r[1], 'activo': r[2]}
+                for r in self.cursor.fetchall()}
+
+    def compute_diff(self, data, deactivate_missing=False):
+        """Comparar los registros del documento con las tablas maestras.
+
+        Devuelve {tabla: {'insert': [...], 'update': [...], 'deactivate': [...]}}.
+        Las actualizaciones incluyen reactivar registros inactivos presentes en el
+        documento y, para solicitantes, cambios de nombre o departamento.
+        """
+        # Los departamentos citados por solicitantes también deben existir
+        data = dict(data)
+        data['departamentos'] = list(data.get('departamentos', [])) + [
+            {'nombre': r['departamento']}
+            for r in data.get('solicitantes', []) if r.get('departamento')]
+
+        diff = {}
+        for table in self.ORDER:
+            spec = self.TABLES[table]
+            current = self._current_rows(table)
+            changes = {'insert': [], 'update': [], 'deactivate': []}
+            seen = set()
+
+            for record in data.get(table, []):
+                key = _normalize(record[spec['key']])
+                if not key or key in seen:
+                    continue
+                seen.add(key)
+                existing = current.get(key)
+
+                if existing is None:
+                    changes['insert'].append(record)
+                    continue
+
+                changed = {}
+                if not existing['activo']:
+                    changed['activo'] = True
+                if table == 'solicitantes':
+                    if record.get('nombre') and record['nombre'] != existing['nombre']:
+                        changed['nombre'] = record['nombre']
+                    if (record.get('departamento') and
+                            _normalize(record['departamento']) != _normalize(existing['departamento'])):
+                        changed['departamento'] = record['departamento']
+                if changed:
+                    changes['update'].append({'id': existing['id'], 'actual': existing,
+                                              'cambios': changed})
+
+            if deactivate_missing and self._has_activo(table):
+                changes['deactivate'] = [row for key, row in current.items()
+                                         if key not in seen and row['activo']]
+            diff[table] = changes
+        return diff
+
+    # ===== APLICACIÓN =====
+
+    def apply_diff(self, diff):
+        """Aplicar inserciones, actualizaciones y desactivaciones en una transacción"""
+        with transaction(self.conn) as cursor:
+            for table in self.ORDER:
+                changes = diff.get(table)
+                if not changes:
+                    continue
+                spec = self.TABLES[table]
+
+                has_activo = self._has_activo(table)
+
+                if table == 'solicitantes':
+                    self._apply_requesters(cursor, changes, has_activo)
+                elif changes['insert'] and has_activo:
+                    cursor.execute(f"""
+                        INSERT INTO {table} (nombre, activo)
+                        SELECT UNNEST(%s::varchar[]), TRUE
+                    """, ([r['nombre'] for r in changes['insert']],))
+                elif changes['insert']:
+                    cursor.execute(f"""
+                        INSERT INTO {table} (nombre)
+                        SELECT UNNEST(%s::varchar[])
+                    """, ([r['nombre'] for r in changes['insert']],))
+
+                # Reactivar y desactivar solo donde existe la columna 'activo'
+                if table != 'solicitantes' and has_activo:
+                    reactivate = [u['id'] for u in changes['update']]
+                    if reactivate:
+                        cursor.execute(
+                            f"UPDATE {table} SET activo = TRUE WHERE {spec['id']} = ANY(%s)",
+                            (reactivate,))
+
+                if changes['deactivate'] and has_activo:
+                    cursor.execute(
+                        f"UPDATE {table} SET activo = FALSE WHERE {spec['id']} = ANY(%s)",
+                        ([r['id'] for r in changes['deactivate']],))
+
+        for table in self.ORDER:
+            if any(diff.get(table, {}).values()):
+                event_bus.publish(ReferenceDataChanged(table))
+
+    def _apply_requesters(self, cursor, changes, has_activo=True):
+        """Aplicar cambios de solicitantes resolviendo departamentos por nombre"""
+        cursor.execute("SELECT id_departamento, nombre FROM departamentos")
+        departments = {_normalize(name): dep_id for dep_id, name in cursor.fetchall()}
+
+        def department_id(name):
+            return departments.get(_normalize(name)) if name else None
+
+        if changes['insert']:
+            cursor.execute(f"""
+                INSERT INTO solicitantes (cedula, nombre, id_departamento{', activo' if has_activo else ''})
+                SELECT v.cedula, v.nombre, v.id_departamento{', TRUE' if has_activo else ''}
+                FROM UNNEST(%s::varchar[], %s::varchar[], %s::int[])
+                     AS v(cedula, nombre, id_departamento)
+            """, (
+                [r['cedula'] for r in changes['insert']],
+                [r.get('nombre') or r['cedula'] for r in changes['insert']],
+                [department_id(r.get('departamento')) for r in changes['insert']],
+            ))
+
+        if changes['update']:
+            cursor.execute(f"""
+                UPDATE solicitantes s
+                SET nombre = COALESCE(v.nombre, s.nombre),
+                    id_departamento = COALESCE(v.id_departamento, s.id_departamento)
+                    {', activo = TRUE' if has_activo else ''}
+                FROM UNNEST(%s::int[], %s::varchar[], %s::int[])
+                     AS v(id_solicitante, nombre, id_departamento)
+                WHERE s.id_solicitante = v.id_solicitante
+            """, (
+                [u['id'] for u in changes['update']],
+                [u['cambios'].get('nombre') for u in changes['update']],
+                [department_id(u['cambios'].get('departamento')) for u in changes['update']],
+            ))
+
+    def close(self):
+        """Cerrar conexión"""
+        try:
+            if self.cursor:
+                self.cursor.close()
+            if self.conn:
+                self.conn.close()
+        except Exception as e:
+            print(f"Error al cerrar conexión: {e}")
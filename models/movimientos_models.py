@@ -1,5 +1,16 @@
 from datetime import datetime
 from database import create_connection
+from prepared_statements import prepared
+from events import event_bus, MovementRecorded
+
+
+_NOMBRE_PRODUCTO = prepared("SELECT nombre FROM productos WHERE id_producto = %s")
+_USUARIO_EXISTE = prepared("SELECT id FROM usuarios WHERE id = %s")
+_INSERTAR_MOVIMIENTO = prepared("""
+    INSERT INTO movimientos (
+        id_producto, tipo, cantidad, id_responsable, referencia, fecha
+    ) VALUES (%s, %s, %s, %s, %s, %s)
+""")
 
 
 class MovementModel:
@@ -41,15 +52,14 @@ class MovementModel:
 
         query += " ORDER BY m.fecha DESC"
 
-        self.cursor.execute(query, params)
+        self.cursor.execute(prepared(query), params)
         return self.cursor.fetchall()
 
     def register_movement(self, id_producto, tipo, cantidad, id_responsable=None, referencia=None):
         """Registra un movimiento en la base de datos (sin ubicación)"""
         try:
             # Obtener el nombre del producto para la referencia
-            self.cursor.execute(
-                "SELECT nombre FROM productos WHERE id_producto = %s", (id_producto,))
+            self.cursor.execute(_NOMBRE_PRODUCTO, (id_producto,))
             producto_nombre = self.cursor.fetchone()[0]
 
             # Determinar la referencia automática basada en el tipo de movimiento
@@ -63,16 +73,11 @@ class MovementModel:
 
             # Validar que el responsable exista si se proporciona
             if id_responsable is not None:
-                self.cursor.execute(
-                    "SELECT id FROM usuarios WHERE id = %s", (id_responsable,))
+                self.cursor.execute(_USUARIO_EXISTE, (id_responsable,))
                 if not self.cursor.fetchone():
                     id_responsable = None
 
-            self.cursor.execute("""
-                INSERT INTO movimientos (
-                    id_producto, tipo, cantidad, id_responsable, referencia, fecha
-                ) VALUES (%s, %s, %s, %s, %s, %s)
-            """, (
+            self.cursor.execute(_INSERTAR_MOVIMIENTO, (
                 id_producto,
                 tipo,
                 cantidad,
@@ -81,6 +86,7 @@ class MovementModel:
                 datetime.now()
             ))
             self.conn.commit()
+            event_bus.publish(MovementRecorded([id_producto], tipo))
             return True
         except Exception as e:
             self.conn.rollback()
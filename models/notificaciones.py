@@ -1,12 +1,55 @@
-from tkinter import ttk, messagebox
 import tkinter as tk
-from database import create_connection
-from helpers import clear_frame
+from database import create_connection, ensure_schema
+from prepared_statements import prepared
+from models.product_model import CLASSIFICATION_SCHEMA
 from views.base_view import BaseView
+from views.notificaciones_view import NotificationPanelView
+from events import event_bus, StockChanged, ProductChanged
 
-# Conexión a PostgreSQL
-conn = create_connection()
-cursor = conn.cursor()
+# Estado de lectura por usuario. Se guarda la severidad leída (1 stock bajo,
+# 2 agotado): si el producto empeora vuelve a figurar como no leído, y la
+# marca se borra cuando el producto sale de stock bajo. Sin sesión iniciada
+# no se guarda nada.
+NOTIFICACIONES_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS notificaciones_leidas (
+        id_usuario INTEGER NOT NULL,
+        id_producto INTEGER NOT NULL REFERENCES productos(id_producto) ON DELETE CASCADE,
+        severidad SMALLINT NOT NULL,
+        leida TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (id_usuario, id_producto)
+    )
+    """,
+    # Las versiones anteriores guardaban las marcas sin sesión con el usuario 0
+    "ALTER TABLE notificaciones_leidas ALTER COLUMN id_usuario DROP DEFAULT",
+    "DELETE FROM notificaciones_leidas WHERE id_usuario = 0",
+]
+
+# Marcas de productos que ya no están bajo el mínimo
+_LIMPIAR_LEIDAS = """
+    DELETE FROM notificaciones_leidas l
+    USING productos p, inventario i
+    WHERE p.id_producto = l.id_producto
+      AND i.id_producto = l.id_producto
+      AND (NOT p.activo OR i.stock > COALESCE(p.stock_minimo, 0))
+"""
+
+# Agotados primero; luego por clase ABC (los productos A primero)
+_STOCK_BAJO = prepared("""
+    SELECT p.id_producto, p.nombre, i.stock, c.nombre as categoria,
+           p.stock_minimo, p.clase_abc,
+           CASE WHEN i.stock <= 0 THEN 2 ELSE 1 END AS severidad,
+           COALESCE(l.severidad >= CASE WHEN i.stock <= 0 THEN 2 ELSE 1 END,
+                    FALSE) AS leida
+    FROM productos p
+    JOIN inventario i ON p.id_producto = i.id_producto
+    LEFT JOIN categorias c ON p.id_categoria = c.id_categoria
+    LEFT JOIN notificaciones_leidas l
+           ON l.id_producto = p.id_producto AND l.id_usuario = %s
+    WHERE p.activo = TRUE
+      AND i.stock <= COALESCE(p.stock_minimo, 0)
+    ORDER BY severidad DESC, COALESCE(p.clase_abc, 'C') ASC, i.stock ASC
+""")
 
 
 class NotificationManager(BaseView):
@@ -15,21 +58,59 @@ class NotificationManager(BaseView):
         super().__init__(None, app)
         self.app = app
         self.notification_count = 0
+        self.unread_count = 0
         self.notifications = []
+        self.conn = create_connection()
+        self.cursor = self.conn.cursor()
+        self.panel = NotificationPanelView(app)
+        self.panel.set_controller(self)
+
+        # Recalcular solo cuando cambian stock o mínimos, no en cada recarga de tabla
+        self._refresh_pending = False
+        # La primera verificación limpia las marcas que quedaron de otras sesiones
+        self._cleanup_pending = True
+        event_bus.subscribe_many({
+            StockChanged: self._on_stock_changed,
+            ProductChanged: self._on_stock_changed,
+        })
+
+    def _on_stock_changed(self, event):
+        """Agrupar los cambios de una misma acción en una sola verificación"""
+        if not self._refresh_pending:
+            self._refresh_pending = True
+            self.app.after_idle(self.refresh_low_stock)
 
     def check_low_stock(self):
+        """Verifica productos con stock bajo y programa la próxima verificación"""
+        try:
+            self.refresh_low_stock()
+        finally:
+            # Programar la próxima verificación en 5 minutos (300000 ms); la
+            # clave reemplaza a la pendiente para no acumular temporizadores
+            self.app.app_scope.after(300000, self.check_low_stock, key="stock_bajo")
+
+    def refresh_low_stock(self):
         """Verifica productos con stock bajo y actualiza las notificaciones"""
+        self._refresh_pending = False
         try:
-            cursor.execute("""
-                SELECT p.id_producto, p.nombre, i.stock, c.nombre as categoria, p.stock_minimo
-                FROM productos p
-                JOIN inventario i ON p.id_producto = i.id_producto
-                LEFT JOIN categorias c ON p.id_categoria = c.id_categoria
-                WHERE p.activo = TRUE
-                  AND i.stock <= COALESCE(p.stock_minimo, 0)
-                ORDER BY i.stock ASC
-            """)
-            low_stock_items = cursor.fetchall()
+            ensure_schema(self.cursor, "clasificacion_abc_xyz",
+                          CLASSIFICATION_SCHEMA)
+            ensure_schema(self.cursor, "notificaciones_leidas",
+                          NOTIFICACIONES_SCHEMA)
+            if self._cleanup_pending:
+                self.cursor.execute(_LIMPIAR_LEIDAS)
+                self._cleanup_pending = False
+
+            self.cursor.execute(_STOCK_BAJO, (self._user_id(),))
+            low_stock_items = self.cursor.fetchall()
+
+            # Olvidar las marcas solo de los productos que salieron de la lista
+            recuperados = ({n['id'] for n in self.notifications}
+                           - {item[0] for item in low_stock_items})
+            if recuperados:
+                self.cursor.execute(
+                    "DELETE FROM notificaciones_leidas WHERE id_producto = ANY(%s)",
+                    (list(recuperados),))
 
             self.notifications = []
             for item in low_stock_items:
@@ -38,25 +119,31 @@ class NotificationManager(BaseView):
                     'product': item[1],
                     'stock': item[2],
                     'category': item[3] or 'Sin categoría',
-                    'stock_minimo': item[4] if item[4] is not None else 0
+                    'stock_minimo': item[4] if item[4] is not None else 0,
+                    'clase': item[5] or '-',
+                    'severidad': item[6],
+                    'leida': item[7]
                 })
 
             self.notification_count = len(self.notifications)
+            self.unread_count = sum(1 for n in self.notifications if not n['leida'])
             self.update_bell_icon()
+            self.panel.render(self.notifications)
 
         except Exception as e:
             print(f"Error al verificar stock bajo: {e}")
-            conn.rollback()
-        finally:
-            # Programar la próxima verificación en 5 minutos (300000 ms)
-            self.app.after(300000, self.check_low_stock)
+            self.conn.rollback()
+
+    def _user_id(self):
+        """ID del usuario en sesión para el estado de lectura (None sin sesión)"""
+        return getattr(getattr(self.app, 'current_user', None), 'id', None)
 
     def update_bell_icon(self):
-        """Actualiza el ícono de la campana con el contador de notificaciones"""
+        """Actualiza el ícono de la campana con el contador de no leídas"""
         if hasattr(self.app, 'bell_icon'):
-            if self.notification_count > 0:
+            if self.unread_count > 0:
                 self.app.bell_icon.config(
-                    text=f"🔔 ({self.notification_count})", 
+                    text=f"🔔 ({self.unread_count})", 
                     fg="red",
                     bg=self.bg_color,
                     font=self.button_font
@@ -70,100 +157,64 @@ class NotificationManager(BaseView):
                 )
 
     def show_notifications(self):
-        """Muestra el menú de notificaciones con estilos aplicados"""
-        if not hasattr(self.app, 'notification_menu'):
-            self.app.notification_menu = tk.Menu(
-                self.app, 
-                tearoff=0,
-                bg=self.bg_color,
-                fg=self.fg_color,
-                font=self.entry_font,
-                relief="solid",
-                borderwidth=1
-            )
-
-        # Limpiar menú anterior
-        self.app.notification_menu.delete(0, tk.END)
-
-        if self.notification_count == 0:
-            self.app.notification_menu.add_command(
-                label="No hay notificaciones",
-                state=tk.DISABLED,
-                background=self.bg_color,
-                foreground=self.fg_color,
-                font=self.entry_font
-            )
-        else:
-            self.app.notification_menu.add_command(
-                label=f"Tienes {self.notification_count} notificaciones",
-                state=tk.DISABLED,
-                background=self.bg_color,
-                foreground=self.primary_color,
-                font=self.label_font
-            )
-            self.app.notification_menu.add_separator()
-
-            for notification in self.notifications:
-                text = f"{notification['product']} - Stock: {notification['stock']} ({notification['category']})"
-                self.app.notification_menu.add_command(
-                    label=text,
-                    command=lambda n=notification: self.show_product_detail(n['id']),
-                    background=self.bg_color,
-                    foreground=self.fg_color,
-                    font=self.entry_font,
-                    activebackground=self.primary_color,
-                    activeforeground="white"
-                )
-
-            self.app.notification_menu.add_separator()
-            self.app.notification_menu.add_command(
-                label="Marcar todas como leídas",
-                command=self.mark_all_as_read,
-                background=self.bg_color,
-                foreground=self.primary_color,
-                font=self.button_font,
-                activebackground=self.primary_color,
-                activeforeground="white"
-            )
-
-        # Mostrar el menú
-        try:
-            self.app.notification_menu.tk_popup(
-                self.app.winfo_pointerx(),
-                self.app.winfo_pointery()
-            )
-        finally:
-            self.app.notification_menu.grab_release()
+        """Abre el centro de notificaciones (las filas se crean al expandir cada grupo)"""
+        self.panel.show(self.notifications)
 
     def show_product_detail(self, product_id):
-        """Muestra los detalles del producto con stock bajo"""
-        from menu.productos import show_inventory, edit_selected_product
-        show_inventory(self.app)
-
-        # Buscar el producto en el treeview y seleccionarlo
-        tree = None
-        for widget in self.app.content_frame.winfo_children():
-            if isinstance(widget, ttk.Treeview):
-                tree = widget
+        """Marca la notificación como leída y muestra el producto en el inventario"""
+        from menu.productos import show_inventory
+        self.mark_as_read([product_id])
+        self.panel.close()
+
+        controller = self.app.open_screen("📦 Inventario", show_inventory)
+        tree = getattr(getattr(controller, 'view', None), 'tree', None)
+        if tree is None:
+            return
+
+        # Las filas del inventario llevan el ID del producto como primer tag
+        for child in tree.get_children():
+            tags = tree.item(child, 'tags')
+            if tags and int(tags[0]) == product_id:
+                tree.selection_set(child)
+                tree.focus(child)
+                tree.see(child)
                 break
 
-        if tree:
-            for child in tree.get_children():
-                if tree.item(child, 'tags')[0] == str(product_id):
-                    tree.selection_set(child)
-                    tree.focus(child)
-                    tree.see(child)
-                    
-                    # Resaltar la fila seleccionada
-                    tree.tag_configure('selected', background=self.primary_color)
-                    tree.item(child, tags=('selected',))
-                    break
+    def mark_as_read(self, product_ids):
+        """Marca como leídas las notificaciones de los productos indicados.
 
-    def mark_all_as_read(self):
-        """Marca todas las notificaciones como leídas (no las elimina, solo actualiza el contador)"""
-        self.notification_count = 0
+        Sin sesión iniciada la marca dura hasta la próxima verificación.
+        """
+        if not product_ids:
+            return
+        user_id = self._user_id()
+        try:
+            if user_id is not None:
+                self.cursor.execute("""
+                    INSERT INTO notificaciones_leidas (id_usuario, id_producto, severidad)
+                    SELECT %s, i.id_producto, CASE WHEN i.stock <= 0 THEN 2 ELSE 1 END
+                    FROM inventario i
+                    WHERE i.id_producto = ANY(%s)
+                    ON CONFLICT (id_usuario, id_producto)
+                    DO UPDATE SET severidad = EXCLUDED.severidad, leida = CURRENT_TIMESTAMP
+                """, (user_id, list(product_ids)))
+        except Exception as e:
+            print(f"Error al marcar notificaciones como leídas: {e}")
+            self.conn.rollback()
+            return
+
+        ids = set(product_ids)
+        for notification in self.notifications:
+            if notification['id'] in ids:
+                notification['leida'] = True
+        self.unread_count = sum(1 for n in self.notifications if not n['leida'])
         self.update_bell_icon()
-        
+        self.panel.render(self.notifications)
+
+    def mark_all_as_read(self):
+        """Marca como leídas todas las notificaciones vigentes"""
+        self.mark_as_read([n['id'] for n in self.notifications if not n['leida']])
+
     def create_notification_bell(self, parent):
         """Crea el ícono de campana de notificaciones con estilos"""
         bell_icon = tk.Label(
@@ -223,7 +274,8 @@ class NotificationManager(BaseView):
         """Obtiene estadísticas de notificaciones"""
         return {
             'total': self.notification_count,
-            'low_stock': len([n for n in self.notifications if n['stock'] < 5]),
-            'out_of_stock': len([n for n in self.notifications if n['stock'] == 0]),
+            'unread': self.unread_count,
+            'low_stock': len([n for n in self.notifications if n['severidad'] == 1]),
+            'out_of_stock': len([n for n in self.notifications if n['severidad'] == 2]),
             'notifications': self.notifications
         }
\ No newline at end of file
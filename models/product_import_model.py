@@ -0,0 +1,355 @@
+import csv
+import io
+import uuid
+from database import create_connection, ensure_schema, transaction
+from events import (event_bus, ProductChanged, StockChanged, MovementRecorded,
+                    ReferenceDataChanged)
+
+# Tabla de preparación sin WAL para cargas masivas; cada importación usa su lote
+IMPORT_SCHEMA = [
+    """
+    CREATE UNLOGGED TABLE IF NOT EXISTS importacion_productos (
+        lote VARCHAR(40) NOT NULL,
+        fila INTEGER NOT NULL,
+        codigo TEXT,
+        nombre TEXT,
+        marca TEXT,
+        categoria TEXT,
+        ubicacion TEXT,
+        stock TEXT,
+        stock_minimo TEXT,
+        id_marca INTEGER,
+        id_categoria INTEGER,
+        id_ubicacion INTEGER,
+        id_producto INTEGER,
+        es_nuevo BOOLEAN NOT NULL DEFAULT FALSE,
+        stock_anterior INTEGER,
+        error TEXT,
+        PRIMARY KEY (lote, fila)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_importacion_productos_codigo "
+    "ON importacion_productos (lote, codigo)",
+]
+
+# Tablas de referencia: (tabla, columna id, columna en staging, etiqueta)
+_REFERENCIAS = [
+    ("marcas", "id_marca", "marca", "Marca"),
+    ("categorias", "id_categoria", "categoria", "Categoría"),
+    ("ubicaciones", "id_ubicacion", "ubicacion", "Ubicación"),
+]
+
+_ESTADO_STOCK = """
+    CASE
+        WHEN {stock} = 0 THEN 'agotado'
+        WHEN {stock} <= {minimo} THEN 'stock bajo'
+        ELSE 'disponible'
+    END
+"""
+
+
+class ProductImportModel:
+    # Alias aceptados en el encabezado de la planilla para cada columna
+    COLUMN_ALIASES = {
+        'codigo': ('codigo', 'código', 'cod', 'sku'),
+        'nombre': ('nombre', 'producto', 'descripcion', 'descripción'),
+        'marca': ('marca',),
+        'categoria': ('categoria', 'categoría'),
+        'ubicacion': ('ubicacion', 'ubicación'),
+        'stock': ('stock', 'cantidad', 'existencia'),
+        'stock_minimo': ('stock_minimo', 'stock mínimo', 'stock minimo', 'minimo', 'mínimo'),
+    }
+    COLUMNS = ('codigo', 'nombre', 'marca', 'categoria', 'ubicacion', 'stock', 'stock_minimo')
+
+    def __init__(self):
+        self.conn = create_connection()
+        self.cursor = self.conn.cursor()
+        ensure_schema(self.cursor, "importacion_productos", IMPORT_SCHEMA)
+
+    def read_file(self, filename):
+        """Leer una planilla CSV/Excel y devolver filas normalizadas (fila, valores...)"""
+        import pandas as pd
+
+        if filename.lower().endswith(".csv"):
+            df = pd.read_csv(filename, dtype=str, sep=None, engine="python",
+                             keep_default_na=False)
+        else:
+            df = pd.read_excel(filename, dtype=str, keep_default_na=False)
+
+        headers = {str(c).strip().lower(): c for c in df.columns}
+        mapping = {}
+        for column, aliases in self.COLUMN_ALIASES.items():
+            source = next((headers[a] for a in aliases if a in headers), None)
+            if source is not None:
+                mapping[column] = source
+
+        missing = [c for c in ('codigo', 'nombre') if c not in mapping]
+        if missing:
+            raise ValueError(
+                f"La planilla no tiene las columnas requeridas: {', '.join(missing)}")
+
+        columns = [df[mapping[c]] if c in mapping else None for c in self.COLUMNS]
+        rows = []
+        for position in range(len(df)):
+            values = [self._clean(col.iat[position]) if col is not None else None
+                      for col in columns]
+            if any(values):
+                # +2: encabezado y numeración desde 1 como en la planilla
+                rows.append((position + 2, *values))
+        return rows
+
+    @staticmethod
+    def _clean(value):
+        """Normalizar celdas: recortar espacios, vacíos a None y '12.0' a '12'"""
+        if value is None:
+            return None
+        value = str(value).strip()
+        if not value or value.lower() == "nan":
+            return None
+        if value.endswith(".0") and value[:-2].isdigit():
+            value = value[:-2]
+        return value
+
+    def import_rows(self, rows, id_responsable=None):
+        """Importar filas en una sola transacción.
+
+        Carga las filas con COPY en la tabla de preparación, valida y resuelve
+        (o crea) marcas, categorías y ubicaciones por conjuntos, actualiza o
+        inserta productos e inventario y registra los movimientos en bloque.
+        Devuelve un resumen con los contadores y la lista de errores por fila.
+        """
+        lote = uuid.uuid4().hex
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([lote] + ["" if v is None else v for v in row])
+        buffer.seek(0)
+
+        params = {'lote': lote, 'responsable': id_responsable,
+                  'referencia': f"Importación masiva {lote[:8]}"}
+
+        with transaction(self.conn) as cursor:
+            # Evitar altas concurrentes de los mismos códigos o nombres
+            cursor.execute("""
+                LOCK TABLE productos, inventario, marcas, categorias, ubicaciones
+                IN SHARE ROW EXCLUSIVE MODE
+            """)
+
+            cursor.copy_expert("""
+                COPY importacion_productos
+                    (lote, fila, codigo, nombre, marca, categoria, ubicacion, stock, stock_minimo)
+                FROM STDIN WITH (FORMAT csv)
+            """, buffer)
+
+            self._validate(cursor, params)
+            self._resolve_references(cursor, params)
+
+            if id_responsable is not None:
+                cursor.execute(
+                    "SELECT 1 FROM usuarios WHERE id = %s", (id_responsable,))
+                if not cursor.fetchone():
+                    params['responsable'] = None
+
+            creados, actualizados = self._upsert_products(cursor, params)
+            movimientos = self._register_movements(cursor, params)
+
+            cursor.execute("""
+                SELECT fila, COALESCE(codigo, ''), error
+                FROM importacion_productos
+                WHERE lote = %(lote)s AND error IS NOT NULL
+                ORDER BY fila
+            """, params)
+            errores = cursor.fetchall()
+
+            cursor.execute(
+                "DELETE FROM importacion_productos WHERE lote = %(lote)s", params)
+
+        # La importación toca un conjunto de productos no determinado
+        if creados or actualizados:
+            for table in ('marcas', 'categorias', 'ubicaciones'):
+                event_bus.publish(ReferenceDataChanged(table))
+            event_bus.publish(ProductChanged(None))
+            event_bus.publish(StockChanged(None))
+        if movimientos:
+            event_bus.publish(MovementRecorded(None, 'Entrada'))
+
+        return {
+            'filas': len(rows),
+            'creados': creados,
+            'actualizados': actualizados,
+            'movimientos': movimientos,
+            'errores': errores
+        }
+
+    def _validate(self, cursor, params):
+        """Marcar filas inválidas sin interrumpir la importación del resto"""
+        cursor.execute("""
+            UPDATE importacion_productos
+            SET error = CASE
+                WHEN codigo IS NULL THEN 'Código vacío'
+                WHEN nombre IS NULL THEN 'Nombre vacío'
+                WHEN stock IS NOT NULL AND stock !~ '^[0-9]+$' THEN 'Stock inválido: ' || stock
+                WHEN stock_minimo IS NOT NULL AND stock_minimo !~ '^[0-9]+$'
+                    THEN 'Stock mínimo inválido: ' || stock_minimo
+                -- Fuera de INTEGER el ::int posterior abortaría todo el lote
+                WHEN stock IS NOT NULL AND stock::numeric > 2147483647
+                    THEN 'Stock fuera de rango: ' || stock
+                WHEN stock_minimo IS NOT NULL AND stock_minimo::numeric > 2147483647
+                    THEN 'Stock mínimo fuera de rango: ' || stock_minimo
+            END
+            WHERE lote = %(lote)s
+        """, params)
+
+        # Códigos repetidos dentro de la planilla: gana la primera aparición
+        cursor.execute("""
+            UPDATE importacion_productos s
+            SET error = 'Código repetido en la planilla (fila ' || d.primera || ')'
+            FROM (
+                SELECT fila, MIN(fila) OVER (PARTITION BY codigo) AS primera
+                FROM importacion_productos
+                WHERE lote = %(lote)s AND error IS NULL
+            ) d
+            WHERE s.lote = %(lote)s AND s.fila = d.fila AND d.fila <> d.primera
+        """, params)
+
+    def _resolve_references(self, cursor, params):
+        """Crear por conjuntos las referencias nuevas y asignar sus IDs"""
+        for table, id_column, column, label in _REFERENCIAS:
+            cursor.execute(f"""
+                INSERT INTO {table} (nombre)
+                SELECT DISTINCT ON (LOWER(s.{column})) s.{column}
+                FROM importacion_productos s
+                WHERE s.lote = %(lote)s AND s.error IS NULL AND s.{column} IS NOT NULL
+                  AND NOT EXISTS (
+                      SELECT 1 FROM {table} t WHERE LOWER(t.nombre) = LOWER(s.{column})
+                  )
+                ORDER BY LOWER(s.{column}), s.fila
+            """, params)
+
+            # Preferir la referencia activa si hay nombres repetidos
+            cursor.execute(f"""
+                UPDATE importacion_productos s
+                SET {id_column} = r.{id_column},
+                    error = CASE WHEN r.activo THEN NULL
+                                 ELSE '{label} inactiva: ' || s.{column} END
+                FROM (
+                    SELECT DISTINCT ON (LOWER(nombre)) {id_column}, LOWER(nombre) AS clave,
+                           COALESCE(activo, TRUE) AS activo
+                    FROM {table}
+                    ORDER BY LOWER(nombre), COALESCE(activo, TRUE) DESC, {id_column}
+                ) r
+                WHERE s.lote = %(lote)s AND s.error IS NULL
+                  AND LOWER(s.{column}) = r.clave
+            """, params)
+
+    def _upsert_products(self, cursor, params):
+        """Actualizar productos existentes por código e insertar los nuevos"""
+        cursor.execute("""
+            UPDATE importacion_productos s
+            SET id_producto = p.id_producto, stock_anterior = i.stock
+            FROM productos p
+            LEFT JOIN inventario i ON i.id_producto = p.id_producto
+            WHERE s.lote = %(lote)s AND s.error IS NULL AND p.codigo = s.codigo
+        """, params)
+
+        cursor.execute("""
+            UPDATE productos p
+            SET nombre = s.nombre,
+                id_marca = COALESCE(s.id_marca, p.id_marca),
+                id_categoria = COALESCE(s.id_categoria, p.id_categoria),
+                stock_minimo = COALESCE(s.stock_minimo::int, p.stock_minimo)
+            FROM importacion_productos s
+            WHERE s.lote = %(lote)s AND s.error IS NULL
+              AND s.id_producto = p.id_producto
+        """, params)
+        actualizados = cursor.rowcount
+
+        # Los productos nuevos requieren marca y categoría, igual que el formulario
+        cursor.execute("""
+            UPDATE importacion_productos
+            SET error = CASE WHEN id_marca IS NULL THEN 'Marca requerida para producto nuevo'
+                             ELSE 'Categoría requerida para producto nuevo' END
+            WHERE lote = %(lote)s AND error IS NULL AND id_producto IS NULL
+              AND (id_marca IS NULL OR id_categoria IS NULL)
+        """, params)
+
+        cursor.execute("""
+            WITH nuevos AS (
+                INSERT INTO productos (codigo, nombre, id_marca, id_categoria, stock_minimo)
+                SELECT codigo, nombre, id_marca, id_categoria, COALESCE(stock_minimo::int, 0)
+                FROM importacion_productos
+                WHERE lote = %(lote)s AND error IS NULL AND id_producto IS NULL
+                RETURNING id_producto, codigo
+            )
+            UPDATE importacion_productos s
+            SET id_producto = n.id_producto, es_nuevo = TRUE
+            FROM nuevos n
+            WHERE s.lote = %(lote)s AND s.codigo = n.codigo AND s.error IS NULL
+        """, params)
+        creados = cursor.rowcount
+
+        # Inventario: actualizar filas existentes y crear las faltantes
+        cursor.execute(f"""
+            UPDATE inventario i
+            SET stock = COALESCE(s.stock::int, i.stock),
+                id_ubicacion = COALESCE(s.id_ubicacion, i.id_ubicacion),
+                estado_stock = {_ESTADO_STOCK.format(
+                    stock="COALESCE(s.stock::int, i.stock)",
+                    minimo="COALESCE(p.stock_minimo, 0)")}
+            FROM importacion_productos s
+            JOIN productos p ON p.id_producto = s.id_producto
+            WHERE s.lote = %(lote)s AND s.error IS NULL
+              AND i.id_producto = s.id_producto
+        """, params)
+
+        cursor.execute(f"""
+            INSERT INTO inventario (id_producto, id_ubicacion, stock, estado_stock)
+            SELECT s.id_producto, s.id_ubicacion, COALESCE(s.stock::int, 0),
+                   {_ESTADO_STOCK.format(
+                       stock="COALESCE(s.stock::int, 0)",
+                       minimo="COALESCE(p.stock_minimo, 0)")}
+            FROM importacion_productos s
+            JOIN productos p ON p.id_producto = s.id_producto
+            WHERE s.lote = %(lote)s AND s.error IS NULL
+              AND NOT EXISTS (
+                  SELECT 1 FROM inventario i WHERE i.id_producto = s.id_producto
+              )
+        """, params)
+
+        return creados, actualizados
+
+    def _register_movements(self, cursor, params):
+        """Registrar en bloque 'Nuevo' para altas y Entrada/Salida por diferencias"""
+        cursor.execute("""
+            INSERT INTO movimientos (
+                id_producto, tipo, cantidad, id_responsable, referencia, fecha
+            )
+            SELECT id_producto,
+                   CASE
+                       WHEN es_nuevo THEN 'Nuevo'
+                       WHEN stock::int > COALESCE(stock_anterior, 0) THEN 'Entrada'
+                       ELSE 'Salida'
+                   END,
+                   CASE
+                       WHEN es_nuevo THEN stock::int
+                       ELSE ABS(stock::int - COALESCE(stock_anterior, 0))
+                   END,
+                   %(responsable)s,
+                   %(referencia)s,
+                   NOW()
+            FROM importacion_productos
+            WHERE lote = %(lote)s AND error IS NULL AND stock IS NOT NULL
+              AND stock::int <> CASE WHEN es_nuevo THEN 0
+                                     ELSE COALESCE(stock_anterior, 0) END
+        """, params)
+        return cursor.rowcount
+
+    def close(self):
+        """Cerrar conexión"""
+        try:
+            if self.cursor:
+                self.cursor.close()
+            if self.conn:
+                self.conn.close()
+        except Exception as e:
+            print(f"Error al cerrar conexión: {e}")
@@ -1,10 +1,104 @@
-from database import create_connection
+from psycopg2.extras import execute_values
+from database import create_connection, ensure_schema, transaction
+from prepared_statements import prepared
+from events import event_bus, ProductChanged, ReferenceDataChanged
+
+# Columnas de clasificación ABC (volumen) / XYZ (variabilidad) en productos
+CLASSIFICATION_SCHEMA = [
+    "ALTER TABLE productos ADD COLUMN IF NOT EXISTS clase_abc CHAR(1)",
+    "ALTER TABLE productos ADD COLUMN IF NOT EXISTS clase_xyz CHAR(1)",
+    "ALTER TABLE productos ADD COLUMN IF NOT EXISTS fecha_clasificacion TIMESTAMP",
+]
+
+# Versión de fila para bloqueo optimista: un trigger la incrementa en cada
+# UPDATE que cambie un campo del formulario de edición, sin importar qué
+# módulo lo ejecute. La clasificación ABC/XYZ no cuenta en productos; en
+# inventario, las entregas, ingresos, conteos y el recálculo de estado_stock
+# lo dejan igual al que corresponde al stock. Ninguno invalida una edición
+# abierta.
+VERSION_SCHEMA = [
+    "ALTER TABLE productos ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1",
+    "ALTER TABLE inventario ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1",
+    """
+    CREATE OR REPLACE FUNCTION trg_incrementar_version() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        NEW.version := OLD.version + 1;
+        RETURN NEW;
+    END
+    $$
+    """,
+    """
+    DO $$
+    BEGIN
+        -- El trigger de versiones anteriores versionaba cualquier cambio de la fila
+        IF EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'trg_productos_version') THEN
+            DROP TRIGGER trg_productos_version ON productos;
+        END IF;
+        IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'trg_productos_version_edicion') THEN
+            CREATE TRIGGER trg_productos_version_edicion BEFORE UPDATE ON productos
+            FOR EACH ROW WHEN (
+                OLD.codigo IS DISTINCT FROM NEW.codigo
+                OR OLD.nombre IS DISTINCT FROM NEW.nombre
+                OR OLD.id_marca IS DISTINCT FROM NEW.id_marca
+                OR OLD.id_categoria IS DISTINCT FROM NEW.id_categoria
+                OR OLD.stock_minimo IS DISTINCT FROM NEW.stock_minimo
+                OR OLD.activo IS DISTINCT FROM NEW.activo
+            )
+            EXECUTE FUNCTION trg_incrementar_version();
+        END IF;
+    END
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION trg_version_inventario() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF NEW.id_ubicacion IS DISTINCT FROM OLD.id_ubicacion
+           OR (NEW.estado_stock IS DISTINCT FROM OLD.estado_stock
+               AND NEW.estado_stock IS DISTINCT FROM (
+                   SELECT CASE
+                              WHEN NEW.stock = 0 THEN 'agotado'
+                              WHEN NEW.stock <= COALESCE(p.stock_minimo, 0) THEN 'stock bajo'
+                              ELSE 'disponible'
+                          END
+                   FROM productos p WHERE p.id_producto = NEW.id_producto)) THEN
+            NEW.version := OLD.version + 1;
+        END IF;
+        RETURN NEW;
+    END
+    $$
+    """,
+    # Reemplaza el trigger de versiones anteriores (que versionaba cualquier
+    # cambio de la fila) solo si todavía no usa la función nueva
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_trigger
+                       WHERE tgname = 'trg_inventario_version'
+                         AND tgfoid = 'trg_version_inventario'::regproc) THEN
+            DROP TRIGGER IF EXISTS trg_inventario_version ON inventario;
+            CREATE TRIGGER trg_inventario_version BEFORE UPDATE ON inventario
+            FOR EACH ROW EXECUTE FUNCTION trg_version_inventario();
+        END IF;
+    END
+    $$
+    """,
+]
 
 
 class ProductModel:
+    # Umbrales de participación acumulada para A y B (el resto es C)
+    ABC_THRESHOLDS = (0.80, 0.95)
+    # Umbrales de coeficiente de variación mensual para X e Y (el resto es Z)
+    XYZ_THRESHOLDS = (0.5, 1.0)
+
     def __init__(self):
         self.conn = create_connection()
         self.cursor = self.conn.cursor()
+        ensure_schema(self.cursor, "clasificacion_abc_xyz",
+                      CLASSIFICATION_SCHEMA)
+        ensure_schema(self.cursor, "version_productos", VERSION_SCHEMA)
 
     def get_id_by_name(self, table, name):
         """Obtener ID por nombre de una tabla relacionada SOLO SI ESTÁ ACTIVO"""
@@ -25,6 +119,14 @@ class ProductModel:
 
     def get_products(self, extra_where="", params=()):
         """Obtener todos los productos con filtros opcionales"""
+        try:
+            return self.fetch_products(extra_where, params)
+        except Exception as e:
+            print(f"Error getting products: {e}")
+            return []
+
+    def fetch_products(self, extra_where="", params=()):
+        """Como get_products, pero propagando los errores de la consulta"""
         query = """
         SELECT 
             p.id_producto, p.codigo, p.nombre, 
@@ -33,7 +135,9 @@ class ProductModel:
             i.stock, 
             u.nombre as ubicacion, 
             i.estado_stock,
-            p.stock_minimo
+            p.stock_minimo,
+            p.clase_abc,
+            p.clase_xyz
         FROM productos p
         LEFT JOIN marcas m ON p.id_marca = m.id_marca
         LEFT JOIN categorias c ON p.id_categoria = c.id_categoria
@@ -42,12 +146,10 @@ class ProductModel:
         WHERE p.activo = TRUE
         """ + extra_where + " ORDER BY p.nombre ASC"
 
-        try:
-            self.cursor.execute(query, params)
-            return self.cursor.fetchall()
-        except Exception as e:
-            print(f"Error getting products: {e}")
-            return []
+        # Cada combinación de filtros es una sentencia preparada distinta
+        self.cursor.execute(prepared(query), params)
+        return self.cursor.fetchall()
+
     def get_combobox_data(self, table):
         """Obtener datos para comboboxes - SOLO ACTIVOS"""
         try:
@@ -125,7 +227,8 @@ class ProductModel:
         try:
             self.cursor.execute("""
                 SELECT p.id_producto, p.codigo, p.nombre, p.id_marca, p.id_categoria,
-                    i.stock, i.id_ubicacion, i.estado_stock, p.stock_minimo
+                    i.stock, i.id_ubicacion, i.estado_stock, p.stock_minimo,
+                    p.version, i.version
                 FROM productos p
                 LEFT JOIN inventario i ON p.id_producto = i.id_producto
                 WHERE p.id_producto = %s
@@ -134,139 +237,22 @@ class ProductModel:
         except Exception as e:
             print(f"Error getting product data: {e}")
             return None
-    def get_ubicacion_id(self, product_id):
-        """Obtener ID de ubicación de un producto"""
-        try:
-            self.cursor.execute(
-                "SELECT id_ubicacion FROM inventario WHERE id_producto = %s", (product_id,))
-            result = self.cursor.fetchone()
-            return result[0] if result else None
-        except Exception as e:
-            print(f"Error getting ubicacion ID: {e}")
-            return None
-
-    def get_old_stock(self, product_id):
-        """Obtener stock anterior de un producto"""
+    def get_code_index(self):
+        """Obtener índice en memoria de productos activos por código (en minúsculas)"""
         try:
-            self.cursor.execute(
-                "SELECT stock FROM inventario WHERE id_producto = %s", (product_id,))
-            result = self.cursor.fetchone()
-            return result[0] if result else 0
-        except Exception as e:
-            print(f"Error getting old stock: {e}")
-            return 0
-
-    def save_product(self, product_data, product_id=None):
-        """Guardar o actualizar un producto"""
-        try:
-            if product_id:
-                # Actualizar producto existente
-                query = """
-                UPDATE productos 
-                SET codigo = %s, nombre = %s, id_marca = %s, id_categoria = %s, stock_minimo = %s
-                WHERE id_producto = %s
-                """
-                self.cursor.execute(query, (
-                    product_data['codigo'],
-                    product_data['nombre'],
-                    product_data['marca_id'],
-                    product_data['categoria_id'],
-                    product_data['stock_minimo'],
-                    product_id
-                ))
-
-                # Verificar si existe en inventario
-                self.cursor.execute(
-                    "SELECT id_inventario FROM inventario WHERE id_producto = %s", (product_id,))
-                inventario_existe = self.cursor.fetchone()
-
-                if inventario_existe:
-                    # Actualizar inventario
-                    self.cursor.execute("""
-                        UPDATE inventario 
-                        SET stock = %s, id_ubicacion = %s, estado_stock = %s
-                        WHERE id_producto = %s
-                    """, (
-                        product_data['stock'],
-                        product_data['ubicacion_id'],
-                        product_data['estado'],
-                        product_id
-                    ))
-                else:
-                    # Insertar en inventario
-                    self.cursor.execute("""
-                        INSERT INTO inventario 
-                        (id_producto, id_ubicacion, stock, estado_stock)
-                        VALUES (%s, %s, %s, %s)
-                    """, (
-                        product_id,
-                        product_data['ubicacion_id'],
-                        product_data['stock'],
-                        product_data['estado']
-                    ))
-
-                self.conn.commit()
-                return product_id
-
-            else:
-                # Insertar nuevo producto
-                query = """
-                INSERT INTO productos 
-                (codigo, nombre, id_marca, id_categoria, stock_minimo)
-                VALUES (%s, %s, %s, %s, %s) RETURNING id_producto
-                """
-                self.cursor.execute(query, (
-                    product_data['codigo'],
-                    product_data['nombre'],
-                    product_data['marca_id'],
-                    product_data['categoria_id'],
-                    product_data['stock_minimo']
-                ))
-
-                new_product_id = self.cursor.fetchone()[0]
-
-                # Insertar en inventario
-                self.cursor.execute("""
-                    INSERT INTO inventario 
-                    (id_producto, id_ubicacion, stock, estado_stock)
-                    VALUES (%s, %s, %s, %s)
-                """, (
-                    new_product_id,
-                    product_data['ubicacion_id'],
-                    product_data['stock'],
-                    product_data['estado']
-                ))
-
-                self.conn.commit()
-                return new_product_id
-
-        except Exception as e:
-            self.conn.rollback()
-            raise e
-
-    def delete_product(self, product_id):
-        """Marcar producto como inactivo"""
-        try:
-            self.cursor.execute(
-                "UPDATE productos SET activo = FALSE WHERE id_producto = %s",
-                (product_id,))
-            self.conn.commit()
-            return True
-        except Exception as e:
-            self.conn.rollback()
-            raise e
-
-    def add_stock(self, product_id, quantity):
-        """Agregar stock a un producto"""
-        try:
-            self.cursor.execute(
-                "UPDATE inventario SET stock = stock + %s WHERE id_producto = %s",
-                (int(quantity), product_id))
-            self.conn.commit()
-            return True
+            self.cursor.execute("""
+                SELECT p.id_producto, p.codigo, p.nombre, COALESCE(i.stock, 0)
+                FROM productos p
+                JOIN inventario i ON p.id_producto = i.id_producto
+                WHERE p.activo = TRUE AND p.codigo IS NOT NULL
+            """)
+            return {
+                str(codigo).strip().lower(): (id_producto, codigo, nombre, stock)
+                for id_producto, codigo, nombre, stock in self.cursor.fetchall()
+            }
         except Exception as e:
-            self.conn.rollback()
-            raise e
+            print(f"Error building code index: {e}")
+            return {}
 
     def add_new_value(self, table, value):
         """Agregar nuevo valor a una tabla relacionada - RETORNA EL NUEVO VALOR"""
@@ -285,7 +271,90 @@ class ProductModel:
 
             result = self.cursor.fetchone()
             self.conn.commit()
+            event_bus.publish(ReferenceDataChanged(table))
             return result  # Retorna el nuevo valor (id, nombre)
         except Exception as e:
             self.conn.rollback()
             raise e
+
+    def classify_abc_xyz(self, months=12):
+        """Clasificar todos los productos activos en ABC/XYZ según sus salidas"""
+        import numpy as np
+        import pandas as pd
+
+        try:
+            # Una sola consulta agregada por producto y mes. La ventana son
+            # exactamente `months` meses calendario (el actual y los
+            # anteriores), la misma cantidad que divide el cálculo de XYZ
+            self.cursor.execute("""
+                SELECT m.id_producto,
+                       DATE_TRUNC('month', m.fecha) AS mes,
+                       SUM(m.cantidad) AS cantidad,
+                       COUNT(*) AS frecuencia
+                FROM movimientos m
+                JOIN productos p ON p.id_producto = m.id_producto
+                WHERE m.tipo = 'Salida' AND p.activo = TRUE
+                  AND m.fecha >= DATE_TRUNC('month', CURRENT_DATE)
+                                 - (%s - 1) * INTERVAL '1 month'
+                GROUP BY m.id_producto, mes
+            """, (months,))
+            consumo = pd.DataFrame(
+                self.cursor.fetchall(),
+                columns=["id_producto", "mes", "cantidad", "frecuencia"])
+
+            self.cursor.execute(
+                "SELECT id_producto FROM productos WHERE activo = TRUE")
+            ids_activos = [row[0] for row in self.cursor.fetchall()]
+        except Exception as e:
+            print(f"Error al obtener consumo para clasificación: {e}")
+            return None
+
+        if not ids_activos:
+            return {"A": 0, "B": 0, "C": 0, "X": 0, "Y": 0, "Z": 0}
+
+        consumo["cantidad"] = consumo["cantidad"].astype(float)
+        consumo["cuadrado"] = consumo["cantidad"] ** 2
+        stats = consumo.groupby("id_producto").agg(
+            volumen=("cantidad", "sum"),
+            cuadrados=("cuadrado", "sum"),
+            frecuencia=("frecuencia", "sum"),
+        ).reindex(ids_activos, fill_value=0)
+
+        # ABC: participación acumulada por volumen (desempate por frecuencia)
+        stats = stats.sort_values(
+            ["volumen", "frecuencia"], ascending=False)
+        total = stats["volumen"].sum()
+        previo = (stats["volumen"].cumsum() - stats["volumen"]) / \
+            total if total else stats["volumen"] * 0
+        limite_a, limite_b = self.ABC_THRESHOLDS
+        stats["abc"] = np.select(
+            [(stats["volumen"] > 0) & (previo < limite_a),
+             (stats["volumen"] > 0) & (previo < limite_b)],
+            ["A", "B"], "C")
+
+        # XYZ: coeficiente de variación del consumo mensual (meses sin
+        # consumo cuentan como cero)
+        media = stats["volumen"] / months
+        varianza = (stats["cuadrados"] / months - media ** 2).clip(lower=0)
+        cv = np.sqrt(varianza) / media.where(media > 0)
+        limite_x, limite_y = self.XYZ_THRESHOLDS
+        stats["xyz"] = np.select(
+            [cv <= limite_x, cv <= limite_y], ["X", "Y"], "Z")
+
+        valores = list(zip(stats.index.astype(int).tolist(),
+                           stats["abc"].tolist(), stats["xyz"].tolist()))
+        # Una sola transacción: las páginas de execute_values se confirman
+        # juntas y todo el catálogo queda con la misma fecha de clasificación
+        with transaction(self.conn) as cursor:
+            execute_values(cursor, """
+                UPDATE productos p
+                SET clase_abc = v.abc, clase_xyz = v.xyz,
+                    fecha_clasificacion = NOW()
+                FROM (VALUES %s) AS v(id_producto, abc, xyz)
+                WHERE p.id_producto = v.id_producto
+            """, valores, page_size=1000)
+        event_bus.publish(ProductChanged([v[0] for v in valores]))
+
+        resumen = stats["abc"].value_counts().to_dict()
+        resumen.update(stats["xyz"].value_counts().to_dict())
+        return {clase: int(resumen.get(clase, 0)) for clase in "ABCXYZ"}
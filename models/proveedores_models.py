@@ -1,10 +1,188 @@
-from database import create_connection
+from database import create_connection, ensure_schema
+
+
+# Resumen mantenido por triggers de las categorías efectivas de cada proveedor
+# (asignadas directamente en proveedor_categoria o heredadas de sus productos).
+# Los triggers son por sentencia: una carga de muchos enlaces recalcula una
+# sola vez cada proveedor afectado.
+SUPPLIER_CATEGORIES_SCHEMA = [
+    # Quitar los triggers por fila de versiones anteriores antes de
+    # reemplazar sus funciones (tgtype & 1 = 1 indica FOR EACH ROW)
+    """
+    DO $$
+    BEGIN
+        IF EXISTS (SELECT 1 FROM pg_trigger
+                   WHERE tgname IN ('trg_pce_proveedor_categoria',
+                                    'trg_pce_proveedor_producto',
+                                    'trg_pce_producto_categoria')
+                     AND tgtype & 1 = 1) THEN
+            DROP TRIGGER IF EXISTS trg_pce_proveedor_categoria ON proveedor_categoria;
+            DROP TRIGGER IF EXISTS trg_pce_proveedor_producto ON proveedor_producto;
+            DROP TRIGGER IF EXISTS trg_pce_producto_categoria ON productos;
+        END IF;
+    END
+    $$
+    """,
+    "DROP FUNCTION IF EXISTS refrescar_categorias_proveedor(INTEGER)",
+    """
+    CREATE OR REPLACE FUNCTION refrescar_categorias_proveedores(p_ids INTEGER[])
+    RETURNS VOID AS $$
+    BEGIN
+        IF p_ids IS NULL OR cardinality(p_ids) = 0 THEN
+            RETURN;
+        END IF;
+
+        -- Solo se borran los pares que ya no corresponden y se agregan los
+        -- que faltan: dos refrescos concurrentes del mismo proveedor no
+        -- chocan con la clave primaria
+        WITH esperadas AS (
+            SELECT cat.id_proveedor, cat.id_categoria
+            FROM (
+                SELECT pc.id_proveedor, pc.id_categoria
+                FROM proveedor_categoria pc
+                WHERE pc.id_proveedor = ANY(p_ids)
+                UNION
+                SELECT pp.id_proveedor, pr.id_categoria
+                FROM proveedor_producto pp
+                JOIN productos pr ON pp.id_producto = pr.id_producto
+                WHERE pp.id_proveedor = ANY(p_ids)
+            ) cat
+            JOIN proveedores pv ON pv.id_proveedor = cat.id_proveedor
+            JOIN categorias c ON c.id_categoria = cat.id_categoria
+        ), obsoletas AS (
+            DELETE FROM proveedor_categorias_efectivas pce
+            WHERE pce.id_proveedor = ANY(p_ids)
+              AND NOT EXISTS (SELECT 1 FROM esperadas e
+                              WHERE e.id_proveedor = pce.id_proveedor
+                                AND e.id_categoria = pce.id_categoria)
+        )
+        INSERT INTO proveedor_categorias_efectivas (id_proveedor, id_categoria)
+        SELECT id_proveedor, id_categoria FROM esperadas
+        ON CONFLICT DO NOTHING;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION trg_proveedor_enlace_categorias()
+    RETURNS TRIGGER AS $$
+    DECLARE
+        ids INTEGER[];
+    BEGIN
+        -- Las tablas de transición disponibles dependen de la operación
+        IF TG_OP = 'INSERT' THEN
+            SELECT array_agg(DISTINCT id_proveedor) INTO ids FROM enlaces_nuevos;
+        ELSIF TG_OP = 'DELETE' THEN
+            SELECT array_agg(DISTINCT id_proveedor) INTO ids FROM enlaces_anteriores;
+        ELSE
+            SELECT array_agg(id_proveedor) INTO ids FROM (
+                SELECT id_proveedor FROM enlaces_anteriores
+                UNION
+                SELECT id_proveedor FROM enlaces_nuevos
+            ) t;
+        END IF;
+        PERFORM refrescar_categorias_proveedores(ids);
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION trg_producto_categoria_proveedores()
+    RETURNS TRIGGER AS $$
+    BEGIN
+        PERFORM refrescar_categorias_proveedores(ARRAY(
+            SELECT DISTINCT pp.id_proveedor
+            FROM productos_anteriores a
+            JOIN productos_nuevos n ON n.id_producto = a.id_producto
+            JOIN proveedor_producto pp ON pp.id_producto = n.id_producto
+            WHERE a.id_categoria IS DISTINCT FROM n.id_categoria
+        ));
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    DO $$
+    BEGIN
+        IF to_regclass('proveedor_categorias_efectivas') IS NULL THEN
+            CREATE TABLE proveedor_categorias_efectivas (
+                id_proveedor INTEGER NOT NULL
+                    REFERENCES proveedores(id_proveedor) ON DELETE CASCADE,
+                id_categoria INTEGER NOT NULL
+                    REFERENCES categorias(id_categoria) ON DELETE CASCADE,
+                PRIMARY KEY (id_proveedor, id_categoria)
+            );
+            CREATE INDEX idx_pce_categoria
+                ON proveedor_categorias_efectivas (id_categoria, id_proveedor);
+
+            -- Carga inicial a partir de los enlaces existentes
+            INSERT INTO proveedor_categorias_efectivas (id_proveedor, id_categoria)
+            SELECT id_proveedor, id_categoria FROM proveedor_categoria
+            WHERE id_categoria IS NOT NULL
+            UNION
+            SELECT pp.id_proveedor, pr.id_categoria
+            FROM proveedor_producto pp
+            JOIN productos pr ON pp.id_producto = pr.id_producto
+            WHERE pr.id_categoria IS NOT NULL;
+        END IF;
+
+        -- Una tabla de transición solo admite un evento por trigger
+        IF NOT EXISTS (SELECT 1 FROM pg_trigger
+                       WHERE tgname = 'trg_pce_proveedor_categoria_ins') THEN
+            CREATE TRIGGER trg_pce_proveedor_categoria_ins
+            AFTER INSERT ON proveedor_categoria
+            REFERENCING NEW TABLE AS enlaces_nuevos
+            FOR EACH STATEMENT EXECUTE FUNCTION trg_proveedor_enlace_categorias();
+
+            CREATE TRIGGER trg_pce_proveedor_categoria_upd
+            AFTER UPDATE ON proveedor_categoria
+            REFERENCING OLD TABLE AS enlaces_anteriores NEW TABLE AS enlaces_nuevos
+            FOR EACH STATEMENT EXECUTE FUNCTION trg_proveedor_enlace_categorias();
+
+            CREATE TRIGGER trg_pce_proveedor_categoria_del
+            AFTER DELETE ON proveedor_categoria
+            REFERENCING OLD TABLE AS enlaces_anteriores
+            FOR EACH STATEMENT EXECUTE FUNCTION trg_proveedor_enlace_categorias();
+        END IF;
+
+        IF NOT EXISTS (SELECT 1 FROM pg_trigger
+                       WHERE tgname = 'trg_pce_proveedor_producto_ins') THEN
+            CREATE TRIGGER trg_pce_proveedor_producto_ins
+            AFTER INSERT ON proveedor_producto
+            REFERENCING NEW TABLE AS enlaces_nuevos
+            FOR EACH STATEMENT EXECUTE FUNCTION trg_proveedor_enlace_categorias();
+
+            CREATE TRIGGER trg_pce_proveedor_producto_upd
+            AFTER UPDATE ON proveedor_producto
+            REFERENCING OLD TABLE AS enlaces_anteriores NEW TABLE AS enlaces_nuevos
+            FOR EACH STATEMENT EXECUTE FUNCTION trg_proveedor_enlace_categorias();
+
+            CREATE TRIGGER trg_pce_proveedor_producto_del
+            AFTER DELETE ON proveedor_producto
+            REFERENCING OLD TABLE AS enlaces_anteriores
+            FOR EACH STATEMENT EXECUTE FUNCTION trg_proveedor_enlace_categorias();
+        END IF;
+
+        -- Las tablas de transición no admiten UPDATE OF columna: el filtro
+        -- por cambio de categoría se hace dentro de la función
+        IF NOT EXISTS (SELECT 1 FROM pg_trigger
+                       WHERE tgname = 'trg_pce_producto_categoria') THEN
+            CREATE TRIGGER trg_pce_producto_categoria
+            AFTER UPDATE ON productos
+            REFERENCING OLD TABLE AS productos_anteriores NEW TABLE AS productos_nuevos
+            FOR EACH STATEMENT EXECUTE FUNCTION trg_producto_categoria_proveedores();
+        END IF;
+    END
+    $$
+    """,
+]
 
 
 class SupplierModel:
     def __init__(self):
         self.conn = create_connection()
         self.cursor = self.conn.cursor()
+        ensure_schema(self.cursor, "proveedor_categorias_efectivas",
+                      SUPPLIER_CATEGORIES_SCHEMA)
 
     def get_all_suppliers(self, category_filter="Todas", rating_filter="Todas", price_filter="Todos"):
         """Obtiene todos los proveedores con filtros opcionales"""
@@ -21,23 +199,15 @@ class SupplierModel:
                     ELSE p.valoracion || ' Estrellas'
                 END as valoracion_texto,
                 COALESCE(p.manejo_precios, 'N/A'),
-                COALESCE(
-                    (SELECT STRING_AGG(DISTINCT c.nombre, ', ')
-                     FROM (
-                         SELECT c.nombre
-                         FROM proveedor_categoria pc
-                         JOIN categorias c ON pc.id_categoria = c.id_categoria
-                         WHERE pc.id_proveedor = p.id_proveedor
-                         UNION
-                         SELECT DISTINCT c.nombre
-                         FROM proveedor_producto pp
-                         JOIN productos pr ON pp.id_producto = pr.id_producto
-                         JOIN categorias c ON pr.id_categoria = c.id_categoria
-                         WHERE pp.id_proveedor = p.id_proveedor
-                     ) c
-                    ), 'N/A'
-                ) as categorias
+                COALESCE(ca.categorias, 'N/A') as categorias
             FROM proveedores p
+            LEFT JOIN (
+                SELECT pce.id_proveedor,
+                       STRING_AGG(c.nombre, ', ' ORDER BY c.nombre) as categorias
+                FROM proveedor_categorias_efectivas pce
+                JOIN categorias c ON pce.id_categoria = c.id_categoria
+                GROUP BY pce.id_proveedor
+            ) ca ON ca.id_proveedor = p.id_proveedor
         """
 
         where_clauses = []
@@ -46,17 +216,12 @@ class SupplierModel:
         if category_filter != "Todas":
             where_clauses.append("""
                 EXISTS (
-                    SELECT 1 FROM proveedor_categoria pc
-                    JOIN categorias c ON pc.id_categoria = c.id_categoria
-                    WHERE pc.id_proveedor = p.id_proveedor AND c.nombre = %s
-                    UNION
-                    SELECT 1 FROM proveedor_producto pp
-                    JOIN productos pr ON pp.id_producto = pr.id_producto
-                    JOIN categorias c ON pr.id_categoria = c.id_categoria
-                    WHERE pp.id_proveedor = p.id_proveedor AND c.nombre = %s
+                    SELECT 1 FROM proveedor_categorias_efectivas pce
+                    JOIN categorias c ON pce.id_categoria = c.id_categoria
+                    WHERE pce.id_proveedor = p.id_proveedor AND c.nombre = %s
                 )
             """)
-            params.extend([category_filter, category_filter])
+            params.append(category_filter)
 
         if rating_filter != "Todas":
             rating_value = int(rating_filter.split()[0])
@@ -92,49 +257,15 @@ class SupplierModel:
         """, (supplier_id,))
         return self.cursor.fetchone()
 
-    def create_supplier(self, data):
-        """Crea un nuevo proveedor"""
-        self.cursor.execute("""
-            INSERT INTO proveedores (
-                nombre, contacto, telefono, email, direccion,
-                redes_sociales, valoracion, manejo_precios, comentarios
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-            RETURNING id_proveedor
-        """, data)
-        new_id = self.cursor.fetchone()[0]
-        self.conn.commit()
-        return new_id
-
-    def update_supplier(self, supplier_id, data):
-        """Actualiza un proveedor existente"""
-        self.cursor.execute("""
-            UPDATE proveedores SET
-                nombre = %s, contacto = %s, telefono = %s, email = %s,
-                direccion = %s, redes_sociales = %s, valoracion = %s,
-                manejo_precios = %s, comentarios = %s
-            WHERE id_proveedor = %s
-        """, data + (supplier_id,))
-        self.conn.commit()
-
-    def delete_supplier(self, supplier_name):
-        """Elimina un proveedor"""
-        self.cursor.execute(
-            "DELETE FROM proveedores WHERE nombre = %s", (supplier_name,))
-        self.conn.commit()
-
     def get_supplier_categories(self, supplier_id):
         """Obtiene las categorías de un proveedor"""
         self.cursor.execute("""
-            SELECT DISTINCT c.nombre
-            FROM (
-                SELECT id_categoria FROM proveedor_categoria WHERE id_proveedor = %s
-                UNION
-                SELECT p.id_categoria FROM proveedor_producto pp
-                JOIN productos p ON pp.id_producto = p.id_producto
-                WHERE pp.id_proveedor = %s
-            ) AS cat_ids
-            JOIN categorias c ON cat_ids.id_categoria = c.id_categoria
-        """, (supplier_id, supplier_id))
+            SELECT c.nombre
+            FROM proveedor_categorias_efectivas pce
+            JOIN categorias c ON pce.id_categoria = c.id_categoria
+            WHERE pce.id_proveedor = %s
+            ORDER BY c.nombre
+        """, (supplier_id,))
         return [row[0] for row in self.cursor.fetchall()] or ["Ninguna"]
 
     def get_supplier_products(self, supplier_id):
@@ -149,84 +280,49 @@ class SupplierModel:
         """, (supplier_id,))
         return self.cursor.fetchall()
 
-    def get_available_products(self, supplier_id):
-        """Obtiene productos disponibles para agregar al proveedor"""
+    def get_assignable_products(self, supplier_id):
+        """Obtiene todos los productos activos indicando si ya están asignados al proveedor"""
         self.cursor.execute("""
-            SELECT p.id_producto, p.nombre, c.nombre
+            SELECT p.id_producto, p.codigo, p.nombre,
+                   COALESCE(c.nombre, 'Sin categoría'),
+                   (pp.id_producto IS NOT NULL) as asignado
             FROM productos p
-            JOIN categorias c ON p.id_categoria = c.id_categoria
-            WHERE p.activo = TRUE
-            AND p.id_producto NOT IN (
-                SELECT id_producto FROM proveedor_producto
-                WHERE id_proveedor = %s
-            )
-            ORDER BY p.nombre
+            LEFT JOIN categorias c ON p.id_categoria = c.id_categoria
+            LEFT JOIN proveedor_producto pp
+                   ON pp.id_producto = p.id_producto AND pp.id_proveedor = %s
+            WHERE p.activo = TRUE OR pp.id_producto IS NOT NULL
+            ORDER BY c.nombre, p.nombre
         """, (supplier_id,))
         return self.cursor.fetchall()
 
-    def add_product_to_supplier(self, supplier_id, product_id):
-        """Agrega un producto al proveedor"""
-        self.cursor.execute("""
-            INSERT INTO proveedor_producto (id_proveedor, id_producto)
-            VALUES (%s, %s)
-        """, (supplier_id, product_id))
-        self.conn.commit()
+    def resolve_products_by_keys(self, keys):
+        """Resuelve una lista de códigos o nombres de producto a sus IDs"""
+        keys = [str(k).strip() for k in keys if k is not None and str(k).strip()]
+        if not keys:
+            return {}
 
-    def remove_product_from_supplier(self, supplier_id, product_id):
-        """Elimina un producto del proveedor"""
+        lowered = [k.lower() for k in keys]
         self.cursor.execute("""
-            DELETE FROM proveedor_producto
-            WHERE id_proveedor = %s AND id_producto = %s
-        """, (supplier_id, product_id))
-        self.conn.commit()
+            SELECT id_producto, LOWER(codigo), LOWER(nombre)
+            FROM productos
+            WHERE LOWER(codigo) = ANY(%s) OR LOWER(nombre) = ANY(%s)
+        """, (lowered, lowered))
+
+        by_code, by_name = {}, {}
+        for product_id, code, name in self.cursor.fetchall():
+            if code:
+                by_code.setdefault(code, product_id)
+            if name:
+                by_name.setdefault(name, product_id)
+
+        resolved = {}
+        for key, low in zip(keys, lowered):
+            product_id = by_code.get(low) or by_name.get(low)
+            if product_id:
+                resolved[key] = product_id
+        return resolved
 
     def get_categories(self):
         """Obtiene todas las categorías"""
         self.cursor.execute("SELECT nombre FROM categorias ORDER BY nombre")
         return [row[0] for row in self.cursor.fetchall()]
-
-    def get_product_id_by_name(self, product_name):
-        """Obtiene el ID de un producto por nombre"""
-        self.cursor.execute(
-            "SELECT id_producto FROM productos WHERE nombre = %s", (product_name,))
-        result = self.cursor.fetchone()
-        return result[0] if result else None
-
-    def set_supplier_category(self, supplier_id, category_name):
-        """Asigna (o reemplaza) la categoría principal de un proveedor.
-
-        El método elimina las asociaciones previas en `proveedor_categoria`
-        y, si `category_name` es válido, inserta la nueva asociación.
-        """
-        # Normalizar valores vacíos o placeholders
-        if not category_name or category_name in ("N/A", "Todas"):
-            # Si no hay categoría válida, solo eliminar asociaciones previas
-            self.cursor.execute(
-                "DELETE FROM proveedor_categoria WHERE id_proveedor = %s", (supplier_id,))
-            # En modo autocommit la operación ya estará aplicada
-            return
-
-        # Buscar id_categoria por nombre
-        self.cursor.execute(
-            "SELECT id_categoria FROM categorias WHERE nombre = %s", (category_name,))
-        res = self.cursor.fetchone()
-        if not res:
-            # No existe la categoría; no hacemos nada
-            return
-
-        id_categoria = res[0]
-
-        # Reemplazar asociaciones previas por la nueva
-        self.cursor.execute(
-            "DELETE FROM proveedor_categoria WHERE id_proveedor = %s", (supplier_id,))
-
-        # Evitar duplicados
-        self.cursor.execute(
-            "SELECT 1 FROM proveedor_categoria WHERE id_proveedor = %s AND id_categoria = %s",
-            (supplier_id, id_categoria)
-        )
-        if not self.cursor.fetchone():
-            self.cursor.execute(
-                "INSERT INTO proveedor_categoria (id_proveedor, id_categoria) VALUES (%s, %s)",
-                (supplier_id, id_categoria)
-            )
@@ -1,5 +1,4 @@
 # models/settings_models.py
-import psycopg2
 from database import create_connection
 
 
@@ -135,88 +134,6 @@ class SettingsModel:
         except Exception as e:
             raise Exception(f"Error al obtener opciones para {table_name}: {str(e)}")
         
-    def insert_item(self, table_name, columns, values):
-        """Inserta un nuevo item"""
-        try:
-            placeholders = ", ".join(["%s"] * len(values))
-            columns_str = ", ".join(columns)
-            query = f"INSERT INTO {table_name} ({columns_str}) VALUES ({placeholders})"
-            self.cursor.execute(query, values)
-            self.conn.commit()
-            return True
-        except psycopg2.Error as e:
-            self.conn.rollback()
-            raise Exception(f"No se pudo agregar el ítem: {str(e)}")
-
-    def update_item(self, table_name, id_column, item_id, columns, values):
-        """Actualiza un item existente"""
-        try:
-            set_clause = ", ".join([f"{col} = %s" for col in columns])
-            query = f"UPDATE {table_name} SET {set_clause} WHERE {id_column} = %s"
-            self.cursor.execute(query, values + [item_id])
-            self.conn.commit()
-            return True
-        except psycopg2.Error as e:
-            self.conn.rollback()
-            raise Exception(f"No se pudo actualizar el ítem: {str(e)}")
-
-    def soft_delete_item(self, table_name, id_column, item_id):
-        """Marca un item como inactivo (eliminación lógica)"""
-        try:
-            # Verificar si la tabla tiene columna activo
-            self.cursor.execute(f"SELECT column_name FROM information_schema.columns WHERE table_name='{table_name}' AND column_name='activo'")
-            has_activo = self.cursor.fetchone()
-            
-            if has_activo:
-                query = f"UPDATE {table_name} SET activo = FALSE WHERE {id_column} = %s"
-                self.cursor.execute(query, (item_id,))
-                self.conn.commit()
-                return True
-            else:
-                # Si no tiene columna activo, no podemos hacer soft delete
-                raise Exception("Esta tabla no soporta eliminación lógica. El registro está siendo usado en otras partes del sistema.")
-                
-        except psycopg2.Error as e:
-            self.conn.rollback()
-            raise Exception(f"No se pudo desactivar el ítem: {str(e)}")
-
-    def activate_item(self, table_name, id_column, item_id):
-        """Reactiva un item previamente desactivado"""
-        try:
-            # Verificar si la tabla tiene columna activo
-            self.cursor.execute(f"SELECT column_name FROM information_schema.columns WHERE table_name='{table_name}' AND column_name='activo'")
-            has_activo = self.cursor.fetchone()
-            
-            if has_activo:
-                query = f"UPDATE {table_name} SET activo = TRUE WHERE {id_column} = %s"
-                self.cursor.execute(query, (item_id,))
-                self.conn.commit()
-                return True
-            else:
-                return False
-                
-        except psycopg2.Error as e:
-            self.conn.rollback()
-            raise Exception(f"No se pudo activar el ítem: {str(e)}")
-
-    def delete_item(self, table_name, id_column, item_id):
-        """Elimina físicamente un item (solo si no tiene relaciones)"""
-        try:
-            query = f"DELETE FROM {table_name} WHERE {id_column} = %s"
-            self.cursor.execute(query, (item_id,))
-            self.conn.commit()
-            return True
-        except psycopg2.IntegrityError as e:
-            self.conn.rollback()
-            # Si hay error de integridad referencial, intentar soft delete
-            try:
-                return self.soft_delete_item(table_name, id_column, item_id)
-            except Exception as soft_e:
-                raise Exception(f"No se puede eliminar el ítem porque está siendo usado en otras partes del sistema: {str(soft_e)}")
-        except psycopg2.Error as e:
-            self.conn.rollback()
-            raise Exception(f"No se pudo eliminar el ítem: {str(e)}")
-
     def close_connection(self):
         """Cierra la conexión a la base de datos"""
         if hasattr(self, 'cursor'):
@@ -1,4 +1,25 @@
 from database import create_connection
+from prepared_statements import prepared
+
+# Índice del formulario de entregas: se consulta en cada apertura. El stock
+# es el disponible (descontadas las reservas vigentes)
+_INDICE_ENTREGA = prepared("""
+    SELECT
+        c.id_categoria,
+        c.nombre,
+        p.id_producto,
+        p.nombre,
+        COALESCE(sd.disponible, i.stock, 0) AS stock,
+        COALESCE(u.nombre, 'N/A') AS ubicacion,
+        COALESCE(i.estado_stock, 'disponible') AS estado_stock
+    FROM productos p
+    JOIN categorias c ON p.id_categoria = c.id_categoria
+    JOIN inventario i ON i.id_producto = p.id_producto
+    LEFT JOIN stock_disponible sd ON sd.id_producto = p.id_producto
+    LEFT JOIN ubicaciones u ON i.id_ubicacion = u.id_ubicacion
+    WHERE p.activo = TRUE
+    ORDER BY c.nombre, p.nombre
+""")
 
 
 class SolicitudesModel:
@@ -35,99 +56,29 @@ class SolicitudesModel:
             print(f"Error al obtener categorías: {e}")
             return []
 
-    def obtener_categorias_en_inventario(self):
-        """Obtener categorías solo de productos presentes en inventario y activos"""
-        try:
-            self.cursor.execute("""
-                SELECT DISTINCT c.id_categoria, c.nombre
-                FROM categorias c
-                JOIN productos p ON p.id_categoria = c.id_categoria
-                JOIN inventario i ON i.id_producto = p.id_producto
-                WHERE p.activo = TRUE
-                ORDER BY c.nombre
-            """)
-            return self.cursor.fetchall()
-        except Exception as e:
-            print(f"Error al obtener categorías de inventario: {e}")
-            return []
+    def obtener_indice_entrega(self):
+        """Obtener en una sola consulta el índice categoría -> productos -> detalles
+        de los productos activos en inventario, indexado por id.
 
-    def obtener_productos_por_categoria_en_inventario(self, categoria_id):
-        """Obtener productos por categoría solo si están en inventario y activos"""
+        El stock informado es el disponible: stock menos reservas vigentes.
+        """
+        indice = {'categorias': [], 'productos_por_categoria': {}, 'productos': {}}
         try:
-            self.cursor.execute("""
-                SELECT p.id_producto, p.nombre
-                FROM productos p
-                JOIN inventario i ON i.id_producto = p.id_producto
-                WHERE p.id_categoria = %s AND p.activo = TRUE
-                ORDER BY p.nombre
-            """, (categoria_id,))
-            return self.cursor.fetchall()
+            self.cursor.execute(_INDICE_ENTREGA)
+            for id_cat, categoria, id_prod, nombre, stock, ubicacion, estado in self.cursor.fetchall():
+                if id_cat not in indice['productos_por_categoria']:
+                    indice['categorias'].append((id_cat, categoria))
+                    indice['productos_por_categoria'][id_cat] = []
+                indice['productos_por_categoria'][id_cat].append((id_prod, nombre))
+                indice['productos'][id_prod] = {
+                    'nombre': nombre,
+                    'stock': stock,
+                    'ubicacion': ubicacion,
+                    'estado': estado
+                }
         except Exception as e:
-            print(f"Error al obtener productos de inventario: {e}")
-            return []
-
-    def obtener_detalles_producto(self, producto_identificador):
-        """Obtener detalles de un producto específico.
-        Acepta tanto nombre como id (o cadenas que contengan el id)."""
-        try:
-            # Normalizar entrada
-            # Si es int o string numérico -> buscar por id
-            if isinstance(producto_identificador, int) or (isinstance(producto_identificador, str) and producto_identificador.isdigit()):
-                product_id = int(producto_identificador)
-                self.cursor.execute("""
-                    SELECT 
-                        p.id_producto,
-                        COALESCE(i.stock, 0) AS stock,
-                        COALESCE(u.nombre, 'N/A') AS ubicacion,
-                        COALESCE(i.estado_stock, 'disponible') AS estado_stock
-                    FROM productos p
-                    LEFT JOIN inventario i ON p.id_producto = i.id_producto
-                    LEFT JOIN ubicaciones u ON i.id_ubicacion = u.id_ubicacion
-                    WHERE p.id_producto = %s
-                """, (product_id,))
-                return self.cursor.fetchone()
-
-            # Si la cadena tiene un número (por ejemplo representación de tupla), intentar extraer id
-            if isinstance(producto_identificador, str):
-                import re
-                m = re.search(r'\b(\d+)\b', producto_identificador)
-                if m:
-                    product_id = int(m.group(1))
-                    self.cursor.execute("""
-                        SELECT 
-                            p.id_producto,
-                            COALESCE(i.stock, 0) AS stock,
-                            COALESCE(u.nombre, 'N/A') AS ubicacion,
-                            COALESCE(i.estado_stock, 'disponible') AS estado_stock
-                        FROM productos p
-                        LEFT JOIN inventario i ON p.id_producto = i.id_producto
-                        LEFT JOIN ubicaciones u ON i.id_ubicacion = u.id_ubicacion
-                        WHERE p.id_producto = %s
-                    """, (product_id,))
-                    result = self.cursor.fetchone()
-                    if result:
-                        return result
-
-                # Si no se obtuvo id, buscar por nombre (case-insensitive)
-                nombre = producto_identificador.strip()
-                self.cursor.execute("""
-                    SELECT 
-                        p.id_producto,
-                        COALESCE(i.stock, 0) AS stock,
-                        COALESCE(u.nombre, 'N/A') AS ubicacion,
-                        COALESCE(i.estado_stock, 'disponible') AS estado_stock
-                    FROM productos p
-                    LEFT JOIN inventario i ON p.id_producto = i.id_producto
-                    LEFT JOIN ubicaciones u ON i.id_ubicacion = u.id_ubicacion
-                    WHERE p.nombre ILIKE %s
-                    LIMIT 1
-                """, (nombre,))
-                return self.cursor.fetchone()
-
-            return None
-        except Exception as e:
-            print(f"Error al obtener detalles del producto: {e}")
-            return None
+            print(f"Error al obtener índice de productos para entregas: {e}")
+        return indice
 
     def obtener_solicitudes(self, filtros=None):
         """Obtener solicitudes con filtros opcionales"""
@@ -175,45 +126,6 @@ class SolicitudesModel:
             print(f"Error al obtener solicitudes: {e}")
             return []
 
-    def registrar_solicitud(self, datos_solicitud):
-        """Registrar una nueva solicitud"""
-        try:
-            self.cursor.execute("""
-                INSERT INTO solicitudes 
-                (id_departamento, id_solicitante, id_responsable_entrega, comentario)
-                VALUES (%s, %s, %s, %s)
-                RETURNING id_solicitud
-            """, datos_solicitud)
-            return self.cursor.fetchone()[0]
-        except Exception as e:
-            print(f"Error al registrar solicitud: {e}")
-            self.conn.rollback()
-            return None
-
-    def registrar_detalle_solicitud(self, detalle_data):
-        """Registrar detalle de solicitud"""
-        try:
-            self.cursor.execute("""
-                INSERT INTO detalle_solicitud 
-                (id_solicitud, id_producto, cantidad)
-                VALUES (%s, %s, %s)
-            """, detalle_data)
-        except Exception as e:
-            print(f"Error al registrar detalle de solicitud: {e}")
-            self.conn.rollback()
-
-    def actualizar_inventario(self, producto_id, cantidad):
-        """Actualizar inventario después de una salida"""
-        try:
-            self.cursor.execute("""
-                UPDATE inventario 
-                SET stock = stock - %s
-                WHERE id_producto = %s
-            """, (cantidad, producto_id))
-        except Exception as e:
-            print(f"Error al actualizar inventario: {e}")
-            self.conn.rollback()
-
     def obtener_detalles_solicitud(self, solicitud_id):
         """Obtener detalles completos de una solicitud"""
         try:
@@ -285,14 +197,6 @@ class SolicitudesModel:
             self.conn.rollback()
             return None
 
-    def commit(self):
-        """Confirmar transacción"""
-        self.conn.commit()
-
-    def rollback(self):
-        """Revertir transacción"""
-        self.conn.rollback()
-
     def close(self):
         """Cerrar conexión"""
         self.cursor.close()
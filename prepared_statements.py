@@ -0,0 +1,210 @@
+"""Sentencias preparadas para las consultas frecuentes.
+
+Las consultas marcadas con `prepared(sql)` se preparan (PREPARE) una vez
+por conexión en su primer uso y luego se ejecutan por nombre (EXECUTE), de
+modo que el servidor no vuelve a analizarlas en cada llamada. Una
+PreparedQuery es un str: un cursor común la ejecuta como texto normal, y la
+caché de resultados y las métricas de consultas la tratan igual que la
+consulta original.
+
+Tras una migración (ensure_schema) el registro cambia de versión y cada
+conexión descarta sus sentencias (DEALLOCATE ALL) antes de volver a usarlas.
+"""
+import hashlib
+import re
+import threading
+import time
+import weakref
+from config import PREPARED_STATEMENTS_ENABLED, PREPARED_STATEMENTS_MAX
+
+_MARCADORES = re.compile(r"%%|%s")
+_PLANIFICACION = re.compile(r"Planning Time:\s*([\d.]+)\s*ms")
+# La sentencia no existe en la sesión, o su plan quedó inválido por un
+# cambio de esquema hecho desde otro proceso
+_RECUPERABLES = {"26000", "0A000"}
+_DUPLICADA = "42P05"
+
+
+class PreparedQuery(str):
+    """Texto SQL con parámetros posicionales (%s) y su sentencia preparada"""
+
+    def __new__(cls, sql):
+        if "%(" in sql:
+            raise ValueError("Las sentencias preparadas usan parámetros posicionales (%s)")
+        query = super().__new__(cls, sql)
+        query.name = "ps_" + hashlib.sha1(sql.encode("utf-8")).hexdigest()[:16]
+
+        cantidad = 0
+
+        def numerar(match):
+            nonlocal cantidad
+            if match.group(0) == "%%":
+                return "%"
+            cantidad += 1
+            return f"${cantidad}"
+        query.server_sql = _MARCADORES.sub(numerar, sql)
+        query.param_count = cantidad
+        query.execute_sql = f"EXECUTE {query.name}" + (
+            f" ({', '.join(['%s'] * cantidad)})" if cantidad else "")
+        return query
+
+
+class StatementRegistry:
+    """Sentencias preparadas por conexión y el tiempo de planificación ahorrado"""
+
+    def __init__(self, enabled=PREPARED_STATEMENTS_ENABLED,
+                 max_statements=PREPARED_STATEMENTS_MAX):
+        self.enabled = enabled
+        self.max_statements = max_statements
+        self.version = 0
+        self.invalidations = 0
+        self._queries = {}
+        self._stats = {}
+        # Conexión de psycopg2 -> (versión, nombres preparados en ella)
+        self._conns = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def prepared(self, sql):
+        """Sentencia registrada para `sql`; con el registro lleno, el texto sin preparar"""
+        query = self._queries.get(sql)
+        if query is not None:
+            return query
+        with self._lock:
+            query = self._queries.get(sql)
+            if query is None:
+                if len(self._queries) >= self.max_statements:
+                    return sql
+                query = PreparedQuery(sql)
+                self._queries[sql] = query
+                self._stats[query.name] = {
+                    'sql': " ".join(sql.split()), 'preparaciones': 0, 'ejecuciones': 0,
+                    'preparar_ms': 0.0, 'planificacion_ms': None,
+                }
+        return query
+
+    def invalidate(self):
+        """Descartar las sentencias de todas las conexiones (cambió el esquema)"""
+        with self._lock:
+            self.version += 1
+            self.invalidations += 1
+
+    def _state(self, conn):
+        with self._lock:
+            return self._conns.get(conn)
+
+    def _set_state(self, conn, version, names):
+        with self._lock:
+            self._conns[conn] = (version, names)
+
+    def execute(self, cursor, query, params, run):
+        """Ejecutar `query` por nombre en la conexión del cursor.
+
+        `run(sql, params)` es el execute del cursor de psycopg2. La sentencia
+        se prepara la primera vez que se usa en la conexión.
+        """
+        conn = cursor.connection
+        try:
+            state = self._state(conn)
+        except TypeError:
+            # Conexión sin soporte de referencias débiles: sin preparar
+            return run(query, params)
+
+        version, names = state if state is not None else (None, set())
+        if version != self.version:
+            if names:
+                run("DEALLOCATE ALL", None)
+            names = set()
+            self._set_state(conn, self.version, names)
+
+        try:
+            if query.name not in names:
+                self._prepare(cursor, query, params, run, names)
+            result = run(query.execute_sql, params)
+        except Exception as e:
+            if getattr(e, "pgcode", None) not in _RECUPERABLES:
+                raise
+            # Estado desconocido: descartar todo antes del próximo uso
+            self._set_state(conn, None, {query.name})
+            if not conn.autocommit:
+                raise
+            # Sin transacción abierta se vuelve a preparar y se repite una vez
+            run("DEALLOCATE ALL", None)
+            names = set()
+            self._set_state(conn, self.version, names)
+            self._prepare(cursor, query, params, run, names)
+            result = run(query.execute_sql, params)
+
+        with self._lock:
+            self._stats[query.name]['ejecuciones'] += 1
+        return result
+
+    def _prepare(self, cursor, query, params, run, names):
+        inicio = time.perf_counter()
+        try:
+            run(f"PREPARE {query.name} AS {query.server_sql}", None)
+        except Exception as e:
+            # Ya existía en la sesión (por ejemplo, preparada antes de un error)
+            if getattr(e, "pgcode", None) != _DUPLICADA or not cursor.connection.autocommit:
+                raise
+        duracion = (time.perf_counter() - inicio) * 1000
+        names.add(query.name)
+
+        with self._lock:
+            stats = self._stats[query.name]
+            stats['preparaciones'] += 1
+            stats['preparar_ms'] += duracion
+            medir = stats['planificacion_ms'] is None
+        if medir and cursor.connection.autocommit:
+            self._measure_planning(cursor, query, params, run)
+
+    def _measure_planning(self, cursor, query, params, run):
+        """Tiempo de planificación de la consulta sin preparar (una vez por proceso).
+
+        EXPLAIN sin ANALYZE no ejecuta la sentencia, por lo que también vale
+        para INSERT y UPDATE.
+        """
+        planificacion = 0.0
+        try:
+            run("EXPLAIN (SUMMARY) " + query, params)
+            for (linea,) in cursor.fetchall():
+                match = _PLANIFICACION.search(linea)
+                if match:
+                    planificacion = float(match.group(1))
+        except Exception as e:
+            print(f"No se pudo medir la planificación de {query.name}: {e}")
+        with self._lock:
+            self._stats[query.name]['planificacion_ms'] = planificacion
+
+    def report(self):
+        """Por sentencia: preparaciones, ejecuciones y planificación ahorrada.
+
+        El ahorro es una estimación: el tiempo de planificación medido una
+        vez por cada ejecución que no tuvo que analizar la consulta. Los
+        planes personalizados que PostgreSQL todavía arma en las primeras
+        ejecuciones no se descuentan.
+        """
+        with self._lock:
+            filas = []
+            for name, s in self._stats.items():
+                planificacion = s['planificacion_ms'] or 0.0
+                reutilizadas = max(s['ejecuciones'] - s['preparaciones'], 0)
+                filas.append(dict(s, nombre=name, ahorro_ms=planificacion * reutilizadas))
+        return sorted(filas, key=lambda f: f['ahorro_ms'], reverse=True)
+
+    def stats(self):
+        filas = self.report()
+        return {
+            'sentencias': len(filas),
+            'preparaciones': sum(f['preparaciones'] for f in filas),
+            'ejecuciones': sum(f['ejecuciones'] for f in filas),
+            'ahorro_ms': sum(f['ahorro_ms'] for f in filas),
+            'invalidaciones': self.invalidations,
+        }
+
+
+statements = StatementRegistry()
+
+
+def prepared(sql):
+    """Marcar `sql` como consulta frecuente que se ejecuta como sentencia preparada"""
+    return statements.prepared(sql)
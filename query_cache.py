@@ -0,0 +1,147 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from config import (RESULT_CACHE_ENABLED, RESULT_CACHE_TTL,
+                    RESULT_CACHE_MAX_ENTRIES, RESULT_CACHE_MAX_ROWS)
+
+_TABLAS_LECTURA = re.compile(r"\b(?:FROM|JOIN)\s+([A-Za-z_][\w.]*)", re.IGNORECASE)
+_TABLAS_ESCRITURA = re.compile(
+    r"\b(?:INSERT\s+INTO|UPDATE|DELETE\s+FROM|REFRESH\s+MATERIALIZED\s+VIEW(?:\s+CONCURRENTLY)?)"
+    r"\s+(?:ONLY\s+)?([A-Za-z_][\w.]*)", re.IGNORECASE)
+_DDL = re.compile(r"^\s*(?:CREATE|ALTER|DROP|TRUNCATE|COPY)\b", re.IGNORECASE)
+_LECTURA_CON_BLOQUEO = re.compile(r"^\s*(?:SELECT|WITH)\b", re.IGNORECASE)
+# Lecturas cuyo resultado cambia sin escrituras de la aplicación
+_VOLATILES = re.compile(
+    r"\b(?:NOW|CURRENT_TIMESTAMP|CURRENT_DATE|CURRENT_TIME|LOCALTIMESTAMP|LOCALTIME|"
+    r"CLOCK_TIMESTAMP|STATEMENT_TIMESTAMP|TRANSACTION_TIMESTAMP|TIMEOFDAY|"
+    r"RANDOM|TXID_\w+|PG_STAT_\w+|PG_LOCKS)\b",
+    re.IGNORECASE)
+# Palabras que las expresiones regulares capturan sin ser tablas
+_NO_TABLAS = {"set", "of", "unnest", "generate_series"}
+
+# Vistas que dependen del reloj en su definición aunque la consulta no lo
+# mencione (stock_disponible descuenta solo las reservas no vencidas)
+NO_CACHEABLES = {"stock_disponible"}
+
+# Vistas y tablas derivadas: se invalidan con cualquiera de sus tablas base
+DERIVADAS = {
+    "stock_disponible": {"inventario", "reservas_stock"},
+    "proveedor_categorias_efectivas": {"proveedor_categoria", "proveedor_producto", "productos"},
+}
+
+
+def _tablas(regex, query):
+    return {nombre.rsplit(".", 1)[-1].lower() for nombre in regex.findall(query)} - _NO_TABLAS
+
+
+class QueryCache:
+    """Caché LRU con vencimiento de resultados de lecturas.
+
+    La clave es la sentencia más sus parámetros. Cada entrada recuerda las
+    tablas que lee (incluidas las bases de las vistas de DERIVADAS) y se
+    descarta cuando una escritura hecha por la aplicación toca alguna de
+    ellas. Los cambios hechos por otros procesos solo se ven al vencer `ttl`.
+    """
+
+    def __init__(self, max_entries=RESULT_CACHE_MAX_ENTRIES, ttl=RESULT_CACHE_TTL,
+                 max_rows=RESULT_CACHE_MAX_ROWS, enabled=RESULT_CACHE_ENABLED):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.enabled = enabled
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _text(query):
+        if isinstance(query, bytes):
+            return query.decode("utf-8", "replace")
+        return query if isinstance(query, str) else None
+
+    def cacheable(self, query):
+        """La lectura no depende del reloj ni de estadísticas del servidor"""
+        text = self._text(query)
+        return (self.enabled and text is not None and not _VOLATILES.search(text)
+                and not self.read_tables(text) & NO_CACHEABLES)
+
+    def read_tables(self, query):
+        tablas = _tablas(_TABLAS_LECTURA, self._text(query))
+        for tabla in list(tablas):
+            tablas |= DERIVADAS.get(tabla, set())
+        return frozenset(tablas)
+
+    def written_tables(self, query):
+        """Tablas que modifica una sentencia; None si debe vaciarse toda la caché"""
+        text = self._text(query)
+        if text is None or _DDL.match(text):
+            return None
+        tablas = _tablas(_TABLAS_ESCRITURA, text)
+        if not tablas:
+            # SELECT ... FOR UPDATE bloquea filas pero no las modifica
+            return set() if _LECTURA_CON_BLOQUEO.match(text) else None
+        return tablas
+
+    def get(self, query, params):
+        """Entrada vigente (filas, description) o None"""
+        key = (query, repr(params))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[3] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0], entry[1]
+
+    def put(self, query, params, rows, description):
+        if len(rows) > self.max_rows:
+            return
+        key = (query, repr(params))
+        entry = (rows, description, self.read_tables(query), time.monotonic() + self.ttl)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, tables):
+        """Descartar las entradas que leen alguna de `tables` (None: todas)"""
+        with self._lock:
+            if tables is None:
+                self.invalidations += len(self._entries)
+                self._entries.clear()
+                return
+            if not tables:
+                return
+            for key in [k for k, e in self._entries.items() if e[2] & tables]:
+                del self._entries[key]
+                self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            consultas = self.hits + self.misses
+            return {
+                "entradas": len(self._entries),
+                "aciertos": self.hits,
+                "fallos": self.misses,
+                "tasa_aciertos": self.hits / consultas if consultas else 0.0,
+                "invalidaciones": self.invalidations,
+                "desalojos": self.evictions,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.invalidations = self.evictions = 0
+
+
+# Caché compartida por todas las conexiones del proceso
+result_cache = QueryCache()
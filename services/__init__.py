@@ -0,0 +1,18 @@
+"""Operaciones de negocio independientes de la interfaz.
+
+Los servicios reciben datos planos, devuelven resultados y señalan los
+problemas con las excepciones de `services.errors`; no importan Tkinter,
+por lo que pueden usarse desde la aplicación de escritorio, scripts de
+consola u otros clientes.
+"""
+from services.errors import (
+    ServiceError, ValidationError, InactiveReferenceError,
+    NotFoundError, ConflictError, InsufficientStockError,
+)
+from services.stock_service import StockService
+from services.entregas_service import EntregaService
+from services.compras_service import PurchaseService
+from services.proveedores_service import SupplierService
+from services.settings_service import SettingsService
+from services.catalogo_service import CatalogService
+from services.reservas_service import ReservaService
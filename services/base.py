@@ -0,0 +1,43 @@
+from database import create_connection
+from services.errors import ValidationError
+
+
+def estado_stock_sql(stock, minimo):
+    """Expresión SQL que calcula estado_stock a partir del stock resultante"""
+    return f"""CASE
+        WHEN {stock} = 0 THEN 'agotado'
+        WHEN {stock} <= COALESCE({minimo}, 0) THEN 'stock bajo'
+        ELSE 'disponible'
+    END"""
+
+
+def parse_quantity(value, field="cantidad", allow_zero=False):
+    """Convertir una cantidad a entero validando que sea positiva"""
+    text = str(value).strip() if value is not None else ""
+    if not text.isdigit() or (int(text) == 0 and not allow_zero):
+        minimo = "cero o positivo" if allow_zero else "positivo"
+        raise ValidationError(
+            f"El campo {field} debe ser un número entero {minimo}", field)
+    return int(text)
+
+
+class BaseService:
+    """Base de los servicios: conexión propia o compartida con un modelo"""
+
+    def __init__(self, conn=None):
+        self.conn = conn or create_connection(show_errors=False)
+
+    @staticmethod
+    def _valid_user(cursor, id_responsable):
+        """Devolver el responsable si existe en usuarios, si no None"""
+        if id_responsable is None:
+            return None
+        cursor.execute("SELECT 1 FROM usuarios WHERE id = %s", (id_responsable,))
+        return id_responsable if cursor.fetchone() else None
+
+    def close(self):
+        """Cerrar la conexión"""
+        try:
+            self.conn.close()
+        except Exception as e:
+            print(f"Error al cerrar conexión: {e}")
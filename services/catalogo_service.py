@@ -0,0 +1,165 @@
+from datetime import datetime
+from services.base import BaseService
+from services.errors import NotFoundError, ValidationError
+
+
+class CatalogService(BaseService):
+    """Consultas de solo lectura: productos, stock, movimientos, solicitudes y proveedores.
+
+    Devuelve listas de diccionarios, listas para serializar a JSON o para
+    cargar en una tabla de la interfaz.
+    """
+
+    MAX_LIMIT = 1000
+
+    def _fetch(self, query, params=()):
+        """Ejecutar una consulta y devolver las filas como diccionarios"""
+        with self.conn.cursor() as cursor:
+            cursor.execute(query, params)
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def _limit(self, limit, default=100):
+        """Validar un límite de filas"""
+        if limit in (None, ""):
+            return default
+        if not str(limit).isdigit() or int(limit) == 0:
+            raise ValidationError("El límite debe ser un entero positivo", "limite")
+        return min(int(limit), self.MAX_LIMIT)
+
+    def list_products(self, categoria=None, texto=None):
+        """Productos activos con su stock, opcionalmente filtrados"""
+        query = """
+            SELECT p.id_producto, p.codigo, p.nombre,
+                   m.nombre AS marca, c.nombre AS categoria,
+                   i.stock, u.nombre AS ubicacion, i.estado_stock,
+                   p.stock_minimo, p.clase_abc, p.clase_xyz
+            FROM productos p
+            LEFT JOIN marcas m ON p.id_marca = m.id_marca
+            LEFT JOIN categorias c ON p.id_categoria = c.id_categoria
+            LEFT JOIN inventario i ON p.id_producto = i.id_producto
+            LEFT JOIN ubicaciones u ON i.id_ubicacion = u.id_ubicacion
+            WHERE p.activo = TRUE
+        """
+        params = []
+        if categoria:
+            query += " AND c.nombre = %s"
+            params.append(categoria)
+        if texto:
+            query += " AND (p.codigo ILIKE %s OR p.nombre ILIKE %s)"
+            params += [f"%{texto}%"] * 2
+        return self._fetch(query + " ORDER BY p.nombre", params)
+
+    def get_product(self, product_id):
+        """Un producto con su stock"""
+        rows = self._fetch("""
+            SELECT p.id_producto, p.codigo, p.nombre, p.activo,
+                   m.nombre AS marca, c.nombre AS categoria,
+                   i.stock, u.nombre AS ubicacion, i.estado_stock, p.stock_minimo,
+                   p.version, i.version AS version_inventario
+            FROM productos p
+            LEFT JOIN marcas m ON p.id_marca = m.id_marca
+            LEFT JOIN categorias c ON p.id_categoria = c.id_categoria
+            LEFT JOIN inventario i ON p.id_producto = i.id_producto
+            LEFT JOIN ubicaciones u ON i.id_ubicacion = u.id_ubicacion
+            WHERE p.id_producto = %s
+        """, (product_id,))
+        if not rows:
+            raise NotFoundError(f"No existe el producto {product_id}")
+        return rows[0]
+
+    def stock(self, solo_bajo=False, limit=None):
+        """Stock por producto; con `solo_bajo`, los que están en o bajo el mínimo"""
+        query = """
+            SELECT p.id_producto, p.codigo, p.nombre, i.stock,
+                   COALESCE(p.stock_minimo, 0) AS stock_minimo, i.estado_stock
+            FROM productos p
+            JOIN inventario i ON p.id_producto = i.id_producto
+            WHERE p.activo = TRUE
+        """
+        if solo_bajo:
+            query += " AND i.stock <= COALESCE(p.stock_minimo, 0) ORDER BY i.stock ASC"
+        else:
+            query += " ORDER BY p.nombre"
+        if limit not in (None, ""):
+            query += " LIMIT %s"
+            return self._fetch(query, (self._limit(limit),))
+        return self._fetch(query)
+
+    def movements(self, tipo=None, desde=None, hasta=None, limit=None):
+        """Movimientos más recientes con filtros opcionales"""
+        query = """
+            SELECT m.id_movimiento, m.fecha, m.tipo, m.id_producto,
+                   p.nombre AS producto, m.cantidad,
+                   usr.nombre_completo AS responsable, m.referencia
+            FROM movimientos m
+            JOIN productos p ON m.id_producto = p.id_producto
+            LEFT JOIN usuarios usr ON m.id_responsable = usr.id
+            WHERE 1=1
+        """
+        params = []
+        if tipo:
+            query += " AND m.tipo = %s"
+            params.append(tipo)
+        if desde:
+            query += " AND m.fecha >= %s"
+            params.append(desde)
+        if hasta:
+            query += " AND m.fecha <= %s"
+            params.append(hasta)
+        query += " ORDER BY m.fecha DESC LIMIT %s"
+        params.append(self._limit(limit))
+        return self._fetch(query, params)
+
+    def requests(self, departamento=None, limit=None):
+        """Solicitudes (entregas) más recientes"""
+        query = """
+            SELECT s.id_solicitud, s.fecha_solicitud,
+                   d.nombre AS departamento, sol.nombre AS solicitante,
+                   s.comentario AS referencia,
+                   u.nombre_completo AS responsable_entrega
+            FROM solicitudes s
+            JOIN departamentos d ON s.id_departamento = d.id_departamento
+            JOIN solicitantes sol ON s.id_solicitante = sol.id_solicitante
+            JOIN usuarios u ON s.id_responsable_entrega = u.id
+        """
+        params = []
+        if departamento:
+            query += " WHERE d.nombre = %s"
+            params.append(departamento)
+        query += " ORDER BY s.fecha_solicitud DESC LIMIT %s"
+        params.append(self._limit(limit))
+        return self._fetch(query, params)
+
+    def suppliers(self):
+        """Proveedores con sus categorías efectivas"""
+        return self._fetch("""
+            SELECT p.id_proveedor, p.nombre, p.contacto, p.telefono, p.email,
+                   p.valoracion, p.manejo_precios, ca.categorias
+            FROM proveedores p
+            LEFT JOIN (
+                SELECT pce.id_proveedor,
+                       STRING_AGG(c.nombre, ', ' ORDER BY c.nombre) AS categorias
+                FROM proveedor_categorias_efectivas pce
+                JOIN categorias c ON pce.id_categoria = c.id_categoria
+                GROUP BY pce.id_proveedor
+            ) ca ON ca.id_proveedor = p.id_proveedor
+            ORDER BY p.nombre
+        """)
+
+    def dashboard_counts(self):
+        """Totales de las tarjetas del panel principal en una sola consulta"""
+        return self._fetch("""
+            SELECT
+                (SELECT COUNT(DISTINCT p.id_producto)
+                 FROM productos p JOIN inventario i ON p.id_producto = i.id_producto
+                 WHERE p.activo = TRUE) AS total_productos,
+                (SELECT COUNT(DISTINCT p.id_producto)
+                 FROM productos p JOIN inventario i ON p.id_producto = i.id_producto
+                 WHERE p.activo = TRUE AND i.stock <= COALESCE(p.stock_minimo, 0)
+                   AND i.stock > 0) AS stock_bajo,
+                (SELECT COUNT(*) FROM solicitudes
+                 WHERE DATE(fecha_solicitud) = %s) AS solicitudes_hoy,
+                (SELECT COUNT(*) FROM solicitudes_compra
+                 WHERE estado = 'Pendiente') AS compras_hoy
+        """, (datetime.now().date(),))[0]
@@ -0,0 +1,49 @@
+from datetime import datetime
+from services.base import BaseService, parse_quantity
+from services.errors import ValidationError, NotFoundError
+
+
+class PurchaseService(BaseService):
+    """Solicitudes de compra"""
+
+    PRIORIDADES = ("Baja", "Media", "Alta")
+    ESTADOS = ("Pendiente", "Aprobado", "Rechazado", "En proceso", "Completado", "Cancelado")
+
+    def create_request(self, producto, cantidad, motivo, prioridad, proveedor=None):
+        """Registrar una solicitud de compra pendiente. Devuelve su ID."""
+        producto = (producto or "").strip()
+        motivo = (motivo or "").strip()
+        if not producto:
+            raise ValidationError("El producto es obligatorio", "producto")
+        if not motivo:
+            raise ValidationError("El motivo es obligatorio", "motivo")
+        if prioridad not in self.PRIORIDADES:
+            raise ValidationError(f"Prioridad inválida: {prioridad}", "prioridad")
+        cantidad = parse_quantity(cantidad)
+
+        with self.conn.cursor() as cursor:
+            cursor.execute("""
+                INSERT INTO solicitudes_compra (
+                    producto, cantidad, motivo, prioridad, proveedor, fecha, estado
+                ) VALUES (%s, %s, %s, %s, %s, %s, 'Pendiente')
+                RETURNING id
+            """, (producto, cantidad, motivo, prioridad, proveedor or None, datetime.now()))
+            return cursor.fetchone()[0]
+
+    def update_status(self, request_id, estado):
+        """Cambiar el estado de una solicitud de compra"""
+        if estado not in self.ESTADOS:
+            raise ValidationError(f"Estado inválido: {estado}", "estado")
+        with self.conn.cursor() as cursor:
+            cursor.execute(
+                "UPDATE solicitudes_compra SET estado = %s WHERE id = %s",
+                (estado, request_id))
+            if cursor.rowcount == 0:
+                raise NotFoundError(f"No existe la solicitud #{request_id}")
+
+    def delete_request(self, request_id):
+        """Eliminar una solicitud de compra"""
+        with self.conn.cursor() as cursor:
+            cursor.execute("DELETE FROM solicitudes_compra WHERE id = %s", (request_id,))
+            if cursor.rowcount == 0:
+                raise NotFoundError(f"No existe la solicitud #{request_id}")
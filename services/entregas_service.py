@@ -0,0 +1,109 @@
+from datetime import datetime
+from database import transaction, ensure_schema
+from services.base import BaseService, estado_stock_sql, parse_quantity
+from services.errors import ValidationError, InsufficientStockError, NotFoundError
+from services.reservas_service import RESERVAS_SCHEMA
+from events import event_bus, RequestRegistered, StockChanged, MovementRecorded
+
+
+class EntregaService(BaseService):
+    """Registro de entregas (salidas de inventario a departamentos)"""
+
+    def __init__(self, conn=None):
+        super().__init__(conn)
+        with self.conn.cursor() as cursor:
+            ensure_schema(cursor, "reservas_stock", RESERVAS_SCHEMA)
+
+    @staticmethod
+    def _consolidate(lines):
+        """Sumar las cantidades por producto validando cada línea"""
+        totals = {}
+        for product_id, quantity in lines:
+            totals[int(product_id)] = totals.get(int(product_id), 0) + parse_quantity(quantity)
+        if not totals:
+            raise ValidationError("Agregue al menos un producto", "productos")
+        return totals
+
+    def registrar_entrega(self, id_departamento, id_solicitante, id_responsable, memo, lineas,
+                          sesion=None):
+        """Registrar una entrega completa en una única transacción.
+
+        `lineas` es una lista de (id_producto, cantidad). Bloquea las filas de
+        inventario, verifica el stock disponible descontando las reservas
+        vigentes de otras sesiones y registra solicitud, detalle, descuento de
+        stock y movimientos de salida. Las reservas de `sesion` se consumen en
+        la misma transacción. Devuelve el ID de la solicitud.
+        """
+        memo = (memo or "").strip()
+        if id_departamento is None or id_solicitante is None:
+            raise ValidationError("Complete todos los campos requeridos")
+        if not memo:
+            raise ValidationError("Ingrese una referencia/memo", "memo")
+        if id_responsable is None:
+            raise ValidationError("No se pudo identificar al usuario actual", "responsable")
+        totals = self._consolidate(lineas)
+        ids, quantities = list(totals), list(totals.values())
+
+        with transaction(self.conn) as cursor:
+            cursor.execute("""
+                SELECT i.id_producto, p.nombre,
+                       i.stock - COALESCE((
+                           SELECT SUM(r.cantidad) FROM reservas_stock r
+                           WHERE r.id_producto = i.id_producto
+                             AND r.expira > CURRENT_TIMESTAMP
+                             AND r.sesion IS DISTINCT FROM %s::uuid
+                       ), 0)
+                FROM inventario i
+                JOIN productos p ON p.id_producto = i.id_producto
+                WHERE i.id_producto = ANY(%s)
+                FOR UPDATE OF i
+            """, (sesion, ids))
+            stock = {pid: (nombre, disponible) for pid, nombre, disponible in cursor.fetchall()}
+
+            missing = [pid for pid in ids if pid not in stock]
+            if missing:
+                raise NotFoundError(
+                    f"Productos sin inventario: {', '.join(map(str, missing))}")
+            shortages = [(pid, stock[pid][0], max(stock[pid][1] or 0, 0), qty)
+                         for pid, qty in totals.items() if (stock[pid][1] or 0) < qty]
+            if shortages:
+                raise InsufficientStockError(shortages)
+
+            cursor.execute("""
+                INSERT INTO solicitudes
+                (id_departamento, id_solicitante, id_responsable_entrega, comentario)
+                VALUES (%s, %s, %s, %s)
+                RETURNING id_solicitud
+            """, (id_departamento, id_solicitante, id_responsable, memo))
+            solicitud_id = cursor.fetchone()[0]
+
+            cursor.execute("""
+                INSERT INTO detalle_solicitud (id_solicitud, id_producto, cantidad)
+                SELECT %s, v.id_producto, v.cantidad
+                FROM UNNEST(%s::int[], %s::int[]) AS v(id_producto, cantidad)
+            """, (solicitud_id, ids, quantities))
+
+            cursor.execute(f"""
+                UPDATE inventario i
+                SET stock = i.stock - v.cantidad,
+                    estado_stock = {estado_stock_sql('i.stock - v.cantidad', 'p.stock_minimo')}
+                FROM UNNEST(%s::int[], %s::int[]) AS v(id_producto, cantidad), productos p
+                WHERE i.id_producto = v.id_producto AND p.id_producto = v.id_producto
+            """, (ids, quantities))
+
+            cursor.execute("""
+                INSERT INTO movimientos (
+                    id_producto, tipo, cantidad, id_responsable, referencia, fecha
+                )
+                SELECT v.id_producto, 'Salida', v.cantidad, %s, %s, %s
+                FROM UNNEST(%s::int[], %s::int[]) AS v(id_producto, cantidad)
+            """, (self._valid_user(cursor, id_responsable), f"Solicitud #{memo}",
+                  datetime.now(), ids, quantities))
+
+            if sesion:
+                cursor.execute("DELETE FROM reservas_stock WHERE sesion = %s", (sesion,))
+
+        event_bus.publish(RequestRegistered(solicitud_id, ids))
+        event_bus.publish(StockChanged(ids))
+        event_bus.publish(MovementRecorded(ids, 'Salida'))
+        return solicitud_id
@@ -0,0 +1,49 @@
+"""Errores tipados de la capa de servicios.
+
+Los servicios no muestran diálogos: señalan los problemas con estas
+excepciones y cada interfaz (Tk, consola, API) decide cómo presentarlos.
+"""
+
+
+class ServiceError(Exception):
+    """Error base de una operación de negocio"""
+
+
+class ValidationError(ServiceError):
+    """Datos de entrada inválidos o incompletos"""
+
+    def __init__(self, message, field=None):
+        super().__init__(message)
+        self.field = field
+
+
+class InactiveReferenceError(ValidationError):
+    """Una marca, categoría u otra referencia no existe o está inactiva"""
+
+    def __init__(self, fields):
+        super().__init__(
+            f"{', '.join(fields)} seleccionada se encuentra inactiva. "
+            "Para permitir la edición, por favor actívela en Ajustes.")
+        self.fields = list(fields)
+
+
+class NotFoundError(ServiceError):
+    """El registro solicitado no existe"""
+
+
+class ConflictError(ServiceError):
+    """El registro cambió desde que se leyó (bloqueo optimista)"""
+
+
+class InsufficientStockError(ServiceError):
+    """Stock insuficiente para una salida.
+
+    `shortages` es una lista de tuplas (id_producto, nombre, disponible, solicitado).
+    """
+
+    def __init__(self, shortages):
+        detalle = "\n".join(
+            f"- {nombre}: disponible {disponible}, solicitado {solicitado}"
+            for _, nombre, disponible, solicitado in shortages)
+        super().__init__(f"Stock insuficiente:\n{detalle}")
+        self.shortages = list(shortages)
@@ -0,0 +1,105 @@
+from database import transaction
+from services.base import BaseService
+from services.errors import ValidationError, NotFoundError
+from events import event_bus, SupplierChanged
+
+
+class SupplierService(BaseService):
+    """Alta, edición y catálogo de productos de proveedores"""
+
+    FIELDS = ('nombre', 'contacto', 'telefono', 'email', 'direccion',
+              'redes_sociales', 'valoracion', 'manejo_precios', 'comentarios')
+
+    def validate_supplier(self, data):
+        """Normalizar y validar los datos planos de un proveedor"""
+        supplier = {f: (str(data.get(f)).strip() if data.get(f) is not None else "")
+                    for f in self.FIELDS}
+        if not supplier['nombre']:
+            raise ValidationError("El nombre es obligatorio", "nombre")
+
+        # La valoración llega como "4 ⭐⭐⭐⭐" desde el formulario o como entero
+        valoracion = supplier['valoracion'].split()[0] if supplier['valoracion'] else ""
+        if valoracion and (not valoracion.isdigit() or not 1 <= int(valoracion) <= 5):
+            raise ValidationError("La valoración debe estar entre 1 y 5", "valoracion")
+        supplier['valoracion'] = int(valoracion) if valoracion else None
+        return supplier
+
+    def save_supplier(self, data, supplier_id=None, categoria=None):
+        """Crear o actualizar un proveedor y su categoría principal. Devuelve el ID."""
+        supplier = self.validate_supplier(data)
+        values = tuple(supplier[f] for f in self.FIELDS)
+
+        with transaction(self.conn) as cursor:
+            if supplier_id is None:
+                cursor.execute("""
+                    INSERT INTO proveedores (
+                        nombre, contacto, telefono, email, direccion,
+                        redes_sociales, valoracion, manejo_precios, comentarios
+                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    RETURNING id_proveedor
+                """, values)
+                supplier_id = cursor.fetchone()[0]
+            else:
+                cursor.execute("""
+                    UPDATE proveedores SET
+                        nombre = %s, contacto = %s, telefono = %s, email = %s,
+                        direccion = %s, redes_sociales = %s, valoracion = %s,
+                        manejo_precios = %s, comentarios = %s
+                    WHERE id_proveedor = %s
+                """, values + (supplier_id,))
+                if cursor.rowcount == 0:
+                    raise NotFoundError(f"No existe el proveedor {supplier_id}")
+
+            if categoria and categoria not in ("N/A", "Todas"):
+                # Reemplazar la categoría principal si la nueva existe
+                cursor.execute(
+                    "SELECT id_categoria FROM categorias WHERE nombre = %s", (categoria,))
+                row = cursor.fetchone()
+                if row:
+                    cursor.execute(
+                        "DELETE FROM proveedor_categoria WHERE id_proveedor = %s",
+                        (supplier_id,))
+                    cursor.execute(
+                        "INSERT INTO proveedor_categoria (id_proveedor, id_categoria) VALUES (%s, %s)",
+                        (supplier_id, row[0]))
+
+        event_bus.publish(SupplierChanged(supplier_id))
+        return supplier_id
+
+    def delete_supplier(self, supplier_id):
+        """Eliminar un proveedor"""
+        with self.conn.cursor() as cursor:
+            cursor.execute("DELETE FROM proveedores WHERE id_proveedor = %s", (supplier_id,))
+            if cursor.rowcount == 0:
+                raise NotFoundError(f"No existe el proveedor {supplier_id}")
+        event_bus.publish(SupplierChanged(supplier_id))
+
+    def apply_products_diff(self, supplier_id, to_add, to_remove):
+        """Aplicar en una sola transacción las altas y bajas de productos del proveedor"""
+        to_add = [int(p) for p in to_add]
+        to_remove = [int(p) for p in to_remove]
+
+        with transaction(self.conn) as cursor:
+            added = removed = 0
+            if to_add:
+                cursor.execute("""
+                    INSERT INTO proveedor_producto (id_proveedor, id_producto)
+                    SELECT %s, nuevos.id_producto
+                    FROM unnest(%s::int[]) AS nuevos(id_producto)
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM proveedor_producto pp
+                        WHERE pp.id_proveedor = %s
+                          AND pp.id_producto = nuevos.id_producto
+                    )
+                """, (supplier_id, to_add, supplier_id))
+                added = cursor.rowcount
+            if to_remove:
+                cursor.execute("""
+                    DELETE FROM proveedor_producto
+                    WHERE id_proveedor = %s AND id_producto = ANY(%s)
+                """, (supplier_id, to_remove))
+                removed = cursor.rowcount
+
+        if added or removed:
+            event_bus.publish(SupplierChanged(supplier_id))
+        return added, removed
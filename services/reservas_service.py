@@ -0,0 +1,138 @@
+import uuid
+from database import transaction, ensure_schema
+from services.base import BaseService, parse_quantity
+from services.errors import InsufficientStockError, NotFoundError
+
+# Reservas temporales de stock para entregas en preparación. El disponible
+# (stock - reservas vigentes) se consulta en la vista stock_disponible, que
+# agrega solo las reservas no vencidas usando el índice (id_producto, expira).
+RESERVAS_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS reservas_stock (
+        id_reserva SERIAL PRIMARY KEY,
+        sesion UUID NOT NULL,
+        id_producto INTEGER NOT NULL REFERENCES productos(id_producto) ON DELETE CASCADE,
+        cantidad INTEGER NOT NULL CHECK (cantidad > 0),
+        id_responsable INTEGER,
+        creada TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        expira TIMESTAMP NOT NULL,
+        UNIQUE (sesion, id_producto)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_reservas_producto_expira ON reservas_stock (id_producto, expira)",
+    "CREATE INDEX IF NOT EXISTS idx_reservas_expira ON reservas_stock (expira)",
+    """
+    CREATE OR REPLACE VIEW stock_disponible AS
+    SELECT i.id_producto,
+           i.stock,
+           COALESCE(r.reservado, 0) AS reservado,
+           i.stock - COALESCE(r.reservado, 0) AS disponible
+    FROM inventario i
+    LEFT JOIN (
+        SELECT id_producto, SUM(cantidad) AS reservado
+        FROM reservas_stock
+        WHERE expira > CURRENT_TIMESTAMP
+        GROUP BY id_producto
+    ) r ON r.id_producto = i.id_producto
+    """,
+]
+
+
+class ReservaService(BaseService):
+    """Reservas de stock con vencimiento para entregas en preparación"""
+
+    def __init__(self, conn=None, minutos=30):
+        super().__init__(conn)
+        self.minutos = minutos
+        with self.conn.cursor() as cursor:
+            ensure_schema(cursor, "reservas_stock", RESERVAS_SCHEMA)
+
+    @staticmethod
+    def nueva_sesion():
+        """Identificador de una entrega en preparación"""
+        return str(uuid.uuid4())
+
+    @staticmethod
+    def _reservado_por_otros(cursor, id_producto, sesion):
+        cursor.execute("""
+            SELECT COALESCE(SUM(cantidad), 0) FROM reservas_stock
+            WHERE id_producto = %s AND expira > CURRENT_TIMESTAMP AND sesion <> %s
+        """, (id_producto, sesion))
+        return cursor.fetchone()[0]
+
+    def reservar(self, sesion, id_producto, cantidad, id_responsable=None):
+        """Fijar la cantidad reservada por la sesión para un producto.
+
+        Bloquea la fila de inventario del producto, de modo que dos sesiones
+        no pueden comprometer las mismas unidades. Renueva el vencimiento de
+        todas las reservas de la sesión. Devuelve el disponible resultante.
+        """
+        cantidad = parse_quantity(cantidad, allow_zero=True)
+        if cantidad == 0:
+            return self.liberar(sesion, id_producto)
+
+        with transaction(self.conn) as cursor:
+            cursor.execute("""
+                SELECT p.nombre, i.stock FROM inventario i
+                JOIN productos p ON p.id_producto = i.id_producto
+                WHERE i.id_producto = %s
+                FOR UPDATE OF i
+            """, (id_producto,))
+            row = cursor.fetchone()
+            if not row:
+                raise NotFoundError(f"El producto {id_producto} no tiene inventario")
+            nombre, stock = row
+
+            disponible = (stock or 0) - self._reservado_por_otros(cursor, id_producto, sesion)
+            if cantidad > disponible:
+                raise InsufficientStockError([(id_producto, nombre, max(disponible, 0), cantidad)])
+
+            cursor.execute("""
+                INSERT INTO reservas_stock (sesion, id_producto, cantidad, id_responsable, expira)
+                VALUES (%s, %s, %s, %s, CURRENT_TIMESTAMP + %s * INTERVAL '1 minute')
+                ON CONFLICT (sesion, id_producto)
+                DO UPDATE SET cantidad = EXCLUDED.cantidad, expira = EXCLUDED.expira
+            """, (sesion, id_producto, cantidad, id_responsable, self.minutos))
+            self._renovar(cursor, sesion)
+            return disponible - cantidad
+
+    def liberar(self, sesion, id_producto=None):
+        """Liberar las reservas de la sesión (o solo las de un producto).
+
+        Con un producto devuelve su disponible tras liberar.
+        """
+        with self.conn.cursor() as cursor:
+            if id_producto is None:
+                cursor.execute("DELETE FROM reservas_stock WHERE sesion = %s", (sesion,))
+                return None
+            cursor.execute(
+                "DELETE FROM reservas_stock WHERE sesion = %s AND id_producto = %s",
+                (sesion, id_producto))
+            cursor.execute(
+                "SELECT disponible FROM stock_disponible WHERE id_producto = %s", (id_producto,))
+            row = cursor.fetchone()
+            return row[0] if row else 0
+
+    def _renovar(self, cursor, sesion):
+        cursor.execute("""
+            UPDATE reservas_stock
+            SET expira = CURRENT_TIMESTAMP + %s * INTERVAL '1 minute'
+            WHERE sesion = %s
+        """, (self.minutos, sesion))
+
+    def disponibles(self, ids=None):
+        """Disponible (stock - reservas vigentes) por producto"""
+        with self.conn.cursor() as cursor:
+            if ids is None:
+                cursor.execute("SELECT id_producto, disponible FROM stock_disponible")
+            else:
+                cursor.execute(
+                    "SELECT id_producto, disponible FROM stock_disponible WHERE id_producto = ANY(%s)",
+                    (list(ids),))
+            return dict(cursor.fetchall())
+
+    def barrer_vencidas(self):
+        """Eliminar reservas vencidas. Devuelve cuántas se eliminaron."""
+        with self.conn.cursor() as cursor:
+            cursor.execute("DELETE FROM reservas_stock WHERE expira <= CURRENT_TIMESTAMP")
+            return cursor.rowcount
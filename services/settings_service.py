@@ -0,0 +1,101 @@
+import re
+import psycopg2
+from services.base import BaseService
+from services.errors import ValidationError, NotFoundError
+from events import event_bus, ReferenceDataChanged, ProductChanged, SupplierChanged
+
+
+class SettingsService(BaseService):
+    """Mantenimiento de tablas maestras (Ajustes)"""
+
+    # Tablas editables y su columna ID
+    TABLES = {
+        'categorias': 'id_categoria',
+        'departamentos': 'id_departamento',
+        'ubicaciones': 'id_ubicacion',
+        'marcas': 'id_marca',
+        'solicitantes': 'id_solicitante',
+        'proveedores': 'id_proveedor',
+        'usuarios': 'id',
+        'productos': 'id_producto',
+    }
+    OPTIONAL_FIELDS = ("contacto", "telefono", "email", "direccion", "activo")
+
+    def __init__(self, conn=None):
+        super().__init__(conn)
+        # Tabla -> tiene columna 'activo' (no todas las tablas maestras la tienen)
+        self._activo = {}
+
+    def _id_column(self, table):
+        """Validar la tabla y devolver su columna ID"""
+        if table not in self.TABLES:
+            raise ValidationError(f"Tabla no editable: {table}")
+        return self.TABLES[table]
+
+    def validate_values(self, values):
+        """Validar columnas y campos requeridos de un ítem"""
+        for column, value in values.items():
+            if not re.fullmatch(r"[a-z_]+", column):
+                raise ValidationError(f"Columna inválida: {column}", column)
+            if column not in self.OPTIONAL_FIELDS and value in (None, ""):
+                raise ValidationError(f"El campo {column} es requerido", column)
+        return values
+
+    def save_item(self, table, values, item_id=None):
+        """Insertar o actualizar un ítem. `values` es {columna: valor}."""
+        id_column = self._id_column(table)
+        values = self.validate_values(dict(values))
+        columns = list(values)
+
+        try:
+            with self.conn.cursor() as cursor:
+                if item_id is None:
+                    cursor.execute(
+                        f"INSERT INTO {table} ({', '.join(columns)}) "
+                        f"VALUES ({', '.join(['%s'] * len(columns))})",
+                        list(values.values()))
+                else:
+                    cursor.execute(
+                        f"UPDATE {table} SET {', '.join(f'{c} = %s' for c in columns)} "
+                        f"WHERE {id_column} = %s",
+                        list(values.values()) + [item_id])
+                    if cursor.rowcount == 0:
+                        raise NotFoundError("No se encontró el ítem seleccionado")
+        except psycopg2.IntegrityError as e:
+            raise ValidationError(f"No se pudo guardar el ítem: {e}") from e
+        self._publish(table, item_id)
+
+    def _has_activo(self, cursor, table):
+        """Verificar si la tabla tiene columna 'activo'"""
+        if table not in self._activo:
+            cursor.execute("""
+                SELECT column_name
+                FROM information_schema.columns
+                WHERE table_name = %s AND column_name = 'activo'
+            """, (table,))
+            self._activo[table] = cursor.fetchone() is not None
+        return self._activo[table]
+
+    def set_active(self, table, item_id, active):
+        """Activar o desactivar (eliminación lógica) un ítem"""
+        id_column = self._id_column(table)
+        with self.conn.cursor() as cursor:
+            if not self._has_activo(cursor, table):
+                raise ValidationError(
+                    "Esta tabla no soporta eliminación lógica. El registro está "
+                    "siendo usado en otras partes del sistema.")
+            cursor.execute(
+                f"UPDATE {table} SET activo = %s WHERE {id_column} = %s",
+                (active, item_id))
+            if cursor.rowcount == 0:
+                raise NotFoundError("No se encontró el ítem seleccionado")
+        self._publish(table, item_id)
+
+    @staticmethod
+    def _publish(table, item_id):
+        """Avisar del cambio con el evento más específico de la tabla"""
+        if table == 'productos':
+            event_bus.publish(ProductChanged(None if item_id is None else [item_id]))
+        elif table == 'proveedores':
+            event_bus.publish(SupplierChanged(item_id))
+        event_bus.publish(ReferenceDataChanged(table))
@@ -0,0 +1,245 @@
+from datetime import datetime
+from psycopg2.extras import execute_values
+from database import transaction, ensure_schema
+from prepared_statements import prepared
+from models.product_model import VERSION_SCHEMA
+from services.base import BaseService, estado_stock_sql, parse_quantity
+from services.errors import (
+    ValidationError, InactiveReferenceError, NotFoundError, ConflictError,
+)
+from events import event_bus, ProductChanged, StockChanged, MovementRecorded
+
+_ENTRADA = prepared("""
+    INSERT INTO movimientos (
+        id_producto, tipo, cantidad, id_responsable, referencia, fecha
+    ) VALUES (%s, 'Entrada', %s, %s, %s, %s)
+""")
+
+
+class StockService(BaseService):
+    """Altas y ediciones de productos y entradas de stock"""
+
+    ESTADOS = ("disponible", "reservado", "agotado", "stock bajo")
+
+    def __init__(self, conn=None):
+        super().__init__(conn)
+        with self.conn.cursor() as cursor:
+            ensure_schema(cursor, "version_productos", VERSION_SCHEMA)
+
+    def validate_product(self, data, new=True):
+        """Normalizar y validar los datos planos de un producto.
+
+        `data` usa las claves codigo, nombre, marca, categoria, ubicacion
+        (nombres), estado, stock_minimo y, para productos nuevos, stock.
+        """
+        codigo = str(data.get('codigo') or "").strip()
+        nombre = str(data.get('nombre') or "").strip()
+        if not codigo or not nombre:
+            raise ValidationError("Código y Producto son campos obligatorios.")
+        if not codigo.replace("-", "").isalnum():
+            raise ValidationError(
+                "El código solo debe contener letras, números y guiones.", "codigo")
+        if not all(c.isalnum() or c.isspace() for c in nombre):
+            raise ValidationError(
+                "El nombre del producto solo debe contener letras, números y espacios.", "nombre")
+
+        stock_minimo = data.get('stock_minimo')
+        stock_minimo = 0 if stock_minimo in (None, "") else parse_quantity(
+            stock_minimo, "stock mínimo", allow_zero=True)
+
+        stock = None
+        if new:
+            if data.get('stock') in (None, ""):
+                raise ValidationError(
+                    "El stock inicial es obligatorio para nuevos productos.", "stock")
+            stock = parse_quantity(data['stock'], "stock", allow_zero=True)
+
+        estado = data.get('estado') or "disponible"
+        if estado not in self.ESTADOS:
+            raise ValidationError(f"Estado de stock inválido: {estado}", "estado")
+
+        return {
+            'codigo': codigo, 'nombre': nombre, 'stock': stock,
+            'stock_minimo': stock_minimo, 'estado': estado,
+            'marca': data.get('marca'), 'categoria': data.get('categoria'),
+            'ubicacion': data.get('ubicacion'),
+        }
+
+    @staticmethod
+    def _resolve_references(cursor, product):
+        """Resolver marca, categoría y ubicación activas por nombre"""
+        ids, inactive = {}, []
+        for key, table, id_column, label in (
+                ('marca', 'marcas', 'id_marca', 'Marca'),
+                ('categoria', 'categorias', 'id_categoria', 'Categoría'),
+                ('ubicacion', 'ubicaciones', 'id_ubicacion', 'Ubicación')):
+            cursor.execute(
+                f"SELECT {id_column} FROM {table} WHERE nombre = %s AND activo = TRUE",
+                (product[key],))
+            row = cursor.fetchone()
+            ids[key] = row[0] if row else None
+            # La ubicación solo es obligatoria si se indicó una
+            if ids[key] is None and (key != 'ubicacion' or product[key]):
+                inactive.append(label)
+        if inactive:
+            raise InactiveReferenceError(inactive)
+        return ids
+
+    @staticmethod
+    def _check_conflict(cursor, table, product_id):
+        """Distinguir un producto inexistente de uno modificado por otro usuario"""
+        cursor.execute(f"SELECT 1 FROM {table} WHERE id_producto = %s", (product_id,))
+        if cursor.fetchone():
+            raise ConflictError(
+                "El producto fue modificado por otro usuario desde que se abrió "
+                "el formulario. Recargue los datos e intente nuevamente.")
+        if table == 'productos':
+            raise NotFoundError(f"No existe el producto {product_id}")
+
+    def save_product(self, data, product_id=None, id_responsable=None, versions=None):
+        """Crear o actualizar un producto con su fila de inventario.
+
+        En edición el stock no se modifica (solo cambia por movimientos con
+        deltas); en un alta se registra la entrada del stock inicial.
+        `versions` es (versión de producto, versión de inventario) leída al
+        abrir el formulario: si otro usuario cambió la fila después, se lanza
+        ConflictError en lugar de sobrescribir sus cambios. Devuelve el ID.
+        """
+        product = self.validate_product(data, new=product_id is None)
+        product_version, inventory_version = versions or (None, None)
+        stock_inicial = product_id is None and product['stock'] > 0
+
+        with transaction(self.conn) as cursor:
+            ids = self._resolve_references(cursor, product)
+
+            if product_id is not None:
+                cursor.execute("""
+                    UPDATE productos
+                    SET codigo = %s, nombre = %s, id_marca = %s, id_categoria = %s,
+                        stock_minimo = %s
+                    WHERE id_producto = %s
+                      AND (%s::int IS NULL OR version = %s::int)
+                """, (product['codigo'], product['nombre'], ids['marca'],
+                      ids['categoria'], product['stock_minimo'], product_id,
+                      product_version, product_version))
+                if cursor.rowcount == 0:
+                    self._check_conflict(cursor, 'productos', product_id)
+
+                cursor.execute("""
+                    UPDATE inventario SET id_ubicacion = %s, estado_stock = %s
+                    WHERE id_producto = %s
+                      AND (%s::int IS NULL OR version = %s::int)
+                """, (ids['ubicacion'], product['estado'], product_id,
+                      inventory_version, inventory_version))
+                if cursor.rowcount == 0:
+                    self._check_conflict(cursor, 'inventario', product_id)
+                    cursor.execute("""
+                        INSERT INTO inventario (id_producto, id_ubicacion, stock, estado_stock)
+                        VALUES (%s, %s, 0, %s)
+                    """, (product_id, ids['ubicacion'], product['estado']))
+            else:
+                cursor.execute("""
+                    INSERT INTO productos (codigo, nombre, id_marca, id_categoria, stock_minimo)
+                    VALUES (%s, %s, %s, %s, %s) RETURNING id_producto
+                """, (product['codigo'], product['nombre'], ids['marca'],
+                      ids['categoria'], product['stock_minimo']))
+                new_id = cursor.fetchone()[0]
+
+                cursor.execute("""
+                    INSERT INTO inventario (id_producto, id_ubicacion, stock, estado_stock)
+                    VALUES (%s, %s, %s, %s)
+                """, (new_id, ids['ubicacion'], product['stock'], product['estado']))
+
+                if stock_inicial:
+                    cursor.execute("""
+                        INSERT INTO movimientos (
+                            id_producto, tipo, cantidad, id_responsable, referencia, fecha
+                        ) VALUES (%s, 'Entrada', %s, %s, 'Producto nuevo', %s)
+                    """, (new_id, product['stock'],
+                          self._valid_user(cursor, id_responsable), datetime.now()))
+                product_id = new_id
+
+        event_bus.publish(ProductChanged([product_id]))
+        if stock_inicial:
+            event_bus.publish(StockChanged([product_id]))
+            event_bus.publish(MovementRecorded([product_id], 'Entrada'))
+        return product_id
+
+    def add_stock(self, product_id, quantity, id_responsable=None, referencia="Entrada de stock"):
+        """Sumar stock a un producto y registrar la entrada. Devuelve el nuevo stock."""
+        quantity = parse_quantity(quantity)
+
+        with transaction(self.conn) as cursor:
+            cursor.execute(f"""
+                UPDATE inventario i
+                SET stock = i.stock + %(cantidad)s,
+                    estado_stock = {estado_stock_sql('i.stock + %(cantidad)s', 'p.stock_minimo')}
+                FROM productos p
+                WHERE i.id_producto = %(id)s AND p.id_producto = i.id_producto
+                RETURNING i.stock
+            """, {'cantidad': quantity, 'id': product_id})
+            row = cursor.fetchone()
+            if not row:
+                raise NotFoundError(f"El producto {product_id} no tiene inventario")
+
+            cursor.execute(_ENTRADA, (
+                product_id, quantity, self._valid_user(cursor, id_responsable),
+                referencia, datetime.now()))
+
+        event_bus.publish(StockChanged([product_id]))
+        event_bus.publish(MovementRecorded([product_id], 'Entrada'))
+        return row[0]
+
+    def bulk_add_stock(self, entries, id_responsable=None, referencia="Entrada por escaneo"):
+        """Agregar stock a varios productos en una sola transacción.
+
+        `entries` es una lista de tuplas (id_producto, cantidad). Actualiza
+        stock y estado con un único UPDATE ... FROM (VALUES ...) y registra los
+        movimientos de entrada en lote. Devuelve los IDs actualizados.
+        """
+        # Consolidar por producto: UPDATE ... FROM aplica una sola fila por destino
+        totals = {}
+        for pid, qty in entries:
+            if int(qty) > 0:
+                totals[int(pid)] = totals.get(int(pid), 0) + int(qty)
+        if not totals:
+            return []
+        entries = list(totals.items())
+
+        with transaction(self.conn) as cursor:
+            id_responsable = self._valid_user(cursor, id_responsable)
+
+            updated = execute_values(cursor, f"""
+                UPDATE inventario i
+                SET stock = i.stock + v.cantidad,
+                    estado_stock = {estado_stock_sql('i.stock + v.cantidad', 'p.stock_minimo')}
+                FROM (VALUES %s) AS v(id_producto, cantidad), productos p
+                WHERE i.id_producto = v.id_producto
+                  AND p.id_producto = v.id_producto
+                RETURNING i.id_producto
+            """, entries, template="(%s::int, %s::int)", page_size=500, fetch=True)
+            updated_ids = {row[0] for row in updated}
+
+            now = datetime.now()
+            execute_values(cursor, """
+                INSERT INTO movimientos (
+                    id_producto, tipo, cantidad, id_responsable, referencia, fecha
+                ) VALUES %s
+            """, [
+                (pid, "Entrada", qty, id_responsable, referencia, now)
+                for pid, qty in entries if pid in updated_ids
+            ], page_size=500)
+
+        if updated_ids:
+            event_bus.publish(StockChanged(updated_ids))
+            event_bus.publish(MovementRecorded(updated_ids, 'Entrada'))
+        return sorted(updated_ids)
+
+    def deactivate_product(self, product_id):
+        """Marcar un producto como inactivo"""
+        with transaction(self.conn) as cursor:
+            cursor.execute(
+                "UPDATE productos SET activo = FALSE WHERE id_producto = %s", (product_id,))
+            if cursor.rowcount == 0:
+                raise NotFoundError(f"No existe el producto {product_id}")
+        event_bus.publish(ProductChanged([product_id]))
@@ -0,0 +1,40 @@
+"""Servidor API local de inventario.
+
+Expone productos, stock, movimientos, solicitudes y proveedores como JSON
+desde un único pool de conexiones, con ETag y caché de respuestas de vida
+corta. Los clientes de escritorio que configuran API_URL en config.py leen
+el panel principal desde aquí; el resto de las pantallas todavía abre sus
+propias conexiones, por lo que el servidor reduce las conexiones del panel
+pero no las de toda la aplicación.
+
+Uso:
+    python servidor_api.py
+    python servidor_api.py --puerto 9000 --ttl 30 --verbose
+"""
+import argparse
+import sys
+from config import API_HOST, API_PORT, API_CACHE_TTL, API_POOL_MAX
+from api.server import run_server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor HTTP/JSON de inventario")
+    parser.add_argument("--host", default=API_HOST, help="Dirección de escucha")
+    parser.add_argument("--puerto", type=int, default=API_PORT, help="Puerto de escucha")
+    parser.add_argument("--ttl", type=int, default=API_CACHE_TTL,
+                        help="Segundos de vida de las respuestas en caché")
+    parser.add_argument("--conexiones", type=int, default=API_POOL_MAX,
+                        help="Máximo de conexiones del pool a PostgreSQL")
+    parser.add_argument("--verbose", action="store_true", help="Registrar cada petición")
+    args = parser.parse_args(argv)
+
+    try:
+        run_server(args.host, args.puerto, args.ttl, args.conexiones, args.verbose)
+    except Exception as e:
+        print(f"No se pudo iniciar el servidor API: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,7 @@
 # views/base_view.py
 import tkinter as tk
 from tkinter import ttk
+from views.dialog_pool import PooledDialog, dialog_pool
 
 
 class AutocompleteCombobox(ttk.Combobox):
@@ -371,6 +372,14 @@ class BaseView:
 
         return window
 
+    def pooled_modal_window(self, key, build):
+        """Formulario modal del pool: se construye con build(window) la primera vez"""
+        def create():
+            window = PooledDialog(self.app, bg=self.bg_color)
+            build(window)
+            return window
+        return dialog_pool.get(key, create)
+
     def center_window(self, window):
         """Centra una ventana en la pantalla"""
         window.update_idletasks()
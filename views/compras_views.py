@@ -1,6 +1,7 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from views.base_view import BaseView
+from diagnostics import timed
 
 
 class PurchaseView(BaseView):
@@ -91,24 +92,40 @@ class PurchaseView(BaseView):
         """Obtiene la solicitud seleccionada en la tabla"""
         return self.get_selected_table_item(self.tree)
 
+    @timed
     def refresh_table(self, data):
         """Actualiza la tabla con nuevos datos"""
         self.refresh_table_data(self.tree, data)
 
     def show_purchase_form(self, categories, products, suppliers, on_save_callback):
-        """Muestra el formulario para nueva solicitud de compra"""
-        window = self.create_modal_window(self.frame, "Nueva Solicitud de Compra", "450x400")
-        
+        """Muestra el formulario para nueva solicitud de compra (construido una vez y reutilizado)"""
+        window = self.pooled_modal_window("solicitud_compra", self._build_purchase_form)
+        entries = window.widgets['entries']
+
+        entries["Categoría:"].set_completion_list(categories)
+        entries["Producto:"].set_completion_list(products)
+        entries["Proveedor:"].set_completion_list(suppliers)
+        window.widgets['save_btn'].configure(
+            command=lambda: self._on_save_purchase_request(entries, window, on_save_callback)
+        )
+
+        window.show("Nueva Solicitud de Compra")
+        return window, entries
+
+    def _build_purchase_form(self, window):
+        """Construye los widgets del formulario de solicitud de compra"""
+        window.geometry("450x400")
+
         main_frame = self.create_form_frame(window, "Datos de la Solicitud")
         main_frame.pack(fill="both", expand=True, padx=10, pady=5)
 
         fields_config = [
-            ("Categoría:", "combobox", categories),
-            ("Producto:", "combobox", products),
+            ("Categoría:", "combobox", None),
+            ("Producto:", "combobox", None),
             ("Cantidad:", "entry", None),
             ("Motivo:", "combobox", ["Reposición", "Nuevo producto", "Emergencia"]),
             ("Prioridad:", "combobox", ["Baja", "Media", "Alta"]),
-            ("Proveedor:", "combobox", suppliers)
+            ("Proveedor:", "combobox", None)
         ]
         
         entries = self.create_form_fields(main_frame, fields_config)
@@ -117,14 +134,11 @@ class PurchaseView(BaseView):
         btn_frame, save_btn, cancel_btn = self.create_form_buttons(window)
         btn_frame.pack(fill="x", pady=10)
         
-        save_btn.configure(
-            text="Enviar Solicitud",
-            command=lambda: self._on_save_purchase_request(entries, window, on_save_callback)
-        )
+        save_btn.configure(text="Enviar Solicitud")
         cancel_btn.configure(command=window.destroy)
 
-        self.center_window(window)
-        return window, entries
+        window.release_commands(save_btn)
+        window.widgets = {'entries': entries, 'save_btn': save_btn}
 
     def show_edit_status_form(self, request_id, current_status, on_save_callback):
         """Muestra el formulario para editar estado"""
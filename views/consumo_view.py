@@ -0,0 +1,109 @@
+import tkinter as tk
+from tkinter import ttk
+from views.base_view import BaseView, AutocompleteCombobox
+
+
+class ConsumoView(BaseView):
+    def __init__(self, frame, app):
+        super().__init__(frame, app)
+        self.controller = None
+        self.tree = None
+
+    def set_controller(self, controller):
+        """Establecer el controlador para esta vista"""
+        self.controller = controller
+
+    def mostrar_ventana_analisis(self, dimensiones, periodos, departamentos, categorias):
+        """Mostrar ventana con filtros y tabla dinámica de consumo"""
+        window = self.create_modal_window(
+            self.app, "Análisis de Consumo por Departamento", "1000x600")
+
+        filter_frame = self.create_filter_frame(window, "Opciones")
+        filter_frame.pack(fill="x", padx=10, pady=5)
+
+        self.filas_var = tk.StringVar(value="Departamento")
+        self.columnas_var = tk.StringVar(value="Categoría")
+        self.periodo_var = tk.StringVar(value="Mes")
+        self.departamento_var = tk.StringVar()
+        self.categoria_var = tk.StringVar()
+        self.date_from_var = tk.StringVar()
+        self.date_to_var = tk.StringVar()
+
+        fila1 = tk.Frame(filter_frame, bg=self.bg_color)
+        fila1.pack(fill="x", pady=2)
+        for texto, var, valores in (("Filas:", self.filas_var, dimensiones),
+                                    ("Columnas:", self.columnas_var, dimensiones),
+                                    ("Período:", self.periodo_var, periodos)):
+            tk.Label(fila1, text=texto, font=self.label_font,
+                     bg=self.bg_color, fg=self.fg_color).pack(side="left", padx=5)
+            ttk.Combobox(fila1, textvariable=var, values=valores, state="readonly",
+                         width=14, font=self.entry_font).pack(side="left", padx=5)
+
+        fila2 = tk.Frame(filter_frame, bg=self.bg_color)
+        fila2.pack(fill="x", pady=2)
+        tk.Label(fila2, text="Departamento:", font=self.label_font,
+                 bg=self.bg_color, fg=self.fg_color).pack(side="left", padx=5)
+        dept_combo = AutocompleteCombobox(
+            fila2, textvariable=self.departamento_var, width=18, font=self.entry_font)
+        dept_combo.set_completion_list(departamentos)
+        dept_combo.pack(side="left", padx=5)
+
+        tk.Label(fila2, text="Categoría:", font=self.label_font,
+                 bg=self.bg_color, fg=self.fg_color).pack(side="left", padx=5)
+        cat_combo = AutocompleteCombobox(
+            fila2, textvariable=self.categoria_var, width=18, font=self.entry_font)
+        cat_combo.set_completion_list(categorias)
+        cat_combo.pack(side="left", padx=5)
+
+        for texto, var in (("Desde:", self.date_from_var), ("Hasta:", self.date_to_var)):
+            tk.Label(fila2, text=texto, font=self.label_font,
+                     bg=self.bg_color, fg=self.fg_color).pack(side="left", padx=5)
+            ttk.Entry(fila2, textvariable=var, width=10,
+                      font=self.entry_font).pack(side="left", padx=5)
+
+        actions = [
+            ("🔍 Aplicar", self.controller.aplicar_filtros),
+            ("🔄 Actualizar datos", self.controller.actualizar_datos),
+            ("📤 Exportar", self.controller.exportar),
+            ("Cerrar", window.destroy)
+        ]
+        btn_frame, _ = self.create_action_buttons(window, actions)
+        btn_frame.pack(fill="x", padx=10, pady=5)
+
+        table_frame, self.tree = self.create_table(
+            window, ("Departamento", "Total"), height=18)
+        table_frame.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+
+        # Desplazamiento horizontal para muchas columnas
+        xscroll = ttk.Scrollbar(window, orient="horizontal",
+                                command=self.tree.xview)
+        self.tree.configure(xscrollcommand=xscroll.set)
+        xscroll.pack(fill="x", padx=10)
+
+        self.center_window(window)
+        return window
+
+    def obtener_opciones(self):
+        """Obtener dimensiones y filtros seleccionados"""
+        return {
+            'filas': self.filas_var.get(),
+            'columnas': self.columnas_var.get(),
+            'periodo': self.periodo_var.get(),
+            'departamento': self.departamento_var.get().strip(),
+            'categoria': self.categoria_var.get().strip(),
+            'date_from': self.date_from_var.get().strip(),
+            'date_to': self.date_to_var.get().strip()
+        }
+
+    def mostrar_pivot(self, encabezados, registros):
+        """Reconfigurar la tabla con las columnas del pivot y cargar datos"""
+        self.tree.delete(*self.tree.get_children())
+        columnas = [f"c{i}" for i in range(len(encabezados))]
+        self.tree.configure(columns=columnas)
+        for col, titulo in zip(columnas, encabezados):
+            self.tree.heading(col, text=titulo)
+            ancho = 180 if col == "c0" else 90
+            self.tree.column(col, width=ancho, minwidth=50, stretch=False)
+
+        for registro in registros:
+            self.tree.insert("", "end", values=registro)
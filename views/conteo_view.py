@@ -0,0 +1,191 @@
+import tkinter as tk
+from tkinter import ttk
+from views.base_view import BaseView
+
+
+class ConteoView(BaseView):
+    def __init__(self, frame, app):
+        super().__init__(frame, app)
+        self.controller = None
+        self.window = None
+
+    def set_controller(self, controller):
+        """Establecer el controlador para esta vista"""
+        self.controller = controller
+
+    def mostrar_ventana_conteo(self):
+        """Mostrar la ventana de conteo físico y conciliación"""
+        window = self.create_modal_window(
+            self.app, "Conteo Físico de Inventario", "950x650")
+        self.window = window
+
+        # --- Sesión de conteo ---
+        session_frame = self.create_filter_frame(window, "Sesión de conteo")
+        session_frame.pack(fill="x", padx=10, pady=5)
+
+        tk.Label(session_frame, text="Sesión:", font=self.label_font,
+                 bg=self.bg_color, fg=self.fg_color).pack(side="left", padx=5)
+        self.sesion_var = tk.StringVar()
+        self.sesion_combo = ttk.Combobox(session_frame, textvariable=self.sesion_var,
+                                         state="readonly", width=50, font=self.entry_font)
+        self.sesion_combo.pack(side="left", padx=5)
+        self.sesion_combo.bind("<<ComboboxSelected>>",
+                               lambda e: self.controller.seleccionar_conteo())
+
+        ttk.Button(session_frame, text="➕ Nueva sesión",
+                   command=self.controller.nueva_sesion).pack(side="left", padx=5)
+        ttk.Button(session_frame, text="🚫 Anular",
+                   command=self.controller.anular_sesion).pack(side="left", padx=5)
+
+        # --- Captura de cantidades ---
+        capture_frame = self.create_filter_frame(window, "Captura")
+        capture_frame.pack(fill="x", padx=10, pady=5)
+
+        tk.Label(capture_frame, text="Código (cantidad*código):", font=self.label_font,
+                 bg=self.bg_color, fg=self.fg_color).pack(side="left", padx=5)
+        self.codigo_var = tk.StringVar()
+        self.codigo_entry = ttk.Entry(capture_frame, textvariable=self.codigo_var,
+                                      width=25, font=self.entry_font)
+        self.codigo_entry.pack(side="left", padx=5)
+        self.codigo_entry.bind("<Return>", lambda e: self.controller.registrar_lectura())
+
+        self.pendientes_label = tk.Label(capture_frame, text="Lecturas sin guardar: 0",
+                                         font=self.label_font, bg=self.bg_color, fg=self.fg_color)
+        self.pendientes_label.pack(side="left", padx=10)
+
+        ttk.Button(capture_frame, text="💾 Guardar lecturas",
+                   command=self.controller.guardar_lecturas).pack(side="left", padx=5)
+        ttk.Button(capture_frame, text="📥 Importar planilla",
+                   command=self.controller.importar_planilla).pack(side="left", padx=5)
+
+        # --- Diferencias ---
+        actions_frame = tk.Frame(window, bg=self.bg_color)
+        actions_frame.pack(fill="x", padx=10, pady=5)
+
+        self.incluir_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(actions_frame, text="Incluir no contados (como 0)",
+                       variable=self.incluir_var, bg=self.bg_color, fg=self.fg_color,
+                       command=self.controller.calcular_diferencias).pack(side="left", padx=5)
+
+        actions = [
+            ("🔄 Calcular diferencias", self.controller.calcular_diferencias),
+            ("✅ Aplicar ajustes", self.controller.aplicar_ajustes),
+            ("📤 Exportar", self.controller.exportar_diferencias),
+            ("Cerrar", self.controller.cerrar)
+        ]
+        btn_frame, _ = self.create_action_buttons(actions_frame, actions)
+        btn_frame.pack(side="left", padx=10)
+
+        columns = ("Código", "Producto", "Ubicación", "Sistema", "Contado", "Diferencia")
+        table_frame, self.tree = self.create_table(
+            window, columns, [110, 280, 150, 90, 90, 90], height=16)
+        table_frame.pack(fill="both", expand=True, padx=10, pady=5)
+        self.tree.tag_configure("faltante", foreground="#c0392b")
+        self.tree.tag_configure("sobrante", foreground="#27ae60")
+
+        self.resumen_label = tk.Label(window, text="", font=self.label_font,
+                                      bg=self.bg_color, fg=self.fg_color)
+        self.resumen_label.pack(anchor="w", padx=10, pady=(0, 10))
+
+        window.protocol("WM_DELETE_WINDOW", self.controller.cerrar)
+        self.center_window(window)
+        self.codigo_entry.focus_set()
+        return window
+
+    def cargar_sesiones(self, sesiones, seleccion=None):
+        """Cargar sesiones abiertas en el combobox"""
+        valores = [f"#{s[0]} - {s[1] or 'Sin descripción'} ({s[2]}, {s[3]}, {s[4]} líneas)"
+                   for s in sesiones]
+        self.sesion_combo['values'] = valores
+        if seleccion is not None:
+            for i, s in enumerate(sesiones):
+                if s[0] == seleccion:
+                    self.sesion_combo.current(i)
+                    return
+        if valores:
+            self.sesion_combo.current(0)
+        else:
+            self.sesion_var.set("")
+
+    def obtener_indice_sesion(self):
+        """Obtener el índice de la sesión seleccionada"""
+        return self.sesion_combo.current()
+
+    def leer_codigo(self):
+        """Leer y limpiar el campo de código"""
+        valor = self.codigo_var.get()
+        self.codigo_var.set("")
+        return valor
+
+    def actualizar_pendientes(self, lecturas, unidades):
+        """Mostrar las lecturas acumuladas sin guardar"""
+        self.pendientes_label.configure(
+            text=f"Lecturas sin guardar: {lecturas} ({unidades} u.)")
+
+    def incluir_no_contados(self):
+        """Indica si los productos no contados se consideran en cero"""
+        return self.incluir_var.get()
+
+    def mostrar_diferencias(self, filas):
+        """Cargar la tabla de diferencias y su resumen"""
+        self.tree.delete(*self.tree.get_children())
+        ajustes = sobrantes = faltantes = 0
+        for _, codigo, nombre, ubicacion, sistema, contado, diferencia in filas:
+            tag = ()
+            if diferencia > 0:
+                tag, sobrantes = ("sobrante",), sobrantes + diferencia
+            elif diferencia < 0:
+                tag, faltantes = ("faltante",), faltantes - diferencia
+            if diferencia:
+                ajustes += 1
+            self.tree.insert("", "end", values=(
+                codigo, nombre, ubicacion, sistema,
+                "-" if contado is None else contado,
+                f"{diferencia:+d}" if diferencia else "0"
+            ), tags=tag)
+
+        self.resumen_label.configure(
+            text=f"Productos: {len(filas)}  |  Con diferencia: {ajustes}  |  "
+                 f"Sobrante: +{sobrantes}  |  Faltante: -{faltantes}")
+
+    def mostrar_estado(self, texto, error=False):
+        """Mostrar el resultado de la última lectura"""
+        self.resumen_label.configure(
+            text=texto, fg="#c0392b" if error else self.fg_color)
+        if error:
+            self.resumen_label.bell()
+
+    def pedir_nueva_sesion(self, ubicaciones):
+        """Solicitar ubicación y descripción para una nueva sesión"""
+        dialog = self.create_modal_window(self.window, "Nueva sesión de conteo", "420x220")
+        form = self.create_form_frame(dialog, "Datos")
+        form.pack(fill="both", expand=True, padx=10, pady=10)
+
+        tk.Label(form, text="Ubicación:", font=self.form_label_font,
+                 bg=self.bg_color, fg=self.fg_color).grid(row=0, column=0, padx=5, pady=5, sticky="e")
+        ubicacion_combo = ttk.Combobox(form, state="readonly", font=self.form_entry_font,
+                                       values=["Todas"] + [u[1] for u in ubicaciones])
+        ubicacion_combo.current(0)
+        ubicacion_combo.grid(row=0, column=1, padx=5, pady=5, sticky="ew")
+
+        tk.Label(form, text="Descripción:", font=self.form_label_font,
+                 bg=self.bg_color, fg=self.fg_color).grid(row=1, column=0, padx=5, pady=5, sticky="e")
+        descripcion_entry = ttk.Entry(form, font=self.form_entry_font)
+        descripcion_entry.grid(row=1, column=1, padx=5, pady=5, sticky="ew")
+
+        resultado = {}
+
+        def aceptar():
+            indice = ubicacion_combo.current()
+            resultado['id_ubicacion'] = ubicaciones[indice - 1][0] if indice > 0 else None
+            resultado['descripcion'] = descripcion_entry.get().strip()
+            dialog.destroy()
+
+        btn_frame, save_btn, cancel_btn = self.create_form_buttons(dialog)
+        btn_frame.pack(fill="x", padx=10, pady=10)
+        save_btn.configure(text="Crear", command=aceptar)
+        cancel_btn.configure(command=dialog.destroy)
+
+        self.center_window(dialog)
+        dialog.wait_window()
+        return resultado or None
@@ -0,0 +1,176 @@
+# views/dialog_pool.py
+import tkinter as tk
+from tkinter import ttk
+
+
+class PooledDialog(tk.Toplevel):
+    """Ventana modal reutilizable.
+
+    Se construye oculta una sola vez; show() la muestra con los datos de la
+    apertura y al cerrarse (también con destroy(), como hacen los
+    controladores) se oculta, se limpian sus campos y queda lista para la
+    siguiente. Los callbacks de los widgets deben leer `context`, que se
+    renueva en cada apertura, en lugar de capturar la vista que la construyó.
+    """
+
+    def __init__(self, parent, title="", size=None, bg=None):
+        super().__init__(parent)
+        self.withdraw()
+        self.title(title)
+        self.resizable(False, False)
+        if bg:
+            self.configure(bg=bg)
+        if size:
+            self.geometry(size)
+        self.context = {}
+        self.is_open = False
+        self._resets = []
+        self._on_hide = []
+        self._commands = []
+        self._previous_grab = None
+        self._centered = False
+        self.protocol("WM_DELETE_WINDOW", self.close)
+
+    def add_reset(self, callback):
+        """Paso de limpieza propio del formulario, ejecutado en cada cierre"""
+        self._resets.append(callback)
+
+    def release_commands(self, *widgets):
+        """Widgets cuyo `command` asigna el controlador en cada apertura.
+
+        Se vacían al cerrar para que el formulario oculto no mantenga vivo al
+        controlador de una pantalla ya cerrada.
+        """
+        self._commands.extend(widgets)
+
+    def on_hide(self, callback):
+        """Ejecutar `callback` al cerrar esta apertura (solo una vez)"""
+        self._on_hide.append(callback)
+
+    def show(self, title=None, **context):
+        """Mostrar la ventana como modal con el contexto de esta apertura"""
+        if self.is_open:
+            self.close()
+        if title:
+            self.title(title)
+        self.context = context
+        self._previous_grab = self.grab_current()
+        self.protocol("WM_DELETE_WINDOW", self.close)
+        self.deiconify()
+        if not self._centered:
+            self._center()
+        self.lift()
+        self.grab_set()
+        self.focus_set()
+        self.is_open = True
+        return self
+
+    def _center(self):
+        self.update_idletasks()
+        w, h = self.winfo_width(), self.winfo_height()
+        x = (self.winfo_screenwidth() - w) // 2
+        y = (self.winfo_screenheight() - h) // 2
+        self.geometry(f"+{x}+{y}")
+        self._centered = True
+
+    def close(self):
+        """Ocultar, avisar a los interesados de esta apertura y limpiar campos"""
+        if not self.is_open:
+            return
+        self.is_open = False
+        try:
+            self.grab_release()
+            self.withdraw()
+        except tk.TclError:
+            return
+
+        callbacks, self._on_hide = self._on_hide, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error al cerrar el formulario: {e}")
+        self.reset()
+        self.context = {}
+        for widget in self._commands:
+            widget.configure(command="")
+        self.protocol("WM_DELETE_WINDOW", self.close)
+
+        # Devolver la modalidad a la ventana que la tenía (p. ej. el
+        # formulario de producto al cerrar "Agregar marca")
+        previous, self._previous_grab = self._previous_grab, None
+        try:
+            if previous is not None and previous.winfo_viewable():
+                previous.grab_set()
+        except tk.TclError:
+            pass
+
+    def reset(self):
+        """Vaciar entradas, combobox, textos y tablas, y aplicar los pasos propios"""
+        _clear_fields(self)
+        for callback in self._resets:
+            callback()
+
+    # Los controladores cierran los formularios con destroy()
+    def destroy(self):
+        self.close()
+
+    def dispose(self):
+        """Destruir realmente la ventana"""
+        self._on_hide = []
+        self._commands = []
+        tk.Toplevel.destroy(self)
+
+
+def _clear_fields(widget):
+    for child in widget.winfo_children():
+        if isinstance(child, ttk.Combobox):
+            child.set("")
+        elif isinstance(child, (ttk.Entry, tk.Entry)):
+            child.configure(state="normal")
+            child.delete(0, tk.END)
+        elif isinstance(child, tk.Text):
+            child.delete("1.0", tk.END)
+        elif isinstance(child, ttk.Treeview):
+            child.delete(*child.get_children())
+        _clear_fields(child)
+
+
+class DialogPool:
+    """Formularios modales construidos una vez y reutilizados por clave"""
+
+    def __init__(self):
+        self._dialogs = {}
+        self.builds = 0
+        self.reuses = 0
+
+    def get(self, key, build):
+        """Diálogo de `key`; la primera vez (o si se destruyó) lo crea con build()"""
+        dialog = self._dialogs.get(key)
+        try:
+            alive = dialog is not None and bool(dialog.winfo_exists())
+        except tk.TclError:
+            alive = False
+        if alive:
+            self.reuses += 1
+            return dialog
+        dialog = build()
+        self._dialogs[key] = dialog
+        self.builds += 1
+        return dialog
+
+    def stats(self):
+        return {'formularios': len(self._dialogs), 'construidos': self.builds,
+                'reutilizados': self.reuses}
+
+    def clear(self):
+        """Destruir todos los formularios del pool"""
+        dialogs, self._dialogs = self._dialogs, {}
+        for dialog in dialogs.values():
+            try:
+                dialog.dispose()
+            except tk.TclError:
+                pass
+
+
+dialog_pool = DialogPool()
@@ -1,6 +1,7 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from views.base_view import BaseView
+from diagnostics import timed
 
 
 class MovementView(BaseView):
@@ -81,6 +82,7 @@ class MovementView(BaseView):
         if self.controller:
             self.controller.export_movements()
 
+    @timed
     def refresh_table(self, data):
         """Actualiza la tabla con nuevos datos"""
         self.refresh_table_data(self.tree, data)
@@ -0,0 +1,213 @@
+# views/notificaciones_view.py
+import tkinter as tk
+from tkinter import ttk
+from views.base_view import BaseView
+from config import NOTIFICACIONES_POR_PAGINA
+
+
+class NotificationPanelView(BaseView):
+    """Centro de notificaciones de stock.
+
+    Agrupa los productos por categoría (con totales) y solo crea las filas de
+    los grupos expandidos, de a una página por vez; el resto se agrega con la
+    fila "Mostrar más". La ventana se construye una sola vez (pool de
+    formularios) y se vuelve a mostrar en cada apertura.
+    """
+
+    def __init__(self, app):
+        super().__init__(None, app)
+        self.controller = None
+        self.window = None
+        self._groups = {}
+        self._loaded = {}
+
+    def set_controller(self, controller):
+        """Establecer el controlador para esta vista"""
+        self.controller = controller
+
+    def show(self, notifications):
+        """Abrir el panel con las notificaciones vigentes"""
+        self.window = self.pooled_modal_window("notificaciones", self._build_panel)
+        self.window.show("Notificaciones")
+        self.render(notifications, expand_first=True)
+
+    def is_open(self):
+        return self.window is not None and self.window.is_open
+
+    def close(self):
+        if self.window is not None:
+            self.window.close()
+
+    def _build_panel(self, window):
+        """Construir los widgets del panel"""
+        window.geometry("760x520")
+        window.resizable(True, True)
+
+        top_frame = tk.Frame(window, bg=self.bg_color)
+        top_frame.pack(fill="x", padx=10, pady=(10, 5))
+
+        summary_label = tk.Label(top_frame, font=self.label_font,
+                                 bg=self.bg_color, fg=self.fg_color, anchor="w")
+        summary_label.pack(side="left", fill="x", expand=True)
+
+        unread_only = tk.BooleanVar(value=False)
+        ttk.Checkbutton(top_frame, text="Solo no leídas", variable=unread_only,
+                        command=lambda: self.render(self.controller.notifications)
+                        ).pack(side="right")
+
+        tree_frame = tk.Frame(window, bg=self.bg_color)
+        tree_frame.pack(fill="both", expand=True, padx=10, pady=5)
+
+        columns = ("Stock", "Mínimo", "Clase", "Estado")
+        tree = ttk.Treeview(tree_frame, columns=columns, show="tree headings",
+                            selectmode="extended")
+        tree.heading("#0", text="Categoría / Producto")
+        tree.column("#0", width=330, anchor="w")
+        for col, width in zip(columns, (80, 80, 60, 110)):
+            tree.heading(col, text=col)
+            tree.column(col, width=width, anchor="center")
+        tree.pack(side="left", fill="both", expand=True)
+
+        scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side="right", fill="y")
+
+        tree.tag_configure("agotado", foreground="#c0392b")
+        tree.tag_configure("stock_bajo", foreground="#b7791f")
+        tree.tag_configure("no_leida", font=self.button_font)
+        tree.tag_configure("grupo", font=self.button_font)
+        tree.tag_configure("mas", foreground=self.primary_color)
+
+        tree.bind("<<TreeviewOpen>>", lambda e: self._on_open())
+        tree.bind("<Double-1>", lambda e: self._on_activate())
+        tree.bind("<Return>", lambda e: self._on_activate())
+
+        btn_frame = tk.Frame(window, bg=self.bg_color)
+        btn_frame.pack(fill="x", padx=10, pady=10)
+
+        ttk.Button(btn_frame, text="Ir al producto",
+                   command=self._on_activate).pack(side="left", padx=5)
+        ttk.Button(btn_frame, text="Marcar seleccionadas como leídas",
+                   command=lambda: self.controller.mark_as_read(self.selected_product_ids())
+                   ).pack(side="left", padx=5)
+        ttk.Button(btn_frame, text="Marcar todas como leídas",
+                   command=lambda: self.controller.mark_all_as_read()).pack(side="left", padx=5)
+        ttk.Button(btn_frame, text="Cerrar", command=window.close).pack(side="right", padx=5)
+
+        window.add_reset(lambda: unread_only.set(False))
+        window.widgets = {'summary_label': summary_label, 'unread_only': unread_only,
+                          'tree': tree}
+
+    # ===== RENDERIZADO =====
+
+    def render(self, notifications, expand_first=False):
+        """Mostrar los grupos; los abiertos conservan las filas ya cargadas"""
+        if not self.is_open():
+            return
+        widgets = self.window.widgets
+        tree = widgets['tree']
+
+        total = len(notifications)
+        unread = sum(1 for n in notifications if not n['leida'])
+        agotados = sum(1 for n in notifications if n['severidad'] == 2)
+        widgets['summary_label'].configure(
+            text=f"{total} productos bajo el mínimo · {agotados} agotados · "
+                 f"{total - agotados} con stock bajo · {unread} sin leer")
+
+        if widgets['unread_only'].get():
+            notifications = [n for n in notifications if not n['leida']]
+
+        # Recordar qué grupos estaban abiertos y cuántas filas tenían
+        abiertos = {iid[len("cat:"):]: self._loaded.get(iid, 0)
+                    for iid in tree.get_children() if tree.item(iid, "open")}
+        tree.delete(*tree.get_children())
+        self._groups = {}
+        self._loaded = {}
+
+        for categoria, items in self._group(notifications):
+            iid = f"cat:{categoria}"
+            sin_leer = sum(1 for n in items if not n['leida'])
+            con_agotados = sum(1 for n in items if n['severidad'] == 2)
+            detalle = f"{len(items)} productos"
+            if con_agotados:
+                detalle += f", {con_agotados} agotados"
+            if sin_leer:
+                detalle += f", {sin_leer} sin leer"
+            tree.insert("", "end", iid=iid, text=f"{categoria} ({detalle})",
+                        tags=("grupo",) + (("agotado",) if con_agotados else ()))
+            self._groups[iid] = items
+
+            if categoria in abiertos or (expand_first and len(self._groups) == 1):
+                tree.item(iid, open=True)
+                self._load_rows(iid, max(abiertos.get(categoria, 0), NOTIFICACIONES_POR_PAGINA))
+            else:
+                # Fila vacía para que el grupo muestre el indicador de expansión
+                tree.insert(iid, "end", iid=f"vacio:{categoria}", text="")
+
+        if not self._groups:
+            tree.insert("", "end", iid="vacio", text="No hay notificaciones")
+
+    @staticmethod
+    def _group(notifications):
+        """Agrupar por categoría; primero los grupos con agotados y los más grandes.
+
+        Las notificaciones ya vienen ordenadas por severidad, de modo que
+        dentro de cada grupo los agotados preceden a los de stock bajo.
+        """
+        groups = {}
+        for n in notifications:
+            groups.setdefault(n['category'], []).append(n)
+        return sorted(groups.items(), key=lambda g: (
+            -sum(1 for n in g[1] if n['severidad'] == 2), -len(g[1]), g[0].lower()))
+
+    def _load_rows(self, group_iid, count=NOTIFICACIONES_POR_PAGINA):
+        """Agregar hasta `count` filas más del grupo y la fila 'Mostrar más' si quedan"""
+        tree = self.window.widgets['tree']
+        categoria = group_iid[len("cat:"):]
+        for iid in (f"vacio:{categoria}", f"mas:{categoria}"):
+            if tree.exists(iid):
+                tree.delete(iid)
+
+        items = self._groups.get(group_iid, [])
+        start = self._loaded.get(group_iid, 0)
+        for n in items[start:start + count]:
+            tags = ("agotado" if n['severidad'] == 2 else "stock_bajo",)
+            if not n['leida']:
+                tags += ("no_leida",)
+            tree.insert(group_iid, "end", iid=f"prod:{n['id']}", text=n['product'],
+                        values=(n['stock'], n['stock_minimo'], n['clase'],
+                                "Agotado" if n['severidad'] == 2 else "Stock bajo"),
+                        tags=tags)
+        self._loaded[group_iid] = min(start + count, len(items))
+
+        restantes = len(items) - self._loaded[group_iid]
+        if restantes > 0:
+            tree.insert(group_iid, "end", iid=f"mas:{categoria}", tags=("mas",),
+                        text=f"Mostrar {min(restantes, NOTIFICACIONES_POR_PAGINA)} más "
+                             f"({restantes} restantes)…")
+
+    def _on_open(self):
+        tree = self.window.widgets['tree']
+        iid = tree.focus()
+        if iid.startswith("cat:") and not self._loaded.get(iid):
+            self._load_rows(iid)
+
+    def _on_activate(self):
+        """Doble clic: cargar la página siguiente o ir al producto"""
+        tree = self.window.widgets['tree']
+        iid = tree.focus()
+        if iid.startswith("mas:"):
+            self._load_rows(tree.parent(iid))
+        elif iid.startswith("prod:"):
+            self.controller.show_product_detail(int(iid[len("prod:"):]))
+
+    def selected_product_ids(self):
+        """IDs de los productos seleccionados (un grupo seleccionado incluye todos los suyos)"""
+        tree = self.window.widgets['tree']
+        ids = set()
+        for iid in tree.selection():
+            if iid.startswith("prod:"):
+                ids.add(int(iid[len("prod:"):]))
+            elif iid in self._groups:
+                ids.update(n['id'] for n in self._groups[iid])
+        return sorted(ids)
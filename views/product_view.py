@@ -2,6 +2,7 @@
 import tkinter as tk
 from tkinter import ttk
 from views.base_view import BaseView, AutocompleteCombobox
+from diagnostics import timed
 
 
 class ProductView(BaseView):
@@ -29,6 +30,10 @@ class ProductView(BaseView):
             ("✏️ Editar", self.controller.edit_selected_product),
             ("🗑️ Eliminar", self.controller.delete_selected_product),
             ("📥 Agregar Stock", self.controller.show_add_stock_form),
+            ("📷 Entrada rápida", self.controller.show_scan_intake),
+            ("📋 Conteo físico", self.controller.show_cycle_count),
+            ("📂 Importar", self.controller.import_products),
+            ("📊 Clasificar ABC/XYZ", self.controller.classify_products),
             ("📤 Exportar", self.controller.export_inventory)
         ]
         button_frame, action_buttons = self.create_action_buttons(
@@ -83,6 +88,15 @@ class ProductView(BaseView):
         self.estado_combo.pack(side="left", padx=5)
         self.estado_combo.set("Todos")
 
+        clase_frame = tk.Frame(filtros_inner_frame, bg=self.bg_color)
+        clase_frame.pack(side="left", padx=5)
+        tk.Label(clase_frame, text="Clase:", font=self.label_font,
+                 bg=self.bg_color, fg=self.fg_color).pack(side="left", padx=5)
+        self.clase_combo = AutocompleteCombobox(
+            clase_frame, width=6, font=self.entry_font)
+        self.clase_combo.pack(side="left", padx=5)
+        self.clase_combo.set("Todas")
+
         # Botón aplicar filtros
         self.apply_btn = ttk.Button(filtros_inner_frame, text="Aplicar Filtros", style="Accent.TButton",
                                     command=self.controller.apply_filters)
@@ -95,8 +109,8 @@ class ProductView(BaseView):
 
         # --- TABLA ---
         columns = ("Nro", "Producto", "Marca", "Categoría",
-                   "Código", "Stock", "Stock (m)", "Ubicación", "Estado")
-        col_widths = [50, 150, 100, 100, 80, 60, 70, 80, 80]  # Ajusta el ancho si es necesario
+                   "Código", "Stock", "Stock (m)", "Ubicación", "Estado", "Clase")
+        col_widths = [50, 150, 100, 100, 80, 60, 70, 80, 80, 60]  # Ajusta el ancho si es necesario
 
         table_frame, self.tree = self.create_table(
             main_container, columns, col_widths, height=15)
@@ -121,6 +135,7 @@ class ProductView(BaseView):
         self.categoria_combo.set("Todas")
         self.marca_combo.set("Todas")
         self.estado_combo.set("Todos")
+        self.clase_combo.set("Todas")
         if self.controller:
             self.controller.apply_filters()
 
@@ -129,9 +144,11 @@ class ProductView(BaseView):
         return {
             'categoria': self.categoria_combo.get(),
             'marca': self.marca_combo.get(),
-            'estado': self.estado_combo.get()
+            'estado': self.estado_combo.get(),
+            'clase': self.clase_combo.get() or "Todas"
         }
 
+    @timed
     def refresh_table(self, data):
         """Refrescar tabla con nuevos datos"""
         self.tree.delete(*self.tree.get_children())
@@ -140,6 +157,42 @@ class ProductView(BaseView):
             fila = (i,) + item[1:]
             self.tree.insert("", "end", values=fila, tags=(item[0],))
 
+    def update_rows(self, product_ids, data):
+        """Actualizar solo las filas de los productos indicados.
+
+        Las filas de `data` reemplazan a las existentes; los productos de
+        `product_ids` sin fila en `data` se quitan y los que no estaban en la
+        tabla se insertan respetando el orden por nombre.
+        """
+        nuevos = {int(item[0]): item for item in data}
+        cambio_orden = False
+        for iid in self.tree.get_children():
+            tags = self.tree.item(iid, "tags")
+            product_id = int(tags[0]) if tags else None
+            if product_id not in product_ids:
+                continue
+            item = nuevos.pop(product_id, None)
+            if item is None:
+                self.tree.delete(iid)
+                cambio_orden = True
+            else:
+                numero = self.tree.item(iid, "values")[0]
+                self.tree.item(iid, values=(numero,) + tuple(item[1:]))
+
+        for product_id, item in nuevos.items():
+            nombre = str(item[1]).lower()
+            posicion = next(
+                (i for i, iid in enumerate(self.tree.get_children())
+                 if str(self.tree.item(iid, "values")[1]).lower() > nombre), "end")
+            self.tree.insert("", posicion, values=(0,) + tuple(item[1:]), tags=(product_id,))
+            cambio_orden = True
+
+        if cambio_orden:
+            for numero, iid in enumerate(self.tree.get_children(), start=1):
+                valores = list(self.tree.item(iid, "values"))
+                valores[0] = numero
+                self.tree.item(iid, values=valores)
+
     def get_selected_product(self):
         """Obtener producto seleccionado"""
         selected_item = self.tree.selection()
@@ -158,12 +211,21 @@ class ProductView(BaseView):
         self.marca_combo.set_completion_list(marcas_list)
 
     def show_product_form(self, product_id=None):
-        """Mostrar formulario de producto"""
-        form_window = self.create_modal_window(
-            self.app,
-            "Nuevo Producto" if not product_id else "Editar Producto",
-            "420x480"  # Aumenté la altura para el nuevo campo
-        )
+        """Mostrar formulario de producto (construido una vez y reutilizado)"""
+        form_window = self.pooled_modal_window("producto", self._build_product_form)
+        form_window.show("Nuevo Producto" if not product_id else "Editar Producto")
+        entries = form_window.widgets['entries']
+
+        # 🔒 BLOQUEAR STOCK INICIAL SI ES EDICIÓN
+        if product_id:
+            entries["Stock inicial:"].config(state="disabled")
+
+        return (form_window, entries, form_window.widgets['buttons'],
+                form_window.widgets['save_btn'])
+
+    def _build_product_form(self, form_window):
+        """Construir los widgets del formulario de producto"""
+        form_window.geometry("420x480")  # Aumenté la altura para el nuevo campo
 
         # Frame principal del formulario
         basic_frame = self.create_form_frame(form_window, "Datos del Producto")
@@ -221,25 +283,25 @@ class ProductView(BaseView):
                 btn.grid(row=i, column=2, padx=(0, 5))
                 buttons[label] = btn
 
-        # 🔒 BLOQUEAR STOCK INICIAL SI ES EDICIÓN
-        if product_id:
-            entries["Stock inicial:"].config(state="disabled")
-            self.create_tooltip(entries["Stock inicial:"],
-                                "El stock inicial no se puede editar. Use 'Agregar Stock' para modificar el inventario.")
+        # El tooltip solo aparece mientras el stock está bloqueado (edición)
+        stock_entry = entries["Stock inicial:"]
+        self.create_tooltip(stock_entry,
+                            "El stock inicial no se puede editar. Use 'Agregar Stock' para modificar el inventario.",
+                            when=lambda: str(stock_entry.cget("state")) == "disabled")
 
         # Botones principales
         btn_frame, save_btn, cancel_btn = self.create_form_buttons(form_window)
         btn_frame.pack(fill="x", pady=10)
         cancel_btn.configure(command=form_window.destroy)
 
-        # Centrar ventana
-        self.center_window(form_window)
+        form_window.release_commands(save_btn, *buttons.values())
+        form_window.widgets = {'entries': entries, 'buttons': buttons, 'save_btn': save_btn}
 
-        return form_window, entries, buttons, save_btn
-
-    def create_tooltip(self, widget, text):
-        """Crear un tooltip para un widget"""
+    def create_tooltip(self, widget, text, when=None):
+        """Crear un tooltip para un widget (opcionalmente solo si when() es verdadero)"""
         def on_enter(event):
+            if when is not None and not when():
+                return
             tooltip = tk.Toplevel()
             tooltip.wm_overrideredirect(True)
             tooltip.wm_geometry(f"+{event.x_root+10}+{event.y_root+10}")
@@ -251,26 +313,35 @@ class ProductView(BaseView):
         def on_leave(event):
             if hasattr(widget, 'tooltip'):
                 widget.tooltip.destroy()
+                del widget.tooltip
 
         widget.bind("<Enter>", on_enter)
         widget.bind("<Leave>", on_leave)
 
     def show_add_stock_form(self, product_name, current_stock):
         """Mostrar formulario para agregar stock"""
-        form_window = self.create_modal_window(
-            self.app,
-            f"Agregar Stock - {product_name}"
-        )
+        form_window = self.pooled_modal_window("agregar_stock", self._build_add_stock_form)
+        widgets = form_window.widgets
+        widgets['product_label'].configure(text=f"Producto: {product_name}")
+        widgets['stock_label'].configure(text=f"Stock actual: {current_stock}")
+        form_window.show(f"Agregar Stock - {product_name}")
+        widgets['qty_entry'].focus_set()
+
+        return form_window, widgets['qty_entry'], widgets['add_btn']
 
+    def _build_add_stock_form(self, form_window):
+        """Construir los widgets del formulario para agregar stock"""
         # Frame principal
         main_frame = self.create_form_frame(form_window, "Agregar Stock")
         main_frame.pack(fill="both", expand=True, padx=16, pady=12)
 
-        # Información del producto
-        tk.Label(main_frame, text=f"Producto: {product_name}",
-                 font=self.form_label_font, bg=self.bg_color, fg=self.fg_color).pack(anchor="w")
-        tk.Label(main_frame, text=f"Stock actual: {current_stock}",
-                 font=self.form_label_font, bg=self.bg_color, fg=self.fg_color).pack(anchor="w")
+        # Información del producto (se completa en cada apertura)
+        product_label = tk.Label(main_frame, font=self.form_label_font,
+                                 bg=self.bg_color, fg=self.fg_color)
+        product_label.pack(anchor="w")
+        stock_label = tk.Label(main_frame, font=self.form_label_font,
+                               bg=self.bg_color, fg=self.fg_color)
+        stock_label.pack(anchor="w")
         tk.Label(main_frame, text="Cantidad a agregar:",
                  font=self.form_label_font, bg=self.bg_color, fg=self.fg_color).pack(anchor="w", pady=(10, 0))
 
@@ -284,9 +355,82 @@ class ProductView(BaseView):
         add_btn.configure(text="Agregar")
         cancel_btn.configure(command=form_window.destroy)
 
-        self.center_window(form_window)
+        form_window.release_commands(add_btn)
+        form_window.widgets = {'product_label': product_label, 'stock_label': stock_label,
+                               'qty_entry': qty_entry, 'add_btn': add_btn}
+
+    def show_scan_intake_form(self):
+        """Mostrar ventana de entrada rápida por escaneo de códigos"""
+        window = self.create_modal_window(
+            self.app, "Entrada rápida por escaneo", "700x550")
 
-        return form_window, qty_entry, add_btn
+        main_frame = self.create_form_frame(window, "Escaneo")
+        main_frame.pack(fill="both", expand=True, padx=16, pady=12)
+
+        tk.Label(main_frame, text="Código (use cantidad*código para múltiplos):",
+                 font=self.form_label_font, bg=self.bg_color, fg=self.fg_color).pack(anchor="w")
+
+        code_var = tk.StringVar()
+        code_entry = ttk.Entry(main_frame, textvariable=code_var,
+                               font=self.form_entry_font)
+        code_entry.pack(fill="x", pady=5, ipady=3)
+
+        status_label = tk.Label(main_frame, text="Listo para escanear",
+                                font=self.form_label_font, bg=self.bg_color, fg=self.fg_color)
+        status_label.pack(anchor="w", pady=(0, 5))
+
+        tree_frame = tk.Frame(main_frame, bg=self.bg_color)
+        tree_frame.pack(fill="both", expand=True)
+
+        columns = ("Código", "Producto", "Stock actual", "Cantidad", "Stock final")
+        tree = ttk.Treeview(tree_frame, columns=columns,
+                            show="headings", height=12)
+        for col, width in zip(columns, (110, 250, 90, 80, 90)):
+            tree.heading(col, text=col)
+            tree.column(col, width=width, anchor="w" if col == "Producto" else "center")
+        tree.pack(side="left", fill="both", expand=True)
+
+        scrollbar = ttk.Scrollbar(
+            tree_frame, orient="vertical", command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side="right", fill="y")
+
+        totals_label = tk.Label(main_frame, text="Productos: 0  |  Unidades: 0",
+                                font=self.form_label_font, bg=self.bg_color, fg=self.fg_color)
+        totals_label.pack(anchor="w", pady=(5, 0))
+
+        btn_frame = tk.Frame(main_frame, bg=self.bg_color)
+        btn_frame.pack(fill="x", pady=10)
+
+        self.center_window(window)
+        code_entry.focus_set()
+
+        return {
+            'window': window,
+            'code_var': code_var,
+            'code_entry': code_entry,
+            'status_label': status_label,
+            'tree': tree,
+            'totals_label': totals_label,
+            'btn_frame': btn_frame
+        }
+
+    def update_scan_row(self, tree, product_id, values):
+        """Insertar o actualizar la fila de un producto escaneado"""
+        iid = str(product_id)
+        if tree.exists(iid):
+            tree.item(iid, values=values)
+            tree.move(iid, "", 0)
+        else:
+            tree.insert("", 0, iid=iid, values=values)
+        tree.selection_set(iid)
+        tree.see(iid)
+
+    def show_scan_status(self, label, text, error=False):
+        """Mostrar el resultado del último escaneo"""
+        label.configure(text=text, fg="#c0392b" if error else self.fg_color)
+        if error:
+            label.bell()
 
     def show_new_value_form(self, table, parent_window=None):
         """Mostrar formulario para agregar nuevo valor a tabla relacionada
@@ -304,18 +448,24 @@ class ProductView(BaseView):
 
         nombre_tabla = nombres_tabla.get(table, table.capitalize())
 
-        form_window = self.create_modal_window(
-            self.app,
-            f"Agregar {nombre_tabla}"
-        )
+        # Un solo formulario sirve para las tres tablas
+        form_window = self.pooled_modal_window("nuevo_valor", self._build_new_value_form)
+        widgets = form_window.widgets
+        widgets['main_frame'].configure(text=f"Nueva {nombre_tabla}")
 
         # Guardar referencia a la ventana padre para mantenerla abierta
-        if parent_window:
-            form_window.parent_window = parent_window
+        form_window.show(f"Agregar {nombre_tabla}")
+        form_window.parent_window = parent_window
+
+        # Enfocar el campo de entrada automáticamente
+        widgets['entry'].focus_set()
+
+        return form_window, widgets['entry'], widgets['save_btn']
 
+    def _build_new_value_form(self, form_window):
+        """Construir los widgets del formulario de nuevo valor"""
         # Frame principal
-        main_frame = self.create_form_frame(
-            form_window, f"Nueva {nombre_tabla}")
+        main_frame = self.create_form_frame(form_window, "")
         main_frame.pack(fill="both", expand=True)
 
         # Campo de nombre
@@ -325,9 +475,6 @@ class ProductView(BaseView):
         entry = ttk.Entry(main_frame, font=self.form_entry_font)
         entry.pack(pady=10, padx=20, fill="x", ipady=3)
 
-        # Enfocar el campo de entrada automáticamente
-        entry.focus_set()
-
         # Botones
         btn_frame, save_btn, cancel_btn = self.create_form_buttons(main_frame)
         btn_frame.pack(pady=10)
@@ -338,6 +485,5 @@ class ProductView(BaseView):
         # Solo cerrar esta ventana modal, no la ventana padre
         cancel_btn.configure(command=form_window.destroy)
 
-        self.center_window(form_window)
-
-        return form_window, entry, save_btn
+        form_window.release_commands(save_btn)
+        form_window.widgets = {'main_frame': main_frame, 'entry': entry, 'save_btn': save_btn}
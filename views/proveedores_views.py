@@ -1,6 +1,7 @@
 import tkinter as tk
 from tkinter import ttk
 from views.base_view import BaseView
+from diagnostics import timed
 
 
 class SupplierView(BaseView):
@@ -102,14 +103,32 @@ class SupplierView(BaseView):
         """Obtiene el proveedor seleccionado en la tabla"""
         return self.get_selected_table_item(self.tree)
 
+    @timed
     def refresh_table(self, data):
         """Actualiza la tabla con nuevos datos"""
         self.refresh_table_data(self.tree, data)
 
     def show_supplier_form(self, app, supplier_id=None):
-        """Formulario para nuevo proveedor o edición"""
+        """Formulario para nuevo proveedor o edición (construido una vez y reutilizado)"""
         title = "Nuevo Proveedor" if not supplier_id else "Editar Proveedor"
-        form_window = self.create_modal_window(app, title, "600x700")
+        form_window = self.pooled_modal_window("proveedor", self._build_supplier_form)
+        widgets = form_window.widgets
+        entries = dict(widgets['entries'])
+
+        # Botón para gestionar productos (solo si es edición)
+        manage_btn = widgets['manage_btn']
+        if supplier_id:
+            manage_btn.pack(side="left", padx=10, ipadx=8, ipady=4)
+            entries["manage_btn"] = manage_btn
+        else:
+            manage_btn.pack_forget()
+
+        form_window.show(title)
+        return form_window, entries, widgets['save_btn']
+
+    def _build_supplier_form(self, form_window):
+        """Construir los widgets del formulario de proveedor"""
+        form_window.geometry("600x700")
 
         # Frame principal del formulario
         main_frame = self.create_form_frame(form_window, "Datos del Proveedor")
@@ -145,17 +164,13 @@ class SupplierView(BaseView):
         btn_frame.pack(fill="x", pady=10)
         cancel_btn.configure(command=form_window.destroy)
 
-        # Botón para gestionar productos (solo si es edición)
-        if supplier_id:
-            manage_btn = ttk.Button(
-                btn_frame, text="📦 Gestionar Productos", style="TButton")
-            manage_btn.pack(side="left", padx=10, ipadx=8, ipady=4)
-            entries["manage_btn"] = manage_btn
-
-        # Centrar ventana
-        self.center_window(form_window)
+        # Botón para gestionar productos; se muestra solo al editar
+        manage_btn = ttk.Button(
+            btn_frame, text="📦 Gestionar Productos", style="TButton")
 
-        return form_window, entries, save_btn
+        form_window.release_commands(save_btn, manage_btn)
+        form_window.widgets = {'entries': entries, 'save_btn': save_btn,
+                               'manage_btn': manage_btn}
 
     def show_supplier_details_view(self, supplier_data, categories, products):
         """Muestra la ventana de detalles del proveedor"""
@@ -217,12 +232,12 @@ class SupplierView(BaseView):
         # Centrar ventana
         self.center_window(detail_window)
 
-    def show_supplier_products_management(self, supplier_id, supplier_name, available_products, current_products):
-        """Muestra la ventana de gestión de productos del proveedor"""
+    def show_supplier_products_management(self, supplier_name, categories):
+        """Muestra la ventana de asignación masiva de productos del proveedor"""
         products_window = self.create_modal_window(
             self.frame,
             f"Gestionar Productos: {supplier_name}",
-            "600x500"
+            "850x600"
         )
 
         # Frame principal
@@ -234,32 +249,38 @@ class SupplierView(BaseView):
         tk.Label(main_frame, text=f"Proveedor: {supplier_name}",
                  font=self.form_label_font, bg=self.bg_color, fg=self.fg_color).pack(pady=(0, 10))
 
-        # Frame para agregar productos
-        add_frame = tk.Frame(main_frame, bg=self.bg_color)
-        add_frame.pack(fill="x", pady=10)
+        # Filtros del catálogo
+        filter_frame = tk.Frame(main_frame, bg=self.bg_color)
+        filter_frame.pack(fill="x", pady=5)
 
-        tk.Label(add_frame, text="Agregar producto:",
+        tk.Label(filter_frame, text="Categoría:",
                  font=self.form_label_font, bg=self.bg_color, fg=self.fg_color).pack(side="left", padx=5)
+        category_combo = ttk.Combobox(
+            filter_frame, state="readonly", width=20, font=self.form_entry_font,
+            values=["Todas"] + list(categories))
+        category_combo.current(0)
+        category_combo.pack(side="left", padx=5)
 
-        # Combobox para productos disponibles
-        product_combo = ttk.Combobox(
-            add_frame, state="readonly", width=30, font=self.form_entry_font)
-        product_combo.pack(side="left", padx=5)
-        product_combo['values'] = available_products
+        tk.Label(filter_frame, text="Buscar:",
+                 font=self.form_label_font, bg=self.bg_color, fg=self.fg_color).pack(side="left", padx=5)
+        search_var = tk.StringVar()
+        ttk.Entry(filter_frame, textvariable=search_var, width=20,
+                  font=self.form_entry_font).pack(side="left", padx=5)
 
-        # Lista de productos actuales
-        tk.Label(main_frame, text="Productos asociados:",
-                 font=self.form_label_font, bg=self.bg_color, fg=self.fg_color).pack(anchor="w", pady=(10, 5))
+        only_assigned_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(filter_frame, text="Solo asignados", variable=only_assigned_var,
+                       bg=self.bg_color, fg=self.fg_color).pack(side="left", padx=5)
 
+        # Catálogo con selección múltiple
         tree_frame = tk.Frame(main_frame, bg=self.bg_color)
-        tree_frame.pack(fill="both", expand=True)
-
-        tree = ttk.Treeview(tree_frame, columns=(
-            "Producto", "Categoría"), show="headings", height=10)
-        tree.heading("Producto", text="Producto")
-        tree.heading("Categoría", text="Categoría")
-        tree.column("Producto", width=200)
-        tree.column("Categoría", width=150)
+        tree_frame.pack(fill="both", expand=True, pady=5)
+
+        columns = ("Asignado", "Código", "Producto", "Categoría")
+        tree = ttk.Treeview(tree_frame, columns=columns, show="headings",
+                            height=14, selectmode="extended")
+        for col, width in zip(columns, (80, 100, 300, 180)):
+            tree.heading(col, text=col)
+            tree.column(col, width=width, anchor="center" if col == "Asignado" else "w")
         tree.pack(side="left", fill="both", expand=True)
 
         scrollbar = ttk.Scrollbar(
@@ -267,29 +288,57 @@ class SupplierView(BaseView):
         tree.configure(yscrollcommand=scrollbar.set)
         scrollbar.pack(side="right", fill="y")
 
-        # Cargar productos actuales
-        for product, category in current_products:
-            tree.insert("", "end", values=(product, category))
+        # Resumen de cambios pendientes
+        status_label = tk.Label(main_frame, text="Sin cambios pendientes",
+                                font=self.form_label_font, bg=self.bg_color, fg=self.fg_color)
+        status_label.pack(anchor="w", pady=(5, 0))
+
+        # Frames para botones
+        action_frame = tk.Frame(main_frame, bg=self.bg_color)
+        action_frame.pack(fill="x", pady=(10, 0))
 
-        # Frame para botones
         btn_frame = tk.Frame(main_frame, bg=self.bg_color)
         btn_frame.pack(fill="x", pady=10)
 
         # Centrar ventana
         self.center_window(products_window)
 
-        return products_window, product_combo, tree, btn_frame
-
-    def get_selected_product_from_tree(self, tree):
-        """Obtiene el producto seleccionado en el treeview"""
-        selected = tree.selection()
-        return selected[0] if selected else None
-
-    def refresh_products_tree(self, tree, products):
-        """Actualiza el treeview de productos"""
+        return {
+            'window': products_window,
+            'category_combo': category_combo,
+            'search_var': search_var,
+            'only_assigned_var': only_assigned_var,
+            'tree': tree,
+            'status_label': status_label,
+            'action_frame': action_frame,
+            'btn_frame': btn_frame
+        }
+
+    def get_selected_product_ids(self, tree):
+        """Obtiene los IDs de los productos seleccionados en el treeview"""
+        return [int(item) for item in tree.selection()]
+
+    def refresh_assignment_tree(self, tree, products):
+        """Actualiza el catálogo de asignación conservando la selección visible"""
+        selected = set(tree.selection())
         tree.delete(*tree.get_children())
-        for product, category in products:
-            tree.insert("", "end", values=(product, category))
+        for product_id, code, name, category, assigned in products:
+            iid = str(product_id)
+            tree.insert("", "end", iid=iid,
+                        values=("✔" if assigned else "", code or "", name, category))
+        visible = [iid for iid in selected if tree.exists(iid)]
+        if visible:
+            tree.selection_set(visible)
+
+    def update_assignment_status(self, label, to_add, to_remove, total_assigned):
+        """Muestra el resumen de cambios pendientes de aplicar"""
+        if to_add or to_remove:
+            label.configure(
+                text=f"Cambios pendientes: +{to_add} / -{to_remove}  "
+                     f"(total asignados: {total_assigned})")
+        else:
+            label.configure(
+                text=f"Sin cambios pendientes (total asignados: {total_assigned})")
 
     def _get_supplier_field_value(self, supplier_data, index, categories):
         """Obtiene el valor formateado de un campo del proveedor"""
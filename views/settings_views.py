@@ -62,6 +62,61 @@ class SettingsView(BaseView):
 
         return tree, button_frame
 
+    def create_diagnostics_tab(self, notebook, on_refresh, on_reset, on_export,
+                               on_toggle_plans, plans_enabled=False):
+        """Crea la pestaña de diagnóstico con las métricas de consultas"""
+        tab_frame = self.create_main_container(notebook)
+        notebook.add(tab_frame, text="📈 Diagnóstico")
+
+        button_frame = self.create_section_frame(tab_frame)
+        button_frame.pack(fill="x", padx=10, pady=5)
+        ttk.Button(button_frame, text="🔄 Refrescar",
+                   command=on_refresh).pack(side="left", padx=5)
+        ttk.Button(button_frame, text="🧹 Reiniciar métricas",
+                   command=on_reset).pack(side="left", padx=5)
+        ttk.Button(button_frame, text="💾 Exportar reporte",
+                   command=on_export).pack(side="left", padx=5)
+        plans_var = tk.BooleanVar(value=plans_enabled)
+        ttk.Checkbutton(button_frame, text="Capturar planes (EXPLAIN ANALYZE)",
+                        variable=plans_var,
+                        command=lambda: on_toggle_plans(plans_var.get())).pack(side="left", padx=5)
+        info_label = tk.Label(button_frame, text="", bg=self.bg_color,
+                              fg=self.fg_color, font=self.entry_font)
+        info_label.pack(side="left", padx=15)
+
+        tk.Label(tab_frame, text="Consultas por operación", font=self.label_font,
+                 bg=self.bg_color, fg=self.fg_color).pack(anchor="w", padx=10)
+        ops_frame, ops_tree = self.create_table(
+            tab_frame,
+            ["Pantalla", "Operación", "Llamadas", "Errores", "p50 ms", "p95 ms",
+             "p99 ms", "Máx ms", "Total ms", "Filas prom.", "SQL"],
+            column_widths=[100, 200, 70, 60, 70, 70, 70, 70, 80, 80, 400],
+            height=12
+        )
+        ops_frame.pack(fill="both", expand=True, padx=10, pady=5)
+
+        tk.Label(tab_frame, text="Consultas lentas recientes", font=self.label_font,
+                 bg=self.bg_color, fg=self.fg_color).pack(anchor="w", padx=10)
+        slow_frame, slow_tree = self.create_table(
+            tab_frame,
+            ["Fecha", "ms", "Pantalla", "Operación", "Filas", "Parámetros", "SQL"],
+            column_widths=[140, 70, 100, 200, 60, 90, 400],
+            height=6
+        )
+        slow_frame.pack(fill="both", expand=True, padx=10, pady=5)
+
+        tk.Label(tab_frame, text="Planes capturados", font=self.label_font,
+                 bg=self.bg_color, fg=self.fg_color).pack(anchor="w", padx=10)
+        plans_frame, plans_tree = self.create_table(
+            tab_frame,
+            ["Fecha", "Huella", "Operación", "ms", "Seq Scans", "Sugerencias"],
+            column_widths=[140, 100, 200, 70, 200, 500],
+            height=5
+        )
+        plans_frame.pack(fill="both", expand=True, padx=10, pady=5)
+
+        return ops_tree, slow_tree, plans_tree, info_label
+
     def create_settings_buttons(self, parent, tab_key, on_add, on_edit, on_delete, on_activate, on_refresh):
         """Crea los botones de acción para una pestaña de settings"""
         # Frame para botones
@@ -48,6 +48,7 @@ class SolicitudesView(BaseView):
         actions = [
             ("➕ Registrar Entrega", self.controller.mostrar_formulario_nueva_entrega),
             ("🔍 Detalles de Solicitud", self.controller.mostrar_detalles_solicitud),
+            ("📊 Análisis de Consumo", self.controller.mostrar_analisis_consumo),
             ("📤 Exportar", self.controller.export_requests)
         ]
         btn_frame, _ = self.create_action_buttons(top_button_frame, actions)
@@ -190,9 +191,34 @@ class SolicitudesView(BaseView):
         return self.get_selected_table_item(self.tree)
 
     def mostrar_formulario_nueva_entrega(self, departamentos, solicitantes, current_user):
-        """Mostrar formulario para nueva entrega"""
-        form_window = self.create_modal_window(
-            self.app, "Registrar Nueva Entrega", "780x750")
+        """Mostrar formulario para nueva entrega (construido una vez y reutilizado)"""
+        form_window = self.pooled_modal_window(
+            "nueva_entrega", self._construir_formulario_entrega)
+        widgets = form_window.widgets
+
+        widgets['dept_combo'].set_completion_list([d[1] for d in departamentos])
+        sol_combo = widgets['sol_combo']
+        sol_combo.set_completion_list([f"{s[1]} ({s[2]})" for s in solicitantes])
+
+        # Responsable de la entrega (label de solo lectura)
+        nombre_responsable = self.obtener_nombre_usuario(current_user)
+        widgets['resp_entrega_label'].configure(text=nombre_responsable)
+
+        # Auto-seleccionar usuario actual como solicitante si existe
+        if current_user:
+            for i, s in enumerate(solicitantes):
+                if s[1] == nombre_responsable:
+                    sol_combo.current(i)
+                    break
+
+        # Los botones del formulario leen el controlador y los datos de esta apertura
+        form_window.show("Registrar Nueva Entrega", controller=self.controller,
+                         departamentos=departamentos, solicitantes=solicitantes)
+        return dict(widgets, window=form_window)
+
+    def _construir_formulario_entrega(self, form_window):
+        """Construir los widgets del formulario de entrega"""
+        form_window.geometry("780x750")
 
         # Frame principal para datos básicos
         basic_frame = self.create_form_frame(
@@ -221,13 +247,12 @@ class SolicitudesView(BaseView):
             font=self.form_entry_font
         )
         dept_combo.grid(row=0, column=1, padx=5, pady=5, sticky="we", ipady=3)
-        dept_combo.set_completion_list([d[1] for d in departamentos])
 
         ttk.Button(
             basic_frame,
             text="➕",
             width=2,
-            command=lambda: self.controller.agregar_departamento(dept_combo)
+            command=lambda: form_window.context['controller'].agregar_departamento(dept_combo)
         ).grid(row=0, column=2, padx=(0, 5))
 
         # Solicitante (AutocompleteCombobox) + botón de agregar
@@ -245,22 +270,18 @@ class SolicitudesView(BaseView):
             font=self.form_entry_font
         )
         sol_combo.grid(row=1, column=1, padx=5, pady=5, sticky="we", ipady=3)
-        sol_combo.set_completion_list(
-            [f"{s[1]} ({s[2]})" for s in solicitantes])
 
         ttk.Button(
             basic_frame,
             text="➕",
             width=2,
-            command=lambda: self.controller.agregar_solicitante(
+            command=lambda: form_window.context['controller'].agregar_solicitante(
                 sol_combo, dept_combo)
         ).grid(row=1, column=2, padx=(0, 5))
 
-        # Responsable de la entrega (label de solo lectura)
-        nombre_responsable = self.obtener_nombre_usuario(current_user)
+        # Responsable de la entrega (se completa en cada apertura)
         resp_entrega_label = tk.Label(
             basic_frame,
-            text=nombre_responsable,
             font=self.form_entry_font,
             bg=self.bg_color,
             fg=self.fg_color
@@ -286,13 +307,6 @@ class SolicitudesView(BaseView):
         memo_entry = ttk.Entry(basic_frame, font=self.form_entry_font)
         memo_entry.grid(row=3, column=1, padx=5, pady=5, sticky="we", ipady=3)
 
-        # Auto-seleccionar usuario actual como solicitante si existe
-        if current_user:
-            for i, s in enumerate(solicitantes):
-                if s[1] == nombre_responsable:
-                    sol_combo.current(i)
-                    break
-
         # Frame para selección de productos
         product_frame = self.create_form_frame(
             form_window, "Selección de Productos")
@@ -332,6 +346,13 @@ class SolicitudesView(BaseView):
         )
         product_combo.pack(side="left", padx=5)
 
+        category_combo.bind(
+            "<<ComboboxSelected>>",
+            lambda e: form_window.context['controller'].on_categoria_seleccionada())
+        product_combo.bind(
+            "<<ComboboxSelected>>",
+            lambda e: form_window.context['controller'].on_producto_seleccionado())
+
         # Detalles del producto seleccionado (alineados en una sola fila con grid)
         detail_frame = tk.Frame(product_frame, bg=self.bg_color)
         detail_frame.pack(fill="x", pady=5)
@@ -409,7 +430,7 @@ class SolicitudesView(BaseView):
         ttk.Button(
             btn_frame,
             text="Agregar Producto",
-            command=lambda: self.controller.agregar_producto_form(
+            command=lambda: form_window.context['controller'].agregar_producto_form(
                 selected_product.get(),
                 qty_entry.get(),
                 output_tree,
@@ -422,7 +443,7 @@ class SolicitudesView(BaseView):
         ttk.Button(
             btn_frame,
             text="Quitar Producto",
-            command=lambda: self.controller.quitar_producto_form(
+            command=lambda: form_window.context['controller'].quitar_producto_form(
                 output_tree, stock_label)
         ).pack(side="left", padx=5)
 
@@ -439,9 +460,10 @@ class SolicitudesView(BaseView):
         save_btn = ttk.Button(
             btn_bottom_frame,
             text="Registrar Entrega",
-            command=lambda: self.controller.registrar_entrega_form(
-                dept_combo, sol_combo, resp_entrega_label, memo_entry,
-                output_tree, departamentos, solicitantes, form_window
+            command=lambda: form_window.context['controller'].registrar_entrega_form(
+                dept_combo, sol_combo, resp_entrega_label, memo_entry, output_tree,
+                form_window.context['departamentos'], form_window.context['solicitantes'],
+                form_window
             )
         )
         save_btn.pack(side="left", padx=10, ipadx=8, ipady=4)
@@ -453,12 +475,16 @@ class SolicitudesView(BaseView):
         )
         cancel_btn.pack(side="right", padx=10, ipadx=8, ipady=4)
 
-        # Centrar ventana
-
-        self.center_window(form_window)
+        # Al cerrar, volver los detalles y las listas de productos a su estado inicial
+        def limpiar():
+            estado_label.config(text="N/A")
+            stock_label.config(text="0")
+            ubicacion_label.config(text="N/A")
+            category_combo.set_completion_list([])
+            product_combo.set_completion_list([])
+        form_window.add_reset(limpiar)
 
-        return {
-            'window': form_window,
+        form_window.widgets = {
             'category_combo': category_combo,
             'product_combo': product_combo,
             'estado_label': estado_label,
@@ -472,7 +498,9 @@ class SolicitudesView(BaseView):
             'selected_solicitante': selected_solicitante,
             # Expose the actual combobox widgets so the controller can update them
             'dept_combo': dept_combo,
-            'sol_combo': sol_combo
+            'sol_combo': sol_combo,
+            'resp_entrega_label': resp_entrega_label,
+            'memo_entry': memo_entry
         }
 
     def actualizar_detalles_producto(self, estado, stock, ubicacion, estado_label, stock_label, ubicacion_label):